@@ -2209,10 +2209,19 @@ def show_database_explorer():
         col1, col2 = st.columns([1, 3])
         with col1:
             search_limit = st.slider("Numero di risultati", min_value=5, max_value=50, value=10)
+        with col2:
+            search_mode = st.radio(
+                "Tipo di ricerca",
+                options=["semantic", "keyword"],
+                format_func=lambda mode: "Semantica" if mode == "semantic" else "Parole chiave",
+                horizontal=True,
+            )
 
         if st.button("🔍 Cerca", disabled=not search_query):
             with st.spinner("Cercando nel database..."):
-                search_results = rag_engine.search_in_database(search_query, limit=search_limit)
+                search_results = [
+                    hit.to_dict() for hit in rag_engine.search_chunks(search_query, limit=search_limit, mode=search_mode)
+                ]
 
             if search_results:
                 st.success(f"✅ Trovati {len(search_results)} risultati")
@@ -2244,6 +2253,10 @@ def show_database_explorer():
                         with col2:
                             st.metric("Score", f"{result['score']:.3f}")
 
+                        if result.get("highlights"):
+                            st.markdown("**Evidenziazioni:**")
+                            for snippet in result["highlights"]:
+                                st.markdown(f"> {snippet}")
                         st.markdown("**Contenuto:**")
                         st.text(result["text"])
             else:
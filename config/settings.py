@@ -32,6 +32,63 @@ class Settings(BaseSettings):
     rag_response_mode: str = Field(default="compact", env="RAG_RESPONSE_MODE")  # compact, tree_summarize, simple
     rag_similarity_top_k: int = Field(default=10, env="RAG_SIMILARITY_TOP_K")  # Number of similar chunks to retrieve
     rag_enable_caching: bool = Field(default=True, env="RAG_ENABLE_CACHING")  # Cache embeddings for faster queries
+    query_cache_ttl_seconds: int = Field(default=3600, env="QUERY_CACHE_TTL_SECONDS")
+    query_cache_max_entries: int = Field(default=5000, env="QUERY_CACHE_MAX_ENTRIES")  # Shared across tenants
+    query_cache_max_mb: int = Field(default=256, env="QUERY_CACHE_MAX_MB")  # Approximate memory budget
+    specialized_analysis_mode: str = Field(
+        default="single_pass", env="SPECIALIZED_ANALYSIS_MODE"
+    )  # single_pass: prompt injected into synthesis; two_pass: second LLM call rewrites the answer
+    semantic_cache_enabled: bool = Field(default=True, env="SEMANTIC_CACHE_ENABLED")  # Reuse answers for paraphrases
+    semantic_cache_threshold: float = Field(default=0.92, env="SEMANTIC_CACHE_THRESHOLD")  # Min cosine similarity
+    semantic_cache_max_entries: int = Field(default=1000, env="SEMANTIC_CACHE_MAX_ENTRIES")  # Per tenant namespace
+    collection_stats_refresh_seconds: int = Field(default=30, env="COLLECTION_STATS_REFRESH_SECONDS")  # Qdrant re-check
+    keyword_search_max_scan: int = Field(
+        default=20_000, env="KEYWORD_SEARCH_MAX_SCAN"
+    )  # Full-text matches ranked per keyword search; past this, only the first matches scanned are ranked
+
+    # Reranking Settings
+    reranker_backend: str = Field(default="torch", env="RERANKER_BACKEND")  # torch, onnx, onnx-int8 (CPU inference)
+    reranker_onnx_int8_file: str = Field(
+        default="onnx/model_qint8_avx512_vnni.onnx", env="RERANKER_ONNX_INT8_FILE"
+    )  # Quantized export inside the model repo
+    reranker_batch_size: int = Field(default=32, env="RERANKER_BATCH_SIZE")  # Max pairs per forward pass
+    reranker_max_batch_chars: int = Field(default=32_000, env="RERANKER_MAX_BATCH_CHARS")  # Longest pair x batch size
+    reranker_score_cache_entries: int = Field(default=50_000, env="RERANKER_SCORE_CACHE_ENTRIES")  # LRU of pair scores
+
+    # Ingestion Pipeline Settings
+    ingestion_embed_batch_size: int = Field(default=256, env="INGESTION_EMBED_BATCH_SIZE")  # Nodes per embedding call
+    ingestion_max_batch_chars: int = Field(default=500_000, env="INGESTION_MAX_BATCH_CHARS")  # Chars per embedding call
+    ingestion_max_concurrency: int = Field(default=4, env="INGESTION_MAX_CONCURRENCY")  # Embedding batches in flight
+    ingestion_upsert_batch_size: int = Field(default=512, env="INGESTION_UPSERT_BATCH_SIZE")  # Nodes per Qdrant upsert
+
+    # Async API Settings
+    blocking_executor_max_workers: int = Field(default=8, env="BLOCKING_EXECUTOR_MAX_WORKERS")  # Parsers & sync calls
+
+    # PDF Extraction Settings
+    pdf_extraction_max_workers: int = Field(default=4, env="PDF_EXTRACTION_MAX_WORKERS")  # Processes, 1 = in-process
+    pdf_parallel_min_pages: int = Field(default=16, env="PDF_PARALLEL_MIN_PAGES")  # Smaller PDFs stay in-process
+    pdf_min_pages_per_shard: int = Field(default=8, env="PDF_MIN_PAGES_PER_SHARD")  # Page range per worker task
+    pdf_table_min_numeric_rows: int = Field(default=3, env="PDF_TABLE_MIN_NUMERIC_ROWS")  # Text rows with 2+ numbers
+    pdf_table_min_numeric_ratio: float = Field(default=0.2, env="PDF_TABLE_MIN_NUMERIC_RATIO")  # Numeric share of words
+    pdf_table_max_engines: int = Field(default=2, env="PDF_TABLE_MAX_ENGINES")  # Engines tried per candidate page
+
+    # OCR Settings
+    ocr_min_page_chars: int = Field(default=100, env="OCR_MIN_PAGE_CHARS")  # PDF pages with less text are OCR'd
+    ocr_max_workers: int = Field(default=2, env="OCR_MAX_WORKERS")  # Concurrent tesseract processes
+    ocr_default_dpi: int = Field(default=300, env="OCR_DEFAULT_DPI")  # Pages without a scanned image
+    ocr_min_dpi: int = Field(default=150, env="OCR_MIN_DPI")  # Clamp for the scan's native resolution
+    ocr_max_dpi: int = Field(default=400, env="OCR_MAX_DPI")
+    ocr_cache_enabled: bool = Field(default=True, env="OCR_CACHE_ENABLED")  # Skip re-OCR of identical images
+    ocr_cache_path: str = Field(default="data/cache/ocr.sqlite", env="OCR_CACHE_PATH")
+    ocr_cache_max_mb: int = Field(default=256, env="OCR_CACHE_MAX_MB")  # LRU eviction above this size
+
+    # Embedding Cache Settings
+    embedding_cache_enabled: bool = Field(default=True, env="EMBEDDING_CACHE_ENABLED")  # Skip re-embedding unchanged text
+    embedding_cache_path: str = Field(default="data/cache/embeddings.sqlite", env="EMBEDDING_CACHE_PATH")
+    embedding_cache_max_mb: int = Field(default=512, env="EMBEDDING_CACHE_MAX_MB")  # LRU eviction above this size
+
+    # Document Catalog Settings
+    document_catalog_dir: str = Field(default="data/catalog", env="DOCUMENT_CATALOG_DIR")  # One SQLite per collection
 
     # Enterprise Features
     hf_hub_disable_symlinks_warning: Optional[str] = Field(default=None, env="HF_HUB_DISABLE_SYMLINKS_WARNING")
@@ -42,6 +99,10 @@ class Settings(BaseSettings):
     jwt_algorithm: str = Field(default="HS256", env="JWT_ALGORITHM")
     session_duration_hours: int = Field(default=8, env="SESSION_DURATION_HOURS")
     max_tenants_per_instance: int = Field(default=100, env="MAX_TENANTS_PER_INSTANCE")
+    tenant_engine_max_count: int = Field(default=50, env="TENANT_ENGINE_MAX_COUNT")  # Cached RAG engines per process
+    tenant_engine_idle_seconds: int = Field(default=1800, env="TENANT_ENGINE_IDLE_SECONDS")  # Evict unused engines
+    tenant_engine_memory_mb: int = Field(default=2048, env="TENANT_ENGINE_MEMORY_MB")  # Budget for cached engines
+    tenant_engine_base_mb: int = Field(default=40, env="TENANT_ENGINE_BASE_MB")  # Estimated fixed cost per engine
 
     # Tenant Database
     tenant_db_path: str = Field(default="data/multi_tenant.db", env="TENANT_DB_PATH")
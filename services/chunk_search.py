@@ -0,0 +1,191 @@
+"""Retrieval-only chunk search helpers: query terms, keyword scoring and highlights (no LLM involved)."""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+import heapq
+import json
+import math
+import re
+from typing import Any, Optional
+
+from llama_index.core.schema import BaseNode, MetadataMode
+from llama_index.vector_stores.qdrant import QdrantVectorStore
+
+# Same tokenization as the Qdrant full-text index (word tokenizer, lowercase)
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Payload field holding the serialized LlamaIndex node (JSON with text, metadata, hashes, relationships)
+NODE_CONTENT_FIELD = "_node_content"
+
+# Payload field holding only the chunk text, the one covered by the full-text index
+CHUNK_TEXT_FIELD = "text"
+
+
+class ChunkTextQdrantVectorStore(QdrantVectorStore):
+    """Qdrant vector store that also writes each chunk's plain text to ``CHUNK_TEXT_FIELD``.
+
+    Full-text indexing the serialized node would match JSON keys and metadata values, and its
+    escaped newlines glue an ``n`` to the first word of every line.
+    """
+
+    def _build_points(self, nodes: list[BaseNode], sparse_vector_name: str) -> tuple[list[Any], list[str]]:
+        points, ids = super()._build_points(nodes, sparse_vector_name)
+        for point, node in zip(points, nodes):
+            point.payload[CHUNK_TEXT_FIELD] = node.get_content(metadata_mode=MetadataMode.NONE)
+        return points, ids
+
+
+@dataclass
+class ChunkHit:
+    """One ranked chunk returned by a retrieval-only search."""
+
+    id: str
+    score: float
+    text: str
+    metadata: dict[str, Any] = field(default_factory=dict)
+    highlights: list[str] = field(default_factory=list)
+
+    def to_dict(self, preview_chars: int = 300) -> dict[str, Any]:
+        """Convert to the dictionary format of ``RAGEngine.search_in_database``."""
+        preview = self.text[:preview_chars] + "..." if len(self.text) > preview_chars else self.text
+        return {
+            "id": self.id,
+            "source": self.metadata.get("source", "Unknown"),
+            "page": self.metadata.get("page"),
+            "score": self.score,
+            "text": preview,
+            "highlights": self.highlights,
+            "metadata": self.metadata,
+        }
+
+
+def query_terms(query: str, min_token_len: int = 2) -> list[str]:
+    """Lowercased, de-duplicated query words as tokenized by the full-text index."""
+    seen = []
+    for token in _WORD_RE.findall(query.lower()):
+        if len(token) >= min_token_len and token not in seen:
+            seen.append(token)
+    return seen
+
+
+def payload_text(payload: dict[str, Any]) -> str:
+    """Chunk text stored in a Qdrant payload (plain field, or the serialized node of older points)."""
+    text = payload.get(CHUNK_TEXT_FIELD)
+    if isinstance(text, str):
+        return text
+    content = payload.get(NODE_CONTENT_FIELD)
+    if content:
+        try:
+            return json.loads(content).get("text") or ""
+        except (TypeError, ValueError):
+            return str(content)
+    return ""
+
+
+def payload_metadata(payload: dict[str, Any]) -> dict[str, Any]:
+    """Payload without the serialized node and the chunk text, i.e. the chunk metadata shown in the explorer."""
+    return {
+        key: value for key, value in payload.items() if not key.startswith("_node_") and key != CHUNK_TEXT_FIELD
+    }
+
+
+def keyword_score(text: str, terms: list[str]) -> float:
+    """Relevance of a chunk for the query terms: saturated term frequency, length normalized.
+
+    Returns:
+        Score in [0, 1); 0 when no term occurs in the text
+    """
+    if not terms:
+        return 0.0
+    tokens = _WORD_RE.findall(text.lower())
+    if not tokens:
+        return 0.0
+    counts: dict[str, int] = {}
+    for token in tokens:
+        counts[token] = counts.get(token, 0) + 1
+    # BM25-style saturation (k1=1.2, b=0.75 against a 100-token reference chunk)
+    length_norm = 0.25 + 0.75 * len(tokens) / 100
+    total = 0.0
+    for term in terms:
+        tf = counts.get(term, 0)
+        total += tf * 2.2 / (tf + 1.2 * length_norm)
+    return 1 - math.exp(-total / len(terms))
+
+
+def highlight_snippets(
+    text: str, terms: list[str], max_snippets: int = 3, window: int = 80, marker: str = "**"
+) -> list[str]:
+    """Snippets of ``text`` around occurrences of the query terms, with the terms wrapped in ``marker``.
+
+    Args:
+        text: Chunk text
+        terms: Lowercased query terms
+        max_snippets: Maximum number of snippets returned
+        window: Characters of context on each side of a match
+        marker: String placed before and after every highlighted term
+    """
+    if not terms or not text:
+        return []
+    pattern = re.compile(r"\b(" + "|".join(re.escape(term) for term in terms) + r")\b", re.IGNORECASE)
+    snippets: list[str] = []
+    covered_until = -1
+    for match in pattern.finditer(text):
+        if match.start() < covered_until:
+            continue
+        start = max(0, match.start() - window)
+        end = min(len(text), match.end() + window)
+        covered_until = end
+        fragment = pattern.sub(lambda m: f"{marker}{m.group(0)}{marker}", text[start:end])
+        snippets.append(("..." if start > 0 else "") + fragment.strip() + ("..." if end < len(text) else ""))
+        if len(snippets) >= max_snippets:
+            break
+    return snippets
+
+
+def rank_keyword_hits(
+    points: Iterable[Any], terms: list[str], limit: int, max_snippets: int = 3
+) -> list[ChunkHit]:
+    """Score keyword-matched Qdrant points locally and return the best ``limit`` hits.
+
+    Points may be streamed (e.g. scroll pages): only the best ``limit`` are kept in memory,
+    and highlights are computed for those alone.
+
+    Args:
+        points: Records returned by a full-text filtered scroll (payload included)
+        terms: Lowercased query terms
+        limit: Number of hits to return
+        max_snippets: Maximum highlights per hit
+    """
+    scored = (
+        (keyword_score(payload_text(point.payload or {}), terms), order, point) for order, point in enumerate(points)
+    )
+    # Ties keep scroll order
+    best = heapq.nlargest(limit, scored, key=lambda item: (item[0], -item[1]))
+    hits = []
+    for score, _, point in best:
+        payload = point.payload or {}
+        text = payload_text(payload)
+        hits.append(
+            ChunkHit(
+                id=str(point.id),
+                score=score,
+                text=text,
+                metadata=payload_metadata(payload),
+                highlights=highlight_snippets(text, terms, max_snippets=max_snippets),
+            )
+        )
+    return hits
+
+
+def node_hit(node_with_score: Any, terms: list[str], max_snippets: int = 3) -> ChunkHit:
+    """Build a hit from a LlamaIndex ``NodeWithScore`` returned by a retriever."""
+    node = node_with_score.node
+    text = node.get_content() or ""
+    score: Optional[float] = node_with_score.score
+    return ChunkHit(
+        id=node.node_id,
+        score=float(score) if score is not None else 0.0,
+        text=text,
+        metadata=dict(node.metadata),
+        highlights=highlight_snippets(text, terms, max_snippets=max_snippets),
+    )
@@ -0,0 +1,218 @@
+"""Cached collection statistics readable without building a RAG engine."""
+
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from config.settings import settings
+from src.infrastructure.performance.connection_pool import get_qdrant_pool
+
+logger = logging.getLogger(__name__)
+
+
+def collection_name_for(tenant_context=None) -> str:
+    """Get the Qdrant collection name of a tenant (or the default collection)."""
+    if tenant_context:
+        return f"tenant_{tenant_context.tenant_id}_docs"
+    return settings.qdrant_collection_name
+
+
+@dataclass
+class CollectionStats:
+    """Statistics of one collection, kept in sync with inserts and deletes."""
+
+    collection_name: str
+    points_count: int = 0
+    vector_dimension: Optional[int] = None
+    distance_metric: Optional[str] = None
+    source_counts: Optional[dict[str, int]] = None  # Chunks per source; None until a read asks for them
+    checked_at: float = 0.0  # Last time points_count was compared with Qdrant
+
+    @property
+    def index_size_mb(self) -> float:
+        """Approximate size of the stored float32 vectors."""
+        return self.points_count * (self.vector_dimension or 0) * 4 / (1024 * 1024)
+
+    def to_dict(self, include_sources: bool = False) -> dict[str, Any]:
+        """Convert to the dictionary format of ``RAGEngine.get_index_stats``."""
+        result = {
+            "total_vectors": self.points_count,
+            "collection_name": self.collection_name,
+            "vector_dimension": self.vector_dimension,
+            "distance_metric": self.distance_metric,
+            "index_size_mb": round(self.index_size_mb, 2),
+        }
+        if self.source_counts is not None:
+            result["document_count"] = len(self.source_counts)
+            if include_sources:
+                result["chunks_per_source"] = dict(self.source_counts)
+        return result
+
+    def is_fresh(self, refresh_seconds: float, include_sources: bool) -> bool:
+        """Whether these statistics can answer a read without asking Qdrant."""
+        if include_sources and self.source_counts is None:
+            return False
+        return time.monotonic() - self.checked_at < refresh_seconds
+
+
+class CollectionStatsService:
+    """Serve collection statistics from memory, updated incrementally on insert/delete.
+
+    Point counts come from the cheap collection info, re-read every ``refresh_seconds``.
+    Chunks per source need a payload-only scroll of the ``source`` field, which runs
+    only when a read asks for sources and none are tracked: once when first asked, and
+    again only after Qdrant reports a different point count than the one tracked here
+    (e.g. writes from another worker process).
+    """
+
+    def __init__(
+        self,
+        client_provider: Optional[Callable[[], AbstractContextManager]] = None,
+        refresh_seconds: float = 30.0,
+        scroll_batch_size: int = 1000,
+    ):
+        """Initialize service.
+
+        Args:
+            client_provider: Callable returning a context manager yielding a Qdrant client
+            refresh_seconds: Minimum interval between checks against Qdrant
+            scroll_batch_size: Points per scroll request when counting chunks per source
+        """
+        self.client_provider = client_provider or (lambda: get_qdrant_pool().get_connection())
+        self.refresh_seconds = refresh_seconds
+        self.scroll_batch_size = scroll_batch_size
+        self._stats: dict[str, CollectionStats] = {}
+        self._lock = threading.Lock()
+        self._refresh_locks: dict[str, threading.Lock] = {}
+
+    def get_stats(self, collection_name: str, include_sources: bool = False) -> dict[str, Any]:
+        """Get statistics of a collection, refreshing them from Qdrant only when due."""
+        with self._lock:
+            stats = self._stats.get(collection_name)
+            if stats is not None and stats.is_fresh(self.refresh_seconds, include_sources):
+                return stats.to_dict(include_sources)
+            refresh_lock = self._refresh_locks.setdefault(collection_name, threading.Lock())
+
+        with refresh_lock:
+            with self._lock:
+                stats = self._stats.get(collection_name)
+                if stats is not None and stats.is_fresh(self.refresh_seconds, include_sources):
+                    return stats.to_dict(include_sources)
+            try:
+                stats = self._refresh(collection_name, stats, include_sources)
+            except Exception as e:
+                logger.error(f"Error getting index stats: {str(e)}")
+                return {"total_vectors": 0, "error": str(e)}
+            return stats.to_dict(include_sources)
+
+    def _refresh(
+        self, collection_name: str, previous: Optional[CollectionStats], include_sources: bool
+    ) -> CollectionStats:
+        """Compare with Qdrant; count chunks per source only if asked for and not tracked in sync."""
+        with self.client_provider() as client:
+            info = client.get_collection(collection_name)
+            vectors = info.config.params.vectors
+            points_count = info.points_count or 0
+
+            in_sync = previous is not None and previous.points_count == points_count
+            source_counts = previous.source_counts if in_sync else None
+            if include_sources and source_counts is None:
+                source_counts = self._count_sources(client, collection_name)
+
+        with self._lock:
+            stats = self._stats.get(collection_name)
+            if stats is None or not in_sync or source_counts is not stats.source_counts:
+                stats = CollectionStats(
+                    collection_name=collection_name,
+                    points_count=points_count,
+                    source_counts=source_counts,
+                )
+                self._stats[collection_name] = stats
+            stats.vector_dimension = getattr(vectors, "size", None)
+            stats.distance_metric = str(getattr(vectors, "distance", ""))
+            stats.checked_at = time.monotonic()
+            return stats
+
+    def _count_sources(self, client, collection_name: str) -> dict[str, int]:
+        """Count chunks per source with a payload-only scroll."""
+        counts: dict[str, int] = {}
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection_name,
+                limit=self.scroll_batch_size,
+                offset=offset,
+                with_payload=["source"],
+                with_vectors=False,
+            )
+            for point in points:
+                source = (point.payload or {}).get("source", "Unknown")
+                counts[source] = counts.get(source, 0) + 1
+            if not points or offset is None:
+                break
+        logger.debug(f"Counted chunks of {len(counts)} sources in {collection_name}")
+        return counts
+
+    def record_insert(self, collection_name: str, source_counts: dict[str, int]) -> None:
+        """Account for chunks inserted by this process."""
+        with self._lock:
+            stats = self._stats.get(collection_name)
+            if stats is None:
+                return  # Built from Qdrant on first read
+            for source, count in source_counts.items():
+                if stats.source_counts is not None:
+                    stats.source_counts[source] = stats.source_counts.get(source, 0) + count
+                stats.points_count += count
+
+    def record_delete(self, collection_name: str, source: str, count: Optional[int] = None) -> None:
+        """Account for the chunks of a source deleted by this process.
+
+        Args:
+            collection_name: Collection name
+            source: Deleted source
+            count: Deleted chunks; None removes all tracked chunks of the source
+        """
+        with self._lock:
+            stats = self._stats.get(collection_name)
+            if stats is None:
+                return
+            if stats.source_counts is None:
+                if count is None:
+                    stats.checked_at = 0.0  # Deleted chunks unknown: re-read the point count
+                else:
+                    stats.points_count = max(0, stats.points_count - count)
+                return
+            tracked = stats.source_counts.get(source, 0)
+            removed = tracked if count is None else count
+            stats.points_count = max(0, stats.points_count - removed)
+            if tracked - removed > 0:
+                stats.source_counts[source] = tracked - removed
+            else:
+                stats.source_counts.pop(source, None)
+
+    def invalidate(self, collection_name: Optional[str] = None) -> None:
+        """Forget statistics of one collection (or all), forcing a rescan on next read."""
+        with self._lock:
+            if collection_name is None:
+                self._stats.clear()
+            else:
+                self._stats.pop(collection_name, None)
+
+
+# Global collection stats service
+_collection_stats_service = None
+_collection_stats_service_lock = threading.Lock()
+
+
+def get_collection_stats_service() -> CollectionStatsService:
+    """Get or create global collection stats service."""
+    global _collection_stats_service
+    with _collection_stats_service_lock:
+        if _collection_stats_service is None:
+            _collection_stats_service = CollectionStatsService(
+                refresh_seconds=settings.collection_stats_refresh_seconds
+            )
+        return _collection_stats_service
@@ -11,10 +11,13 @@ Estende i risultati di ricerca includendo chunks adiacenti per maggiore contesto
 """
 
 import logging
-from typing import Dict, List, Optional, Set, Tuple, Any
+from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 import time
 
+from llama_index.core.vector_stores.utils import metadata_dict_to_node
+from qdrant_client.http import models as rest
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,7 +50,11 @@ class ContextualRetrievalService:
         self.similarity_threshold = similarity_threshold
 
     def enhance_retrieval_results(
-        self, original_results: List[Dict], vector_store, include_metadata: bool = True
+        self,
+        original_results: list[dict],
+        vector_store,
+        include_metadata: bool = True,
+        qdrant_filter: Optional[rest.Filter] = None,
     ) -> List[ChunkContext]:
         """Arricchisce i risultati di ricerca con chunks di contesto.
 
@@ -55,6 +62,7 @@ class ContextualRetrievalService:
             original_results: Risultati originali dalla ricerca vettoriale
             vector_store: Store vettoriale per recuperare chunks aggiuntivi
             include_metadata: Se includere metadata dettagliati
+            qdrant_filter: Filtro della ricerca originale (RLS, tenant, entità), applicato anche ai chunks adiacenti
 
         Returns:
             Lista di ChunkContext con chunks originali e di contesto
@@ -76,6 +84,9 @@ class ContextualRetrievalService:
                 f"Filtered {len(original_results)} to {len(filtered_results)} results above threshold {self.similarity_threshold}"
             )
 
+            # Recupera in un'unica richiesta tutti i chunks adiacenti necessari
+            neighbors = self._fetch_neighbors(filtered_results, vector_store, qdrant_filter)
+
             for result in filtered_results:
                 # Aggiungi chunk originale
                 original_chunk = self._create_chunk_context(result, "original", result.get("score", 0))
@@ -84,8 +95,8 @@ class ContextualRetrievalService:
                     enhanced_results.append(original_chunk)
                     processed_chunks.add(original_chunk.chunk_id)
 
-                # Recupera chunks di contesto
-                context_chunks = self._get_contextual_chunks(result, vector_store, processed_chunks)
+                # Chunks di contesto
+                context_chunks = self._get_contextual_chunks(result, neighbors, processed_chunks)
 
                 enhanced_results.extend(context_chunks)
                 processed_chunks.update(chunk.chunk_id for chunk in context_chunks)
@@ -121,31 +132,60 @@ class ContextualRetrievalService:
             chunk_index=metadata.get("chunk_index", 0),
         )
 
+    @staticmethod
+    def _chunk_position(result: dict) -> Optional[tuple[str, int]]:
+        """(source, chunk_index) of a result, or None for chunks indexed without a position."""
+        metadata = result.get("metadata", {})
+        source_file = metadata.get("source", metadata.get("file_name"))
+        chunk_index = metadata.get("chunk_index")
+        if not source_file or chunk_index is None:
+            return None
+        return source_file, int(chunk_index)
+
+    def _neighbor_positions(self, results: list[dict]) -> dict[str, set[int]]:
+        """Indici adiacenti da recuperare, raggruppati per source."""
+        wanted: dict[str, set[int]] = {}
+        for result in results:
+            position = self._chunk_position(result)
+            if position is None:
+                continue
+            source_file, chunk_index = position
+            for offset in range(-self.window_size, self.window_size + 1):
+                if offset != 0 and chunk_index + offset >= 0:
+                    wanted.setdefault(source_file, set()).add(chunk_index + offset)
+        return wanted
+
+    def _fetch_neighbors(
+        self, results: list[dict], vector_store, qdrant_filter: Optional[rest.Filter] = None
+    ) -> dict[tuple[str, int], dict]:
+        """Recupera tutti i chunks adiacenti dei risultati con un solo scroll su Qdrant.
+
+        Returns:
+            Mappa (source, chunk_index) -> chunk
+        """
+        wanted = self._neighbor_positions(results)
+        if not wanted:
+            return {}
+        return self._find_chunks_by_index(vector_store, wanted, qdrant_filter)
+
     def _get_contextual_chunks(
-        self, original_result: Dict, vector_store, processed_chunks: Set[str]
+        self, original_result: dict, neighbors: dict[tuple[str, int], dict], processed_chunks: set[str]
     ) -> List[ChunkContext]:
-        """Recupera chunks di contesto per un risultato originale."""
+        """Costruisce i chunks di contesto di un risultato originale dai vicini già recuperati."""
         context_chunks = []
 
         try:
-            metadata = original_result.get("metadata", {})
-            source_file = metadata.get("source", metadata.get("file_name"))
-            chunk_index = metadata.get("chunk_index", 0)
-
-            if not source_file:
+            position = self._chunk_position(original_result)
+            if position is None:
                 return context_chunks
+            source_file, chunk_index = position
 
-            # Recupera chunks adiacenti
+            # Chunks adiacenti
             for offset in range(-self.window_size, self.window_size + 1):
                 if offset == 0:  # Skip original chunk
                     continue
 
-                adjacent_index = chunk_index + offset
-                if adjacent_index < 0:
-                    continue
-
-                # Cerca chunk adiacente nello store
-                adjacent_chunk = self._find_chunk_by_index(vector_store, source_file, adjacent_index)
+                adjacent_chunk = neighbors.get((source_file, chunk_index + offset))
 
                 if adjacent_chunk and adjacent_chunk["id"] not in processed_chunks:
                     context_type = "before" if offset < 0 else "after"
@@ -164,46 +204,60 @@ class ContextualRetrievalService:
             logger.warning(f"Error getting contextual chunks: {e}")
             return []
 
-    def _find_chunk_by_index(self, vector_store, source_file: str, chunk_index: int) -> Optional[Dict]:
-        """Trova un chunk specifico per source e indice."""
+    def _find_chunks_by_index(
+        self, vector_store, wanted: dict[str, set[int]], qdrant_filter: Optional[rest.Filter] = None
+    ) -> dict[tuple[str, int], dict]:
+        """Trova i chunks per (source, chunk_index) con un'unica richiesta filtrata.
+
+        Il filtro è un OR per source di ``source == s AND chunk_index IN (...)``,
+        servito dagli indici di payload su ``source`` e ``chunk_index``. Il filtro della
+        ricerca originale è sempre in ``must``: un chunk escluso al chiamante non torna come contesto.
+        """
         try:
-            # Implementazione dipende dal tipo di vector store
-            if hasattr(vector_store, "query_with_filter"):
-                # Qdrant o store con filtri
-                filter_conditions = {"source": source_file, "chunk_index": chunk_index}
-                results = vector_store.query_with_filter(
-                    query_vector=None,  # Non usiamo query vettoriale
-                    filter_dict=filter_conditions,
-                    top_k=1,
-                )
-                return results[0] if results else None
-
-            elif hasattr(vector_store, "_collection"):
-                # Per Qdrant diretto
-                from qdrant_client.http import models as rest
-
-                search_result = vector_store._client.scroll(
-                    collection_name=vector_store._collection_name,
-                    scroll_filter=rest.Filter(
+            client = getattr(vector_store, "client", None)
+            collection_name = getattr(vector_store, "collection_name", None)
+            if client is None or not collection_name:
+                return {}
+
+            scroll_filter = rest.Filter(
+                should=[
+                    rest.Filter(
                         must=[
                             rest.FieldCondition(key="source", match=rest.MatchValue(value=source_file)),
-                            rest.FieldCondition(key="chunk_index", match=rest.MatchValue(value=chunk_index)),
+                            rest.FieldCondition(key="chunk_index", match=rest.MatchAny(any=sorted(indexes))),
                         ]
-                    ),
-                    limit=1,
-                    with_payload=True,
-                    with_vectors=False,
-                )
-
-                if search_result[0]:  # points, next_page_offset
-                    point = search_result[0][0]
-                    return {"id": point.id, "content": point.payload.get("text", ""), "metadata": point.payload}
+                    )
+                    for source_file, indexes in wanted.items()
+                ]
+            )
+            if qdrant_filter is not None:
+                scroll_filter = rest.Filter(must=[qdrant_filter, scroll_filter])
+            points, _ = client.scroll(
+                collection_name=collection_name,
+                scroll_filter=scroll_filter,
+                limit=sum(len(indexes) for indexes in wanted.values()),
+                with_payload=True,
+                with_vectors=False,
+            )
 
-            return None
+            chunks = {}
+            for point in points:
+                payload = point.payload or {}
+                try:
+                    node = metadata_dict_to_node(payload)
+                    content, metadata = node.get_content(), node.metadata
+                except Exception:
+                    content = payload.get("text", "")
+                    metadata = {key: value for key, value in payload.items() if not key.startswith("_")}
+                chunk = {"id": str(point.id), "content": content, "metadata": metadata}
+                position = self._chunk_position(chunk)
+                if position is not None:
+                    chunks[position] = chunk
+            return chunks
 
         except Exception as e:
-            logger.warning(f"Error finding chunk by index: {e}")
-            return None
+            logger.warning(f"Error finding chunks by index: {e}")
+            return {}
 
     def _reorder_with_context_awareness(self, chunks: List[ChunkContext]) -> List[ChunkContext]:
         """Riordina chunks mantenendo consapevolezza del contesto."""
@@ -1,6 +1,7 @@
 """CSV Data Analyzer module for financial and business data analysis."""
 
 from datetime import datetime
+from decimal import Decimal
 import json
 import logging
 from typing import Any, Optional
@@ -85,52 +86,50 @@ class CSVAnalyzer:
             return series
 
     def _parse_numeric_column(self, series: pd.Series, column_name: str, file_path: str) -> tuple[Optional[pd.Series], list[ProvenancedValue]]:
-        """Parse numeric column using enterprise DataNormalizer"""
-        parsed_values = []
-        converted_values = []
-
-        for idx, value in series.items():
-            if pd.isna(value) or value == '':
-                converted_values.append(np.nan)
-                continue
-
-            # Use the enterprise DataNormalizer
-            normalized = self.data_normalizer.normalize_number(str(value), context=column_name)
+        """Parse numeric column using enterprise DataNormalizer (vectorized over the whole column)"""
+        present = series.notna() & (series != '')
+        normalized = self.data_normalizer.batch_normalize(series[present], context=column_name)
+        parsed = normalized['parsed']
 
-            if normalized:
-                converted_values.append(float(normalized.value))
-
-                # Create source reference for provenance tracking
-                source_ref = SourceReference(
-                    file_path=file_path,
-                    extraction_method="csv_parser",
-                    page_number=idx + 2,  # +2 for header (using page_number as row reference)
-                    confidence_score=normalized.confidence
-                )
+        if not parsed.any():
+            return None, []
 
-                # Create provenance value
-                provenance_value = ProvenancedValue(
-                    value=normalized.value,
-                    source_ref=source_ref,
-                    metric_name=column_name,
-                    unit="percentage" if normalized.is_percentage else "numeric",
-                    currency=normalized.currency
-                )
+        # Cells the normalizer rejects fall back to pandas numeric conversion
+        fallback = pd.to_numeric(
+            series[present][~parsed].astype(str).str.replace(',', '.', regex=False), errors='coerce'
+        )
+        converted = pd.Series(np.nan, index=series.index, dtype=float)
+        converted[normalized.index[parsed]] = normalized.loc[parsed, 'value']
+        converted[fallback.index] = fallback
 
-                parsed_values.append(provenance_value)
-            else:
-                # Fallback to pandas numeric conversion
-                try:
-                    numeric_val = pd.to_numeric(str(value).replace(',', '.'), errors='coerce')
-                    converted_values.append(numeric_val)
-                except:
-                    converted_values.append(np.nan)
-
-        # Return parsed series only if we successfully parsed some values
-        if parsed_values:
-            return pd.Series(converted_values, index=series.index), parsed_values
-        else:
-            return None, []
+        # Provenance: one reference per parsed cell, sharing file-level fields with the first one
+        parsed_values = []
+        template: Optional[SourceReference] = None
+        rows = normalized[parsed]
+        for idx, number, is_negative, is_percentage, currency, confidence in zip(
+            rows.index, rows['number'], rows['is_negative'], rows['is_percentage'], rows['currency'], rows['confidence']
+        ):
+            source_ref = SourceReference(
+                file_path=file_path,
+                file_name=template.file_name if template else None,
+                source_type=template.source_type if template else None,
+                extraction_method="csv_parser",
+                extraction_timestamp=template.extraction_timestamp if template else None,
+                page_number=idx + 2,  # +2 for header (using page_number as row reference)
+                confidence_score=float(confidence)
+            )
+            template = template or source_ref
+
+            value = Decimal(number)
+            parsed_values.append(ProvenancedValue(
+                value=-value if is_negative else value,
+                source_ref=source_ref,
+                metric_name=column_name,
+                unit="percentage" if is_percentage else "numeric",
+                currency=currency
+            ))
+
+        return converted, parsed_values
 
     def analyze_balance_sheet(self, df: pd.DataFrame, year_column: str = 'anno',
                             revenue_column: str = 'fatturato') -> dict[str, Any]:
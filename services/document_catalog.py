@@ -0,0 +1,567 @@
+"""
+Per-collection document catalog.
+Lists indexed documents without scrolling every chunk in Qdrant, and keeps
+per-document centroid and medoid vectors for document-level similarity.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+import json
+import logging
+from pathlib import Path
+import re
+import sqlite3
+import threading
+from typing import Any, Optional
+
+import numpy as np
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CatalogEntry:
+    """One indexed document (source) and the chunks it was split into."""
+
+    source: str
+    file_type: Optional[str] = None
+    document_type: Optional[str] = None
+    chunk_count: int = 0
+    byte_size: int = 0
+    text_size: int = 0  # Sum of the chunks' ``document_size`` payload, the size the UI has always shown
+    file_hash: Optional[str] = None
+    indexed_at: Optional[str] = None
+    pdf_path: Optional[str] = None
+    pages: list[int] = field(default_factory=list)
+    document_chunks: dict[str, int] = field(default_factory=dict)  # LlamaIndex document id -> chunks
+
+    def to_source_details(self) -> dict[str, Any]:
+        """Convert to the dictionary format of ``RAGEngine._get_unique_sources_details``."""
+        return {
+            "name": self.source,
+            "file_type": self.file_type or "Unknown",
+            "document_type": self.document_type,
+            "indexed_at": self.indexed_at or "Unknown",
+            "chunk_count": self.chunk_count,
+            "total_size": self.text_size,
+            "byte_size": self.byte_size,
+            "file_hash": self.file_hash,
+            "pages": sorted(self.pages),
+            "page_count": len(self.pages) or None,
+            "pdf_path": self.pdf_path,
+            "has_analysis": False,
+        }
+
+
+@dataclass
+class DocumentVectors:
+    """Embedding aggregate of the chunks of one LlamaIndex document (a part of a source)."""
+
+    source: str
+    document_id: str
+    vector_sum: np.ndarray
+    chunk_count: int
+    medoid: np.ndarray  # Chunk vector closest to the part's centroid
+
+
+def _normalized(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class DocumentCatalog:
+    """SQLite table of the documents in one collection, updated on ingest and delete.
+
+    Each write runs in a single transaction, so a listing never sees half of a batch.
+    A catalog created for a collection that already holds points is marked unsynced
+    until ``rebuild`` fills it from one payload-only scroll; its document vectors stay
+    unsynced until ``replace_vectors`` fills them from the chunk vectors.
+    """
+
+    def __init__(self, db_path: str):
+        """Initialize catalog, creating the database if needed."""
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    source TEXT PRIMARY KEY,
+                    file_type TEXT,
+                    document_type TEXT,
+                    chunk_count INTEGER NOT NULL,
+                    byte_size INTEGER NOT NULL,
+                    text_size INTEGER NOT NULL,
+                    file_hash TEXT,
+                    indexed_at TEXT,
+                    pdf_path TEXT,
+                    pages TEXT NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS document_parts (
+                    document_id TEXT PRIMARY KEY,
+                    source TEXT NOT NULL REFERENCES documents (source) ON DELETE CASCADE,
+                    chunk_count INTEGER NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS document_vectors (
+                    document_id TEXT PRIMARY KEY,
+                    source TEXT NOT NULL REFERENCES documents (source) ON DELETE CASCADE,
+                    vector_sum BLOB NOT NULL,
+                    chunk_count INTEGER NOT NULL,
+                    medoid BLOB NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS deletions (
+                    operation_id INTEGER PRIMARY KEY,
+                    filter TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    matched_chunks INTEGER NOT NULL,
+                    submitted_at TEXT NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_document_parts_source ON document_parts (source)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_document_vectors_source ON document_vectors (source)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_indexed_at ON documents (indexed_at)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    @property
+    def synced(self) -> bool:
+        """Whether the catalog reflects the collection (built or maintained since creation)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM catalog_meta WHERE key = 'synced'").fetchone()
+        return row is not None
+
+    @property
+    def vectors_synced(self) -> bool:
+        """Whether document vectors are maintained (false for catalogs built before they existed)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM catalog_meta WHERE key = 'vectors_synced'").fetchone()
+        return row is not None
+
+    @property
+    def chunk_text_backfilled(self) -> bool:
+        """Whether points written before the plain chunk text field existed have been given one."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM catalog_meta WHERE key = 'chunk_text_backfilled'").fetchone()
+        return row is not None
+
+    def mark_chunk_text_backfilled(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO catalog_meta (key, value) VALUES ('chunk_text_backfilled', '1')")
+
+    @property
+    def content_version(self) -> int:
+        """Generation of the collection's content, shared by every process using this catalog."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM catalog_meta WHERE key = 'content_version'").fetchone()
+        return int(row[0]) if row is not None else 0
+
+    def bump_content_version(self) -> int:
+        """Mark the collection's content as changed and return the new generation."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO catalog_meta (key, value) VALUES ('content_version', '1') "
+                "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+            row = self._conn.execute("SELECT value FROM catalog_meta WHERE key = 'content_version'").fetchone()
+        return int(row[0])
+
+    def mark_synced(self) -> None:
+        with self._lock, self._conn:
+            self._mark_synced()
+
+    def _mark_synced(self) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, '1')", [("synced",), ("vectors_synced",)]
+        )
+
+    def record_ingest(self, entries: Iterable[CatalogEntry], vectors: Iterable[DocumentVectors] = ()) -> None:
+        """Add ingested documents; chunks of a source indexed again are added to its count.
+
+        Args:
+            entries: Catalog entries of the ingested sources
+            vectors: Embedding aggregates of the ingested documents, written in the same transaction
+        """
+        entries = list(entries)
+        if not entries:
+            return
+        with self._lock, self._conn:
+            self._write_entries(entries)
+            self._write_vectors(vectors)
+
+    def _write_vectors(self, vectors: Iterable[DocumentVectors]) -> None:
+        """Upsert document vectors (sums add up, the newest medoid wins); must run inside a transaction."""
+        for part in vectors:
+            row = self._conn.execute(
+                "SELECT vector_sum, chunk_count FROM document_vectors WHERE document_id = ?", (part.document_id,)
+            ).fetchone()
+            vector_sum, chunk_count = part.vector_sum.astype(np.float64), part.chunk_count
+            if row is not None and len(row["vector_sum"]) == vector_sum.nbytes:
+                vector_sum = vector_sum + np.frombuffer(row["vector_sum"], dtype=np.float64)
+                chunk_count += row["chunk_count"]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO document_vectors (document_id, source, vector_sum, chunk_count, medoid) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    part.document_id,
+                    part.source,
+                    vector_sum.tobytes(),
+                    chunk_count,
+                    part.medoid.astype(np.float32).tobytes(),
+                ),
+            )
+
+    def _write_entries(self, entries: list[CatalogEntry]) -> None:
+        """Upsert entries; must run inside a transaction holding the lock."""
+        for entry in entries:
+            row = self._conn.execute("SELECT * FROM documents WHERE source = ?", (entry.source,)).fetchone()
+            pages = set(entry.pages)
+            if row is not None:
+                pages.update(json.loads(row["pages"]))
+            self._conn.execute(
+                """
+                INSERT INTO documents (source, file_type, document_type, chunk_count, byte_size, text_size,
+                                       file_hash, indexed_at, pdf_path, pages)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source) DO UPDATE SET
+                    file_type = COALESCE(excluded.file_type, file_type),
+                    document_type = COALESCE(excluded.document_type, document_type),
+                    chunk_count = chunk_count + excluded.chunk_count,
+                    byte_size = excluded.byte_size,
+                    text_size = text_size + excluded.text_size,
+                    file_hash = COALESCE(excluded.file_hash, file_hash),
+                    indexed_at = COALESCE(excluded.indexed_at, indexed_at),
+                    pdf_path = COALESCE(excluded.pdf_path, pdf_path),
+                    pages = excluded.pages
+                """,
+                (
+                    entry.source,
+                    entry.file_type,
+                    entry.document_type,
+                    entry.chunk_count,
+                    entry.byte_size,
+                    entry.text_size,
+                    entry.file_hash,
+                    entry.indexed_at,
+                    entry.pdf_path,
+                    json.dumps(sorted(pages)),
+                ),
+            )
+            self._conn.executemany(
+                """
+                INSERT INTO document_parts (document_id, source, chunk_count) VALUES (?, ?, ?)
+                ON CONFLICT (document_id) DO UPDATE SET chunk_count = chunk_count + excluded.chunk_count
+                """,
+                [(document_id, entry.source, count) for document_id, count in entry.document_chunks.items()],
+            )
+
+    def remove_sources(self, sources: Iterable[str]) -> int:
+        """Remove documents by source.
+
+        Returns:
+            Number of removed documents
+        """
+        sources = list(sources)
+        with self._lock, self._conn:
+            removed = 0
+            for start in range(0, len(sources), 500):
+                batch = sources[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                removed += self._conn.execute(f"DELETE FROM documents WHERE source IN ({placeholders})", batch).rowcount
+        return removed
+
+    def remove_document_ids(self, document_ids: Iterable[str]) -> list[str]:
+        """Remove LlamaIndex documents, subtracting their chunks from their sources.
+
+        Returns:
+            Sources that lost chunks (sources left without chunks are removed)
+        """
+        document_ids = list(document_ids)
+        with self._lock, self._conn:
+            removed: dict[str, int] = {}
+            for start in range(0, len(document_ids), 500):
+                batch = document_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                for row in self._conn.execute(
+                    f"SELECT source, SUM(chunk_count) FROM document_parts WHERE document_id IN ({placeholders}) "
+                    "GROUP BY source",
+                    batch,
+                ):
+                    removed[row[0]] = removed.get(row[0], 0) + row[1]
+                self._conn.execute(f"DELETE FROM document_parts WHERE document_id IN ({placeholders})", batch)
+                self._conn.execute(f"DELETE FROM document_vectors WHERE document_id IN ({placeholders})", batch)
+            self._conn.executemany(
+                "UPDATE documents SET chunk_count = MAX(0, chunk_count - ?) WHERE source = ?",
+                [(count, source) for source, count in removed.items()],
+            )
+            self._conn.execute("DELETE FROM documents WHERE chunk_count = 0")
+        return list(removed)
+
+    def clear(self) -> None:
+        """Remove all documents; the catalog stays synced with the (now empty) collection."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM documents")
+            self._mark_synced()
+
+    def rebuild(self, entries: Iterable[CatalogEntry]) -> None:
+        """Replace the whole catalog in one transaction and mark it synced.
+
+        Document vectors are dropped with their documents and marked unsynced.
+        """
+        entries = list(entries)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM documents")
+            self._write_entries(entries)
+            self._conn.execute("INSERT OR REPLACE INTO catalog_meta (key, value) VALUES ('synced', '1')")
+            self._conn.execute("DELETE FROM catalog_meta WHERE key = 'vectors_synced'")
+        logger.info(f"Rebuilt document catalog {self.db_path.name}: {len(entries)} documents")
+
+    def replace_vectors(self, vectors: Iterable[DocumentVectors]) -> None:
+        """Replace all document vectors in one transaction and mark them synced.
+
+        Vectors of sources missing from the catalog (ingested after its rebuild) are skipped.
+        """
+        with self._lock, self._conn:
+            sources = {row[0] for row in self._conn.execute("SELECT source FROM documents")}
+            self._conn.execute("DELETE FROM document_vectors")
+            self._write_vectors(part for part in vectors if part.source in sources)
+            self._conn.execute("INSERT OR REPLACE INTO catalog_meta (key, value) VALUES ('vectors_synced', '1')")
+
+    def record_deletion(
+        self, operation_id: int, filter_json: str, status: str, matched_chunks: int, submitted_at: str, keep: int
+    ) -> None:
+        """Track an asynchronous delete so every worker process can report its status.
+
+        Only the ``keep`` most recent operations are kept (Qdrant operation ids increase).
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO deletions (operation_id, filter, status, matched_chunks, submitted_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (operation_id, filter_json, status, matched_chunks, submitted_at),
+            )
+            self._conn.execute(
+                "DELETE FROM deletions WHERE operation_id NOT IN "
+                "(SELECT operation_id FROM deletions ORDER BY operation_id DESC LIMIT ?)",
+                (keep,),
+            )
+
+    def get_deletion(self, operation_id: int) -> Optional[dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM deletions WHERE operation_id = ?", (operation_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def mark_deletion_completed(self, operation_id: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE deletions SET status = 'completed' WHERE operation_id = ?", (operation_id,))
+
+    def list_documents(self) -> list[CatalogEntry]:
+        """All documents, most recently indexed first."""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM documents ORDER BY indexed_at DESC, source").fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    def get(self, source: str) -> Optional[CatalogEntry]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM documents WHERE source = ?", (source,)).fetchone()
+        return self._to_entry(row) if row is not None else None
+
+    def get_stats(self) -> dict[str, Any]:
+        """Totals over all documents."""
+        with self._lock:
+            totals = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(chunk_count), 0), COALESCE(SUM(byte_size), 0), "
+                "COALESCE(SUM(text_size), 0) FROM documents"
+            ).fetchone()
+            file_types = {
+                row[0] or "Unknown": row[1]
+                for row in self._conn.execute("SELECT file_type, SUM(chunk_count) FROM documents GROUP BY file_type")
+            }
+        documents, chunks, byte_size, text_size = totals
+        return {
+            "total_documents": documents,
+            "total_chunks": chunks,
+            "total_bytes": byte_size,
+            "total_size_bytes": text_size,
+            "file_types": file_types,
+            "avg_chunk_size": text_size // chunks if chunks else 0,
+        }
+
+    def get_document_vectors(
+        self, sources: Optional[list[str]] = None, kind: str = "centroid"
+    ) -> tuple[list[str], np.ndarray]:
+        """Per-source document vectors, unnormalized.
+
+        Args:
+            sources: Sources to return (all cataloged sources with vectors if None); unknown ones are skipped
+            kind: ``centroid`` (mean of all chunk vectors) or ``medoid`` (chunk vector closest to the centroid)
+
+        Returns:
+            Tuple (sources in output order, matrix with one row per source)
+        """
+        if kind not in ("centroid", "medoid"):
+            raise ValueError(f"Unknown document vector kind: {kind}")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, vector_sum, chunk_count, medoid FROM document_vectors ORDER BY source"
+            ).fetchall()
+        parts: dict[str, list[sqlite3.Row]] = {}
+        for row in rows:
+            parts.setdefault(row["source"], []).append(row)
+
+        names, matrix = [], []
+        for source in sources if sources is not None else list(parts):
+            source_parts = parts.get(source)
+            if not source_parts:
+                continue
+            centroid = sum(np.frombuffer(row["vector_sum"], dtype=np.float64) for row in source_parts) / sum(
+                row["chunk_count"] for row in source_parts
+            )
+            if kind == "medoid":
+                medoids = np.stack([np.frombuffer(row["medoid"], dtype=np.float32) for row in source_parts])
+                vector = medoids[int(np.argmax(medoids @ _normalized(centroid)))].astype(np.float64)
+            else:
+                vector = centroid
+            names.append(source)
+            matrix.append(vector)
+        return names, np.vstack(matrix) if matrix else np.empty((0, 0))
+
+    @staticmethod
+    def _to_entry(row: sqlite3.Row) -> CatalogEntry:
+        return CatalogEntry(
+            source=row["source"],
+            file_type=row["file_type"],
+            document_type=row["document_type"],
+            chunk_count=row["chunk_count"],
+            byte_size=row["byte_size"],
+            text_size=row["text_size"],
+            file_hash=row["file_hash"],
+            indexed_at=row["indexed_at"],
+            pdf_path=row["pdf_path"],
+            pages=json.loads(row["pages"]),
+        )
+
+
+def entries_from_payloads(payloads: Iterable[dict[str, Any]]) -> list[CatalogEntry]:
+    """Group chunk payloads (Qdrant point payloads or node metadata) into catalog entries."""
+    entries: dict[str, CatalogEntry] = {}
+    for payload in payloads:
+        source = payload.get("source", "Unknown")
+        entry = entries.get(source)
+        if entry is None:
+            entry = entries[source] = CatalogEntry(
+                source=source,
+                file_type=payload.get("file_type") or payload.get("file_types"),
+                document_type=payload.get("document_type"),
+                indexed_at=payload.get("indexed_at"),
+                pdf_path=payload.get("pdf_path"),
+            )
+        entry.chunk_count += 1
+        entry.text_size += payload.get("document_size", 0) or 0
+        page = payload.get("page")
+        if isinstance(page, int) and page not in entry.pages:
+            entry.pages.append(page)
+        document_id = payload.get("document_id") or payload.get("ref_doc_id")
+        if document_id:
+            entry.document_chunks[document_id] = entry.document_chunks.get(document_id, 0) + 1
+    return list(entries.values())
+
+
+class DocumentVectorBuilder:
+    """Aggregates (payload, embedding) pairs of chunks into per-document vectors, page by page.
+
+    Only one running sum and one medoid candidate per document are held, never the chunk
+    vectors themselves: ``add_chunks`` over all chunks gives the centroids, then a second
+    pass of ``add_medoid_candidates`` over the same chunks picks each document's medoid.
+    Chunks without a vector or a document id are skipped.
+    """
+
+    def __init__(self):
+        self._sums: dict[tuple[str, str], np.ndarray] = {}
+        self._counts: dict[tuple[str, str], int] = {}
+        self._directions: dict[tuple[str, str], np.ndarray] = {}
+        self._medoids: dict[tuple[str, str], tuple[float, np.ndarray]] = {}
+
+    @staticmethod
+    def _key(payload: dict[str, Any]) -> Optional[tuple[str, str]]:
+        document_id = payload.get("document_id") or payload.get("ref_doc_id")
+        return (payload.get("source", "Unknown"), document_id) if document_id else None
+
+    def add_chunks(self, chunks: Iterable[tuple[dict[str, Any], Optional[list[float]]]]) -> None:
+        """Add chunk vectors to the running sums of their documents."""
+        for payload, vector in chunks:
+            key = self._key(payload)
+            if key is None or vector is None:
+                continue
+            vector = np.asarray(vector, dtype=np.float64)
+            if key in self._sums:
+                self._sums[key] += vector
+                self._counts[key] += 1
+            else:
+                self._sums[key] = vector.copy()
+                self._counts[key] = 1
+
+    def add_medoid_candidates(self, chunks: Iterable[tuple[dict[str, Any], Optional[list[float]]]]) -> None:
+        """Keep, per document, the chunk vector closest to the centroid seen so far."""
+        for payload, vector in chunks:
+            key = self._key(payload)
+            if key is None or vector is None or key not in self._sums:
+                continue
+            direction = self._directions.get(key)
+            if direction is None:
+                direction = self._directions[key] = _normalized(self._sums[key])
+            vector = np.asarray(vector, dtype=np.float64)
+            score = float(vector @ direction)
+            best = self._medoids.get(key)
+            if best is None or score > best[0]:
+                self._medoids[key] = (score, vector)
+
+    def build(self) -> list[DocumentVectors]:
+        """Document vectors; documents without a medoid candidate use their centroid."""
+        return [
+            DocumentVectors(
+                source,
+                document_id,
+                vector_sum,
+                self._counts[(source, document_id)],
+                self._medoids.get((source, document_id), (0.0, vector_sum / self._counts[(source, document_id)]))[1],
+            )
+            for (source, document_id), vector_sum in self._sums.items()
+        ]
+
+
+def vectors_from_chunks(chunks: Iterable[tuple[dict[str, Any], Optional[list[float]]]]) -> list[DocumentVectors]:
+    """Aggregate (payload, embedding) pairs of chunks held in memory into per-document vectors."""
+    chunks = list(chunks)
+    builder = DocumentVectorBuilder()
+    builder.add_chunks(chunks)
+    builder.add_medoid_candidates(chunks)
+    return builder.build()
+
+
+# Global document catalogs, one per collection
+_document_catalogs: dict[str, DocumentCatalog] = {}
+_document_catalogs_lock = threading.Lock()
+
+
+def get_document_catalog(collection_name: str) -> DocumentCatalog:
+    """Get or create the document catalog of a collection."""
+    with _document_catalogs_lock:
+        catalog = _document_catalogs.get(collection_name)
+        if catalog is None:
+            file_name = re.sub(r"[^A-Za-z0-9_.-]", "_", collection_name)
+            catalog = DocumentCatalog(str(Path(settings.document_catalog_dir) / f"{file_name}.sqlite"))
+            _document_catalogs[collection_name] = catalog
+        return catalog
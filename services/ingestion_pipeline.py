@@ -0,0 +1,270 @@
+"""Batched, concurrent embedding pipeline for bulk document ingestion.
+
+Nodes coming from many files are grouped into size-bounded embedding batches,
+embedded with bounded concurrency and upserted to the vector store in bulk,
+instead of one embedding round trip and one upsert per file.
+"""
+
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from llama_index.core.schema import BaseNode, MetadataMode
+
+from src.infrastructure.performance.embedding_cache import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestionStats:
+    """Throughput statistics for a single ingestion run."""
+
+    total_nodes: int = 0
+    embedded_nodes: int = 0
+    upserted_nodes: int = 0
+    total_batches: int = 0
+    failed_batches: int = 0
+    rolled_back_nodes: int = 0  # Upserted nodes removed again because another batch of their file failed
+    peak_batches_in_flight: int = 0
+    embed_seconds: float = 0.0
+    upsert_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def nodes_per_second(self) -> float:
+        """Upserted nodes per wall-clock second."""
+        return self.upserted_nodes / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "total_nodes": self.total_nodes,
+            "embedded_nodes": self.embedded_nodes,
+            "upserted_nodes": self.upserted_nodes,
+            "total_batches": self.total_batches,
+            "failed_batches": self.failed_batches,
+            "rolled_back_nodes": self.rolled_back_nodes,
+            "peak_batches_in_flight": self.peak_batches_in_flight,
+            "embed_seconds": round(self.embed_seconds, 3),
+            "upsert_seconds": round(self.upsert_seconds, 3),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "nodes_per_second": round(self.nodes_per_second, 1),
+        }
+
+
+@dataclass
+class IngestionResult:
+    """Outcome of an ingestion run, keyed by the caller's file identifiers.
+
+    A file is either fully indexed or listed in ``failed_keys``; nodes of a failed file
+    upserted by its other batches are deleted again (``partial_keys`` lists the files
+    whose rollback failed, with the number of nodes left in the collection).
+    """
+
+    stats: IngestionStats
+    failed_keys: dict[str, str] = field(default_factory=dict)  # key -> error message
+    partial_keys: dict[str, int] = field(default_factory=dict)  # key -> nodes left after a failed rollback
+
+
+@dataclass
+class _EmbeddingBatch:
+    """Group of nodes embedded with a single request."""
+
+    nodes: list[BaseNode] = field(default_factory=list)
+    node_keys: list[str] = field(default_factory=list)  # File identifier of each node
+    chars: int = 0
+
+
+class EmbeddingIngestionPipeline:
+    """Embed nodes in large batches with bounded concurrency and upsert them in bulk.
+
+    Embeddings are computed here and attached to the nodes before they reach
+    ``index.insert_nodes``, so LlamaIndex does not embed them a second time.
+    """
+
+    def __init__(
+        self,
+        index,
+        embed_model,
+        max_batch_nodes: int = 256,
+        max_batch_chars: int = 500_000,
+        max_concurrency: int = 4,
+        upsert_batch_size: int = 512,
+        progress_callback: Optional[Callable[[IngestionStats, int], None]] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        embedding_model_name: Optional[str] = None,
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            index: LlamaIndex ``VectorStoreIndex`` receiving the nodes
+            embed_model: LlamaIndex embedding model used for the batches
+            max_batch_nodes: Maximum number of nodes per embedding batch
+            max_batch_chars: Maximum total characters per embedding batch
+            max_concurrency: Maximum number of embedding batches in flight
+            upsert_batch_size: Number of embedded nodes accumulated before a bulk upsert
+            progress_callback: Optional callback receiving (stats, batches_in_flight)
+            embedding_cache: Optional content-hash cache consulted before calling the model
+            embedding_model_name: Model name used in cache keys (defaults to ``embed_model.model_name``)
+        """
+        self.index = index
+        self.embed_model = embed_model
+        self.max_batch_nodes = max(1, max_batch_nodes)
+        self.max_batch_chars = max(1, max_batch_chars)
+        self.max_concurrency = max(1, max_concurrency)
+        self.upsert_batch_size = max(1, upsert_batch_size)
+        self.progress_callback = progress_callback
+        self.embedding_cache = embedding_cache
+        self.embedding_model_name = embedding_model_name or getattr(embed_model, "model_name", "unknown")
+
+    def run(self, nodes_by_key: dict[str, list[BaseNode]]) -> IngestionResult:
+        """Embed and upsert all nodes.
+
+        Args:
+            nodes_by_key: Nodes grouped by file identifier (used for failure reporting)
+
+        Returns:
+            IngestionResult with throughput stats and the keys whose nodes failed
+        """
+        stats = IngestionStats(total_nodes=sum(len(nodes) for nodes in nodes_by_key.values()))
+        result = IngestionResult(stats=stats)
+        if stats.total_nodes == 0:
+            return result
+
+        start_time = time.perf_counter()
+        batches = self._make_batches(nodes_by_key)
+        upsert_buffer: list[tuple[str, BaseNode]] = []
+        upserted_ids: dict[str, list[str]] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="ingest-embed") as executor:
+            in_flight: dict[Future, _EmbeddingBatch] = {}
+
+            def submit_next() -> bool:
+                batch = next(batches, None)
+                if batch is None:
+                    return False
+                in_flight[executor.submit(self._embed_batch, batch)] = batch
+                stats.total_batches += 1
+                stats.peak_batches_in_flight = max(stats.peak_batches_in_flight, len(in_flight))
+                return True
+
+            while len(in_flight) < self.max_concurrency and submit_next():
+                pass
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = in_flight.pop(future)
+                    try:
+                        stats.embed_seconds += future.result()
+                        stats.embedded_nodes += len(batch.nodes)
+                        upsert_buffer.extend(zip(batch.node_keys, batch.nodes))
+                    except Exception as e:
+                        stats.failed_batches += 1
+                        logger.error(f"Embedding batch of {len(batch.nodes)} nodes failed: {e}")
+                        for key in batch.node_keys:
+                            result.failed_keys.setdefault(key, f"Embedding failed: {e}")
+
+                # Refill before upserting so embeddings keep flowing while Qdrant writes
+                while len(in_flight) < self.max_concurrency and submit_next():
+                    pass
+
+                if len(upsert_buffer) >= self.upsert_batch_size:
+                    self._flush(upsert_buffer, upserted_ids, stats, result)
+                    upsert_buffer = []
+
+                if self.progress_callback:
+                    self.progress_callback(stats, len(in_flight))
+
+        if upsert_buffer:
+            self._flush(upsert_buffer, upserted_ids, stats, result)
+        self._roll_back_failed(upserted_ids, stats, result)
+
+        stats.elapsed_seconds = time.perf_counter() - start_time
+        logger.info(
+            f"Ingested {stats.upserted_nodes}/{stats.total_nodes} nodes in {stats.total_batches} batches "
+            f"({stats.nodes_per_second:.1f} nodes/s, peak {stats.peak_batches_in_flight} batches in flight)"
+        )
+        return result
+
+    def _make_batches(self, nodes_by_key: dict[str, list[BaseNode]]) -> Iterator[_EmbeddingBatch]:
+        """Group nodes from all files into batches bounded by node count and total characters."""
+        batch = _EmbeddingBatch()
+        for key, nodes in nodes_by_key.items():
+            for node in nodes:
+                node_chars = len(node.get_content(metadata_mode=MetadataMode.EMBED))
+                if batch.nodes and (
+                    len(batch.nodes) >= self.max_batch_nodes or batch.chars + node_chars > self.max_batch_chars
+                ):
+                    yield batch
+                    batch = _EmbeddingBatch()
+                batch.nodes.append(node)
+                batch.node_keys.append(key)
+                batch.chars += node_chars
+        if batch.nodes:
+            yield batch
+
+    def _embed_batch(self, batch: _EmbeddingBatch) -> float:
+        """Embed a batch in place and return the time spent."""
+        start_time = time.perf_counter()
+        pending = [node for node in batch.nodes if node.embedding is None]
+        if pending:
+            texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in pending]
+            embeddings = self._embed_texts(texts)
+            for node, embedding in zip(pending, embeddings):
+                node.embedding = embedding
+        return time.perf_counter() - start_time
+
+    def _embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Embed a list of texts with the configured model, reusing cached vectors for unchanged text."""
+        if self.embedding_cache is not None:
+            return self.embedding_cache.get_or_compute(
+                self.embedding_model_name, texts, self.embed_model.get_text_embedding_batch
+            )
+        return self.embed_model.get_text_embedding_batch(texts)
+
+    def _flush(
+        self,
+        buffer: list[tuple[str, BaseNode]],
+        upserted_ids: dict[str, list[str]],
+        stats: IngestionStats,
+        result: IngestionResult,
+    ) -> None:
+        """Upsert embedded nodes to the vector store in a single bulk insert, skipping files that already failed."""
+        buffer = [(key, node) for key, node in buffer if key not in result.failed_keys]
+        if not buffer:
+            return
+        start_time = time.perf_counter()
+        try:
+            self.index.insert_nodes([node for _, node in buffer])
+            stats.upserted_nodes += len(buffer)
+            for key, node in buffer:
+                upserted_ids.setdefault(key, []).append(node.node_id)
+        except Exception as e:
+            logger.error(f"Bulk upsert of {len(buffer)} nodes failed: {e}")
+            for key, _ in buffer:
+                result.failed_keys.setdefault(key, f"Upsert failed: {e}")
+        finally:
+            stats.upsert_seconds += time.perf_counter() - start_time
+
+    def _roll_back_failed(
+        self, upserted_ids: dict[str, list[str]], stats: IngestionStats, result: IngestionResult
+    ) -> None:
+        """Delete the upserted nodes of files whose other batches failed, so no file is left half indexed."""
+        for key in result.failed_keys:
+            node_ids = upserted_ids.get(key)
+            if not node_ids:
+                continue
+            try:
+                self.index.delete_nodes(node_ids)
+                stats.upserted_nodes -= len(node_ids)
+                stats.rolled_back_nodes += len(node_ids)
+                logger.info(f"Removed {len(node_ids)} nodes of {key} after a failed batch")
+            except Exception as e:
+                logger.error(f"Could not remove the {len(node_ids)} indexed nodes of {key}: {e}")
+                result.partial_keys[key] = len(node_ids)
+                result.failed_keys[key] += f" (partially indexed: {len(node_ids)} chunks left in the collection)"
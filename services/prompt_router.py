@@ -5,6 +5,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+import json
 import logging
 import re
 from typing import Callable
@@ -21,22 +22,97 @@ def _norm(s: str) -> str:
     return re.sub(r"\s+", " ", (s or "")).strip().lower()
 
 
-def _findall(pattern: str, text: str) -> int:
-    """Conta le occorrenze di un pattern nel testo"""
-    try:
-        return len(re.findall(pattern, text, flags=re.IGNORECASE))
-    except re.error:
-        return 0
-
-
-def _contains_any(text: str, keywords: list[str]) -> int:
-    """Conta le occorrenze di keyword nel testo"""
-    score = 0
-    for kw in keywords:
-        # parole intere o bigrammi; tolleranza accenti
-        kw_re = re.escape(kw).replace(r"\ ", r"\s+")
-        score += _findall(rf"\b{kw_re}\b", text)
-    return score
+def _is_word(ch: str) -> bool:
+    """Stessa definizione di carattere \\w usata da \\b nelle regex"""
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """Conta tutte le keyword di tutte le regole con una sola scansione del testo normalizzato.
+
+    Equivale a ``re.findall(rf"\\b{kw}\\b", text)`` per ogni keyword (occorrenze non sovrapposte
+    della stessa keyword, ma keyword diverse possono sovrapporsi, es. "ricavi" e "ricavi netti").
+    Una sola regex in lookahead trova le posizioni in cui inizia un prefisso di keyword; solo le
+    keyword di quel prefisso vengono poi verificate, con i confini di parola.
+    """
+
+    def __init__(self, keywords: list[str]):
+        self.keywords = list(dict.fromkeys(kw.lower() for kw in keywords if kw))
+        self.prefix_len = min((len(kw) for kw in self.keywords), default=1)
+        self.buckets: dict[str, list[str]] = {}
+        for kw in self.keywords:
+            self.buckets.setdefault(kw[: self.prefix_len], []).append(kw)
+        alternation = "|".join(re.escape(prefix) for prefix in self.buckets)
+        self.regex = re.compile(f"(?=(?:{alternation}))") if self.buckets else None
+
+    def count(self, text: str) -> dict[str, int]:
+        """Occorrenze di ogni keyword in ``text`` (già normalizzato con ``_norm``)."""
+        counts: dict[str, int] = {}
+        if self.regex is None:
+            return counts
+        last_end: dict[str, int] = {}
+        size = len(text)
+        for match in self.regex.finditer(text):
+            start = match.start()
+            if start > 0 and _is_word(text[start - 1]) == _is_word(text[start]):
+                continue
+            for kw in self.buckets[text[start : start + self.prefix_len]]:
+                end = start + len(kw)
+                if start < last_end.get(kw, 0) or not text.startswith(kw, start):
+                    continue
+                if end < size and _is_word(text[end - 1]) == _is_word(text[end]):
+                    continue
+                counts[kw] = counts.get(kw, 0) + 1
+                last_end[kw] = end
+        return counts
+
+
+@dataclass
+class TextSignals:
+    """Segnali estratti una sola volta dal testo e condivisi da tutte le regole"""
+
+    keyword_counts: dict[str, int]
+    pattern_counts: dict[str, int]
+    generic_signals: int
+    json_data: object = None
+
+
+class RouterMatcher:
+    """Keyword e pattern di tutte le regole, compilati una volta sola."""
+
+    GENERIC_PATTERNS = (r"[€$£]\s?\d", r"\d[\.,]\d+%|\bpercentuale\b|\bpercent\b")
+
+    def __init__(self, rules: dict[str, CaseRule]):
+        self.keyword_matcher = KeywordMatcher([kw for rule in rules.values() for kw in rule.keywords])
+        # Pattern identici in più regole vengono contati una volta sola per testo
+        self.patterns: dict[str, re.Pattern] = {}
+        for rule in rules.values():
+            for pattern in rule.patterns:
+                if pattern in self.patterns:
+                    continue
+                try:
+                    self.patterns[pattern] = re.compile(pattern, re.IGNORECASE)
+                except re.error:
+                    logger.warning(f"Pattern non valido nel router: {pattern}")
+        self.generic_patterns = [re.compile(p, re.IGNORECASE) for p in self.GENERIC_PATTERNS]
+        self.needs_json = "scadenzario" in rules
+
+    def analyze(self, analysis_text: str) -> TextSignals:
+        """Normalizza il testo e calcola tutti i segnali in un passaggio"""
+        json_data = None
+        if self.needs_json and analysis_text.lstrip().startswith(("{", "[")):
+            try:
+                json_data = json.loads(analysis_text)
+            except (json.JSONDecodeError, ValueError):
+                json_data = None
+        return TextSignals(
+            keyword_counts=self.keyword_matcher.count(_norm(analysis_text)),
+            pattern_counts={
+                pattern: sum(1 for _ in regex.finditer(analysis_text)) for pattern, regex in self.patterns.items()
+            },
+            generic_signals=sum(sum(1 for _ in regex.finditer(analysis_text)) for regex in self.generic_patterns),
+            json_data=json_data,
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -1072,12 +1148,15 @@ ROUTER: dict[str, CaseRule] = {
 # ---------------------------------------------------------------------------
 
 
-def _score_case(rule: CaseRule, file_name: str, analysis_text: str) -> float:
-    text = _norm(analysis_text)
+def _score_case(
+    rule: CaseRule, file_name: str, analysis_text: str, signals: TextSignals | None = None
+) -> float:
+    if signals is None:
+        signals = _get_matcher().analyze(analysis_text)
     fname = _norm(file_name)
 
-    kw_hits = _contains_any(text, rule.keywords)
-    pat_hits = sum(_findall(p, analysis_text) for p in rule.patterns)
+    kw_hits = sum(signals.keyword_counts.get(kw.lower(), 0) for kw in rule.keywords)
+    pat_hits = sum(signals.pattern_counts.get(p, 0) for p in rule.patterns)
 
     score = kw_hits * rule.weight_keywords + pat_hits * rule.weight_patterns
 
@@ -1086,49 +1165,54 @@ def _score_case(rule: CaseRule, file_name: str, analysis_text: str) -> float:
         score *= rule.boost_if_filename
 
     # Special handling for JSON files with structured data
-    if rule.name == "scadenzario":
-        # Check if it's a JSON with scadenzario-specific keys
-        import json
-
-        try:
-            json_data = json.loads(analysis_text)
-            if isinstance(json_data, dict):
-                # Strong indicators for scadenzario
-                scadenzario_keys = [
-                    "aging_bucket",
-                    "past_due",
-                    "dso",
-                    "dpd",
-                    "crediti_lordi",
-                    "crediti_netto",
-                    "fondo_svalutazione",
-                    "totale_scaduto",
-                    "dpd_medio_ponderato",
-                    "coverage_fondo_su_scaduto",
-                    "piani_rientro_e_promesse_pagamento",
-                    "qualita_crediti",
-                    "concentrazione_rischio",
-                    "turnover_crediti",
-                ]
-                # Count matching keys
-                key_matches = sum(1 for key in scadenzario_keys if key in str(json_data))
-                if key_matches >= 3:  # If we have 3+ scadenzario keys, it's definitely a scadenzario
-                    score += 100  # Strong boost to ensure it wins
-                    logger.info(f"Detected JSON scadenzario with {key_matches} matching keys")
-        except (json.JSONDecodeError, ValueError):
-            # Not JSON, continue with normal scoring
-            pass
+    if rule.name == "scadenzario" and isinstance(signals.json_data, dict):
+        # Strong indicators for scadenzario
+        scadenzario_keys = [
+            "aging_bucket",
+            "past_due",
+            "dso",
+            "dpd",
+            "crediti_lordi",
+            "crediti_netto",
+            "fondo_svalutazione",
+            "totale_scaduto",
+            "dpd_medio_ponderato",
+            "coverage_fondo_su_scaduto",
+            "piani_rientro_e_promesse_pagamento",
+            "qualita_crediti",
+            "concentrazione_rischio",
+            "turnover_crediti",
+        ]
+        # Count matching keys
+        json_text = str(signals.json_data)
+        key_matches = sum(1 for key in scadenzario_keys if key in json_text)
+        if key_matches >= 3:  # If we have 3+ scadenzario keys, it's definitely a scadenzario
+            score += 100  # Strong boost to ensure it wins
+            logger.info(f"Detected JSON scadenzario with {key_matches} matching keys")
 
     # segnali generici: valute/percentuali/datetime → piccolo boost alla finanza/vendite
     if rule.name in {"bilancio", "fatturato"}:
-        generic_signals = _findall(r"[€$£]\s?\d", analysis_text) + _findall(
-            r"\d[\.,]\d+%|\bpercentuale\b|\bpercent\b", analysis_text
-        )
-        score += 0.2 * generic_signals
+        score += 0.2 * signals.generic_signals
 
     return score
 
 
+# Matcher compilato una volta per il ROUTER corrente (ricompilato se le regole cambiano)
+_matcher: RouterMatcher | None = None
+_matcher_key: tuple | None = None
+
+
+def _get_matcher() -> RouterMatcher:
+    global _matcher, _matcher_key
+    key = tuple((name, id(rule), len(rule.keywords), len(rule.patterns)) for name, rule in ROUTER.items())
+    if _matcher is None or key != _matcher_key:
+        _matcher, _matcher_key = RouterMatcher(ROUTER), key
+    return _matcher
+
+
+_get_matcher()  # compila keyword e pattern all'import
+
+
 # ---------------------------------------------------------------------------
 # Entry point: scelta del prompt
 # ---------------------------------------------------------------------------
@@ -1141,9 +1225,11 @@ def choose_prompt(file_name: str, analysis_text: str) -> tuple[str, str, dict]:
     - prompt_text: string pronto da inviare al modello
     - debug_info: dizionario con punteggi e motivazioni
     """
+    # Testo normalizzato e analizzato una sola volta per tutte le regole
+    signals = _get_matcher().analyze(analysis_text)
     scores = {}
     for name, rule in ROUTER.items():
-        scores[name] = _score_case(rule, file_name, analysis_text)
+        scores[name] = _score_case(rule, file_name, analysis_text, signals)
 
     # Sort scores to see the ranking
     sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
@@ -1,91 +1,305 @@
-"""Simple in-memory cache for RAG query results to improve performance."""
+"""Bounded in-memory cache for RAG query results to improve performance."""
 
+from collections import OrderedDict
+from dataclasses import dataclass
 import hashlib
 import logging
+import sys
+import threading
 import time
 from typing import Any, Optional
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_NAMESPACE = "default"
+
+
+def estimate_size(obj: Any, _depth: int = 0) -> int:
+    """Approximate the memory footprint of a cached result in bytes."""
+    size = sys.getsizeof(obj)
+    if _depth > 8:
+        return size
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _depth + 1) for item in obj)
+    return size
+
+
+@dataclass
+class _CacheEntry:
+    """Cached value with its namespace, expiry time and approximate size."""
+
+    namespace: str
+    value: Any
+    expires_at: float
+    size: int
+    metadata: dict[str, Any]
+
+
+class BoundedTTLCache:
+    """Thread-safe LRU + TTL cache bounded by entry count and approximate byte budget.
+
+    Entries are kept in LRU order for capacity eviction. Each namespace also keeps
+    its keys in write order; since a namespace has a single TTL, write order is
+    expiry order and expired entries are popped from the front in O(1) each.
+    """
+
+    def __init__(self, max_entries: int = 5000, max_bytes: int = 256 * 1024 * 1024):
+        """Initialize cache with entry and byte limits."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, str], _CacheEntry] = OrderedDict()
+        self._expiry: dict[str, OrderedDict[tuple[str, str], None]] = {}
+        self._bytes = 0
+        self._ns_bytes: dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def _ns_stats(self, namespace: str) -> dict[str, int]:
+        """Get (creating if needed) the counters of a namespace."""
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expirations": 0}
+            self._stats[namespace] = stats
+        return stats
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Return a cached value, or None if missing or expired."""
+        with self._lock:
+            self._purge_expired(namespace)
+            entry = self._entries.get((namespace, key))
+            stats = self._ns_stats(namespace)
+            if entry is None:
+                stats["misses"] += 1
+                return None
+            self._entries.move_to_end((namespace, key))
+            stats["hits"] += 1
+            return entry.value
+
+    def set(
+        self, namespace: str, key: str, value: Any, ttl_seconds: float, metadata: Optional[dict[str, Any]] = None
+    ) -> None:
+        """Store a value, evicting least recently used entries if over budget."""
+        size = estimate_size(value)
+        full_key = (namespace, key)
+        with self._lock:
+            if full_key in self._entries:
+                self._remove(full_key)
+            if size > self.max_bytes:
+                logger.debug(f"Result of {size} bytes exceeds cache budget, not cached")
+                return
+
+            self._entries[full_key] = _CacheEntry(
+                namespace=namespace,
+                value=value,
+                expires_at=time.monotonic() + ttl_seconds,
+                size=size,
+                metadata=metadata or {},
+            )
+            self._expiry.setdefault(namespace, OrderedDict())[full_key] = None
+            self._bytes += size
+            self._ns_bytes[namespace] = self._ns_bytes.get(namespace, 0) + size
+            self._ns_stats(namespace)["sets"] += 1
+
+            self._purge_expired(namespace)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                lru_key, lru_entry = next(iter(self._entries.items()))
+                self._remove(lru_key)
+                self._ns_stats(lru_entry.namespace)["evictions"] += 1
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        """Remove an entry from all indexes (caller holds the lock)."""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        self._ns_bytes[entry.namespace] -= entry.size
+        expiry = self._expiry.get(entry.namespace)
+        if expiry is not None:
+            expiry.pop(key, None)
+            if not expiry:
+                del self._expiry[entry.namespace]
+                del self._ns_bytes[entry.namespace]
+
+    def _purge_expired(self, namespace: str) -> int:
+        """Drop expired entries at the front of a namespace's expiry queue (caller holds the lock)."""
+        expiry = self._expiry.get(namespace)
+        removed = 0
+        now = time.monotonic()
+        while expiry:
+            key = next(iter(expiry))
+            if self._entries[key].expires_at > now:
+                break
+            self._remove(key)
+            removed += 1
+            expiry = self._expiry.get(namespace)
+        if removed:
+            self._ns_stats(namespace)["expirations"] += removed
+        return removed
+
+    def purge_expired(self, namespace: Optional[str] = None) -> int:
+        """Remove expired entries of one namespace, or of all namespaces."""
+        with self._lock:
+            namespaces = [namespace] if namespace is not None else list(self._expiry)
+            return sum(self._purge_expired(ns) for ns in namespaces)
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        """Clear one namespace, or the whole cache."""
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+                self._expiry.clear()
+                self._bytes = 0
+                self._ns_bytes.clear()
+                self._stats.clear()
+                return
+            for key in list(self._expiry.get(namespace, ())):
+                self._remove(key)
+            self._stats.pop(namespace, None)
+
+    def namespace_stats(self, namespace: str) -> dict[str, Any]:
+        """Get counters, entry count and bytes used by one namespace."""
+        with self._lock:
+            return {
+                **self._ns_stats(namespace),
+                "entries": len(self._expiry.get(namespace, ())),
+                "bytes": self._ns_bytes.get(namespace, 0),
+            }
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get global cache statistics with a per-namespace breakdown."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "namespaces": {ns: self.namespace_stats(ns) for ns in set(self._stats) | set(self._expiry)},
+            }
+
 
 class QueryCache:
-    """In-memory cache for query results with TTL support."""
+    """Namespaced view over a shared bounded cache for query results with TTL support."""
 
-    def __init__(self, ttl_seconds: int = 3600, namespace: Optional[str] = None):
-        """Initialize cache with time-to-live in seconds (default 1 hour) and optional namespace."""
-        self.cache: dict[str, dict[str, Any]] = {}
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        namespace: Optional[str] = None,
+        store: Optional[BoundedTTLCache] = None,
+    ):
+        """Initialize cache with time-to-live in seconds (default 1 hour) and optional namespace.
+
+        Args:
+            ttl_seconds: Time-to-live of cached results
+            namespace: Namespace for multi-tenant isolation
+            store: Backing store; defaults to the process-wide shared store, so limits apply across tenants
+        """
         self.ttl_seconds = ttl_seconds
         self.namespace = namespace  # For multi-tenant isolation
-        self.hits = 0
-        self.misses = 0
+        self.store = store if store is not None else get_query_cache_store()
+
+    @property
+    def _store_namespace(self) -> str:
+        return self.namespace or DEFAULT_NAMESPACE
 
-    def _generate_key(self, query: str, top_k: int, analysis_type: Optional[str] = None) -> str:
+    def _generate_key(
+        self, query: str, top_k: int, analysis_type: Optional[str] = None, scope: Optional[str] = None
+    ) -> str:
         """Generate a unique cache key for the query parameters."""
         namespace_prefix = f"{self.namespace}_" if self.namespace else ""
         cache_string = f"{namespace_prefix}{query.lower().strip()}_{top_k}_{analysis_type or 'standard'}"
+        if scope:
+            cache_string += f"_{scope}"
         return hashlib.md5(cache_string.encode()).hexdigest()
 
-    def get(self, query: str, top_k: int, analysis_type: Optional[str] = None) -> Optional[dict[str, Any]]:
-        """Retrieve cached result if exists and not expired."""
-        key = self._generate_key(query, top_k, analysis_type)
-
-        if key in self.cache:
-            cached_item = self.cache[key]
-            # Check if expired
-            if time.time() - cached_item['timestamp'] < self.ttl_seconds:
-                self.hits += 1
-                logger.debug(f"Cache hit for query: {query[:50]}... (hits: {self.hits}, misses: {self.misses})")
-                return cached_item['result']
-            else:
-                # Remove expired item
-                del self.cache[key]
-                logger.debug(f"Cache expired for query: {query[:50]}...")
-
-        self.misses += 1
-        logger.debug(f"Cache miss for query: {query[:50]}... (hits: {self.hits}, misses: {self.misses})")
-        return None
-
-    def set(self, query: str, top_k: int, result: dict[str, Any], analysis_type: Optional[str] = None):
+    def get(
+        self, query: str, top_k: int, analysis_type: Optional[str] = None, scope: Optional[str] = None
+    ) -> Optional[dict[str, Any]]:
+        """Retrieve cached result if exists and not expired.
+
+        Args:
+            query: Query text
+            top_k: Number of retrieved chunks
+            analysis_type: Specialized analysis type
+            scope: Optional fingerprint of retrieval filters (e.g. RLS) the result depends on
+        """
+        key = self._generate_key(query, top_k, analysis_type, scope)
+        result = self.store.get(self._store_namespace, key)
+        if result is not None:
+            logger.debug(f"Cache hit for query: {query[:50]}...")
+        else:
+            logger.debug(f"Cache miss for query: {query[:50]}...")
+        return result
+
+    def set(
+        self,
+        query: str,
+        top_k: int,
+        result: dict[str, Any],
+        analysis_type: Optional[str] = None,
+        scope: Optional[str] = None,
+    ):
         """Store query result in cache."""
-        key = self._generate_key(query, top_k, analysis_type)
-        self.cache[key] = {
-            'result': result,
-            'timestamp': time.time(),
-            'query': query,
-            'top_k': top_k,
-            'analysis_type': analysis_type
-        }
-        logger.debug(f"Cached result for query: {query[:50]}... (cache size: {len(self.cache)})")
+        key = self._generate_key(query, top_k, analysis_type, scope)
+        self.store.set(
+            self._store_namespace,
+            key,
+            result,
+            self.ttl_seconds,
+            metadata={"query": query, "top_k": top_k, "analysis_type": analysis_type, "scope": scope},
+        )
+        logger.debug(f"Cached result for query: {query[:50]}...")
 
     def clear(self):
-        """Clear all cached results."""
-        self.cache.clear()
-        self.hits = 0
-        self.misses = 0
+        """Clear all cached results of this namespace."""
+        self.store.clear(self._store_namespace)
         logger.info("Query cache cleared")
 
     def cleanup_expired(self):
         """Remove expired entries from cache."""
-        current_time = time.time()
-        expired_keys = [
-            key for key, item in self.cache.items()
-            if current_time - item['timestamp'] >= self.ttl_seconds
-        ]
-        for key in expired_keys:
-            del self.cache[key]
+        removed = self.store.purge_expired(self._store_namespace)
+        if removed:
+            logger.debug(f"Cleaned up {removed} expired cache entries")
+
+    @property
+    def hits(self) -> int:
+        return self.store.namespace_stats(self._store_namespace)["hits"]
 
-        if expired_keys:
-            logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
+    @property
+    def misses(self) -> int:
+        return self.store.namespace_stats(self._store_namespace)["misses"]
 
     def get_stats(self) -> dict[str, Any]:
         """Get cache statistics."""
-        total_requests = self.hits + self.misses
-        hit_rate = (self.hits / total_requests * 100) if total_requests > 0 else 0
+        stats = self.store.namespace_stats(self._store_namespace)
+        total_requests = stats["hits"] + stats["misses"]
+        hit_rate = (stats["hits"] / total_requests * 100) if total_requests > 0 else 0
 
         return {
-            'cache_size': len(self.cache),
-            'hits': self.hits,
-            'misses': self.misses,
+            'cache_size': stats["entries"],
+            'hits': stats["hits"],
+            'misses': stats["misses"],
             'hit_rate': f"{hit_rate:.1f}%",
-            'ttl_seconds': self.ttl_seconds
+            'ttl_seconds': self.ttl_seconds,
+            'evictions': stats["evictions"],
+            'expirations': stats["expirations"],
+            'bytes': stats["bytes"],
+            'max_entries': self.store.max_entries,
+            'max_bytes': self.store.max_bytes,
         }
+
+
+# Process-wide store shared by all QueryCache namespaces
+_query_cache_store = None
+_query_cache_store_lock = threading.Lock()
+
+
+def get_query_cache_store(max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> BoundedTTLCache:
+    """Get singleton query cache store, creating it with the given limits on first use."""
+    global _query_cache_store
+    with _query_cache_store_lock:
+        if _query_cache_store is None:
+            _query_cache_store = BoundedTTLCache(
+                max_entries=max_entries if max_entries is not None else 5000,
+                max_bytes=max_bytes if max_bytes is not None else 256 * 1024 * 1024,
+            )
+        return _query_cache_store
@@ -1,26 +1,79 @@
 """RAG Engine using LlamaIndex and Qdrant for document retrieval and analysis."""
 
+from collections import OrderedDict
+from collections.abc import Iterator
 from datetime import datetime
+import hashlib
 import logging
 from logging import Logger
 from pathlib import Path
-from typing import Any, List, Optional, Tuple
-
-from llama_index.core import Document, Settings, SimpleDirectoryReader, StorageContext, VectorStoreIndex
+import threading
+from typing import Any, List, Optional, Tuple, Union
+
+from llama_index.core import (
+    Document,
+    PromptTemplate,
+    Settings,
+    SimpleDirectoryReader,
+    StorageContext,
+    VectorStoreIndex,
+)
 from llama_index.core.node_parser import SimpleNodeParser
-from llama_index.embeddings.openai import OpenAIEmbedding
-from llama_index.llms.openai import OpenAI
-from llama_index.vector_stores.qdrant import QdrantVectorStore
+from llama_index.core.schema import QueryBundle
 import numpy as np
-from qdrant_client.models import DatetimeRange, Distance, FieldCondition, Filter, VectorParams
+from qdrant_client.models import (
+    DatetimeRange,
+    Distance,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    IsEmptyCondition,
+    MatchAny,
+    MatchText,
+    MatchValue,
+    PayloadField,
+    PayloadSchemaType,
+    SetPayload,
+    SetPayloadOperation,
+    TextIndexParams,
+    TokenizerType,
+    VectorParams,
+)
 
 from config.settings import settings
 from services.audio_overview_service import clean_markdown
+from services.chunk_search import (
+    CHUNK_TEXT_FIELD,
+    NODE_CONTENT_FIELD,
+    ChunkHit,
+    ChunkTextQdrantVectorStore,
+    node_hit,
+    payload_text,
+    query_terms,
+    rank_keyword_hits,
+)
+from services.collection_stats import collection_name_for, get_collection_stats_service
+from services.document_catalog import (
+    DocumentVectorBuilder,
+    entries_from_payloads,
+    get_document_catalog,
+    vectors_from_chunks,
+)
 from services.format_helper import format_analysis_result
+from services.ingestion_pipeline import EmbeddingIngestionPipeline, IngestionResult
 from services.prompt_router import choose_prompt
-from services.query_cache import QueryCache
+from services.query_cache import QueryCache, get_query_cache_store
+from services.semantic_query_cache import get_semantic_query_cache
+from src.application.services.pdf_page_extractor import get_pdf_page_extractor
 from src.domain.entities.tenant_context import TenantContext
+from src.infrastructure.performance.blocking_executor import run_blocking
 from src.infrastructure.performance.connection_pool import get_qdrant_pool, get_query_optimizer
+from src.infrastructure.performance.embedding_cache import get_embedding_cache
+from src.infrastructure.performance.shared_resources import (
+    get_llama_embed_model,
+    get_llama_llm,
+    get_openai_client,
+)
 
 try:
     from src.application.services.enterprise_orchestrator import EnterpriseOrchestrator, EnterpriseQuery
@@ -55,10 +108,72 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Collections whose chunk text backfill is running in this process
+_chunk_text_backfills: set[str] = set()
+_chunk_text_backfills_lock = threading.Lock()
+
 
 class RAGEngine:
     """RAG engine for document indexing and retrieval using LlamaIndex and Qdrant."""
 
+    # Payload fields indexed in every collection (RLS filters: entity, period, classification;
+    # neighbor lookups of contextual retrieval: source, chunk_index; filter deletes: source, document_id;
+    # keyword search of the database explorer: full-text index on the plain chunk text)
+    PAYLOAD_INDEXES = {
+        "entity": PayloadSchemaType.KEYWORD,
+        "period": PayloadSchemaType.KEYWORD,
+        "classification_level": PayloadSchemaType.INTEGER,
+        "source": PayloadSchemaType.KEYWORD,
+        "chunk_index": PayloadSchemaType.INTEGER,
+        "document_id": PayloadSchemaType.KEYWORD,
+        CHUNK_TEXT_FIELD: TextIndexParams(
+            type="text", tokenizer=TokenizerType.WORD, min_token_len=2, max_token_len=40, lowercase=True
+        ),
+    }
+
+    # Metadata that differs between uploads of the same file: kept out of the embedded text,
+    # so re-uploads produce the same embedding input and hit the embedding cache
+    VOLATILE_EMBED_METADATA_KEYS = ("indexed_at", "pdf_path", "document_size", "chunk_index")
+
+    # Query engines / retrievers kept per (kind, top_k, response_mode, streaming, filter, analysis) configuration
+    MAX_CACHED_QUERY_ENGINES = 32
+
+    # Specialized analyses: (focus of the answer, instructions). The single-pass synthesis templates
+    # and the two-pass rewrite prompt are both built from these.
+    SPECIALIZED_ANALYSES = {
+        "bilancio": (
+            "con focus finanziario professionale",
+            """Produci un'analisi finanziaria strutturata che include:
+- Metriche chiave con valori specifici
+- Trend e variazioni percentuali
+- Confronti con periodi precedenti
+- Implicazioni finanziarie
+
+Usa un tono da equity analyst professionale.""",
+        ),
+        "report_dettagliato": (
+            "come briefing professionale dettagliato",
+            """Struttura l'analisi come:
+## Executive Summary
+[Sintesi in 2-3 righe]
+
+## Analisi Dettagliata
+[Punti chiave con quantificazione]
+
+## Implicazioni e Raccomandazioni
+[Azioni suggerite basate sui dati]
+
+Mantieni un tono professionale da investment analyst.""",
+        ),
+        "fatturato": (
+            "con focus su vendite e revenue",
+            "Evidenzia: driver di crescita, mix prodotto, trend vendite, forecast.",
+        ),
+    }
+
+    # Asynchronous delete operations remembered for status polling
+    MAX_TRACKED_DELETIONS = 256
+
     def __init__(self, tenant_context: Optional[TenantContext] = None):
         """Initialize RAG engine with Qdrant and OpenAI, optionally with tenant context."""
         self.client = None
@@ -69,7 +184,31 @@ class RAGEngine:
         # Initialize query cache if enabled (with tenant namespace if multi-tenant)
         cache_namespace = f"tenant_{tenant_context.tenant_id}" if tenant_context else None
         self.query_cache = (
-            QueryCache(ttl_seconds=3600, namespace=cache_namespace) if settings.rag_enable_caching else None
+            QueryCache(
+                ttl_seconds=settings.query_cache_ttl_seconds,
+                namespace=cache_namespace,
+                store=get_query_cache_store(
+                    settings.query_cache_max_entries, settings.query_cache_max_mb * 1024 * 1024
+                ),
+            )
+            if settings.rag_enable_caching
+            else None
+        )
+        # Second-level semantic cache matching paraphrased questions (namespaced by collection)
+        self.semantic_cache = (
+            get_semantic_query_cache(
+                similarity_threshold=settings.semantic_cache_threshold,
+                max_entries=settings.semantic_cache_max_entries,
+                ttl_seconds=settings.query_cache_ttl_seconds,
+            )
+            if settings.rag_enable_caching and settings.semantic_cache_enabled
+            else None
+        )
+        # Content-hash embedding cache shared by all engines in the process
+        self.embedding_cache = (
+            get_embedding_cache(settings.embedding_cache_path, settings.embedding_cache_max_mb * 1024 * 1024)
+            if settings.embedding_cache_enabled
+            else None
         )
         # Initialize enterprise orchestrator
         self.enterprise_orchestrator = None
@@ -79,19 +218,28 @@ class RAGEngine:
         # Use connection pool for Qdrant
         self.connection_pool = get_qdrant_pool()
         self.query_optimizer = get_query_optimizer()
+        # Engines bound to the current index; queries run on worker threads, so access is locked
+        self._query_engines: OrderedDict = OrderedDict()
+        self._query_engines_lock = threading.Lock()
+        # Sidecar table of indexed documents, so listings don't scroll every chunk
+        self.document_catalog = get_document_catalog(self.collection_name)
         self._initialize_components()
 
     def _initialize_components(self):
         """Initialize Qdrant client, vector store, and global settings."""
         try:
-            # Configure global LlamaIndex settings
-            Settings.llm = OpenAI(
+            # Configure global LlamaIndex settings (clients shared by all tenant engines)
+            Settings.llm = get_llama_llm(
                 model=settings.llm_model,
                 temperature=settings.temperature,
                 max_tokens=settings.max_tokens,
                 api_key=settings.openai_api_key,
             )
-            Settings.embed_model = OpenAIEmbedding(model=settings.embedding_model, api_key=settings.openai_api_key)
+            Settings.embed_model = get_llama_embed_model(
+                model=settings.embedding_model,
+                api_key=settings.openai_api_key,
+                embed_batch_size=settings.ingestion_embed_batch_size,
+            )
             Settings.chunk_size = settings.chunk_size
             Settings.chunk_overlap = settings.chunk_overlap
 
@@ -103,7 +251,12 @@ class RAGEngine:
             self._setup_collection()
 
             # Initialize vector store
-            self.vector_store = QdrantVectorStore(client=self.client, collection_name=self.collection_name)
+            # The async client lets aquery/aquery_enhanced retrieve without blocking the event loop
+            self.vector_store = ChunkTextQdrantVectorStore(
+                client=self.client,
+                aclient=self.connection_pool.get_async_client(),
+                collection_name=self.collection_name,
+            )
 
             # Initialize or load existing index
             self._initialize_index()
@@ -114,11 +267,9 @@ class RAGEngine:
 
             if ADVANCED_FEATURES_AVAILABLE and self.index:
                 try:
-                    # Initialize streaming engine
-                    query_engine = self.index.as_query_engine()
-                    self.streaming_engine = StreamingRAGEngine(
-                        query_engine=query_engine, llm=Settings.llm, chunk_size=10, stream_delay=0.01
-                    )
+                    # Initialize streaming engine (per-request engines are passed to stream_query)
+                    query_engine = self._create_query_engine(settings.rag_similarity_top_k, streaming=True)
+                    self.streaming_engine = StreamingRAGEngine(query_engine=query_engine, llm=Settings.llm)
 
                     # Initialize HyDE engine
                     hyde_config = HyDEConfig(num_hypothetical_docs=3, temperature=0.0, include_original_query=True)
@@ -165,11 +316,32 @@ class RAGEngine:
             logger.error(f"Error initializing RAG Engine: {str(e)}")
             raise
 
+    def estimate_memory_bytes(self) -> int:
+        """Approximate memory held by this engine's tenant-specific state.
+
+        Shared objects (OpenAI clients, CrossEncoder, ontology, caches) are not counted.
+        """
+        size = settings.tenant_engine_base_mb * 1024 * 1024
+        retriever = getattr(self.enterprise_orchestrator, "hybrid_retriever", None)
+        if retriever is not None:
+            if retriever.doc_embeddings is not None:
+                size += retriever.doc_embeddings.nbytes
+            size += sum(len(doc.content) for doc in retriever.documents)
+        size += sum(len(text) for text in getattr(self, "_last_document_texts", {}).values())
+        return size
+
+    def close(self) -> None:
+        """Release the resources this engine owns (fact table connection, cached query engines).
+
+        Shared clients, caches and the document catalog stay open for other engines.
+        """
+        if self.enterprise_orchestrator is not None:
+            self.enterprise_orchestrator.close()
+        self._clear_query_engines()
+
     def _get_tenant_collection_name(self) -> str:
         """Get collection name based on tenant context."""
-        if self.tenant_context:
-            return f"tenant_{self.tenant_context.tenant_id}_docs"
-        return settings.qdrant_collection_name
+        return collection_name_for(self.tenant_context)
 
     def _setup_collection(self):
         """Setup Qdrant collection with proper configuration."""
@@ -180,6 +352,7 @@ class RAGEngine:
 
             if collection_exists:
                 logger.info(f"Collection {self.collection_name} already exists")
+                self._ensure_payload_indexes()
             else:
                 # Create new collection with proper vector size for OpenAI embeddings
                 vector_size = 1536  # OpenAI text-embedding-3-small dimension
@@ -189,6 +362,8 @@ class RAGEngine:
                         vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
                     )
                     logger.info(f"Created new collection: {self.collection_name}")
+                    self._ensure_payload_indexes()
+                    self.document_catalog.clear()
                 except Exception as create_error:
                     # If collection creation fails due to orphaned data, try to delete and recreate
                     if (
@@ -211,6 +386,8 @@ class RAGEngine:
                             vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
                         )
                         logger.info(f"Successfully recreated collection: {self.collection_name}")
+                        self._ensure_payload_indexes()
+                        self.document_catalog.clear()
                     else:
                         raise create_error
 
@@ -218,6 +395,98 @@ class RAGEngine:
             logger.error(f"Error setting up collection: {str(e)}")
             raise
 
+    def _ensure_payload_indexes(self) -> Optional[threading.Thread]:
+        """Create missing payload indexes so filtered searches don't scan the collection.
+
+        Returns:
+            The chunk text backfill thread, if one was started
+        """
+        try:
+            existing = self.client.get_collection(self.collection_name).payload_schema or {}
+            for field_name, schema in self.PAYLOAD_INDEXES.items():
+                if field_name in existing:
+                    continue
+                self.client.create_payload_index(
+                    collection_name=self.collection_name, field_name=field_name, field_schema=schema
+                )
+                logger.info(f"Created payload index on '{field_name}' for {self.collection_name}")
+            if NODE_CONTENT_FIELD in existing:
+                # Full-text index of the serialized node, replaced by the one on the chunk text
+                self.client.delete_payload_index(collection_name=self.collection_name, field_name=NODE_CONTENT_FIELD)
+                logger.info(f"Dropped payload index on '{NODE_CONTENT_FIELD}' for {self.collection_name}")
+        except Exception as e:
+            logger.warning(f"Could not create payload indexes: {e}")
+        return self._start_chunk_text_backfill()
+
+    def _start_chunk_text_backfill(self) -> Optional[threading.Thread]:
+        """Backfill the chunk text of older points in a background thread until it has completed once.
+
+        Completion is recorded in the document catalog, so an interrupted backfill resumes on the
+        next start (it only scrolls points still missing the field).
+
+        Returns:
+            The backfill thread, or None if there is nothing to do or it is already running
+        """
+        if self.document_catalog.chunk_text_backfilled:
+            return None
+        with _chunk_text_backfills_lock:
+            if self.collection_name in _chunk_text_backfills:
+                return None
+            _chunk_text_backfills.add(self.collection_name)
+
+        thread = threading.Thread(
+            target=self._run_chunk_text_backfill, name=f"chunk-text-backfill-{self.collection_name}", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _run_chunk_text_backfill(self) -> None:
+        try:
+            self._backfill_chunk_text()
+            self.document_catalog.mark_chunk_text_backfilled()
+        except Exception as e:
+            logger.warning(f"Chunk text backfill of {self.collection_name} stopped (resumed on next start): {e}")
+        finally:
+            with _chunk_text_backfills_lock:
+                _chunk_text_backfills.discard(self.collection_name)
+
+    def _backfill_chunk_text(self) -> int:
+        """Copy the chunk text out of the serialized node of points written before it had its own field.
+
+        Returns:
+            Number of updated points
+        """
+        missing = Filter(must=[IsEmptyCondition(is_empty=PayloadField(key=CHUNK_TEXT_FIELD))])
+        updated = 0
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=missing,
+                limit=256,
+                offset=offset,
+                with_payload=[NODE_CONTENT_FIELD],
+                with_vectors=False,
+            )
+            if points:
+                self.client.batch_update_points(
+                    collection_name=self.collection_name,
+                    update_operations=[
+                        SetPayloadOperation(
+                            set_payload=SetPayload(
+                                payload={CHUNK_TEXT_FIELD: payload_text(point.payload or {})}, points=[point.id]
+                            )
+                        )
+                        for point in points
+                    ],
+                )
+                updated += len(points)
+            if not points or offset is None:
+                break
+        if updated:
+            logger.info(f"Backfilled chunk text of {updated} points in {self.collection_name}")
+        return updated
+
     def _initialize_index(self):
         """Initialize or load existing index."""
         try:
@@ -239,6 +508,9 @@ class RAGEngine:
             self.index = VectorStoreIndex(
                 [], storage_context=StorageContext.from_defaults(vector_store=self.vector_store)
             )
+        finally:
+            # Cached engines hold the previous index
+            self._clear_query_engines()
 
     def parse_insert_docs(
         self,
@@ -255,6 +527,7 @@ class RAGEngine:
             "total_chunks": 0,
             "errors": [],
         }
+        nodes_by_file = {}
 
         for i, file_path in enumerate(file_paths):
             try:
@@ -295,17 +568,24 @@ class RAGEngine:
                     )
                     if metadata:
                         doc.metadata.update(metadata)
-                    parser = SimpleNodeParser.from_defaults()
-                    nodes = parser.get_nodes_from_documents(documents)
-                    self.index.insert_nodes(nodes)
-
-                    results["uploaded_files"].append(file_path)
-                    results["total_chunks"] += len(nodes)
-                    logger.info(f"Uploaded {file_path} : {len(nodes)} chunks")
+                parser = SimpleNodeParser.from_defaults()
+                nodes_by_file[file_path] = parser.get_nodes_from_documents(documents)
             except Exception as e:
                 results["failed_files"].append(file_path)
                 results["errors"].append(f"Error uploading {file_path}:{str(e)}")
                 logger.info(f"Uploaded {file_path} : {str(e)}")
+
+        # Embed and upsert the nodes of all files in bulk
+        ingestion = self._ingest_nodes(nodes_by_file)
+        for file_path, nodes in nodes_by_file.items():
+            if file_path in ingestion.failed_keys:
+                results["failed_files"].append(file_path)
+                results["errors"].append(f"Error uploading {file_path}:{ingestion.failed_keys[file_path]}")
+                continue
+            results["uploaded_files"].append(file_path)
+            results["total_chunks"] += len(nodes)
+            logger.info(f"Uploaded {file_path} : {len(nodes)} chunks")
+        results["ingestion_stats"] = ingestion.stats.to_dict()
         return results
 
     def index_documents(
@@ -325,6 +605,8 @@ class RAGEngine:
             "errors": [],
             "document_analyses": {},  # Store automatic analyses
         }
+        nodes_by_file = {}
+        display_names = {}
 
         for i, file_path in enumerate(file_paths):
             try:
@@ -381,12 +663,10 @@ class RAGEngine:
                     if metadata:
                         doc.metadata.update(metadata)
 
-                # Parse documents into nodes
+                # Parse documents into nodes; embedding and upsert happen in bulk below
                 parser = SimpleNodeParser.from_defaults()
-                nodes = parser.get_nodes_from_documents(documents)
-
-                # Add nodes to index
-                self.index.insert_nodes(nodes)
+                nodes_by_file[file_path] = parser.get_nodes_from_documents(documents)
+                display_names[file_path] = display_name
 
                 # Generate automatic analysis of the document content
                 if documents:
@@ -400,17 +680,99 @@ class RAGEngine:
                     analysis = self.analyze_document_content(full_text, display_name, force_prompt_type)
                     results["document_analyses"][display_name] = analysis
 
-                results["indexed_files"].append(file_path)
-                results["total_chunks"] += len(nodes)
-                logger.info(f"Indexed {file_path}: {len(nodes)} chunks")
-
             except Exception as e:
+                nodes_by_file.pop(file_path, None)
                 results["failed_files"].append(file_path)
                 results["errors"].append(f"Error indexing {file_path}: {str(e)}")
                 logger.error(f"Error indexing {file_path}: {str(e)}")
 
+        # Embed and upsert the nodes of all files in large, concurrent batches
+        ingestion = self._ingest_nodes(nodes_by_file)
+        for file_path, nodes in nodes_by_file.items():
+            if file_path in ingestion.failed_keys:
+                display_name = display_names[file_path]
+                results["document_analyses"].pop(display_name, None)
+                if hasattr(self, "_last_document_texts"):
+                    self._last_document_texts.pop(display_name, None)
+                results["failed_files"].append(file_path)
+                results["errors"].append(f"Error indexing {file_path}: {ingestion.failed_keys[file_path]}")
+                logger.error(f"Error indexing {file_path}: {ingestion.failed_keys[file_path]}")
+                continue
+            results["indexed_files"].append(file_path)
+            results["total_chunks"] += len(nodes)
+            logger.info(f"Indexed {file_path}: {len(nodes)} chunks")
+        results["ingestion_stats"] = ingestion.stats.to_dict()
+
         return results
 
+    @classmethod
+    def _assign_chunk_positions(cls, nodes_by_file: dict[str, list]) -> None:
+        """Store each node's position within its file, used to fetch neighbors in one filtered request.
+
+        The position and the per-upload metadata are excluded from the embedded text (the position
+        also from the LLM text), so re-uploading a file yields the same embedding inputs.
+        """
+        for nodes in nodes_by_file.values():
+            for chunk_index, node in enumerate(nodes):
+                node.metadata["chunk_index"] = chunk_index
+                for key in cls.VOLATILE_EMBED_METADATA_KEYS:
+                    if key not in node.excluded_embed_metadata_keys:
+                        node.excluded_embed_metadata_keys.append(key)
+                if "chunk_index" not in node.excluded_llm_metadata_keys:
+                    node.excluded_llm_metadata_keys.append("chunk_index")
+
+    def _ingest_nodes(self, nodes_by_file: dict[str, list]) -> IngestionResult:
+        """Embed and upsert parsed nodes of many files through the batched ingestion pipeline."""
+        self._assign_chunk_positions(nodes_by_file)
+        pipeline = EmbeddingIngestionPipeline(
+            index=self.index,
+            embed_model=Settings.embed_model,
+            max_batch_nodes=settings.ingestion_embed_batch_size,
+            max_batch_chars=settings.ingestion_max_batch_chars,
+            max_concurrency=settings.ingestion_max_concurrency,
+            upsert_batch_size=settings.ingestion_upsert_batch_size,
+            embedding_cache=self.embedding_cache,
+            embedding_model_name=settings.embedding_model,
+        )
+        ingestion = pipeline.run(nodes_by_file)
+        if ingestion.stats.upserted_nodes:
+            self._mark_collection_changed()
+            source_counts: dict[str, int] = {}
+            for file_key, nodes in nodes_by_file.items():
+                if file_key in ingestion.failed_keys:
+                    continue
+                for node in nodes:
+                    source = node.metadata.get("source", "Unknown")
+                    source_counts[source] = source_counts.get(source, 0) + 1
+            get_collection_stats_service().record_insert(self.collection_name, source_counts)
+            self._record_catalog_ingest(nodes_by_file, ingestion.failed_keys)
+        return ingestion
+
+    def _record_catalog_ingest(self, nodes_by_file: dict[str, list], failed_keys) -> None:
+        """Add the successfully ingested files and their document vectors to the catalog in one transaction."""
+        entries = []
+        vectors = []
+        for file_key, nodes in nodes_by_file.items():
+            if file_key in failed_keys or not nodes:
+                continue
+            payloads = [{**node.metadata, "document_id": node.ref_doc_id} for node in nodes]
+            file_entries = entries_from_payloads(payloads)
+            vectors.extend(vectors_from_chunks(zip(payloads, (node.embedding for node in nodes))))
+            path = Path(file_key)
+            if path.is_file():
+                digest = hashlib.sha256()
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(block)
+                for entry in file_entries:
+                    entry.byte_size = path.stat().st_size
+                    entry.file_hash = digest.hexdigest()
+            entries.extend(file_entries)
+        try:
+            self.document_catalog.record_ingest(entries, vectors)
+        except Exception as e:
+            logger.error(f"Error updating document catalog: {str(e)}")
+
     def clean_metadata_paths(self) -> bool:
         """Remove temporary paths from existing document metadata."""
         try:
@@ -426,9 +788,7 @@ class RAGEngine:
     ) -> str:
         """Generate automatic analysis of document content using specialized prompts."""
         try:
-            from openai import OpenAI
-
-            client = OpenAI(api_key=settings.openai_api_key)
+            client = get_openai_client(settings.openai_api_key)
 
             # Truncate text if too long (keep first 8000 chars for analysis)
             analysis_text = document_text[:8000] if len(document_text) > 8000 else document_text
@@ -525,16 +885,16 @@ class RAGEngine:
 
             # Try to retrieve documents using a broad query
             logger.info("Attempting to retrieve document content via similarity search")
-            query_engine = self.index.as_query_engine(similarity_top_k=50, response_mode="no_text")
+            retriever = self._create_retriever(50)
 
             # Use a generic query to get document nodes
             try:
-                response = query_engine.query("contenuto documento analisi")
+                source_nodes = retriever.retrieve("contenuto documento analisi")
 
-                if hasattr(response, "source_nodes") and response.source_nodes:
+                if source_nodes:
                     documents_content = {}
 
-                    for node in response.source_nodes:
+                    for node in source_nodes:
                         source = node.node.metadata.get("source", "Unknown")
                         text = node.node.text or node.node.get_content()
 
@@ -595,42 +955,41 @@ class RAGEngine:
     def _load_pdf(self, file_path: str, metadata: Optional[dict[str, Any]] = None) -> list[Document]:
         """Load and parse PDF documents with enhanced text extraction."""
         try:
-            from pypdf import PdfReader
-
-            reader = PdfReader(file_path)
+            # Pages are sharded over the process pool for large files and come back in page order
+            pdf_pages = get_pdf_page_extractor().extract(file_path)
+            total_pages = pdf_pages.page_count
             documents = []
             total_extracted_text = ""
 
-            logger.info(f"Processing PDF: {file_path} with {len(reader.pages)} pages")
-
-            for i, page in enumerate(reader.pages):
-                try:
-                    text = page.extract_text()
-                    page_text_length = len(text.strip())
-                    total_extracted_text += text
-
-                    logger.debug(f"Page {i + 1}: extracted {page_text_length} characters")
-
-                    if text.strip():
-                        doc = Document(
-                            text=text,
-                            metadata={
-                                "page": i + 1,
-                                "total_pages": len(reader.pages),
-                                "source": file_path,
-                                "page_text_length": page_text_length,
-                            },
-                        )
-                        if metadata:
-                            doc.metadata.update(metadata)
-                        documents.append(doc)
-                    else:
-                        logger.warning(f"Page {i + 1} in {file_path} has no extractable text")
+            logger.info(f"Processing PDF: {file_path} with {total_pages} pages")
 
-                except Exception as page_error:
-                    logger.error(f"Error extracting text from page {i + 1} in {file_path}: {str(page_error)}")
+            for page in pdf_pages.pages:
+                if page.error:
+                    logger.error(f"Error extracting text from page {page.page_number} in {file_path}: {page.error}")
                     continue
 
+                text = page.text
+                page_text_length = len(text.strip())
+                total_extracted_text += text
+
+                logger.debug(f"Page {page.page_number}: extracted {page_text_length} characters")
+
+                if text.strip():
+                    doc = Document(
+                        text=text,
+                        metadata={
+                            "page": page.page_number,
+                            "total_pages": total_pages,
+                            "source": file_path,
+                            "page_text_length": page_text_length,
+                        },
+                    )
+                    if metadata:
+                        doc.metadata.update(metadata)
+                    documents.append(doc)
+                else:
+                    logger.warning(f"Page {page.page_number} in {file_path} has no extractable text")
+
             total_text_length = len(total_extracted_text.strip())
             logger.info(
                 f"PDF processing complete: {len(documents)} pages with text, {total_text_length} total characters"
@@ -646,12 +1005,12 @@ class RAGEngine:
                 if not documents:
                     warning_doc = Document(
                         text=f"[ATTENZIONE] Il documento PDF '{file_path}' potrebbe contenere principalmente immagini o avere problemi di estrazione testo. "
-                        f"Sono stati estratti solo {total_text_length} caratteri da {len(reader.pages)} pagine. "
+                        f"Sono stati estratti solo {total_text_length} caratteri da {total_pages} pagine. "
                         f"Per un'analisi completa, si consiglia di utilizzare un documento con testo selezionabile o di convertire "
                         f"le immagini in testo utilizzando OCR.",
                         metadata={
                             "page": 1,
-                            "total_pages": len(reader.pages),
+                            "total_pages": total_pages,
                             "source": file_path,
                             "extraction_warning": True,
                             "total_text_length": total_text_length,
@@ -855,7 +1214,7 @@ class RAGEngine:
         self,
         query_text: str,
         top_k: int = 3,
-        filters: Optional[dict[str, Any]] = None,
+        filters: Optional[Union[Filter, dict[str, Any]]] = None,
         analysis_type: Optional[str] = None,
     ) -> dict[str, Any]:
         """Query the indexed documents with optional specialized analysis."""
@@ -863,57 +1222,50 @@ class RAGEngine:
             if not self.index:
                 return {"answer": "Nessun documento è stato ancora indicizzato.", "sources": [], "confidence": 0}
 
+            # Payload filters (e.g. RLS) are part of every cache key
+            qdrant_filter = self._to_qdrant_filter(filters)
+            scope = self._filter_scope(qdrant_filter)
+
             # Check cache first if enabled
+            original_query = query_text
             if self.query_cache:
-                cached_result = self.query_cache.get(query_text, top_k, analysis_type)
+                cached_result = self.query_cache.get(query_text, top_k, analysis_type, scope=scope)
                 if cached_result:
                     logger.info(f"Returning cached result for query: {query_text[:50]}...")
                     return cached_result
 
-            # Create query engine with specific parameters
-            # Using configurable response mode for performance optimization
-            query_engine = self.index.as_query_engine(
-                similarity_top_k=top_k or settings.rag_similarity_top_k,
-                response_mode=settings.rag_response_mode,  # Configurable: compact, tree_summarize, simple
-                verbose=settings.debug_mode,
-                streaming=False,
+            # Then look for a cached answer to a paraphrase of this question
+            semantic_params = f"query|{top_k}|{analysis_type or 'standard'}|{scope}"
+            cached_result, query_embedding = self._semantic_cache_lookup(query_text, semantic_params)
+            if cached_result:
+                if self.query_cache:
+                    self.query_cache.set(query_text, top_k, cached_result, analysis_type, scope=scope)
+                return cached_result
+
+            # Create query engine with specific parameters (and the specialized synthesis prompt, if any)
+            query_engine = self._create_query_engine(
+                top_k or settings.rag_similarity_top_k,
+                qdrant_filter,
+                analysis_type=self._single_pass_analysis_type(analysis_type),
             )
 
             # If analysis_type is specified, enhance the query with specialized context
             if analysis_type and analysis_type != "standard":
                 query_text = self._enhance_query_with_analysis_type(query_text, analysis_type)
 
-            # Aggiungi prompt per rispondere in italiano
-            query_text_it = f"Per favore rispondi in italiano. {query_text}"
+            # Execute query (con prompt per rispondere in italiano)
+            response = query_engine.query(self._engine_query(query_text, original_query, query_embedding))
+            sources = self._extract_sources(response)
 
-            # Execute query
-            response = query_engine.query(query_text_it)
+            # Mark the specialized analysis, or run its second pass in two-pass mode
+            response_text = self._specialized_response(str(response), sources, query_text, analysis_type)
 
-            # Extract source information
-            sources = []
-            if hasattr(response, "source_nodes"):
-                for node in response.source_nodes:
-                    sources.append(
-                        {"text": node.node.text[:200] + "...", "score": node.score, "metadata": node.node.metadata}
-                    )
-
-            # If specialized analysis is requested, post-process the response
-            if analysis_type and analysis_type != "standard":
-                response_text = self._apply_specialized_analysis(str(response), sources, query_text, analysis_type)
-            else:
-                response_text = str(response)
-
-            result = {
-                "answer": response_text,
-                "unformattedAnswer": clean_markdown(response_text),
-                "sources": sources,
-                "confidence": sources[0]["score"] if sources else 0,
-                "analysis_type": analysis_type or "standard",
-            }
+            result = self._build_query_result(response_text, sources, analysis_type)
 
             # Cache the result if caching is enabled
             if self.query_cache:
-                self.query_cache.set(query_text, top_k, result, analysis_type)
+                self.query_cache.set(original_query, top_k, result, analysis_type, scope=scope)
+            self._semantic_cache_store(original_query, query_embedding, semantic_params, result)
 
             return result
 
@@ -925,7 +1277,7 @@ class RAGEngine:
         self,
         query_text: str,
         top_k: int = 5,
-        filters: Optional[dict[str, Any]] = None,
+        filters: Optional[Union[Filter, dict[str, Any]]] = None,
         analysis_type: Optional[str] = None,
         use_reranking: bool = True,
         use_contextual_chunks: bool = True,
@@ -936,7 +1288,7 @@ class RAGEngine:
         Args:
             query_text: Query text
             top_k: Final number of results to return
-            filters: Optional filters for retrieval
+            filters: Optional payload filter (Qdrant ``Filter`` or dict) applied at retrieval
             analysis_type: Type of specialized analysis
             use_reranking: Whether to use CrossEncoder reranking
             use_contextual_chunks: Whether to include contextual chunks
@@ -950,123 +1302,516 @@ class RAGEngine:
                 return {"answer": "Nessun documento è stato ancora indicizzato.", "sources": [], "confidence": 0}
 
             # Check cache first if enabled
+            original_query = query_text
+            qdrant_filter = self._to_qdrant_filter(filters)
+            scope = self._filter_scope(qdrant_filter)
             cache_key = f"{query_text}_{top_k}_{analysis_type}_{use_reranking}_{use_contextual_chunks}"
             if self.query_cache:
-                cached_result = self.query_cache.get(cache_key, top_k, analysis_type)
+                cached_result = self.query_cache.get(cache_key, top_k, analysis_type, scope=scope)
                 if cached_result:
                     logger.info(f"Returning cached enhanced result for query: {query_text[:50]}...")
                     return cached_result
 
+            # Then look for a cached answer to a paraphrase of this question
+            semantic_params = (
+                f"enhanced|{top_k}|{analysis_type or 'standard'}|{use_reranking}|{use_contextual_chunks}|{rerank_top_k}"
+                f"|{scope}"
+            )
+            cached_result, query_embedding = self._semantic_cache_lookup(query_text, semantic_params)
+            if cached_result:
+                if self.query_cache:
+                    self.query_cache.set(cache_key, top_k, cached_result, analysis_type, scope=scope)
+                return cached_result
+
             # Get more initial results for reranking/contextual enhancement
             initial_top_k = max(rerank_top_k, top_k * 2) if (use_reranking or use_contextual_chunks) else top_k
-
-            # Create query engine
-            query_engine = self.index.as_query_engine(
-                similarity_top_k=initial_top_k,
-                response_mode=settings.rag_response_mode,
-                verbose=settings.debug_mode,
-                streaming=False,
+            query_engine = self._create_query_engine(
+                initial_top_k, qdrant_filter, analysis_type=self._single_pass_analysis_type(analysis_type)
             )
 
             # Enhance query with analysis type if specified
             if analysis_type and analysis_type != "standard":
                 query_text = self._enhance_query_with_analysis_type(query_text, analysis_type)
 
-            # Add Italian language prompt
-            query_text_it = f"Per favore rispondi in italiano. {query_text}"
+            # Execute initial query with Italian language prompt
+            response = query_engine.query(self._engine_query(query_text, original_query, query_embedding))
+            initial_sources = self._extract_sources(response, include_content=True)
 
-            # Execute initial query
-            response = query_engine.query(query_text_it)
+            enhanced_sources, processing_stats = self._enhance_sources(
+                query_text, initial_sources, top_k, use_reranking, use_contextual_chunks, qdrant_filter
+            )
 
-            # Extract initial source information
-            initial_sources = []
-            if hasattr(response, "source_nodes"):
-                for node in response.source_nodes:
-                    source_dict = {
-                        "id": getattr(node, "node_id", str(hash(node.node.text))),
-                        "content": node.node.text,
-                        "text": node.node.text[:200] + "...",
-                        "score": float(node.score),
-                        "metadata": node.node.metadata,
-                    }
-                    initial_sources.append(source_dict)
+            # Mark the specialized analysis, or run its second pass in two-pass mode
+            response_text = self._specialized_response(str(response), enhanced_sources, query_text, analysis_type)
 
-            enhanced_sources = initial_sources
-            processing_stats = {"initial_sources": len(initial_sources)}
+            result = self._build_enhanced_result(
+                response_text, enhanced_sources, processing_stats, analysis_type, use_reranking, use_contextual_chunks
+            )
 
-            # Apply reranking if enabled and available
-            if use_reranking and self.reranking_service and self.reranking_service.is_available():
-                try:
-                    reranked_sources = self.reranking_service.rerank_rag_results(
-                        query_text, initial_sources, top_k=top_k
-                    )
-                    enhanced_sources = reranked_sources
-                    processing_stats["reranked_sources"] = len(reranked_sources)
-                    logger.info(f"Reranked {len(initial_sources)} to {len(reranked_sources)} sources")
-                except Exception as e:
-                    logger.warning(f"Reranking failed, using original sources: {e}")
+            # Cache the enhanced result
+            if self.query_cache:
+                self.query_cache.set(cache_key, top_k, result, analysis_type, scope=scope)
+            self._semantic_cache_store(original_query, query_embedding, semantic_params, result)
 
-            # Apply contextual chunks retrieval if enabled and available
-            if use_contextual_chunks and self.contextual_service:
-                try:
-                    contextual_chunks = self.contextual_service.enhance_retrieval_results(
-                        enhanced_sources, self.vector_store, include_metadata=True
+            return result
+
+        except Exception as e:
+            logger.error(f"Error in enhanced query: {str(e)}")
+            # Fallback to standard query
+            return self.query(query_text, top_k, filters, analysis_type)
+
+    def _enhance_sources(
+        self,
+        query_text: str,
+        initial_sources: list[dict],
+        top_k: int,
+        use_reranking: bool,
+        use_contextual_chunks: bool,
+        qdrant_filter: Optional[Filter] = None,
+    ) -> tuple[list[dict], dict[str, Any]]:
+        """Rerank sources and expand them with contextual chunks (blocking: CrossEncoder and Qdrant calls).
+
+        Neighbor chunks are fetched with ``qdrant_filter``, the filter of the main search.
+
+        Returns:
+            tuple (enhanced sources, processing stats)
+        """
+        enhanced_sources = initial_sources
+        processing_stats = {"initial_sources": len(initial_sources)}
+
+        # Apply reranking if enabled and available
+        if use_reranking and self.reranking_service and self.reranking_service.is_available():
+            try:
+                reranked_sources = self.reranking_service.rerank_rag_results(
+                    query_text, initial_sources, top_k=top_k
+                )
+                enhanced_sources = reranked_sources
+                processing_stats["reranked_sources"] = len(reranked_sources)
+                logger.info(f"Reranked {len(initial_sources)} to {len(reranked_sources)} sources")
+            except Exception as e:
+                logger.warning(f"Reranking failed, using original sources: {e}")
+
+        # Apply contextual chunks retrieval if enabled and available
+        if use_contextual_chunks and self.contextual_service:
+            try:
+                contextual_chunks = self.contextual_service.enhance_retrieval_results(
+                    enhanced_sources, self.vector_store, include_metadata=True, qdrant_filter=qdrant_filter
+                )
+
+                # Convert ChunkContext objects back to source format
+                enhanced_sources = []
+                for chunk in contextual_chunks[:top_k]:
+                    enhanced_sources.append(
+                        {
+                            "text": chunk.content[:200] + "...",
+                            "score": chunk.score,
+                            "metadata": chunk.metadata,
+                            "context_type": chunk.context_type,
+                            "source_file": chunk.source_file,
+                        }
                     )
 
-                    # Convert ChunkContext objects back to source format
-                    enhanced_sources = []
-                    for chunk in contextual_chunks[:top_k]:
-                        enhanced_sources.append(
-                            {
-                                "text": chunk.content[:200] + "...",
-                                "score": chunk.score,
-                                "metadata": chunk.metadata,
-                                "context_type": chunk.context_type,
-                                "source_file": chunk.source_file,
-                            }
-                        )
+                processing_stats["contextual_sources"] = len(contextual_chunks)
+                context_stats = self.contextual_service.get_context_statistics(contextual_chunks)
+                processing_stats["context_stats"] = context_stats
 
-                    processing_stats["contextual_sources"] = len(contextual_chunks)
-                    context_stats = self.contextual_service.get_context_statistics(contextual_chunks)
-                    processing_stats["context_stats"] = context_stats
+                logger.info(f"Enhanced with {len(contextual_chunks)} contextual chunks")
+            except Exception as e:
+                logger.warning(f"Contextual enhancement failed, using existing sources: {e}")
 
-                    logger.info(f"Enhanced with {len(contextual_chunks)} contextual chunks")
-                except Exception as e:
-                    logger.warning(f"Contextual enhancement failed, using existing sources: {e}")
+        return enhanced_sources, processing_stats
+
+    def _build_enhanced_result(
+        self,
+        response_text: str,
+        enhanced_sources: list[dict],
+        processing_stats: dict[str, Any],
+        analysis_type: Optional[str],
+        use_reranking: bool,
+        use_contextual_chunks: bool,
+    ) -> dict[str, Any]:
+        """Assemble the result of an enhanced query."""
+        return {
+            "answer": response_text,
+            "sources": enhanced_sources,
+            "confidence": self._calculate_enhanced_confidence(enhanced_sources),
+            "analysis_type": analysis_type or "standard",
+            "enhancement_used": {
+                "reranking": use_reranking and self.reranking_service is not None,
+                "contextual_chunks": use_contextual_chunks and self.contextual_service is not None,
+            },
+            "processing_stats": processing_stats,
+        }
+
+    async def aquery(
+        self,
+        query_text: str,
+        top_k: int = 3,
+        filters: Optional[Union[Filter, dict[str, Any]]] = None,
+        analysis_type: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Async variant of ``query`` that does not block the event loop.
+
+        Retrieval and synthesis go through LlamaIndex ``aquery`` (async Qdrant and OpenAI
+        clients); the remaining blocking steps run in the shared bounded executor.
+        """
+        try:
+            if not self.index:
+                return {"answer": "Nessun documento è stato ancora indicizzato.", "sources": [], "confidence": 0}
+
+            qdrant_filter = self._to_qdrant_filter(filters)
+            scope = self._filter_scope(qdrant_filter)
+
+            original_query = query_text
+            if self.query_cache:
+                cached_result = self.query_cache.get(query_text, top_k, analysis_type, scope=scope)
+                if cached_result:
+                    logger.info(f"Returning cached result for query: {query_text[:50]}...")
+                    return cached_result
+
+            semantic_params = f"query|{top_k}|{analysis_type or 'standard'}|{scope}"
+            cached_result, query_embedding = await self._asemantic_cache_lookup(query_text, semantic_params)
+            if cached_result:
+                if self.query_cache:
+                    self.query_cache.set(query_text, top_k, cached_result, analysis_type, scope=scope)
+                return cached_result
+
+            query_engine = self._create_query_engine(
+                top_k or settings.rag_similarity_top_k,
+                qdrant_filter,
+                analysis_type=self._single_pass_analysis_type(analysis_type),
+            )
 
-            # Apply specialized analysis if requested
             if analysis_type and analysis_type != "standard":
-                response_text = self._apply_specialized_analysis(
-                    str(response), enhanced_sources, query_text, analysis_type
+                query_text = self._enhance_query_with_analysis_type(query_text, analysis_type)
+
+            response = await query_engine.aquery(self._engine_query(query_text, original_query, query_embedding))
+            sources = self._extract_sources(response)
+
+            if self._needs_second_pass(analysis_type):
+                response_text = await run_blocking(
+                    self._apply_specialized_analysis, str(response), sources, query_text, analysis_type
                 )
             else:
-                response_text = str(response)
+                response_text = self._specialized_response(str(response), sources, query_text, analysis_type)
 
-            # Calculate enhanced confidence score
-            confidence = self._calculate_enhanced_confidence(enhanced_sources)
+            result = self._build_query_result(response_text, sources, analysis_type)
 
-            result = {
-                "answer": response_text,
-                "sources": enhanced_sources,
-                "confidence": confidence,
-                "analysis_type": analysis_type or "standard",
-                "enhancement_used": {
-                    "reranking": use_reranking and self.reranking_service is not None,
-                    "contextual_chunks": use_contextual_chunks and self.contextual_service is not None,
-                },
-                "processing_stats": processing_stats,
-            }
+            if self.query_cache:
+                self.query_cache.set(original_query, top_k, result, analysis_type, scope=scope)
+            self._semantic_cache_store(original_query, query_embedding, semantic_params, result)
 
-            # Cache the enhanced result
+            return result
+
+        except Exception as e:
+            logger.error(f"Error querying index: {str(e)}")
+            return {"answer": f"Error processing query: {str(e)}", "sources": [], "confidence": 0}
+
+    async def aquery_enhanced(
+        self,
+        query_text: str,
+        top_k: int = 5,
+        filters: Optional[Union[Filter, dict[str, Any]]] = None,
+        analysis_type: Optional[str] = None,
+        use_reranking: bool = True,
+        use_contextual_chunks: bool = True,
+        rerank_top_k: int = 10,
+    ) -> dict[str, Any]:
+        """Async variant of ``query_enhanced``; reranking and contextual expansion run in the bounded executor."""
+        try:
+            if not self.index:
+                return {"answer": "Nessun documento è stato ancora indicizzato.", "sources": [], "confidence": 0}
+
+            original_query = query_text
+            qdrant_filter = self._to_qdrant_filter(filters)
+            scope = self._filter_scope(qdrant_filter)
+            cache_key = f"{query_text}_{top_k}_{analysis_type}_{use_reranking}_{use_contextual_chunks}"
             if self.query_cache:
-                self.query_cache.set(cache_key, top_k, result, analysis_type)
+                cached_result = self.query_cache.get(cache_key, top_k, analysis_type, scope=scope)
+                if cached_result:
+                    logger.info(f"Returning cached enhanced result for query: {query_text[:50]}...")
+                    return cached_result
+
+            semantic_params = (
+                f"enhanced|{top_k}|{analysis_type or 'standard'}|{use_reranking}|{use_contextual_chunks}|{rerank_top_k}"
+                f"|{scope}"
+            )
+            cached_result, query_embedding = await self._asemantic_cache_lookup(query_text, semantic_params)
+            if cached_result:
+                if self.query_cache:
+                    self.query_cache.set(cache_key, top_k, cached_result, analysis_type, scope=scope)
+                return cached_result
+
+            initial_top_k = max(rerank_top_k, top_k * 2) if (use_reranking or use_contextual_chunks) else top_k
+            query_engine = self._create_query_engine(
+                initial_top_k, qdrant_filter, analysis_type=self._single_pass_analysis_type(analysis_type)
+            )
+
+            if analysis_type and analysis_type != "standard":
+                query_text = self._enhance_query_with_analysis_type(query_text, analysis_type)
+
+            response = await query_engine.aquery(self._engine_query(query_text, original_query, query_embedding))
+            initial_sources = self._extract_sources(response, include_content=True)
+
+            enhanced_sources, processing_stats = await run_blocking(
+                self._enhance_sources,
+                query_text,
+                initial_sources,
+                top_k,
+                use_reranking,
+                use_contextual_chunks,
+                qdrant_filter,
+            )
+
+            if self._needs_second_pass(analysis_type):
+                response_text = await run_blocking(
+                    self._apply_specialized_analysis, str(response), enhanced_sources, query_text, analysis_type
+                )
+            else:
+                response_text = self._specialized_response(
+                    str(response), enhanced_sources, query_text, analysis_type
+                )
+
+            result = self._build_enhanced_result(
+                response_text, enhanced_sources, processing_stats, analysis_type, use_reranking, use_contextual_chunks
+            )
+
+            if self.query_cache:
+                self.query_cache.set(cache_key, top_k, result, analysis_type, scope=scope)
+            self._semantic_cache_store(original_query, query_embedding, semantic_params, result)
 
             return result
 
         except Exception as e:
             logger.error(f"Error in enhanced query: {str(e)}")
             # Fallback to standard query
-            return self.query(query_text, top_k, filters, analysis_type)
+            return await self.aquery(query_text, top_k, filters, analysis_type)
+
+    def _create_query_engine(
+        self,
+        similarity_top_k: int,
+        qdrant_filter: Optional[Filter] = None,
+        streaming: bool = False,
+        response_mode: Optional[str] = None,
+        analysis_type: Optional[str] = None,
+    ):
+        """Return the query engine for this configuration, building it on first use.
+
+        Args:
+            similarity_top_k: Number of chunks to retrieve
+            qdrant_filter: Optional payload filter applied by Qdrant during the vector search
+            streaming: Return LLM tokens as they are generated instead of a complete response
+            response_mode: Synthesis mode; defaults to the configured ``rag_response_mode``
+            analysis_type: Specialized analysis whose prompt replaces the default text QA template
+        """
+        # Configurable: compact, tree_summarize, simple
+        response_mode = response_mode or settings.rag_response_mode
+        if analysis_type in self.SPECIALIZED_ANALYSES:
+            kwargs = self._specialized_templates(analysis_type)
+        else:
+            analysis_type, kwargs = None, {}
+        key = ("query", similarity_top_k, response_mode, streaming, self._filter_scope(qdrant_filter), analysis_type)
+        return self._cached_engine(
+            key,
+            lambda: self.index.as_query_engine(
+                similarity_top_k=similarity_top_k,
+                response_mode=response_mode,
+                verbose=settings.debug_mode,
+                streaming=streaming,
+                **self._vector_store_kwargs(qdrant_filter),
+                **kwargs,
+            ),
+        )
+
+    def _create_retriever(self, similarity_top_k: int, qdrant_filter: Optional[Filter] = None):
+        """Return the vector retriever for this configuration (embeds the query, never calls the LLM)."""
+        key = ("retriever", similarity_top_k, None, False, self._filter_scope(qdrant_filter), None)
+        return self._cached_engine(
+            key,
+            lambda: self.index.as_retriever(
+                similarity_top_k=similarity_top_k, **self._vector_store_kwargs(qdrant_filter)
+            ),
+        )
+
+    def _cached_engine(self, key: tuple, build):
+        """LRU of query engines and retrievers; they are stateless, so one instance serves every call."""
+        with self._query_engines_lock:
+            engine = self._query_engines.get(key)
+            if engine is not None:
+                self._query_engines.move_to_end(key)
+                return engine
+            index = self.index
+        engine = build()
+        with self._query_engines_lock:
+            if self.index is not index:
+                return engine  # Index replaced while building: serve this call, don't cache
+            engine = self._query_engines.setdefault(key, engine)
+            self._query_engines.move_to_end(key)
+            while len(self._query_engines) > self.MAX_CACHED_QUERY_ENGINES:
+                self._query_engines.popitem(last=False)
+        return engine
+
+    def _clear_query_engines(self) -> None:
+        """Drop cached engines; called whenever ``self.index`` is replaced."""
+        with self._query_engines_lock:
+            self._query_engines.clear()
+
+    @staticmethod
+    def _vector_store_kwargs(qdrant_filter: Optional[Filter]) -> dict[str, Any]:
+        """Keyword arguments passing a payload filter through LlamaIndex to the Qdrant search."""
+        return {"vector_store_kwargs": {"qdrant_filters": qdrant_filter}} if qdrant_filter is not None else {}
+
+    @staticmethod
+    def _to_qdrant_filter(filters: Optional[Union[Filter, dict[str, Any]]]) -> Optional[Filter]:
+        """Convert query filters to a Qdrant payload filter.
+
+        Args:
+            filters: A Qdrant ``Filter``, or a dict of payload key -> value (or list of accepted values)
+        """
+        if filters is None or isinstance(filters, Filter):
+            return filters
+        conditions = [
+            FieldCondition(key=key, match=MatchAny(any=list(value)))
+            if isinstance(value, (list, tuple, set))
+            else FieldCondition(key=key, match=MatchValue(value=value))
+            for key, value in filters.items()
+        ]
+        return Filter(must=conditions) if conditions else None
+
+    @staticmethod
+    def _filter_scope(qdrant_filter: Optional[Filter]) -> Optional[str]:
+        """Stable fingerprint of a payload filter, used to keep filtered results apart in the caches."""
+        if qdrant_filter is None:
+            return None
+        return hashlib.md5(qdrant_filter.model_dump_json(exclude_none=True).encode()).hexdigest()
+
+    @staticmethod
+    def _italian_prompt(query_text: str) -> str:
+        """Aggiungi prompt per rispondere in italiano."""
+        return f"Per favore rispondi in italiano. {query_text}"
+
+    def _engine_query(self, query_text: str, question: str, query_embedding: Optional[list[float]]) -> QueryBundle:
+        """Italian prompt for the query engine; retrieval always embeds the bare question.
+
+        The semantic cache embeds the question before any prompt is built, so retrieving with the
+        same text gives the same chunks whether that cache is enabled (embedding reused) or not.
+        """
+        return QueryBundle(
+            query_str=self._italian_prompt(query_text), custom_embedding_strs=[question], embedding=query_embedding
+        )
+
+    @staticmethod
+    def _extract_sources(response, include_content: bool = False) -> list[dict[str, Any]]:
+        """Extract source information from a LlamaIndex response.
+
+        Args:
+            response: LlamaIndex response with ``source_nodes``
+            include_content: Include node id and full text (needed for reranking and contextual chunks)
+        """
+        sources = []
+        for node in getattr(response, "source_nodes", None) or []:
+            if include_content:
+                sources.append(
+                    {
+                        "id": getattr(node, "node_id", str(hash(node.node.text))),
+                        "content": node.node.text,
+                        "text": node.node.text[:200] + "...",
+                        "score": float(node.score),
+                        "metadata": node.node.metadata,
+                    }
+                )
+            else:
+                sources.append(
+                    {"text": node.node.text[:200] + "...", "score": node.score, "metadata": node.node.metadata}
+                )
+        return sources
+
+    @staticmethod
+    def _build_query_result(
+        response_text: str, sources: list[dict[str, Any]], analysis_type: Optional[str]
+    ) -> dict[str, Any]:
+        """Assemble the result of a standard query."""
+        return {
+            "answer": response_text,
+            "unformattedAnswer": clean_markdown(response_text),
+            "sources": sources,
+            "confidence": sources[0]["score"] if sources else 0,
+            "analysis_type": analysis_type or "standard",
+        }
+
+    async def aindex_documents(self, file_paths: list[str], **kwargs) -> dict[str, Any]:
+        """Run ``index_documents`` (blocking parsers and ingestion) in the bounded executor."""
+        return await run_blocking(self.index_documents, file_paths, **kwargs)
+
+    async def aparse_insert_docs(self, file_paths: list[str], **kwargs) -> dict[str, Any]:
+        """Run ``parse_insert_docs`` (blocking parsers and ingestion) in the bounded executor."""
+        return await run_blocking(self.parse_insert_docs, file_paths, **kwargs)
+
+    def _semantic_cache_lookup(
+        self, query_text: str, params_key: str
+    ) -> tuple[Optional[dict[str, Any]], Optional[list[float]]]:
+        """Look up an answer cached for a paraphrase of the query.
+
+        Returns:
+            tuple (cached result or None, query embedding to reuse when storing the new answer)
+        """
+        if not self.semantic_cache:
+            return None, None
+
+        try:
+            query_embedding = Settings.embed_model.get_query_embedding(query_text)
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup skipped, could not embed query: {e}")
+            return None, None
+
+        return self._semantic_cache_match(query_text, query_embedding, params_key), query_embedding
+
+    async def _asemantic_cache_lookup(
+        self, query_text: str, params_key: str
+    ) -> tuple[Optional[dict[str, Any]], Optional[list[float]]]:
+        """Async variant of ``_semantic_cache_lookup`` embedding the query with the async OpenAI client."""
+        if not self.semantic_cache:
+            return None, None
+
+        try:
+            query_embedding = await Settings.embed_model.aget_query_embedding(query_text)
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup skipped, could not embed query: {e}")
+            return None, None
+
+        return self._semantic_cache_match(query_text, query_embedding, params_key), query_embedding
+
+    def _semantic_cache_match(
+        self, query_text: str, query_embedding: list[float], params_key: str
+    ) -> Optional[dict[str, Any]]:
+        """Match an embedded query against the semantic cache."""
+        hit = self.semantic_cache.lookup(
+            self.collection_name, query_embedding, params_key, self.document_catalog.content_version, query=query_text
+        )
+        if not hit:
+            return None
+
+        cached_result, similarity = hit
+        logger.info(f"Returning semantically cached result ({similarity:.3f}) for query: {query_text[:50]}...")
+        return {**cached_result, "semantic_cache_similarity": similarity}
+
+    def _semantic_cache_store(
+        self, query_text: str, query_embedding: Optional[list[float]], params_key: str, result: dict[str, Any]
+    ) -> None:
+        """Store an answer in the semantic cache for future paraphrases."""
+        if self.semantic_cache and query_embedding is not None:
+            self.semantic_cache.store(
+                self.collection_name,
+                query_text,
+                query_embedding,
+                params_key,
+                result,
+                self.document_catalog.content_version,
+            )
+
+    def _mark_collection_changed(self) -> None:
+        """Invalidate answers cached for the previous content of the collection (in every worker process)."""
+        self.document_catalog.bump_content_version()
 
     def _calculate_enhanced_confidence(self, sources: List[dict]) -> float:
         """Calculate confidence score for enhanced results."""
@@ -1105,7 +1850,7 @@ class RAGEngine:
         """
         if not enable_enterprise_features or not self.enterprise_orchestrator or not ENTERPRISE_AVAILABLE:
             # Fallback to standard query
-            return self.query(query_text, **kwargs)
+            return await self.aquery(query_text, **kwargs)
 
         try:
             # Create enterprise query - filter known parameters
@@ -1131,8 +1876,8 @@ class RAGEngine:
             # Process through enterprise pipeline
             processing_result = await self.enterprise_orchestrator.process_enterprise_query(enterprise_query, documents)
 
-            # Generate AI response and get sources
-            ai_response = self._generate_ai_response_with_sources(processing_result)
+            # Generate AI response and get sources (synchronous query, kept off the event loop)
+            ai_response = await run_blocking(self._generate_ai_response_with_sources, processing_result)
 
             # Convert processing result to standard query response format
             enterprise_response = {
@@ -1167,7 +1912,7 @@ class RAGEngine:
         except Exception as e:
             logger.error(f"Enterprise query failed, falling back to standard: {e}")
             # Fallback to standard query on error
-            return self.query(query_text, **kwargs)
+            return await self.aquery(query_text, **kwargs)
 
     def _generate_ai_response_with_sources(self, processing_result) -> dict[str, Any]:
         """Generate AI response with sources from processing result."""
@@ -1306,12 +2051,60 @@ class RAGEngine:
             return f"{enhancement}\n\nDomanda: {query_text}"
         return query_text
 
+    @classmethod
+    def _specialized_templates(cls, analysis_type: str) -> dict[str, PromptTemplate]:
+        """Text QA and refine templates producing a specialized analysis during synthesis."""
+        focus, instructions = cls.SPECIALIZED_ANALYSES[analysis_type]
+        text_qa = (
+            "Le informazioni di contesto sono riportate di seguito.\n"
+            "---------------------\n"
+            "{context_str}\n"
+            "---------------------\n"
+            f"Usando solo le informazioni di contesto, rispondi alla domanda {focus}.\n\n"
+            f"{instructions}\n"
+            "Domanda: {query_str}\n"
+            "Risposta: "
+        )
+        refine = (
+            "La domanda è: {query_str}\n"
+            "La risposta esistente è: {existing_answer}\n"
+            "Se utile, migliora la risposta esistente con il nuovo contesto riportato di seguito.\n"
+            "---------------------\n"
+            "{context_msg}\n"
+            "---------------------\n"
+            f"Mantieni la risposta {focus}.\n\n"
+            f"{instructions}\n"
+            "Risposta migliorata: "
+        )
+        return {"text_qa_template": PromptTemplate(text_qa), "refine_template": PromptTemplate(refine)}
+
+    def _single_pass_analysis_type(self, analysis_type: Optional[str]) -> Optional[str]:
+        """Analysis type whose prompt is injected into synthesis, so one LLM call produces the analysis.
+
+        Returns None in two-pass mode and for analysis types without a specialized synthesis prompt.
+        """
+        if settings.specialized_analysis_mode == "two_pass" or analysis_type not in self.SPECIALIZED_ANALYSES:
+            return None
+        return analysis_type
+
+    def _needs_second_pass(self, analysis_type: Optional[str]) -> bool:
+        """Whether the answer must be rewritten by ``_apply_specialized_analysis`` (two-pass mode)."""
+        return bool(analysis_type and analysis_type != "standard" and not self._single_pass_analysis_type(analysis_type))
+
+    def _specialized_response(
+        self, response: str, sources: list[dict], query: str, analysis_type: Optional[str]
+    ) -> str:
+        """Final answer text: marked single-pass analysis, two-pass rewrite, or the plain response."""
+        if self._single_pass_analysis_type(analysis_type):
+            return f"[Analisi {analysis_type.upper()}]\n\n{response}"
+        if self._needs_second_pass(analysis_type):
+            return self._apply_specialized_analysis(response, sources, query, analysis_type)
+        return response
+
     def _apply_specialized_analysis(self, response: str, sources: list[dict], query: str, analysis_type: str) -> str:
-        """Apply specialized post-processing based on analysis type."""
+        """Rewrite an answer with a second LLM call based on analysis type (two-pass mode)."""
         try:
-            from openai import OpenAI
-
-            client = OpenAI(api_key=settings.openai_api_key)
+            client = get_openai_client(settings.openai_api_key)
 
             # Prepare source context
             source_context = "\n\n".join(
@@ -1321,51 +2114,15 @@ class RAGEngine:
                 ]
             )
 
-            # Create specialized prompt based on analysis type
-            specialized_prompts = {
-                "bilancio": f"""Riformula questa risposta con focus finanziario professionale:
-
-                            Risposta originale: {response}
-
-                            Fonti rilevanti:
-                            {source_context}
-
-                            Produci un'analisi finanziaria strutturata che include:
-                            - Metriche chiave con valori specifici
-                            - Trend e variazioni percentuali
-                            - Confronti con periodi precedenti
-                            - Implicazioni finanziarie
-
-                            Usa un tono da equity analyst professionale.""",
-                "report_dettagliato": f"""Trasforma questa risposta in un briefing professionale dettagliato:
-
-                            Risposta originale: {response}
-
-                            Fonti rilevanti:
-                            {source_context}
-
-                            Struttura l'analisi come:
-                            ## Executive Summary
-                            [Sintesi in 2-3 righe]
-
-                            ## Analisi Dettagliata
-                            [Punti chiave con quantificazione]
-
-                            ## Implicazioni e Raccomandazioni
-                            [Azioni suggerite basate sui dati]
-
-                            Mantieni un tono professionale da investment analyst.""",
-                "fatturato": f"""Riformula con focus su vendite e revenue:
-
-                            Risposta: {response}
-                            Fonti: {source_context}
-
-                            Evidenzia: driver di crescita, mix prodotto, trend vendite, forecast.""",
-            }
-
-            prompt = specialized_prompts.get(analysis_type)
-            if not prompt:
+            if analysis_type not in self.SPECIALIZED_ANALYSES:
                 return response  # Return original if no specialized prompt
+            focus, instructions = self.SPECIALIZED_ANALYSES[analysis_type]
+            prompt = (
+                f"Riformula questa risposta {focus}:\n\n"
+                f"Risposta originale: {response}\n\n"
+                f"Fonti rilevanti:\n{source_context}\n\n"
+                f"{instructions}"
+            )
 
             # Get specialized analysis
             completion = client.chat.completions.create(
@@ -1433,13 +2190,22 @@ class RAGEngine:
 
         return "\n".join(formatted_parts)
 
-    async def query_stream(self, query_text: str, top_k: int = 3, **kwargs):
+    async def query_stream(
+        self,
+        query_text: str,
+        top_k: int = 3,
+        filters: Optional[Union[Filter, dict[str, Any]]] = None,
+        **kwargs,
+    ):
         """
         Stream query response in real-time.
 
+        Sources are emitted as soon as retrieval finishes, then LLM tokens as they are generated.
+
         Args:
             query_text: User query
             top_k: Number of documents to retrieve
+            filters: Optional payload filter (e.g. RLS) applied by Qdrant during retrieval
             **kwargs: Additional arguments
 
         Yields:
@@ -1447,7 +2213,7 @@ class RAGEngine:
         """
         if not self.streaming_engine:
             logger.warning("Streaming not available, falling back to standard query")
-            result = self.query(query_text, top_k=top_k)
+            result = await self.aquery(query_text, top_k=top_k, filters=filters)
             # Convert standard response to single chunk
             if ADVANCED_FEATURES_AVAILABLE:
                 yield StreamingChunk(
@@ -1458,7 +2224,10 @@ class RAGEngine:
             return
 
         # Stream the response
-        async for chunk in self.streaming_engine.stream_query(query_text, **kwargs):
+        query_engine = self._create_query_engine(top_k, self._to_qdrant_filter(filters), streaming=True)
+        async for chunk in self.streaming_engine.stream_query(
+            self._italian_prompt(query_text), query_engine=query_engine, max_sources=top_k, **kwargs
+        ):
             yield chunk
 
     def query_with_hyde(self, query_text: str, top_k: int = 3, **kwargs) -> dict[str, Any]:
@@ -1480,32 +2249,49 @@ class RAGEngine:
         try:
             # Use HyDE engine for query
             response = self.hyde_engine.query(query_text, **kwargs)
+            return self._build_hyde_result(response, top_k)
 
-            # Format response
-            sources = []
-            if hasattr(response, "source_nodes"):
-                for node in response.source_nodes[:top_k]:
-                    sources.append(
-                        {
-                            "content": node.node.text[:500],
-                            "metadata": node.node.metadata,
-                            "score": float(node.score) if node.score else 0.0,
-                        }
-                    )
+        except Exception as e:
+            logger.error(f"Error in HyDE query: {str(e)}")
+            return self.query(query_text, top_k=top_k)
 
-            result = {
-                "answer": str(response),
-                "sources": sources,
-                "confidence": sum(s["score"] for s in sources) / len(sources) if sources else 0.0,
-                "method": "hyde",
-            }
+    async def aquery_with_hyde(self, query_text: str, top_k: int = 3, **kwargs) -> dict[str, Any]:
+        """Async variant of ``query_with_hyde`` (concurrent generation, one batched search)."""
+        if not self.hyde_engine:
+            logger.warning("HyDE not available, falling back to standard query")
+            return await self.aquery(query_text, top_k=top_k)
 
-            logger.info(f"HyDE query completed with {len(sources)} sources")
-            return result
+        try:
+            response = await self.hyde_engine.aquery(query_text, **kwargs)
+            return self._build_hyde_result(response, top_k)
 
         except Exception as e:
             logger.error(f"Error in HyDE query: {str(e)}")
-            return self.query(query_text, top_k=top_k)
+            return await self.aquery(query_text, top_k=top_k)
+
+    @staticmethod
+    def _build_hyde_result(response, top_k: int) -> dict[str, Any]:
+        """Format a HyDE query engine response."""
+        sources = []
+        if hasattr(response, "source_nodes"):
+            for node in response.source_nodes[:top_k]:
+                sources.append(
+                    {
+                        "content": node.node.text[:500],
+                        "metadata": node.node.metadata,
+                        "score": float(node.score) if node.score else 0.0,
+                    }
+                )
+
+        result = {
+            "answer": str(response),
+            "sources": sources,
+            "confidence": sum(s["score"] for s in sources) / len(sources) if sources else 0.0,
+            "method": "hyde",
+        }
+
+        logger.info(f"HyDE query completed with {len(sources)} sources")
+        return result
 
     def benchmark_hyde(self, test_queries: list[str]) -> dict[str, float]:
         """
@@ -1532,15 +2318,26 @@ class RAGEngine:
             return {"error": str(e)}
 
     def delete_documents(self, source_filter: str) -> bool:
-        """Delete documents by source filter."""
+        """Delete documents by source filter.
+
+        Args:
+            source_filter: Source name, or ``"*"`` to empty the whole collection
+
+        Returns:
+            True if the deletion succeeded
+        """
+        if source_filter and source_filter != "*":
+            return self.delete_document_by_source(source_filter)
+
         try:
-            # Delete the entire collection and recreate it
+            # Emptying everything: dropping the collection is cheaper than deleting every point
             logger.info(f"Deleting collection: {self.collection_name}")
 
             # Clear query cache when deleting documents
             if self.query_cache:
                 self.query_cache.clear()
                 logger.info("Query cache cleared after document deletion")
+            self._mark_collection_changed()
 
             # Delete the collection completely
             try:
@@ -1556,6 +2353,10 @@ class RAGEngine:
                 vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
             )
             logger.info(f"Created fresh collection: {self.collection_name}")
+            self._ensure_payload_indexes()
+
+            get_collection_stats_service().invalidate(self.collection_name)
+            self.document_catalog.clear()
 
             # Reinitialize the index
             self._initialize_index()
@@ -1566,21 +2367,157 @@ class RAGEngine:
             logger.error(f"Error deleting documents: {str(e)}")
             return False
 
-    def get_index_stats(self) -> dict[str, Any]:
-        """Get statistics about the indexed documents."""
+    @staticmethod
+    def _deletion_filter(
+        sources: Optional[list[str]] = None, document_ids: Optional[list[str]] = None
+    ) -> Optional[Filter]:
+        """Filter matching the chunks of any of the given sources or document ids."""
+        conditions = []
+        if sources:
+            conditions.append(FieldCondition(key="source", match=MatchAny(any=list(sources))))
+        if document_ids:
+            conditions.append(FieldCondition(key="document_id", match=MatchAny(any=list(document_ids))))
+        return Filter(should=conditions) if conditions else None
+
+    def delete_by_filter(
+        self,
+        sources: Optional[list[str]] = None,
+        document_ids: Optional[list[str]] = None,
+        wait: bool = False,
+    ) -> dict[str, Any]:
+        """Delete the chunks of many sources and/or documents with one filtered Qdrant delete.
+
+        Qdrant resolves the filter through the ``source``/``document_id`` payload indexes, so no
+        point ids are collected client-side. With ``wait=False`` the call returns once Qdrant has
+        acknowledged the operation; poll ``get_deletion_status`` for completion.
+
+        Args:
+            sources: Document sources to delete
+            document_ids: LlamaIndex document ids to delete
+            wait: Block until the points are removed
+
+        Returns:
+            Dictionary with operation_id, status and the number of matched chunks
+        """
+        deletion_filter = self._deletion_filter(sources, document_ids)
+        if deletion_filter is None:
+            return {"success": False, "status": "failed", "error": "No sources or document ids given"}
+
         try:
-            collection_info = self.client.get_collection(self.collection_name)
+            matched = self.client.count(
+                collection_name=self.collection_name, count_filter=deletion_filter, exact=True
+            ).count
+            if not matched:
+                logger.warning(f"No chunks found for sources={sources} document_ids={document_ids}")
+                self._record_catalog_delete(sources, document_ids)
+                return {"success": True, "operation_id": None, "status": "completed", "matched_chunks": 0}
+
+            update = self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=FilterSelector(filter=deletion_filter),
+                wait=wait,
+            )
+            status = "completed" if wait else "pending"
+            logger.info(
+                f"Deleting {matched} chunks ({len(sources or [])} sources, {len(document_ids or [])} documents) "
+                f"from {self.collection_name}: operation {update.operation_id} {update.status}"
+            )
+        except Exception as e:
+            logger.error(f"Error deleting documents by filter: {str(e)}")
+            return {"success": False, "status": "failed", "error": str(e)}
+
+        # Stale answers must not be served even while the delete is still being applied
+        stats_service = get_collection_stats_service()
+        if document_ids:
+            stats_service.invalidate(self.collection_name)
+        else:
+            for source in sources:
+                stats_service.record_delete(self.collection_name, source)
+        self._record_catalog_delete(sources, document_ids)
+        for source in sources or []:
+            if hasattr(self, "_last_document_texts"):
+                self._last_document_texts.pop(source, None)
+        if self.query_cache:
+            self.query_cache.clear()
+        self._mark_collection_changed()
+
+        if update.operation_id is not None:
+            # Tracked in the shared catalog: the status may be asked of another worker or a rebuilt engine
+            self.document_catalog.record_deletion(
+                update.operation_id,
+                deletion_filter.model_dump_json(exclude_none=True),
+                status,
+                matched,
+                datetime.now().isoformat(),
+                keep=self.MAX_TRACKED_DELETIONS,
+            )
 
-            return {
-                "total_vectors": collection_info.points_count,
-                "collection_name": self.collection_name,
-                "vector_dimension": collection_info.config.params.vectors.size,
-                "distance_metric": str(collection_info.config.params.vectors.distance),
-            }
+        return {"success": True, "operation_id": update.operation_id, "status": status, "matched_chunks": matched}
 
+    def _record_catalog_delete(self, sources: Optional[list[str]], document_ids: Optional[list[str]]) -> None:
+        """Remove deleted sources and documents from the document catalog."""
+        try:
+            if sources:
+                self.document_catalog.remove_sources(sources)
+            if document_ids:
+                self.document_catalog.remove_document_ids(document_ids)
         except Exception as e:
-            logger.error(f"Error getting index stats: {str(e)}")
-            return {"total_vectors": 0, "error": str(e)}
+            logger.error(f"Error updating document catalog: {str(e)}")
+
+    def delete_sources(self, source_names: list[str], wait: bool = False) -> dict[str, Any]:
+        """Bulk delete the chunks of many document sources with a single request.
+
+        Args:
+            source_names: Document sources to delete
+            wait: Block until the points are removed
+
+        Returns:
+            Dictionary with operation_id, status and the number of matched chunks
+        """
+        return self.delete_by_filter(sources=list(dict.fromkeys(source_names)), wait=wait)
+
+    def get_deletion_status(self, operation_id: int) -> dict[str, Any]:
+        """Report whether an asynchronous delete has been applied.
+
+        Qdrant has no per-operation status endpoint, so a pending operation is complete
+        once no point matches its filter any more (an indexed count, not a scan).
+
+        Args:
+            operation_id: Operation id returned by ``delete_by_filter``
+
+        Returns:
+            Dictionary with status (pending, completed or unknown) and remaining chunks
+        """
+        operation = self.document_catalog.get_deletion(operation_id)
+        if operation is None:
+            return {"operation_id": operation_id, "status": "unknown"}
+
+        remaining = 0
+        if operation["status"] != "completed":
+            try:
+                remaining = self.client.count(
+                    collection_name=self.collection_name,
+                    count_filter=Filter.model_validate_json(operation["filter"]),
+                    exact=True,
+                ).count
+            except Exception as e:
+                logger.warning(f"Could not check deletion {operation_id}: {e}")
+                remaining = None
+            if remaining == 0:
+                operation["status"] = "completed"
+                self.document_catalog.mark_deletion_completed(operation_id)
+
+        return {
+            "operation_id": operation_id,
+            "status": operation["status"],
+            "matched_chunks": operation["matched_chunks"],
+            "remaining_chunks": remaining,
+            "submitted_at": operation["submitted_at"],
+        }
+
+    def get_index_stats(self, include_sources: bool = False) -> dict[str, Any]:
+        """Get statistics about the indexed documents (served from the shared stats cache)."""
+        return get_collection_stats_service().get_stats(self.collection_name, include_sources=include_sources)
 
     def explore_database(
         self,
@@ -1663,18 +2600,14 @@ class RAGEngine:
                     }
                 raise
 
-            # Process points to extract document information
+            # Process points of the requested page
             documents = []
-            source_set = set()
-            file_types = {}
-            total_size = 0
 
             for point in points:
                 payload = point.payload if point.payload else {}
 
                 # Extract metadata
                 source = payload.get("source", "Unknown")
-                source_set.add(source)
 
                 doc_info = {
                     "id": str(point.id),
@@ -1693,13 +2626,9 @@ class RAGEngine:
 
                 documents.append(doc_info)
 
-                # Collect stats
-                file_type = doc_info["file_type"]
-                file_types[file_type] = file_types.get(file_type, 0) + 1
-                total_size += doc_info["document_size"]
-
-            # Get unique sources with more details
+            # Document list and totals come from the catalog, not from scrolling every chunk
             unique_sources = self._get_unique_sources_details()
+            catalog_stats = self.document_catalog.get_stats()
 
             return {
                 "documents": documents,
@@ -1710,9 +2639,9 @@ class RAGEngine:
                 "stats": {
                     "total_documents": len(unique_sources),
                     "total_chunks": total_points,
-                    "file_types": file_types,
-                    "total_size_bytes": total_size,
-                    "avg_chunk_size": total_size // total_points if total_points > 0 else 0,
+                    "file_types": catalog_stats["file_types"],
+                    "total_size_bytes": catalog_stats["total_size_bytes"],
+                    "avg_chunk_size": catalog_stats["avg_chunk_size"],
                 },
             }
 
@@ -1720,91 +2649,108 @@ class RAGEngine:
             logger.error(f"Error exploring database: {str(e)}")
             return {"documents": [], "total_count": 0, "unique_sources": [], "stats": {}, "error": str(e)}
 
-    def _get_unique_sources_details(self) -> list[dict[str, Any]]:
-        """Get detailed information about unique document sources with error recovery."""
-        try:
-            # Use scroll to get all points and extract unique sources
-            all_points = []
-            offset = None
-            max_iterations = 1000  # Safety limit to prevent infinite loops
-            iteration = 0
-
-            while iteration < max_iterations:
-                try:
-                    points, next_offset = self.client.scroll(
-                        collection_name=self.collection_name,
-                        limit=100,
-                        offset=offset,
-                        with_payload=True,
-                        with_vectors=False,
-                    )
-
-                    if not points:
-                        break
-
-                    all_points.extend(points)
-                    offset = next_offset
-
-                    if offset is None:
-                        break
-
-                    iteration += 1
-
-                except Exception as scroll_error:
-                    # Handle Qdrant internal errors gracefully
-                    error_msg = str(scroll_error)
-                    if "500" in error_msg or "Internal Server Error" in error_msg or "panic" in error_msg.lower():
-                        logger.warning(
-                            f"Qdrant internal error during scroll at iteration {iteration}. "
-                            f"Returning {len(all_points)} points collected so far. "
-                            f"Consider clearing the collection if this persists."
-                        )
-                        break
-                    else:
-                        # Re-raise unexpected errors
-                        raise
+    def _ensure_document_catalog(self) -> None:
+        """Build the document catalog from Qdrant once, for collections indexed before it existed."""
+        if self.document_catalog.synced:
+            return
+        self.rebuild_document_catalog()
 
-            # Group by source
-            sources_map = {}
-            for point in all_points:
-                payload = point.payload if point.payload else {}
-                source = payload.get("source", "Unknown")
+    def _ensure_document_vectors(self) -> None:
+        """Compute document vectors once if the catalog was built (or rebuilt) without them."""
+        self._ensure_document_catalog()
+        if self.document_catalog.vectors_synced:
+            return
+        self.rebuild_document_vectors()
 
-                if source not in sources_map:
-                    sources_map[source] = {
-                        "name": source,
-                        "file_type": payload.get("file_type", "Unknown"),
-                        "indexed_at": payload.get("indexed_at", "Unknown"),
-                        "chunk_count": 0,
-                        "total_size": 0,
-                        "pages": set(),
-                        "pdf_path": payload.get("pdf_path"),
-                        "has_analysis": False,
-                    }
+    def rebuild_document_catalog(self) -> int:
+        """Rebuild the document catalog with one payload-only scroll of the collection.
 
-                sources_map[source]["chunk_count"] += 1
-                sources_map[source]["total_size"] += payload.get("document_size", 0)
+        Document vectors are dropped; ``rebuild_document_vectors`` recomputes them when first needed.
 
-                if payload.get("page"):
-                    sources_map[source]["pages"].add(payload.get("page"))
+        Returns:
+            Number of cataloged documents
+        """
+        fields = [
+            "source",
+            "file_type",
+            "file_types",
+            "document_type",
+            "indexed_at",
+            "pdf_path",
+            "page",
+            "document_size",
+            "document_id",
+        ]
+
+        def payloads() -> Iterator[dict[str, Any]]:
+            offset = None
+            while True:
+                points, offset = self.client.scroll(
+                    collection_name=self.collection_name,
+                    limit=1000,
+                    offset=offset,
+                    with_payload=fields,
+                    with_vectors=False,
+                )
+                yield from (point.payload or {} for point in points)
+                if not points or offset is None:
+                    return
 
-            # Convert to list and process
-            unique_sources = []
-            for source_info in sources_map.values():
-                source_info["page_count"] = len(source_info["pages"]) if source_info["pages"] else None
-                source_info["pages"] = sorted(source_info["pages"]) if source_info["pages"] else []
+        # Aggregated per source while scrolling: only one page of payloads is held at a time
+        entries = entries_from_payloads(payloads())
+        self.document_catalog.rebuild(entries)
+        return len(entries)
 
-                # Check if we have cached analysis for this document
-                if hasattr(self, "_last_document_texts") and source_info["name"] in self._last_document_texts:
-                    source_info["has_analysis"] = True
+    def rebuild_document_vectors(self) -> int:
+        """Recompute the document vectors from the chunk vectors, one scroll page at a time.
 
-                unique_sources.append(source_info)
+        A first scroll accumulates a running sum per document (centroids), a second one keeps each
+        document's chunk closest to its centroid (medoid); chunk vectors are never held all at once.
 
-            # Sort by indexed date (most recent first)
-            unique_sources.sort(key=lambda x: x["indexed_at"], reverse=True)
+        Returns:
+            Number of documents with vectors
+        """
+        builder = DocumentVectorBuilder()
+        for chunks in self._scroll_chunk_vectors():
+            builder.add_chunks(chunks)
+        for chunks in self._scroll_chunk_vectors():
+            builder.add_medoid_candidates(chunks)
+        vectors = builder.build()
+        self.document_catalog.replace_vectors(vectors)
+        logger.info(f"Rebuilt {len(vectors)} document vectors for {self.collection_name}")
+        return len(vectors)
+
+    def _scroll_chunk_vectors(self, page_size: int = 256) -> Iterator[list[tuple[dict[str, Any], Any]]]:
+        """Yield (payload, vector) pairs of all chunks, one scroll page at a time."""
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                limit=page_size,
+                offset=offset,
+                with_payload=["source", "document_id"],
+                with_vectors=True,
+            )
+            if points:
+                yield [(point.payload or {}, point.vector) for point in points]
+            if not points or offset is None:
+                break
 
-            return unique_sources
+    def list_documents(self) -> list[dict[str, Any]]:
+        """list indexed documents from the document catalog, most recently indexed first."""
+        self._ensure_document_catalog()
+        analyzed = getattr(self, "_last_document_texts", {})
+        documents = []
+        for entry in self.document_catalog.list_documents():
+            details = entry.to_source_details()
+            details["has_analysis"] = entry.source in analyzed
+            documents.append(details)
+        return documents
 
+    def _get_unique_sources_details(self) -> list[dict[str, Any]]:
+        """Get detailed information about unique document sources."""
+        try:
+            return self.list_documents()
         except Exception as e:
             logger.error(f"Error getting unique sources: {str(e)}")
             return []
@@ -1862,88 +2808,84 @@ class RAGEngine:
 
     def delete_document_by_source(self, source_name: str) -> bool:
         """Delete all chunks for a specific document source."""
-        try:
-            from qdrant_client.models import FieldCondition, Filter, MatchValue
-
-            # Create filter for specific source
-            filter_condition = Filter(must=[FieldCondition(key="source", match=MatchValue(value=source_name))])
-
-            # Get all point IDs for this source
-            points_to_delete = []
-            offset = None
-
-            while True:
-                points, next_offset = self.client.scroll(
-                    collection_name=self.collection_name,
-                    scroll_filter=filter_condition,
-                    limit=100,
-                    offset=offset,
-                    with_payload=False,
-                    with_vectors=False,
-                )
-
-                if not points:
-                    break
-
-                points_to_delete.extend([point.id for point in points])
-
-                offset = next_offset
-                if offset is None:
-                    break
-
-            # Delete points
-            if points_to_delete:
-                self.client.delete(collection_name=self.collection_name, points_selector=points_to_delete)
-                logger.info(f"Deleted {len(points_to_delete)} chunks for document '{source_name}'")
-
-                # Clear from cache if present
-                if hasattr(self, "_last_document_texts") and source_name in self._last_document_texts:
-                    del self._last_document_texts[source_name]
-
-                # Clear query cache as document changed
-                if self.query_cache:
-                    self.query_cache.clear()
-                    logger.info("Query cache cleared after document deletion")
-
-                return True
-            else:
-                logger.warning(f"No chunks found for document '{source_name}'")
-                return False
-
-        except Exception as e:
-            logger.error(f"Error deleting document: {str(e)}")
-            return False
+        result = self.delete_sources([source_name], wait=True)
+        return bool(result["success"] and result["matched_chunks"])
 
     def search_in_database(self, search_query: str, limit: int = 20) -> list[dict[str, Any]]:
-        """Search for specific content in the database using semantic search."""
-        try:
-            # Use the existing query infrastructure for semantic search
-            query_engine = self.index.as_query_engine(
-                similarity_top_k=limit,
-                response_mode="no_text",  # Just get the nodes, no synthesis
-            )
+        """Search for specific content in the database using semantic search (no LLM synthesis)."""
+        return [hit.to_dict() for hit in self.search_chunks(search_query, limit=limit)]
 
-            response = query_engine.query(search_query)
+    def search_chunks(
+        self,
+        search_query: str,
+        limit: int = 20,
+        mode: str = "semantic",
+        filters: Optional[Union[Filter, dict[str, Any]]] = None,
+    ) -> list[ChunkHit]:
+        """Retrieval-only search returning ranked chunks with scores and highlighted snippets.
 
-            results = []
-            if hasattr(response, "source_nodes"):
-                for node in response.source_nodes:
-                    results.append(
-                        {
-                            "source": node.node.metadata.get("source", "Unknown"),
-                            "page": node.node.metadata.get("page"),
-                            "score": node.score,
-                            "text": node.node.text[:300] + "..." if len(node.node.text) > 300 else node.node.text,
-                            "metadata": node.node.metadata,
-                        }
-                    )
+        Args:
+            search_query: Text to search for
+            limit: Maximum number of chunks returned
+            mode: ``semantic`` (vector similarity) or ``keyword`` (Qdrant full-text index on the chunk text)
+            filters: Optional payload filter (Qdrant ``Filter`` or dict), e.g. RLS conditions
 
-            return results
+        Returns:
+            List of ``ChunkHit`` sorted by decreasing score
+        """
+        try:
+            if not self.index or not search_query.strip():
+                return []
+            qdrant_filter = self._to_qdrant_filter(filters)
+            terms = query_terms(search_query)
+            if mode == "keyword":
+                return self._keyword_search(search_query, terms, limit, qdrant_filter)
+            if mode != "semantic":
+                raise ValueError(f"Unknown search mode: {mode}")
+            nodes = self._create_retriever(limit, qdrant_filter).retrieve(search_query)
+            return [node_hit(node, terms) for node in nodes]
 
         except Exception as e:
             logger.error(f"Error searching in database: {str(e)}")
             return []
 
+    def _keyword_search(
+        self, search_query: str, terms: list[str], limit: int, qdrant_filter: Optional[Filter]
+    ) -> list[ChunkHit]:
+        """Match chunks containing every query word through the full-text payload index, then rank locally.
+
+        Qdrant returns filter matches unordered, so all of them are scored page by page (keeping only
+        the best ``limit``) before anything is cut; past ``keyword_search_max_scan`` matches the
+        ranking covers only the matches scanned so far.
+        """
+        if not terms:
+            return []
+        conditions = [FieldCondition(key=CHUNK_TEXT_FIELD, match=MatchText(text=" ".join(terms)))]
+        if qdrant_filter is not None:
+            conditions.append(qdrant_filter)
+        return rank_keyword_hits(
+            self._scroll_matches(Filter(must=conditions), settings.keyword_search_max_scan), terms, limit
+        )
+
+    def _scroll_matches(self, scroll_filter: Filter, max_points: int, page_size: int = 256) -> Iterator[Any]:
+        """Yield points matching a filter, one scroll page at a time, stopping after ``max_points``."""
+        offset = None
+        scanned = 0
+        while scanned < max_points:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=scroll_filter,
+                limit=min(page_size, max_points - scanned),
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            yield from points
+            scanned += len(points)
+            if not points or offset is None:
+                return
+        logger.info(f"Keyword search stopped after {scanned} matches (keyword_search_max_scan)")
+
     def generate_faq(self, num_questions: int = 10) -> dict[str, Any]:
         """Generate FAQ based on vector database content.
 
@@ -2632,7 +3574,7 @@ Genera SOLO le domande, una per riga, numerate da 1 a {num_questions}:
             }
 
     def calculate_document_similarity(self, doc1_name: str, doc2_name: str) -> float:
-        """Calculate cosine similarity between two documents using their embeddings.
+        """Calculate cosine similarity between two documents using their centroid embeddings.
 
         Args:
             doc1_name: Name of first document
@@ -2642,121 +3584,68 @@ Genera SOLO le domande, una per riga, numerate da 1 a {num_questions}:
             Cosine similarity score between 0 and 1
         """
         try:
-            # Get chunks for both documents
-            doc1_vectors = self._get_document_embeddings(doc1_name)
-            doc2_vectors = self._get_document_embeddings(doc2_name)
-
-            if doc1_vectors is None or doc2_vectors is None:
-                return 0.0
-
-            # Average the embeddings for each document
-            doc1_avg = np.mean(doc1_vectors, axis=0)
-            doc2_avg = np.mean(doc2_vectors, axis=0)
-
-            # Calculate cosine similarity
-            dot_product = np.dot(doc1_avg, doc2_avg)
-            norm1 = np.linalg.norm(doc1_avg)
-            norm2 = np.linalg.norm(doc2_avg)
-
-            if norm1 == 0 or norm2 == 0:
-                return 0.0
-
-            similarity = dot_product / (norm1 * norm2)
-            return float(similarity)
+            matrix, _ = self.get_document_similarity_matrix([doc1_name, doc2_name])
+            return float(matrix[0, 1]) if matrix.size else 0.0
 
         except Exception as e:
             logger.error(f"Error calculating document similarity: {str(e)}")
             return 0.0
 
-    def _get_document_embeddings(self, doc_name: str) -> Optional[np.ndarray]:
-        """Get all embeddings for a document.
-
-        Args:
-            doc_name: Document name
+    def _get_document_vectors(
+        self, doc_names: Optional[list[str]] = None, kind: str = "centroid"
+    ) -> tuple[list[str], np.ndarray]:
+        """L2-normalized document vectors from the catalog (backfilled once for older collections).
 
         Returns:
-            Numpy array of embeddings or None
+            tuple (document names with vectors, matrix with one unit row per document)
         """
-        try:
-            # Search for all points belonging to this document
-            result = self.client.scroll(
-                collection_name=self.collection_name,
-                scroll_filter=Filter(must=[FieldCondition(key="metadata.source", match={"value": doc_name})]),
-                limit=1000,
-                with_vectors=True,
-            )
-
-            if not result or not result[0]:
-                return None
-
-            points = result[0]
-            vectors = [point.vector for point in points if point.vector]
-
-            if not vectors:
-                return None
-
-            return np.array(vectors)
-
-        except Exception as e:
-            logger.error(f"Error getting document embeddings: {str(e)}")
-            return None
-
-    def find_similar_documents(self, source_name: str, top_k: int = 5) -> List[Tuple[str, float]]:
-        """Find documents most similar to the given document.
+        self._ensure_document_vectors()
+        names, vectors = self.document_catalog.get_document_vectors(doc_names, kind=kind)
+        if len(names):
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1.0, norms)
+        return names, vectors
+
+    def find_similar_documents(
+        self, source_name: str, top_k: int = 5, kind: str = "centroid"
+    ) -> list[tuple[str, float]]:
+        """Find documents most similar to the given document (nearest neighbors among document vectors).
 
         Args:
             source_name: Name of the source document
             top_k: Number of similar documents to return
+            kind: Document vector used, ``centroid`` or ``medoid``
 
         Returns:
             List of tuples (document_name, similarity_score)
         """
         try:
-            # Get embeddings for source document
-            source_vectors = self._get_document_embeddings(source_name)
-
-            if source_vectors is None:
+            names, vectors = self._get_document_vectors(kind=kind)
+            if source_name not in names or len(names) < 2:
                 return []
 
-            # Average the embeddings
-            avg_embedding = np.mean(source_vectors, axis=0)
+            source_index = names.index(source_name)
+            scores = vectors @ vectors[source_index]
+            scores[source_index] = -np.inf  # Exclude the source document itself
 
-            # Search for similar vectors
-            search_result = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=avg_embedding.tolist(),
-                limit=top_k * 10,  # Get more to filter out same document
-            )
-
-            # Group by document and calculate similarities
-            doc_scores = {}
-            for point in search_result:
-                if point.payload and "metadata" in point.payload:
-                    doc_name = point.payload["metadata"].get("source", "Unknown")
-                    if doc_name != source_name:  # Exclude the source document itself
-                        if doc_name not in doc_scores:
-                            doc_scores[doc_name] = []
-                        doc_scores[doc_name].append(point.score)
-
-            # Average scores per document
-            doc_avg_scores = [(doc, np.mean(scores)) for doc, scores in doc_scores.items()]
-
-            # Sort by score and return top_k
-            doc_avg_scores.sort(key=lambda x: x[1], reverse=True)
-            return doc_avg_scores[:top_k]
+            k = min(top_k, len(names) - 1)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(names[i], float(scores[i])) for i in top]
 
         except Exception as e:
             logger.error(f"Error finding similar documents: {str(e)}")
             return []
 
     def get_document_similarity_matrix(
-        self, doc_names: Optional[List[str]] = None, max_docs: int = 10
+        self, doc_names: Optional[list[str]] = None, max_docs: int = 10, kind: str = "centroid"
     ) -> Tuple[np.ndarray, List[str]]:
-        """Calculate similarity matrix between documents.
+        """Calculate similarity matrix between documents as one product of normalized document vectors.
 
         Args:
             doc_names: List of document names (if None, use first max_docs)
             max_docs: Maximum number of documents to compare
+            kind: Document vector used, ``centroid`` or ``medoid``
 
         Returns:
             Tuple of (similarity_matrix, document_names)
@@ -2764,23 +3653,22 @@ Genera SOLO le domande, una per riga, numerate da 1 a {num_questions}:
         try:
             # Get document list if not provided
             if doc_names is None:
-                exploration = self.explore_database(limit=max_docs)
-                if not exploration.get("unique_sources"):
+                sources = self._get_unique_sources_details()
+                if not sources:
                     return np.array([]), []
-                doc_names = [doc["name"] for doc in exploration["unique_sources"][:max_docs]]
+                doc_names = [doc["name"] for doc in sources[:max_docs]]
+
+            names, vectors = self._get_document_vectors(doc_names, kind=kind)
+            rows = {name: i for i, name in enumerate(names)}
 
+            # Documents without vectors keep zero similarity to the others, as before
             n = len(doc_names)
             similarity_matrix = np.zeros((n, n))
-
-            # Calculate pairwise similarities
-            for i in range(n):
-                for j in range(i, n):
-                    if i == j:
-                        similarity_matrix[i, j] = 1.0
-                    else:
-                        sim = self.calculate_document_similarity(doc_names[i], doc_names[j])
-                        similarity_matrix[i, j] = sim
-                        similarity_matrix[j, i] = sim  # Matrix is symmetric
+            present = [i for i, name in enumerate(doc_names) if name in rows]
+            if present:
+                block = vectors[[rows[doc_names[i]] for i in present]]
+                similarity_matrix[np.ix_(present, present)] = block @ block.T
+            np.fill_diagonal(similarity_matrix, 1.0)
 
             return similarity_matrix, doc_names
 
@@ -2879,6 +3767,14 @@ Genera SOLO le domande, una per riga, numerate da 1 a {num_questions}:
                         errors.append(f"Failed to delete {doc_id}:{e}")
                 else:
                     errors.append(f"No doc_id found in document:{doc}")
+            if deleted:
+                self._mark_collection_changed()
+                get_collection_stats_service().invalidate(self.collection_name)
+                # Rescan only if some chunks survived
+                if errors:
+                    self.rebuild_document_catalog()
+                else:
+                    self.document_catalog.clear()
             logger.info("Vector index cleared successfully")
             return {
                 "success": True,
@@ -10,8 +10,11 @@ Advanced Reranking Service per migliorare la qualità delle risposte RAG.
 Utilizza Cross-Encoder models per riordinare i risultati di ricerca.
 """
 
+from collections import OrderedDict
+import hashlib
 import logging
-from typing import Dict, List, Optional, Tuple
+import threading
+from typing import Dict, List, Optional
 import time
 
 try:
@@ -22,9 +25,79 @@ except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
     CrossEncoder = None
 
+from config.settings import settings
+from src.infrastructure.performance.shared_resources import get_cross_encoder
+
 logger = logging.getLogger(__name__)
 
 
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class RerankScoreCache:
+    """Thread-safe LRU cache of cross-encoder scores keyed by (model, query hash, chunk hash)."""
+
+    def __init__(self, max_entries: int = 50_000):
+        """Initialize cache.
+
+        Args:
+            max_entries: Maximum number of cached pair scores
+        """
+        self.max_entries = max_entries
+        self._scores: OrderedDict[tuple[str, str, str], float] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def query_hash(query: str) -> str:
+        """Hash of the query with whitespace collapsed (case is kept: the CrossEncoder is case sensitive)."""
+        return _text_hash(" ".join(query.split()))
+
+    def get_many(self, model_key: str, query_hash: str, chunk_hashes: list[str]) -> list[Optional[float]]:
+        """Look up the scores of many chunks for one query."""
+        results = []
+        with self._lock:
+            for chunk_hash in chunk_hashes:
+                key = (model_key, query_hash, chunk_hash)
+                score = self._scores.get(key)
+                if score is None:
+                    self.misses += 1
+                else:
+                    self._scores.move_to_end(key)
+                    self.hits += 1
+                results.append(score)
+        return results
+
+    def set_many(self, model_key: str, query_hash: str, chunk_hashes: list[str], scores: list[float]) -> None:
+        """Store the scores of many chunks for one query, evicting least recently used pairs."""
+        with self._lock:
+            for chunk_hash, score in zip(chunk_hashes, scores):
+                key = (model_key, query_hash, chunk_hash)
+                self._scores[key] = score
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.max_entries:
+                self._scores.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached scores."""
+        with self._lock:
+            self._scores.clear()
+
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._scores),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": f"{(self.hits / total * 100) if total else 0:.1f}%",
+            }
+
+
 class RerankingService:
     """Servizio di reranking che utilizza Cross-Encoder per migliorare la rilevanza dei risultati."""
 
@@ -36,19 +109,46 @@ class RerankingService:
         "multilingual": "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1",
     }
 
-    def __init__(self, model_name: str = "default", confidence_threshold: float = 0.5, lazy_load: bool = True):
+    # Backend di inferenza: nome -> (backend sentence-transformers, usa file ONNX quantizzato)
+    BACKENDS = {
+        "torch": ("torch", False),
+        "onnx": ("onnx", False),
+        "onnx-int8": ("onnx", True),
+    }
+
+    def __init__(
+        self,
+        model_name: str = "default",
+        confidence_threshold: float = 0.5,
+        lazy_load: bool = True,
+        backend: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_batch_chars: Optional[int] = None,
+        score_cache: Optional[RerankScoreCache] = None,
+    ):
         """Initialize reranking service.
 
         Args:
             model_name: Nome del modello da utilizzare (default, fast, accurate, multilingual)
             confidence_threshold: Soglia di confidence per filtrare risultati di bassa qualità
             lazy_load: Se True, carica il modello solo quando necessario
+            backend: Backend di inferenza (torch, onnx, onnx-int8); default da settings
+            batch_size: Numero massimo di coppie per forward pass
+            max_batch_chars: Budget di padding per batch (coppia più lunga x dimensione batch)
+            score_cache: Cache LRU dei punteggi; default una nuova cache dimensionata da settings
         """
         self.model_name = model_name
         self.confidence_threshold = confidence_threshold
         self.model = None
         self.model_loaded = False
         self.lazy_load = lazy_load
+        self.backend = backend or settings.reranker_backend
+        if self.backend not in self.BACKENDS:
+            logger.warning(f"Unknown reranker backend '{self.backend}', using torch")
+            self.backend = "torch"
+        self.batch_size = max(1, batch_size or settings.reranker_batch_size)
+        self.max_batch_chars = max(1, max_batch_chars or settings.reranker_max_batch_chars)
+        self.score_cache = score_cache or RerankScoreCache(settings.reranker_score_cache_entries)
 
         if not SENTENCE_TRANSFORMERS_AVAILABLE:
             logger.warning("sentence-transformers not available. Reranking will be disabled.")
@@ -64,10 +164,17 @@ class RerankingService:
 
         try:
             model_path = self.MODELS.get(self.model_name, self.MODELS["default"])
-            logger.info(f"Loading reranking model: {model_path}")
+            logger.info(f"Loading reranking model: {model_path} (backend: {self.backend})")
 
             start_time = time.time()
-            self.model = CrossEncoder(model_path)
+            try:
+                self.model = self._load_backend(model_path, self.backend)
+            except Exception as e:
+                if self.backend == "torch":
+                    raise
+                logger.warning(f"Reranker backend '{self.backend}' unavailable ({e}), falling back to torch")
+                self.backend = "torch"
+                self.model = self._load_backend(model_path, "torch")
             load_time = time.time() - start_time
 
             logger.info(f"Reranking model loaded in {load_time:.2f}s")
@@ -78,6 +185,76 @@ class RerankingService:
             self.model = None
             self.model_loaded = False
 
+    def _load_backend(self, model_path: str, backend: str):
+        """Load (or reuse) the shared CrossEncoder for a backend."""
+        st_backend, quantized = self.BACKENDS[backend]
+        onnx_file_name = settings.reranker_onnx_int8_file if quantized else None
+        return get_cross_encoder(model_path, backend=st_backend, onnx_file_name=onnx_file_name)
+
+    @property
+    def _model_key(self) -> str:
+        """Identify model and backend in score cache keys (quantized scores differ slightly)."""
+        return f"{self.MODELS.get(self.model_name, self.model_name)}:{self.backend}"
+
+    def _length_batches(self, contents: list[str]) -> list[list[int]]:
+        """Group pair indices into batches of similar length.
+
+        Pairs are sorted by length so each batch pads to a similar size, and a
+        batch is closed when it reaches ``batch_size`` pairs or its padded size
+        (longest pair x pairs) would exceed ``max_batch_chars``.
+        """
+        order = sorted(range(len(contents)), key=lambda i: len(contents[i]), reverse=True)
+        batches: list[list[int]] = []
+        batch: list[int] = []
+        batch_max = 0
+        for i in order:
+            length = len(contents[i])
+            longest = max(batch_max, length)
+            if batch and (len(batch) >= self.batch_size or longest * (len(batch) + 1) > self.max_batch_chars):
+                batches.append(batch)
+                batch, longest = [], length
+            batch.append(i)
+            batch_max = longest
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _predict(self, model, query: str, contents: list[str]) -> list[float]:
+        """Score pairs with length-bucketed batches, returning scores in input order."""
+        scores: list[float] = [0.0] * len(contents)
+        for batch in self._length_batches(contents):
+            batch_scores = model.predict([[query, contents[i]] for i in batch], batch_size=len(batch))
+            for i, score in zip(batch, batch_scores):
+                # Convert numpy float to Python float for JSON serialization
+                scores[i] = float(score)
+        return scores
+
+    def score_pairs(self, query: str, contents: list[str], use_cache: bool = True) -> list[float]:
+        """Score (query, content) pairs, reusing cached scores of already seen pairs.
+
+        Args:
+            query: User query
+            contents: Chunk texts to score against the query
+            use_cache: Whether to read and update the score cache
+
+        Returns:
+            Relevance scores in the order of ``contents``
+        """
+        if not use_cache:
+            return self._predict(self.model, query, contents)
+
+        query_hash = self.score_cache.query_hash(query)
+        chunk_hashes = [_text_hash(content) for content in contents]
+        scores = self.score_cache.get_many(self._model_key, query_hash, chunk_hashes)
+
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            computed = self._predict(self.model, query, [contents[i] for i in missing])
+            for i, score in zip(missing, computed):
+                scores[i] = score
+            self.score_cache.set_many(self._model_key, query_hash, [chunk_hashes[i] for i in missing], computed)
+        return scores
+
     def is_available(self) -> bool:
         """Check if reranking service is available.
 
@@ -125,15 +302,12 @@ class RerankingService:
                 logger.warning("No valid documents for reranking")
                 return []
 
-            # Get relevance scores
-            scores = self.model.predict(pairs)
+            # Get relevance scores (cached pairs are not rescored)
+            scores = self.score_pairs(query, [content for _, content in pairs])
 
             # Add scores to documents and filter by threshold
             scored_docs = []
-            for doc, score in zip(valid_docs, scores):
-                # Convert numpy float to Python float for JSON serialization
-                rerank_score = float(score)
-
+            for doc, rerank_score in zip(valid_docs, scores):
                 # Only include documents above confidence threshold
                 if rerank_score >= self.confidence_threshold:
                     doc_copy = doc.copy()
@@ -204,6 +378,9 @@ class RerankingService:
             "model_path": self.MODELS.get(self.model_name, "unknown"),
             "confidence_threshold": self.confidence_threshold,
             "sentence_transformers_available": SENTENCE_TRANSFORMERS_AVAILABLE,
+            "backend": self.backend,
+            "batch_size": self.batch_size,
+            "score_cache": self.score_cache.get_stats(),
         }
 
     def set_confidence_threshold(self, threshold: float):
@@ -218,44 +395,62 @@ class RerankingService:
         else:
             logger.warning(f"Invalid confidence threshold: {threshold}. Must be between 0.0 and 1.0")
 
-    def benchmark_model(self, test_queries: List[str], test_documents: List[str]) -> Dict:
+    def benchmark_model(
+        self, test_queries: list[str], test_documents: list[str], backends: Optional[list[str]] = None
+    ) -> dict:
         """Benchmark reranking performance.
 
+        The score cache is bypassed so every pair reaches the model.
+
         Args:
             test_queries: List of test queries
             test_documents: List of test documents
+            backends: Backends to compare (e.g. ["torch", "onnx-int8"]); default the configured one
 
         Returns:
-            Performance metrics
+            Performance metrics, with latency per pair for each backend
         """
         if not self.is_available():
             return {"error": "Reranking not available"}
+        if not test_queries or not test_documents:
+            return {"error": "No test queries or documents"}
+
+        model_path = self.MODELS.get(self.model_name, self.MODELS["default"])
+        backend_results = {}
+        for backend in backends or [self.backend]:
+            try:
+                model = self.model if backend == self.backend else self._load_backend(model_path, backend)
+                # Warm-up, so model loading and first-call overhead are not measured
+                self._predict(model, test_queries[0], test_documents[:1])
+
+                start_time = time.perf_counter()
+                for query in test_queries:
+                    self._predict(model, query, test_documents)
+                total_time = time.perf_counter() - start_time
+
+                total_pairs = len(test_queries) * len(test_documents)
+                backend_results[backend] = {
+                    "total_pairs_processed": total_pairs,
+                    "total_time_seconds": total_time,
+                    "latency_per_pair_ms": total_time / total_pairs * 1000,
+                    "avg_time_per_query": total_time / len(test_queries),
+                    "pairs_per_second": total_pairs / total_time if total_time > 0 else 0.0,
+                }
+            except Exception as e:
+                logger.error(f"Benchmark of backend '{backend}' failed: {e}")
+                backend_results[backend] = {"error": str(e)}
+
+        current = backend_results.get(self.backend) or next(iter(backend_results.values()))
+        if "error" in current:
+            return {"error": current["error"], "backends": backend_results}
 
-        try:
-            start_time = time.time()
-
-            # Test with all query-document combinations
-            total_pairs = 0
-            for query in test_queries:
-                docs = [{"content": doc} for doc in test_documents]
-                self.rerank_documents(query, docs)
-                total_pairs += len(docs)
-
-            total_time = time.time() - start_time
-
-            return {
-                "total_queries": len(test_queries),
-                "total_documents": len(test_documents),
-                "total_pairs_processed": total_pairs,
-                "total_time_seconds": total_time,
-                "avg_time_per_query": total_time / len(test_queries),
-                "pairs_per_second": total_pairs / total_time,
-                "model_info": self.get_model_info(),
-            }
-
-        except Exception as e:
-            logger.error(f"Benchmark failed: {e}")
-            return {"error": str(e)}
+        return {
+            "total_queries": len(test_queries),
+            "total_documents": len(test_documents),
+            **current,
+            "backends": backend_results,
+            "model_info": self.get_model_info(),
+        }
 
 
 # Global reranking service instance
@@ -12,6 +12,7 @@ from src.core.security import (
     UserContext,
 )
 from src.core.security.multi_tenant_manager import MultiTenantManager
+from src.core.security.vector_rls import compile_rls_filter
 from src.domain.entities.tenant_context import TenantContext
 from src.infrastructure.repositories.secure_fact_table import SecureFactTableRepository
 
@@ -126,10 +127,17 @@ class SecureRAGEngine:
             if not self.access_control.validate_access_attempt(self.user_context, "query", operation="read"):
                 raise SecurityViolationError("Insufficient permissions for query")
 
-            # Execute base RAG query
-            base_response = self.rag_engine.query(query_text=query_text, top_k=top_k, analysis_type=analysis_type)
+            # RLS constraints are applied by Qdrant during retrieval, so the LLM only
+            # sees permitted chunks and top_k of them are returned in one pass
+            rls_filter = self.access_control.generate_rls_filter(self.user_context, target_table="documents")
+            base_response = self.rag_engine.query(
+                query_text=query_text,
+                top_k=top_k,
+                filters=compile_rls_filter(rls_filter),
+                analysis_type=analysis_type,
+            )
 
-            # Apply RLS filtering to sources/documents
+            # Post-retrieval check (defence in depth) and sanitization of sources
             if "sources" in base_response:
                 filtered_sources = self._apply_rls_to_sources(base_response["sources"])
                 base_response["sources"] = filtered_sources
@@ -184,19 +192,22 @@ class SecureRAGEngine:
 
         for source in sources:
             try:
+                # Security attributes are stored in the chunk metadata (same fields as the Qdrant RLS filter)
+                attributes = {**source, **(source.get("metadata") or {})}
+
                 # Check entity access
-                entity = source.get("entity", source.get("source", ""))
+                entity = attributes.get("entity", "")
                 if entity and not self.user_context.can_access_entity(entity):
                     continue
 
                 # Check classification
-                classification_level = source.get("classification_level", 2)
+                classification_level = attributes.get("classification_level", 2)
                 classification = DataClassification(classification_level)
                 if not self.user_context.can_access_classification(classification):
                     continue
 
                 # Check period
-                period = source.get("period", "")
+                period = attributes.get("period", "")
                 if period and not self.user_context.can_access_period(period):
                     continue
 
@@ -235,7 +246,7 @@ class SecureRAGEngine:
                 "indexed_by": self.user_context.user_id,
                 "tenant_id": self.user_context.tenant_id,
                 "indexed_at": datetime.utcnow().isoformat(),
-                "classification_level": metadata_overrides.get(
+                "classification_level": (metadata_overrides or {}).get(
                     "classification_level", DataClassification.INTERNAL.value
                 ),
             }
@@ -246,7 +257,8 @@ class SecureRAGEngine:
                 metadata_overrides = security_metadata
 
             # Index documents
-            result = self.rag_engine.parse_insert_docs(file_paths, metadata_overrides=metadata_overrides)
+            # Security metadata lands in each chunk payload, where the RLS filter reads it
+            result = self.rag_engine.parse_insert_docs(file_paths, metadata=metadata_overrides)
 
             # Audit successful indexing
             self.access_control.audit_access_attempt(
@@ -326,8 +338,16 @@ class SecureRAGEngine:
             self.logger.error(f"Error getting user stats: {e}")
             return {"error": str(e)}
 
-    def delete_documents(self, source_names: List[str]) -> Dict[str, Any]:
-        """Delete documents with security validation."""
+    def delete_documents(self, source_names: List[str], wait: bool = False) -> Dict[str, Any]:
+        """Delete documents with security validation.
+
+        Args:
+            source_names: Document sources to delete
+            wait: Block until the chunks are removed instead of returning a pending operation
+
+        Returns:
+            Dictionary with operation_id, status and the number of deleted chunks
+        """
         if not self.user_context:
             raise SecurityViolationError("Authentication required")
 
@@ -343,23 +363,25 @@ class SecureRAGEngine:
                 if not self.user_context.can_access_entity(potential_entity):
                     raise SecurityViolationError(f"No access to delete document from entity: {potential_entity}")
 
-            # Delete documents
-            results = {}
-            for source_name in source_names:
-                success = self.rag_engine.delete_document_by_source(source_name)
-                results[source_name] = success
+            # Delete all documents with one filtered request (completes asynchronously)
+            deletion = self.rag_engine.delete_sources(source_names, wait=wait)
 
             # Audit deletion
             self.access_control.audit_access_attempt(
                 self.user_context,
                 "documents",
                 "delete",
-                True,
+                deletion["success"],
                 None,
-                {"source_names": source_names, "deletion_results": results},
+                {"source_names": source_names, "deletion_results": deletion},
             )
 
-            return {"success": True, "results": results, "deleted_count": sum(1 for v in results.values() if v)}
+            return {
+                "success": deletion["success"],
+                "operation_id": deletion.get("operation_id"),
+                "status": deletion["status"],
+                "deleted_chunks": deletion.get("matched_chunks", 0),
+            }
 
         except SecurityViolationError:
             self.access_control.audit_access_attempt(
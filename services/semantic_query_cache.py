@@ -0,0 +1,245 @@
+"""Semantic second-level cache reusing answers for near-duplicate questions."""
+
+from dataclasses import dataclass, field
+import logging
+import re
+import threading
+import time
+from typing import Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Numbers (years, amounts, percentages) and words; names are capitalized words not opening a sentence
+NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*%?")
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+SENTENCE_START = re.compile(r"(?:^|[.!?:]\s+)([^\W\d_]+)")
+
+
+@dataclass(frozen=True)
+class QueryAnchors:
+    """Parts of a question two paraphrases must share for one answer to serve both.
+
+    Embeddings of "EBITDA 2023" and "EBITDA 2022" are nearly identical, so similarity alone
+    would return the answer for the wrong year (or company).
+    """
+
+    numbers: frozenset[str]
+    entities: frozenset[str]  # Acronyms and capitalized names, lowercased
+    words: frozenset[str]  # All words, lowercased
+
+    @classmethod
+    def from_query(cls, query: str) -> "QueryAnchors":
+        sentence_starts = {match.start(1) for match in SENTENCE_START.finditer(query)}
+        entities = {
+            match.group().lower()
+            for match in WORD_PATTERN.finditer(query)
+            if match.group()[0].isupper() and (match.start() not in sentence_starts or match.group().isupper())
+        }
+        return cls(
+            numbers=frozenset(NUMBER_PATTERN.findall(query)),
+            entities=frozenset(entities),
+            words=frozenset(word.lower() for word in WORD_PATTERN.findall(query)),
+        )
+
+    def matches(self, other: "QueryAnchors") -> bool:
+        """Same numbers, and every name of each question appears (in any case) in the other."""
+        return self.numbers == other.numbers and self.entities <= other.words and other.entities <= self.words
+
+
+@dataclass
+class _SemanticEntry:
+    """Cached answer with the parameters and collection generation it was computed for."""
+
+    query: str
+    params_key: str
+    result: dict[str, Any]
+    collection_version: int
+    created_at: float
+    anchors: QueryAnchors
+
+
+@dataclass
+class _NamespaceIndex:
+    """In-process vector index of the query embeddings of one namespace (growable ring buffer)."""
+
+    capacity: int
+    vectors: Optional[np.ndarray] = None
+    entries: list[Optional[_SemanticEntry]] = field(default_factory=list)
+    next_slot: int = 0
+    collection_version: int = 0
+
+
+class SemanticQueryCache:
+    """Return a cached answer when a new query is a close paraphrase of a previous one.
+
+    Query embeddings are L2-normalized and stored per namespace in a bounded
+    matrix, so a lookup is a single matrix-vector product. An entry only matches
+    if it was computed with the same query parameters and the same collection
+    generation (``DocumentCatalog.content_version``, shared by all worker processes),
+    and, when the new query text is given, only if both questions name the same numbers
+    and entities (see ``QueryAnchors``).
+    """
+
+    def __init__(self, similarity_threshold: float = 0.92, max_entries: int = 1000, ttl_seconds: int = 3600):
+        """Initialize semantic cache.
+
+        Args:
+            similarity_threshold: Minimum cosine similarity to reuse a cached answer
+            max_entries: Maximum entries per namespace; the oldest are overwritten first
+            ttl_seconds: Time-to-live of cached answers
+        """
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._indexes: dict[str, _NamespaceIndex] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'invalidations': 0}
+
+    @staticmethod
+    def _normalize(embedding) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def _get_index(self, namespace: str, collection_version: int) -> _NamespaceIndex:
+        """Get the namespace index, resetting it if the collection changed (caller holds the lock)."""
+        index = self._indexes.get(namespace)
+        if index is None or index.collection_version != collection_version:
+            if index is not None:
+                self.stats['invalidations'] += 1
+                logger.debug(f"Semantic cache for '{namespace}' invalidated by collection change")
+            index = _NamespaceIndex(capacity=self.max_entries, collection_version=collection_version)
+            self._indexes[namespace] = index
+        return index
+
+    def lookup(
+        self, namespace: str, query_embedding, params_key: str, collection_version: int, query: Optional[str] = None
+    ) -> Optional[tuple[dict[str, Any], float]]:
+        """Find a cached answer for a semantically equivalent query.
+
+        Args:
+            query: Text of the new query; when given, cached queries must share its numbers and entities
+
+        Returns:
+            Tuple (cached result, cosine similarity) or None
+        """
+        query_vector = self._normalize(query_embedding)
+        if query_vector is None:
+            return None
+        anchors = QueryAnchors.from_query(query) if query is not None else None
+
+        with self._lock:
+            index = self._get_index(namespace, collection_version)
+            if index.vectors is None or not index.entries:
+                self.stats['misses'] += 1
+                return None
+
+            similarities = index.vectors[: len(index.entries)] @ query_vector
+            now = time.time()
+            # Visit candidates from most to least similar, stopping below the threshold
+            for slot in np.argsort(similarities)[::-1]:
+                similarity = float(similarities[slot])
+                if similarity < self.similarity_threshold:
+                    break
+                entry = index.entries[slot]
+                if entry is None or entry.params_key != params_key:
+                    continue
+                if now - entry.created_at >= self.ttl_seconds:
+                    index.entries[slot] = None
+                    continue
+                if anchors is not None and not anchors.matches(entry.anchors):
+                    continue
+                self.stats['hits'] += 1
+                logger.info(f"Semantic cache hit ({similarity:.3f}) for cached query: {entry.query[:50]}...")
+                return entry.result, similarity
+
+            self.stats['misses'] += 1
+            return None
+
+    def store(
+        self,
+        namespace: str,
+        query: str,
+        query_embedding,
+        params_key: str,
+        result: dict[str, Any],
+        collection_version: int,
+    ) -> None:
+        """Store an answer together with the embedding of its query."""
+        query_vector = self._normalize(query_embedding)
+        if query_vector is None:
+            return
+
+        with self._lock:
+            index = self._get_index(namespace, collection_version)
+            if index.vectors is not None and index.vectors.shape[1] != query_vector.shape[0]:
+                logger.warning("Semantic cache embedding dimension changed, resetting namespace")
+                index = _NamespaceIndex(capacity=self.max_entries, collection_version=collection_version)
+                self._indexes[namespace] = index
+
+            slot = index.next_slot
+            if index.vectors is None:
+                index.vectors = np.zeros((min(16, index.capacity), query_vector.shape[0]), dtype=np.float32)
+            elif slot >= index.vectors.shape[0]:
+                # Grow geometrically up to capacity so idle tenants stay small
+                grown = np.zeros((min(index.capacity, index.vectors.shape[0] * 2), index.vectors.shape[1]), np.float32)
+                grown[: index.vectors.shape[0]] = index.vectors
+                index.vectors = grown
+            index.vectors[slot] = query_vector
+            entry = _SemanticEntry(
+                query=query,
+                params_key=params_key,
+                result=result,
+                collection_version=collection_version,
+                created_at=time.time(),
+                anchors=QueryAnchors.from_query(query),
+            )
+            if slot < len(index.entries):
+                index.entries[slot] = entry
+            else:
+                index.entries.append(entry)
+            index.next_slot = (slot + 1) % index.capacity
+            self.stats['stores'] += 1
+
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        """Drop cached answers of one namespace, or of all namespaces."""
+        with self._lock:
+            if namespace is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(namespace, None)
+            self.stats['invalidations'] += 1
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            total = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': f"{(self.stats['hits'] / total * 100) if total else 0:.1f}%",
+                'similarity_threshold': self.similarity_threshold,
+                'namespaces': {
+                    namespace: sum(1 for entry in index.entries if entry is not None)
+                    for namespace, index in self._indexes.items()
+                },
+            }
+
+
+# Global semantic cache instance
+_semantic_query_cache = None
+_semantic_query_cache_lock = threading.Lock()
+
+
+def get_semantic_query_cache(
+    similarity_threshold: float = 0.92, max_entries: int = 1000, ttl_seconds: int = 3600
+) -> SemanticQueryCache:
+    """Get or create global semantic query cache instance."""
+    global _semantic_query_cache
+    with _semantic_query_cache_lock:
+        if _semantic_query_cache is None:
+            _semantic_query_cache = SemanticQueryCache(
+                similarity_threshold=similarity_threshold, max_entries=max_entries, ttl_seconds=ttl_seconds
+            )
+        return _semantic_query_cache
@@ -4,10 +4,13 @@ import logging
 import re
 from typing import Any, Optional
 
+import fitz  # PyMuPDF
 import pandas as pd
 import pdfplumber
 import tabula
 
+from src.application.services.table_detector import TableDetector, page_table_signals
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,6 +40,12 @@ class PDFTableExtractor:
         tables = []
 
         if method == 'auto':
+            # Only pages that look like tables are worth a JVM round trip
+            pages = self._candidate_pages(pdf_path, pages)
+            if not pages:
+                logger.info("No table candidates found")
+                return []
+
             # Try Tabula first (better for bordered tables)
             tables = self._extract_with_tabula(pdf_path, pages)
 
@@ -60,6 +69,26 @@ class PDFTableExtractor:
 
         return tables
 
+    def _candidate_pages(self, pdf_path: str, pages) -> list[int]:
+        """1-based pages among ``pages`` that the table detector flags as candidates."""
+        detector = TableDetector()
+        with fitz.open(pdf_path) as doc:
+            if pages == 'all':
+                page_nums = range(1, len(doc) + 1)
+            elif isinstance(pages, str):
+                if '-' in pages:
+                    start, end = pages.split('-')
+                    page_nums = range(int(start), int(end) + 1)
+                else:
+                    page_nums = [int(pages)]
+            else:
+                page_nums = pages
+
+            return [
+                number for number in page_nums
+                if 0 < number <= len(doc) and detector.is_candidate(page_table_signals(doc[number - 1], number))
+            ]
+
     def _extract_with_tabula(self, pdf_path: str, pages: str) -> list[dict[str, Any]]:
         """Extract tables using Tabula-py."""
         tables = []
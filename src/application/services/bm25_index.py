@@ -0,0 +1,278 @@
+"""Incrementally maintained BM25 inverted index with sparse, vectorized scoring."""
+
+import logging
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores in descending order, via partial selection.
+
+    ``argpartition`` is O(n); only the k selected entries are sorted.
+    """
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(scores, n - k)[n - k:] if k < n else np.arange(n)
+    return candidates[np.argsort(scores[candidates])[::-1]]
+
+
+class InvertedBM25Index:
+    """BM25 (Okapi) over an inverted index updated per document add/remove.
+
+    Documents live in dense slots ``0..n-1`` so scores line up with the caller's
+    document list. Removal moves the last document into the freed slot. Scores
+    are identical to ``rank_bm25.BM25Okapi`` on the same corpus.
+
+    Postings are kept as a term-major CSR matrix (term -> document slots and
+    term frequencies) plus a small COO delta holding documents added since the
+    last compaction, so ingestion does not rebuild the matrix on every add and a
+    query only touches the postings of its own terms.
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+        max_delta_ratio: float = 0.1,
+        min_delta_docs: int = 256,
+    ):
+        """Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+            epsilon: Floor for negative IDF values, as a fraction of the average IDF
+            max_delta_ratio: Fraction of documents that may wait in the delta before compaction
+            min_delta_docs: Documents that may always wait in the delta, regardless of the ratio
+        """
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.max_delta_ratio = max_delta_ratio
+        self.min_delta_docs = min_delta_docs
+
+        self._term_ids: dict[str, int] = {}
+        self._df = np.zeros(1024, dtype=np.int64)
+        self._doc_postings: list[tuple[np.ndarray, np.ndarray]] = []  # slot -> (term ids, term frequencies)
+        self._doc_lengths = np.zeros(16, dtype=np.float64)
+        self._total_length = 0
+        self._average_idf: Optional[float] = None
+
+        # CSR over documents [0, _csr_docs); documents after that are in the delta
+        self._csr_indptr = np.zeros(1, dtype=np.int64)
+        self._csr_docs = np.empty(0, dtype=np.int64)
+        self._csr_tfs = np.empty(0, dtype=np.float64)
+        self._csr_doc_count = 0
+        self._csr_stale = False
+        self._delta: Optional[tuple[np.ndarray, np.ndarray, np.ndarray]] = None  # (terms, docs, tfs)
+
+    def __len__(self) -> int:
+        return len(self._doc_postings)
+
+    @property
+    def vocabulary_size(self) -> int:
+        return int(np.count_nonzero(self._df[: len(self._term_ids)]))
+
+    @property
+    def average_length(self) -> float:
+        return self._total_length / len(self._doc_postings) if self._doc_postings else 0.0
+
+    def document_frequency(self, term: str) -> int:
+        """Number of documents containing a term."""
+        term_id = self._term_ids.get(term)
+        return int(self._df[term_id]) if term_id is not None else 0
+
+    def add(self, tokens: list[str]) -> int:
+        """Index a tokenized document and return its slot."""
+        slot = len(self._doc_postings)
+        frequencies: dict[int, int] = {}
+        for token in tokens:
+            term_id = self._term_ids.get(token)
+            if term_id is None:
+                term_id = len(self._term_ids)
+                self._term_ids[token] = term_id
+            frequencies[term_id] = frequencies.get(term_id, 0) + 1
+
+        term_ids = np.fromiter(frequencies.keys(), dtype=np.int64, count=len(frequencies))
+        tfs = np.fromiter(frequencies.values(), dtype=np.float64, count=len(frequencies))
+        if len(self._term_ids) > self._df.shape[0]:
+            self._df = self._grow(self._df, len(self._term_ids))
+        self._df[term_ids] += 1
+
+        if slot >= self._doc_lengths.shape[0]:
+            self._doc_lengths = self._grow(self._doc_lengths, slot + 1)
+        self._doc_lengths[slot] = len(tokens)
+        self._doc_postings.append((term_ids, tfs))
+        self._total_length += len(tokens)
+        self._average_idf = None
+        self._delta = None
+        return slot
+
+    def remove(self, slot: int) -> Optional[int]:
+        """Remove the document in a slot.
+
+        Returns:
+            Former slot of the document moved into ``slot`` (the last one), or None
+        """
+        last = len(self._doc_postings) - 1
+        if not 0 <= slot <= last:
+            raise IndexError(f"BM25 slot {slot} out of range")
+
+        term_ids, _ = self._doc_postings[slot]
+        self._df[term_ids] -= 1
+        self._total_length -= int(self._doc_lengths[slot])
+
+        moved = None
+        if slot != last:
+            self._doc_postings[slot] = self._doc_postings[last]
+            self._doc_lengths[slot] = self._doc_lengths[last]
+            moved = last
+
+        self._doc_postings.pop()
+        self._doc_lengths[last] = 0
+        self._average_idf = None
+        self._delta = None
+        if slot < self._csr_doc_count:
+            self._csr_stale = True
+        return moved
+
+    def clear(self) -> None:
+        """Remove all documents."""
+        self.__init__(
+            k1=self.k1,
+            b=self.b,
+            epsilon=self.epsilon,
+            max_delta_ratio=self.max_delta_ratio,
+            min_delta_docs=self.min_delta_docs,
+        )
+
+    @staticmethod
+    def _grow(array: np.ndarray, min_size: int) -> np.ndarray:
+        grown = np.zeros(max(min_size, array.shape[0] * 2), dtype=array.dtype)
+        grown[: array.shape[0]] = array
+        return grown
+
+    def _coo(self, start: int, stop: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Postings of documents [start, stop) as (term ids, slots, term frequencies) arrays."""
+        postings = self._doc_postings[start:stop]
+        if not postings:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0, dtype=np.float64)
+        terms = np.concatenate([term_ids for term_ids, _ in postings])
+        tfs = np.concatenate([doc_tfs for _, doc_tfs in postings])
+        docs = np.repeat(np.arange(start, stop, dtype=np.int64), [len(term_ids) for term_ids, _ in postings])
+        return terms, docs, tfs
+
+    def compact(self) -> None:
+        """Merge all documents into the CSR matrix."""
+        n = len(self._doc_postings)
+        terms, docs, tfs = self._coo(0, n)
+        order = np.argsort(terms, kind="stable")
+        vocabulary = len(self._term_ids)
+        self._csr_indptr = np.zeros(vocabulary + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=vocabulary), out=self._csr_indptr[1:])
+        self._csr_docs = docs[order]
+        self._csr_tfs = tfs[order]
+        self._csr_doc_count = n
+        self._csr_stale = False
+        self._delta = None
+        logger.debug(f"Compacted BM25 index: {n} documents, {len(order)} postings")
+
+    def _prepare(self) -> None:
+        """Compact if the CSR is stale or the delta grew too large, and materialize the delta."""
+        n = len(self._doc_postings)
+        delta_docs = n - self._csr_doc_count
+        if self._csr_stale or delta_docs > max(self.min_delta_docs, self.max_delta_ratio * n):
+            self.compact()
+        elif self._delta is None:
+            self._delta = self._coo(self._csr_doc_count, n)
+
+    def _idf(self, term_ids: np.ndarray) -> np.ndarray:
+        """IDF with BM25Okapi's epsilon floor for very common terms."""
+        n = len(self._doc_postings)
+        df = self._df[term_ids]
+        idf = np.log(n - df + 0.5) - np.log(df + 0.5)
+        negative = idf < 0
+        if negative.any():
+            if self._average_idf is None:
+                corpus_df = self._df[: len(self._term_ids)]
+                corpus_df = corpus_df[corpus_df > 0]
+                corpus_idf = np.log(n - corpus_df + 0.5) - np.log(corpus_df + 0.5)
+                self._average_idf = float(corpus_idf.mean()) if len(corpus_idf) else 0.0
+            idf[negative] = self.epsilon * self._average_idf
+        return idf
+
+    def get_scores(self, query_tokens: list[str]) -> np.ndarray:
+        """Score every document against a tokenized query."""
+        return self.get_scores_batch([query_tokens])[0]
+
+    def get_scores_batch(self, queries: list[list[str]]) -> np.ndarray:
+        """Score every document against many tokenized queries at once.
+
+        Returns:
+            Array of shape (len(queries), len(self)) with BM25 scores
+        """
+        n = len(self._doc_postings)
+        scores = np.zeros((len(queries), n), dtype=np.float64)
+        if n == 0 or not self._total_length:
+            return scores
+
+        # Sparse query matrix in COO form: (query row, term id, query term count)
+        rows, terms, counts = [], [], []
+        for row, tokens in enumerate(queries):
+            query_counts: dict[int, int] = {}
+            for token in tokens:
+                term_id = self._term_ids.get(token)
+                if term_id is not None:
+                    query_counts[term_id] = query_counts.get(term_id, 0) + 1
+            rows.extend([row] * len(query_counts))
+            terms.extend(query_counts.keys())
+            counts.extend(query_counts.values())
+        if not terms:
+            return scores
+
+        self._prepare()
+        rows = np.asarray(rows, dtype=np.int64)
+        terms = np.asarray(terms, dtype=np.int64)
+        weights = np.asarray(counts, dtype=np.float64) * self._idf(terms)
+        length_norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[:n] / self.average_length)
+
+        # Gather the CSR rows of all query terms in one shot
+        indexed = terms < self._csr_indptr.shape[0] - 1
+        starts = self._csr_indptr[terms[indexed]]
+        lengths = self._csr_indptr[terms[indexed] + 1] - starts
+        total = int(lengths.sum())
+        if total:
+            offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(total)
+            docs = self._csr_docs[offsets]
+            tfs = self._csr_tfs[offsets]
+            contributions = np.repeat(weights[indexed], lengths) * tfs * (self.k1 + 1) / (tfs + length_norm[docs])
+            flat = np.repeat(rows[indexed], lengths) * n + docs
+            scores += np.bincount(flat, weights=contributions, minlength=scores.size).reshape(scores.shape)
+
+        # Documents added since the last compaction
+        delta_terms, delta_docs, delta_tfs = self._delta if self._delta is not None else (None, None, None)
+        if delta_terms is not None and len(delta_terms):
+            term_weights = np.zeros(len(self._term_ids), dtype=np.float64)
+            saturation = delta_tfs * (self.k1 + 1) / (delta_tfs + length_norm[delta_docs])
+            for row in np.unique(rows):
+                in_row = rows == row
+                term_weights[terms[in_row]] = weights[in_row]
+                scores[row] += np.bincount(delta_docs, weights=term_weights[delta_terms] * saturation, minlength=n)
+                term_weights[terms[in_row]] = 0.0
+        return scores
+
+    def get_stats(self) -> dict[str, float]:
+        """Get index statistics."""
+        return {
+            "documents": len(self._doc_postings),
+            "vocabulary_size": self.vocabulary_size,
+            "postings": sum(len(term_ids) for term_ids, _ in self._doc_postings),
+            "compacted_documents": self._csr_doc_count,
+            "average_length": round(self.average_length, 2),
+        }
@@ -7,8 +7,10 @@ from enum import Enum
 import json
 from pathlib import Path
 import re
-from typing import Any, Optional
+from typing import Any, Optional, Union
 
+import numpy as np
+import pandas as pd
 import requests
 
 try:
@@ -125,6 +127,25 @@ class NormalizedValue:
 class DataNormalizer:
     """Service for normalizing financial data."""
 
+    # Scale suffixes written next to the number ("1,5 mln", "2 mld", "800k")
+    _SCALE_SUFFIX = re.compile(r'(?i)\d[\s)]*(k|mln|mio|mld|mrd|mlrd)\b')
+    _SUFFIX_UNITS = {
+        'k': ScaleUnit.THOUSANDS,
+        'mln': ScaleUnit.MILLIONS,
+        'mio': ScaleUnit.MILLIONS,
+        'mld': ScaleUnit.BILLIONS,
+        'mrd': ScaleUnit.BILLIONS,
+        'mlrd': ScaleUnit.BILLIONS,
+    }
+    _THOUSANDS_DOTS = re.compile(r'^\d{1,3}(\.\d{3}){2,}$')
+    # Plain numbers the vectorized path handles: 1.234.567 / 1.234,56 / 1234,5 / 1234.5 (optional minus)
+    _PLAIN_NUMBER = (
+        r'^(?P<sign>-)?'
+        r'(?P<integer>\d{1,3}(?:\.\d{3}){2,}|\d{1,3}\.\d{3}(?=,)|\d+)'
+        r'(?:,(?P<comma_decimals>\d{1,2})|\.(?P<dot_decimals>\d+))?$'
+    )
+    _WELL_FORMED = r'^\d{1,3}([\.,]\d{3})*[\.,]?\d{0,2}$'
+
     def __init__(self, default_locale: str = "it_IT", enable_currency_conversion: bool = False):
         """Initialize normalizer with locale settings."""
         self.default_locale = default_locale
@@ -246,7 +267,10 @@ class DataNormalizer:
         # Parse number based on locale
         try:
             # Try Italian format first (1.234,56)
-            if ',' in clean_value and '.' in clean_value:
+            if self._THOUSANDS_DOTS.match(clean_value):
+                # Only dots, grouped in thousands: 1.234.567
+                clean_value = clean_value.replace('.', '')
+            elif ',' in clean_value and '.' in clean_value:
                 # Both comma and dot - check which is decimal separator
                 last_comma = clean_value.rfind(',')
                 last_dot = clean_value.rfind('.')
@@ -272,8 +296,8 @@ class DataNormalizer:
             if is_negative:
                 decimal_value = -decimal_value
 
-            # Apply scale
-            scale = detected_scale or self.detect_scale(context)
+            # Apply scale ("1,5 mln" carries its own scale)
+            scale = self._suffix_scale(original_value) or detected_scale or self.detect_scale(context)
 
             return NormalizedValue(
                 value=decimal_value,
@@ -288,6 +312,11 @@ class DataNormalizer:
         except (InvalidOperation, ValueError, TypeError):
             return None
 
+    def _suffix_scale(self, value_str: str) -> Optional[ScaleUnit]:
+        """Scale declared by a suffix of the value itself (e.g. "1,5 mln", "800k")."""
+        match = self._SCALE_SUFFIX.search(value_str)
+        return self._SUFFIX_UNITS[match.group(1).lower()] if match else None
+
     def _clean_numeric_string(self, value_str: str) -> str:
         """Clean numeric string removing non-numeric chars except separators."""
         if not value_str:
@@ -452,13 +481,22 @@ class DataNormalizer:
             return None
 
     def batch_normalize(self,
-                       data: dict[str, Any],
+                       data: Union[dict[str, Any], pd.Series],
                        context: str = "",
-                       scale_override: Optional[ScaleUnit] = None) -> dict[str, NormalizedValue]:
-        """Batch normalize multiple values."""
-        results = {}
+                       scale_override: Optional[ScaleUnit] = None) -> Union[dict[str, NormalizedValue], pd.DataFrame]:
+        """Batch normalize multiple values.
+
+        A dict is normalized value by value. A pandas Series (e.g. a CSV column) is parsed with
+        vectorized string operations; only cells the vectorized parser rejects go through
+        ``normalize_number``. The result is then a DataFrame aligned with the series, see
+        ``_normalize_series``.
+        """
         detected_scale = scale_override or self.detect_scale(context)
 
+        if isinstance(data, pd.Series):
+            return self._normalize_series(data, context, detected_scale)
+
+        results = {}
         for key, value in data.items():
             if isinstance(value, (str, int, float)):
                 normalized = self.normalize_number(str(value), context, detected_scale)
@@ -467,6 +505,54 @@ class DataNormalizer:
 
         return results
 
+    def _normalize_series(self, series: pd.Series, context: str, detected_scale: ScaleUnit) -> pd.DataFrame:
+        """Vectorized ``normalize_number`` over a Series.
+
+        Plain numbers ("1.234.567,89", "1234,5", "-12.75") are parsed with one regex pass over the
+        column; anything else (currency, parentheses, scale suffixes, US thousands) goes through
+        ``normalize_number``, so results match the scalar parser cell by cell.
+
+        Returns:
+            DataFrame indexed like ``series`` with columns ``parsed`` (bool), ``value`` (float, NaN if
+            not parsed), ``number`` (absolute value as a numeric string, for exact Decimal values),
+            ``currency``, ``is_negative``, ``is_percentage``, ``confidence`` and ``scale``
+        """
+        original = series.astype(str).str.strip()
+        parts = original.str.extract(self._PLAIN_NUMBER)
+        parsed = parts['integer'].notna()
+
+        integer = parts['integer'].str.replace('.', '', regex=False)
+        fraction = parts['comma_decimals'].fillna(parts['dot_decimals'])
+        number = integer.where(fraction.isna(), integer + '.' + fraction)
+        is_negative = parts['sign'].notna()
+        value = pd.to_numeric(number, errors='coerce')
+
+        columns = {
+            'parsed': parsed.to_numpy(copy=True),
+            'value': value.mask(is_negative, -value).to_numpy(dtype=float, copy=True),
+            'number': number.to_numpy(dtype=object, copy=True),
+            'currency': np.full(len(series), None, dtype=object),
+            'is_negative': is_negative.to_numpy(copy=True),
+            'is_percentage': np.full(len(series), self._is_percentage(" " + context)),
+            'confidence': 0.7 + 0.2 * number.str.match(self._WELL_FORMED).fillna(False).to_numpy(dtype=bool),
+            'scale': np.full(len(series), detected_scale, dtype=object),
+        }
+
+        # Scalar parser for the cells outside the plain-number grammar
+        for pos in np.flatnonzero((~parsed & (original != '')).to_numpy()):
+            normalized = self.normalize_number(original.iat[pos], context, detected_scale)
+            if normalized:
+                columns['parsed'][pos] = True
+                columns['value'][pos] = float(normalized.value)
+                columns['number'][pos] = str(abs(normalized.value))
+                columns['currency'][pos] = normalized.currency
+                columns['is_negative'][pos] = normalized.is_negative
+                columns['is_percentage'][pos] = normalized.is_percentage
+                columns['confidence'][pos] = normalized.confidence
+                columns['scale'][pos] = normalized.scale_applied
+
+        return pd.DataFrame(columns, index=series.index)
+
     def _is_percentage(self, text: str) -> bool:
         """Check if value represents a percentage."""
         return any(re.search(pattern, text) for pattern in self.percentage_patterns)
@@ -10,7 +10,7 @@ from src.application.parsers.excel_parser import ExcelParser
 from src.application.services.data_normalizer import DataNormalizer, NormalizedValue
 from src.application.services.document_router import DocumentRouter, ProcessingMode
 from src.application.services.hybrid_retrieval import HybridRetriever, RetrievalResult
-from src.application.services.ontology_mapper import OntologyMapper
+from src.application.services.ontology_mapper import get_ontology_mapper
 from src.application.services.raw_blocks_extractor import BlockType, DocumentBlocks, RawBlocksExtractor
 from src.domain.value_objects.guardrails import FinancialGuardrails, ValidationResult
 from src.domain.value_objects.source_reference import ProvenancedValue, SourceReference, SourceType
@@ -82,9 +82,10 @@ class EnterpriseOrchestrator:
         self.hybrid_retriever = HybridRetriever(
             embedding_model_name="text-embedding-3-small",
             cache_dir="data/cache/hybrid_retrieval",
-            openai_api_key=api_key
+            openai_api_key=api_key,
+            embedding_cache=getattr(rag_engine, "embedding_cache", None)
         )
-        self.ontology_mapper = OntologyMapper()
+        self.ontology_mapper = get_ontology_mapper()  # Shared across tenants
         if FACT_TABLE_AVAILABLE:
             self.fact_table_repo = FactTableRepository(db_path=fact_table_path)
         else:
@@ -112,6 +113,12 @@ class EnterpriseOrchestrator:
 
         logger.info("Enterprise orchestrator initialized")
 
+    def close(self) -> None:
+        """Close the fact table connection."""
+        if self.fact_table_repo is not None:
+            self.fact_table_repo.close()
+            self.fact_table_repo = None
+
     async def process_enterprise_query(self,
                                      query: EnterpriseQuery,
                                      documents: Optional[list[dict[str, Any]]] = None) -> ProcessingResult:
@@ -187,6 +194,7 @@ class EnterpriseOrchestrator:
                                query: EnterpriseQuery,
                                result: ProcessingResult) -> None:
         """Process and route documents."""
+        retrieval_docs = []
         for doc in documents:
             try:
                 # Create source reference
@@ -209,9 +217,9 @@ class EnterpriseOrchestrator:
                     classification = self.document_router.classify_document(content)
                     doc_type = classification.processing_mode
 
-                # Add to hybrid retrieval index
+                # Collect for the hybrid retrieval index (embedded and indexed in one batch below)
                 if content:
-                    self.hybrid_retriever.add_documents([{
+                    retrieval_docs.append({
                         'content': content,
                         'metadata': {
                             'source_ref': source_ref.to_dict(),
@@ -219,7 +227,7 @@ class EnterpriseOrchestrator:
                             'processing_date': datetime.now().isoformat()
                         },
                         'id': source_ref.file_hash or source_ref.file_name
-                    }])
+                    })
 
                 logger.debug(f"Processed document: {source_ref.file_name} as {doc_type.value}")
 
@@ -227,6 +235,13 @@ class EnterpriseOrchestrator:
                 result.errors.append(f"Document processing failed: {str(e)}")
                 logger.error(f"Failed to process document: {e}")
 
+        if retrieval_docs:
+            try:
+                self.hybrid_retriever.add_documents(retrieval_docs)
+            except Exception as e:
+                result.errors.append(f"Hybrid indexing failed: {str(e)}")
+                logger.error(f"Failed to index documents for hybrid retrieval: {e}")
+
     async def _perform_hybrid_retrieval(self,
                                       query: EnterpriseQuery,
                                       result: ProcessingResult) -> None:
@@ -10,9 +10,9 @@ from typing import Any, Optional, Union
 
 from bs4 import BeautifulSoup
 from PIL import Image
-import pytesseract
 import xmltodict
 
+from src.application.services.ocr_service import OCRService, get_ocr_service
 from src.domain.value_objects.source_reference import SourceReference
 
 logger = logging.getLogger(__name__)
@@ -462,14 +462,16 @@ class JSONParser:
 class ImageParser:
     """Parser for image files with OCR capabilities."""
 
-    def __init__(self, ocr_language: str = 'ita+eng'):
+    def __init__(self, ocr_language: str = 'ita+eng', ocr_service: Optional[OCRService] = None):
         """
         Initialize image parser.
 
         Args:
             ocr_language: Languages for OCR
+            ocr_service: OCR worker pool and cache (defaults to the shared one)
         """
         self.ocr_language = ocr_language
+        self.ocr_service = ocr_service or get_ocr_service()
 
     def parse(self, file_path: str) -> ParsedContent:
         """Parse image file using OCR."""
@@ -477,27 +479,16 @@ class ImageParser:
         errors = []
 
         try:
-            # Configure Tesseract path for Windows
-            import os
-            if os.name == 'nt':  # Windows
-                tesseract_paths = [
-                    r'C:\Program Files\Tesseract-OCR\tesseract.exe',
-                    r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe',
-                    r'C:\Tesseract-OCR\tesseract.exe'
-                ]
-                for path in tesseract_paths:
-                    if os.path.exists(path):
-                        pytesseract.pytesseract.tesseract_cmd = path
-                        break
-            
-            # Open image
+            # Open image (header only, for metadata)
             image = Image.open(file_path)
-
-            # Extract text using OCR
-            text = pytesseract.image_to_string(image, lang=self.ocr_language)
-
-            # Extract data (tables if possible)
-            data = pytesseract.image_to_data(image, lang=self.ocr_language, output_type=pytesseract.Output.DICT)
+            image_bytes = Path(file_path).read_bytes()
+
+            # OCR text and word-level data in the shared worker pool (served from cache for known images)
+            ocr_result = self.ocr_service.ocr_image(image_bytes, self.ocr_language, with_data=True)
+            if ocr_result.error:
+                raise RuntimeError(ocr_result.error)
+            text = ocr_result.text
+            data = ocr_result.data
 
             # Try to detect tables in OCR output
             tables = self._detect_tables_in_ocr(data)
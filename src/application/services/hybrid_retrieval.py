@@ -1,29 +1,21 @@
 """Hybrid retrieval service combining BM25 and embeddings."""
 
 from dataclasses import dataclass
+import importlib.util
 import logging
 import os
+from pathlib import Path
+import pickle
 from typing import Any, Optional
 
 import numpy as np
-from openai import OpenAI
-
-try:
-    from rank_bm25 import BM25Okapi
 
-    BM25_AVAILABLE = True
-except ImportError:
-    BM25_AVAILABLE = False
+from src.application.services.bm25_index import InvertedBM25Index, top_k_indices
+from src.infrastructure.performance.embedding_cache import EmbeddingCache
+from src.infrastructure.performance.shared_resources import get_cross_encoder, get_openai_client
 
-try:
-    from sentence_transformers import CrossEncoder
-
-    RERANKER_AVAILABLE = True
-except ImportError:
-    RERANKER_AVAILABLE = False
-
-from pathlib import Path
-import pickle
+# The CrossEncoder itself is loaded (once per process) by get_cross_encoder
+RERANKER_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
 
 logger = logging.getLogger(__name__)
 
@@ -73,15 +65,17 @@ class HybridRetriever:
         reranker_model_name: str = "cross-encoder/ms-marco-MiniLM-L-2-v2",
         cache_dir: str = "data/cache",
         openai_api_key: Optional[str] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
     ):
         """Initialize hybrid retriever."""
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
+        self.embedding_cache = embedding_cache
 
         # Initialize OpenAI client for embeddings
         api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
         if api_key:
-            self.openai_client = OpenAI(api_key=api_key)
+            self.openai_client = get_openai_client(api_key)
             self.embedding_model_name = embedding_model_name
             logger.info(f"Initialized OpenAI embeddings with model: {embedding_model_name}")
         else:
@@ -92,7 +86,7 @@ class HybridRetriever:
         # Load reranker model
         if RERANKER_AVAILABLE:
             try:
-                self.reranker = CrossEncoder(reranker_model_name)
+                self.reranker = get_cross_encoder(reranker_model_name)
                 logger.info(f"Loaded reranker model: {reranker_model_name}")
             except Exception as e:
                 logger.warning(f"Failed to load reranker {reranker_model_name}: {e}")
@@ -101,58 +95,155 @@ class HybridRetriever:
             logger.warning("CrossEncoder not available, reranker functionality disabled")
             self.reranker = None
 
-        # Index components
+        # Index components, maintained incrementally: documents[i] is BM25 slot i and embedding row i
         self.documents: list[IndexedDocument] = []
-        self.bm25_index: Optional[BM25Okapi] = None
-        self.doc_embeddings: Optional[np.ndarray] = None
+        self.bm25_index = InvertedBM25Index()
+        self._embedding_matrix: Optional[np.ndarray] = None  # Preallocated, grown geometrically
+        self._doc_slots: dict[str, int] = {}
+        self._next_doc_number = 0
 
         # Search parameters
         self.bm25_weight = 0.3  # Weight for BM25 scores
         self.embedding_weight = 0.7  # Weight for embedding scores
         self.use_reranking = True  # Whether to use cross-encoder reranking
 
+    @property
+    def doc_embeddings(self) -> Optional[np.ndarray]:
+        """L2-normalized embedding matrix of the indexed documents (a view, one row per document)."""
+        if self._embedding_matrix is None:
+            return None
+        return self._embedding_matrix[: len(self.documents)]
+
     def add_documents(
         self, documents: list[dict[str, Any]], content_field: str = "content", metadata_field: str = "metadata"
     ) -> None:
-        """Add documents to the hybrid index."""
+        """Add documents to the hybrid index.
+
+        Only the new documents are tokenized, embedded and indexed, so repeated
+        calls cost O(new documents). A document whose id is already indexed
+        replaces the previous version, unless its content is unchanged: then it is
+        skipped, so re-sending the same documents leaves the index untouched.
+        """
         new_docs = []
 
-        for i, doc in enumerate(documents):
+        for doc in documents:
             content = doc.get(content_field, "")
             if not content:
                 continue
 
+            slot = self._doc_slots.get(doc.get("id"))
+            if slot is not None and self.documents[slot].content == content:
+                continue
+
             metadata = doc.get(metadata_field, {})
-            doc_id = doc.get("id", f"doc_{len(self.documents) + i}")
+            doc_id = doc.get("id") or f"doc_{self._next_doc_number}"
+            self._next_doc_number += 1
 
             # Tokenize for BM25
             tokens = self._tokenize(content)
 
-            # Generate embedding
-            embedding = None
-            if self.openai_client:
-                try:
-                    response = self.openai_client.embeddings.create(
-                        model=self.embedding_model_name,
-                        input=content[:8191]  # OpenAI max input length
-                    )
-                    embedding = np.array(response.data[0].embedding)
-                except Exception as e:
-                    logger.warning(f"Failed to generate embedding for doc {doc_id}: {e}")
-                    embedding = np.zeros(1536)  # Fallback empty embedding for text-embedding-3-small
-
             indexed_doc = IndexedDocument(
-                content=content, embedding=embedding, tokens=tokens, metadata=metadata, doc_id=doc_id
+                content=content, embedding=None, tokens=tokens, metadata=metadata, doc_id=doc_id
             )
 
             new_docs.append(indexed_doc)
 
-        self.documents.extend(new_docs)
-        logger.info(f"Added {len(new_docs)} documents to hybrid index")
+        # Generate embeddings for all new documents in batched requests
+        if self.openai_client and new_docs:
+            for indexed_doc, embedding in zip(new_docs, self._embed_texts([d.content for d in new_docs])):
+                indexed_doc.embedding = embedding
+
+        for indexed_doc in new_docs:
+            if indexed_doc.doc_id in self._doc_slots:
+                self._remove_slot(self._doc_slots[indexed_doc.doc_id])
+            self._append_document(indexed_doc)
+
+        if new_docs:
+            logger.info(f"Added {len(new_docs)} documents to hybrid index ({len(self.documents)} total)")
+
+    def remove_documents(self, doc_ids: list[str]) -> int:
+        """Remove documents from the hybrid index by id.
+
+        Returns:
+            Number of documents removed
+        """
+        removed = 0
+        for doc_id in doc_ids:
+            slot = self._doc_slots.get(doc_id)
+            if slot is not None:
+                self._remove_slot(slot)
+                removed += 1
+        if removed:
+            logger.info(f"Removed {removed} documents from hybrid index")
+        return removed
+
+    def _append_document(self, doc: IndexedDocument) -> None:
+        """Index a document in the next free slot."""
+        slot = len(self.documents)
+        self.documents.append(doc)
+        self._doc_slots[doc.doc_id] = slot
+        self.bm25_index.add(doc.tokens)
+        if doc.embedding is not None:
+            self._store_embedding(slot, doc.embedding)
+
+    def _remove_slot(self, slot: int) -> None:
+        """Remove the document in a slot, moving the last document into it and zeroing the vacated row."""
+        doc = self.documents[slot]
+        del self._doc_slots[doc.doc_id]
+        moved = self.bm25_index.remove(slot)
+        if moved is not None:
+            moved_doc = self.documents[moved]
+            self.documents[slot] = moved_doc
+            self._doc_slots[moved_doc.doc_id] = slot
+            if self._embedding_matrix is not None:
+                self._embedding_matrix[slot] = self._embedding_matrix[moved]
+        self.documents.pop()
+        if self._embedding_matrix is not None:
+            self._embedding_matrix[len(self.documents)] = 0.0
+
+    def _store_embedding(self, slot: int, embedding: np.ndarray) -> None:
+        """Write an L2-normalized embedding row, growing the preallocated matrix when full."""
+        embedding = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        if norm > 0:
+            embedding = embedding / norm
+        if self._embedding_matrix is None:
+            self._embedding_matrix = np.zeros((max(64, slot + 1), embedding.shape[0]), dtype=np.float32)
+        elif embedding.shape[0] != self._embedding_matrix.shape[1]:
+            logger.warning(
+                f"Embedding dimension {embedding.shape[0]} does not match index "
+                f"({self._embedding_matrix.shape[1]}), storing zero vector"
+            )
+            embedding = np.zeros(self._embedding_matrix.shape[1], dtype=np.float32)
+        if slot >= self._embedding_matrix.shape[0]:
+            capacity = max(slot + 1, self._embedding_matrix.shape[0] * 2)
+            grown = np.zeros((capacity, self._embedding_matrix.shape[1]), dtype=np.float32)
+            grown[: self._embedding_matrix.shape[0]] = self._embedding_matrix
+            self._embedding_matrix = grown
+        self._embedding_matrix[slot] = embedding
+
+    def _embed_texts(self, texts: list[str], batch_size: int = 256) -> list[np.ndarray]:
+        """Embed texts in batched requests, reusing cached vectors for unchanged content."""
 
-        # Rebuild indices
-        self._build_bm25_index()
-        self._build_embedding_index()
+        def compute(batch: list[str]) -> list[list[float]]:
+            response = self.openai_client.embeddings.create(model=self.embedding_model_name, input=batch)
+            return [item.embedding for item in response.data]
+
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            batch = [text[:8191] for text in texts[start:start + batch_size]]  # OpenAI max input length
+            try:
+                if self.embedding_cache is not None:
+                    vectors = self.embedding_cache.get_or_compute(self.embedding_model_name, batch, compute)
+                else:
+                    vectors = compute(batch)
+                embeddings.extend(np.array(vector) for vector in vectors)
+            except Exception as e:
+                logger.warning(f"Failed to generate embeddings for {len(batch)} documents: {e}")
+                # Fallback empty embeddings for text-embedding-3-small
+                embeddings.extend(np.zeros(1536) for _ in batch)
+
+        return embeddings
 
     def _tokenize(self, text: str) -> list[str]:
         """Simple tokenization for BM25."""
@@ -163,115 +254,118 @@ class HybridRetriever:
         tokens = text.split()
         return [token for token in tokens if len(token) > 2]  # Filter short tokens
 
-    def _build_bm25_index(self) -> None:
-        """Build BM25 index from documents."""
-        if not self.documents:
-            return
-
-        if BM25_AVAILABLE:
-            corpus = [doc.tokens for doc in self.documents]
-            self.bm25_index = BM25Okapi(corpus)
-            logger.info(f"Built BM25 index with {len(corpus)} documents")
-        else:
-            logger.warning("BM25 not available, BM25 indexing disabled")
-            self.bm25_index = None
-
-    def _build_embedding_index(self) -> None:
-        """Build embedding index from documents."""
-        if not self.documents or not self.openai_client:
-            return
-
-        embeddings = []
-        for doc in self.documents:
-            if doc.embedding is not None:
-                embeddings.append(doc.embedding)
-            else:
-                # Generate embedding if missing
-                try:
-                    response = self.openai_client.embeddings.create(
-                        model=self.embedding_model_name,
-                        input=doc.content[:8191]  # OpenAI max input length
-                    )
-                    emb = np.array(response.data[0].embedding)
-                    embeddings.append(emb)
-                    doc.embedding = emb
-                except Exception as e:
-                    logger.warning(f"Failed to generate embedding: {e}")
-                    embeddings.append(np.zeros(1536))  # text-embedding-3-small dimensions
-
-        if embeddings:
-            self.doc_embeddings = np.vstack(embeddings)
-            logger.info(f"Built embedding index with {self.doc_embeddings.shape} shape")
+    def _rebuild_indices(self) -> None:
+        """Rebuild BM25 postings and embedding matrix from ``self.documents`` (after loading)."""
+        documents = self.documents
+        self.documents = []
+        self.bm25_index.clear()
+        self._embedding_matrix = None
+        self._doc_slots.clear()
+
+        # Generate missing embeddings in one batched pass
+        missing = [doc for doc in documents if doc.embedding is None]
+        if missing and self.openai_client:
+            for doc, embedding in zip(missing, self._embed_texts([d.content for d in missing])):
+                doc.embedding = embedding
+
+        for doc in documents:
+            self._append_document(doc)
+        self._next_doc_number = max(self._next_doc_number, len(self.documents))
+        logger.info(f"Rebuilt hybrid index with {len(self.documents)} documents")
 
     def search(
         self, query: str, top_k: int = 10, bm25_top_k: int = 50, embedding_top_k: int = 50, final_rerank_k: int = 10
     ) -> list[RetrievalResult]:
         """Perform hybrid search."""
+        return self.search_batch([query], top_k, bm25_top_k, embedding_top_k, final_rerank_k)[0]
+
+    def search_batch(
+        self,
+        queries: list[str],
+        top_k: int = 10,
+        bm25_top_k: int = 50,
+        embedding_top_k: int = 50,
+        final_rerank_k: int = 10,
+    ) -> list[list[RetrievalResult]]:
+        """Perform hybrid search for many queries.
+
+        BM25 and embedding scores of all queries are computed as matrix products
+        and the queries are embedded with a single request.
+
+        Returns:
+            One result list per query, in input order
+        """
         if not self.documents:
             logger.warning("No documents in hybrid index")
-            return []
+            return [[] for _ in queries]
 
         # Step 1: BM25 retrieval
-        bm25_results = self._bm25_search(query, top_k=bm25_top_k)
+        bm25_results = self._bm25_search_batch(queries, top_k=bm25_top_k)
 
         # Step 2: Embedding similarity search
-        embedding_results = self._embedding_search(query, top_k=embedding_top_k)
+        embedding_results = self._embedding_search_batch(queries, top_k=embedding_top_k)
+
+        results = []
+        for query, query_bm25, query_embedding in zip(queries, bm25_results, embedding_results):
+            # Step 3: Combine scores
+            combined_results = self._combine_scores(query_bm25, query_embedding, top_k)
 
-        # Step 3: Combine scores
-        combined_results = self._combine_scores(bm25_results, embedding_results, top_k)
+            # Step 4: Reranking (optional)
+            if self.use_reranking and self.reranker and len(combined_results) > 1:
+                combined_results = self._rerank_results(query, combined_results, final_rerank_k)
 
-        # Step 4: Reranking (optional)
-        if self.use_reranking and self.reranker and len(combined_results) > 1:
-            combined_results = self._rerank_results(query, combined_results, final_rerank_k)
+            results.append(combined_results[:top_k])
+        return results
 
-        return combined_results[:top_k]
+    @staticmethod
+    def _top_positive(scores: np.ndarray, top_k: int) -> list[tuple[int, float]]:
+        """Top-k (index, score) pairs with a positive score, best first."""
+        return [(int(idx), float(scores[idx])) for idx in top_k_indices(scores, top_k) if scores[idx] > 0]
 
     def _bm25_search(self, query: str, top_k: int = 50) -> list[tuple[int, float]]:
         """Search using BM25."""
-        if not self.bm25_index:
-            return []
+        return self._bm25_search_batch([query], top_k)[0]
 
-        query_tokens = self._tokenize(query)
-        if not query_tokens:
-            return []
+    def _bm25_search_batch(self, queries: list[str], top_k: int = 50) -> list[list[tuple[int, float]]]:
+        """Search many queries using BM25 over the sparse term-document matrix."""
+        if not len(self.bm25_index):
+            return [[] for _ in queries]
 
-        scores = self.bm25_index.get_scores(query_tokens)
+        scores = self.bm25_index.get_scores_batch([self._tokenize(query) for query in queries])
+        results = [self._top_positive(row, top_k) for row in scores]
 
-        # Get top-k results
-        top_indices = np.argsort(scores)[::-1][:top_k]
-        results = [(idx, scores[idx]) for idx in top_indices if scores[idx] > 0]
-
-        logger.debug(f"BM25 found {len(results)} results")
+        logger.debug(f"BM25 found {sum(len(r) for r in results)} results for {len(queries)} queries")
         return results
 
     def _embedding_search(self, query: str, top_k: int = 50) -> list[tuple[int, float]]:
         """Search using embedding similarity."""
+        return self._embedding_search_batch([query], top_k)[0]
+
+    def _embedding_search_batch(self, queries: list[str], top_k: int = 50) -> list[list[tuple[int, float]]]:
+        """Search many queries using cosine similarity against the pre-normalized embedding matrix."""
         if not self.openai_client or self.doc_embeddings is None:
-            return []
+            return [[] for _ in queries]
 
         try:
-            # Generate query embedding
+            # Generate query embeddings in one request
             response = self.openai_client.embeddings.create(
                 model=self.embedding_model_name,
-                input=query[:8191]  # OpenAI max input length
-            )
-            query_embedding = np.array(response.data[0].embedding)
-
-            # Calculate cosine similarities
-            similarities = np.dot(self.doc_embeddings, query_embedding) / (
-                np.linalg.norm(self.doc_embeddings, axis=1) * np.linalg.norm(query_embedding)
+                input=[query[:8191] for query in queries]  # OpenAI max input length
             )
+            query_embeddings = np.array([item.embedding for item in response.data], dtype=np.float32)
+            norms = np.linalg.norm(query_embeddings, axis=1, keepdims=True)
+            query_embeddings /= np.where(norms > 0, norms, 1.0)
 
-            # Get top-k results
-            top_indices = np.argsort(similarities)[::-1][:top_k]
-            results = [(idx, similarities[idx]) for idx in top_indices if similarities[idx] > 0]
+            # Document rows are L2-normalized at insert time, so this is the cosine similarity
+            similarities = query_embeddings @ self.doc_embeddings.T
+            results = [self._top_positive(row, top_k) for row in similarities]
 
-            logger.debug(f"Embedding search found {len(results)} results")
+            logger.debug(f"Embedding search found {sum(len(r) for r in results)} results for {len(queries)} queries")
             return results
 
         except Exception as e:
             logger.error(f"Embedding search failed: {e}")
-            return []
+            return [[] for _ in queries]
 
     def _combine_scores(
         self, bm25_results: list[tuple[int, float]], embedding_results: list[tuple[int, float]], top_k: int
@@ -383,8 +477,7 @@ class HybridRetriever:
             self.embedding_weight = index_data.get("embedding_weight", 0.7)
 
             # Rebuild indices
-            self._build_bm25_index()
-            self._build_embedding_index()
+            self._rebuild_indices()
 
             logger.info(f"Loaded hybrid index with {len(self.documents)} documents")
             return True
@@ -396,15 +489,17 @@ class HybridRetriever:
     def clear_index(self) -> None:
         """Clear the hybrid index."""
         self.documents.clear()
-        self.bm25_index = None
-        self.doc_embeddings = None
+        self.bm25_index.clear()
+        self._embedding_matrix = None
+        self._doc_slots.clear()
         logger.info("Cleared hybrid index")
 
     def get_stats(self) -> dict[str, Any]:
         """Get index statistics."""
         return {
             "document_count": len(self.documents),
-            "has_bm25_index": self.bm25_index is not None,
+            "has_bm25_index": len(self.bm25_index) > 0,
+            "bm25_vocabulary_size": self.bm25_index.vocabulary_size,
             "has_embedding_index": self.doc_embeddings is not None,
             "embedding_dimension": self.doc_embeddings.shape[1] if self.doc_embeddings is not None else 0,
             "bm25_weight": self.bm25_weight,
@@ -3,16 +3,23 @@ HyDE (Hypothetical Document Embeddings) implementation for improved retrieval.
 Generates hypothetical documents to improve semantic search quality.
 """
 
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 import logging
+import threading
+import time
 from typing import Any, Optional
 
 from llama_index.core import VectorStoreIndex
+from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.prompts import PromptTemplate
 from llama_index.core.retrievers import BaseRetriever
 from llama_index.core.schema import NodeWithScore, QueryBundle
 from llama_index.llms.openai import OpenAI
 import numpy as np
+from qdrant_client.http import models as rest
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +33,72 @@ class HyDEConfig:
     temperature: float = 0.0
     include_original_query: bool = True
     fusion_weight: float = 0.3  # Weight for original query vs hypothetical docs
+    cache_ttl_seconds: int = 3600  # Reuse generated documents for repeated questions
+
+
+class HypotheticalDocumentCache:
+    """Thread-safe LRU + TTL cache of generated hypothetical documents.
+
+    Documents depend only on the question and the generation settings, not on
+    tenant data, so one process-wide cache is shared by all retrievers.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, list[str]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a query for cache lookups (case and whitespace insensitive)."""
+        return " ".join(query.lower().split())
+
+    def get(self, key: tuple) -> Optional[list[str]]:
+        """Return cached documents, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[1])
+
+    def set(self, key: tuple, documents: list[str], ttl_seconds: float) -> None:
+        """Store generated documents, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, list(documents))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached documents."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Global hypothetical document cache instance
+_hypothetical_document_cache = None
+_hypothetical_document_cache_lock = threading.Lock()
+
+
+def get_hypothetical_document_cache() -> HypotheticalDocumentCache:
+    """Get or create global hypothetical document cache instance."""
+    global _hypothetical_document_cache
+    with _hypothetical_document_cache_lock:
+        if _hypothetical_document_cache is None:
+            _hypothetical_document_cache = HypotheticalDocumentCache()
+        return _hypothetical_document_cache
 
 
 class HyDERetriever(BaseRetriever):
@@ -70,6 +143,10 @@ Business Analysis:""",
         llm: Optional[OpenAI] = None,
         config: Optional[HyDEConfig] = None,
         domain: str = "default",
+        vector_store=None,
+        embed_model: Optional[BaseEmbedding] = None,
+        similarity_top_k: Optional[int] = None,
+        cache: Optional[HypotheticalDocumentCache] = None,
     ):
         """
         Initialize HyDE retriever.
@@ -79,56 +156,192 @@ Business Analysis:""",
             llm: Language model for generating hypothetical documents
             config: HyDE configuration
             domain: Domain for specialized prompts
+            vector_store: Optional QdrantVectorStore; when given with ``embed_model``, all
+                searches of a query run as one Qdrant batch request
+            embed_model: Embedding model used to embed queries and hypothetical documents in one batch
+            similarity_top_k: Results per search (defaults to the base retriever's top_k)
+            cache: Cache of generated documents (defaults to the process-wide cache)
         """
         super().__init__()
         self.base_retriever = base_retriever
         self.llm = llm or OpenAI(model="gpt-3.5-turbo")
         self.config = config or HyDEConfig()
         self.domain = domain
+        self.vector_store = vector_store
+        self.embed_model = embed_model
+        self.similarity_top_k = similarity_top_k or getattr(base_retriever, "similarity_top_k", 2)
+        self.cache = cache or get_hypothetical_document_cache()
         self._prompt_template = PromptTemplate(self.HYPOTHESIS_PROMPTS.get(domain, self.HYPOTHESIS_PROMPTS["default"]))
 
+    def _generation_requests(self, query: str) -> list[tuple[str, float]]:
+        """Prompt and temperature of each hypothetical document."""
+        requests = []
+        for i in range(self.config.num_hypothetical_docs):
+            # Vary temperature for diversity
+            temperature = min(self.config.temperature + (i * 0.1), 1.0)
+            if i == 0:
+                prompt = self._prompt_template.format(query=query)
+            else:
+                # Variation prompt for subsequent documents
+                prompt = f"Provide another perspective on: {query}\n\nAlternative answer:"
+            requests.append((prompt, temperature))
+        return requests
+
+    def _cache_key(self, query: str) -> tuple:
+        return (
+            self.domain,
+            self.config.num_hypothetical_docs,
+            self.config.hypothetical_doc_max_tokens,
+            self.config.temperature,
+            self.cache.normalize(query),
+        )
+
+    def _complete(self, prompt: str, temperature: float) -> Optional[str]:
+        try:
+            response = self.llm.complete(
+                prompt, temperature=temperature, max_tokens=self.config.hypothetical_doc_max_tokens
+            )
+            return response.text.strip()
+        except Exception as e:
+            logger.warning(f"Failed to generate hypothetical doc: {str(e)}")
+            return None
+
+    async def _acomplete(self, prompt: str, temperature: float) -> Optional[str]:
+        try:
+            response = await self.llm.acomplete(
+                prompt, temperature=temperature, max_tokens=self.config.hypothetical_doc_max_tokens
+            )
+            return response.text.strip()
+        except Exception as e:
+            logger.warning(f"Failed to generate hypothetical doc: {str(e)}")
+            return None
+
+    def _finish_generation(self, query: str, generated: list[Optional[str]]) -> list[str]:
+        hypothetical_docs = [doc for doc in generated if doc]
+        for i, doc in enumerate(hypothetical_docs):
+            logger.debug(f"Generated hypothetical doc {i + 1}: {doc[:100]}...")
+        if hypothetical_docs:
+            self.cache.set(self._cache_key(query), hypothetical_docs, self.config.cache_ttl_seconds)
+        return hypothetical_docs
+
     def _generate_hypothetical_documents(self, query: str) -> list[str]:
         """
         Generate hypothetical documents that answer the query.
 
+        The LLM calls run concurrently and results are cached per normalized query.
+
         Args:
             query: User query
 
         Returns:
             List of hypothetical document texts
         """
-        hypothetical_docs = []
-
-        for i in range(self.config.num_hypothetical_docs):
-            try:
-                # Vary temperature for diversity
-                temp = self.config.temperature + (i * 0.1)
-
-                # Generate hypothetical answer
-                prompt = self._prompt_template.format(query=query)
-
-                response = self.llm.complete(
-                    prompt, temperature=min(temp, 1.0), max_tokens=self.config.hypothetical_doc_max_tokens
-                )
+        cached = self.cache.get(self._cache_key(query))
+        if cached is not None:
+            return cached
+
+        requests = self._generation_requests(query)
+        if not requests:
+            return []
+        # A private pool: this may already run inside the shared blocking executor
+        with ThreadPoolExecutor(max_workers=len(requests), thread_name_prefix="hyde") as executor:
+            generated = list(executor.map(lambda request: self._complete(*request), requests))
+        return self._finish_generation(query, generated)
+
+    async def _agenerate_hypothetical_documents(self, query: str) -> list[str]:
+        """Async variant of ``_generate_hypothetical_documents`` using concurrent ``acomplete`` calls."""
+        cached = self.cache.get(self._cache_key(query))
+        if cached is not None:
+            return cached
+
+        requests = self._generation_requests(query)
+        generated = await asyncio.gather(*(self._acomplete(prompt, temp) for prompt, temp in requests))
+        return self._finish_generation(query, list(generated))
+
+    def _search_texts(self, query: str, hypothetical_docs: list[str]) -> list[str]:
+        """Texts to search: the original query first (if enabled), then the hypothetical documents."""
+        return ([query] if self.config.include_original_query else []) + hypothetical_docs
+
+    def _batch_request(self, embeddings: list[list[float]]) -> list[rest.QueryRequest]:
+        return [
+            rest.QueryRequest(
+                query=embedding,
+                using=self.vector_store.dense_vector_name,
+                limit=self.similarity_top_k,
+                with_payload=True,
+            )
+            for embedding in embeddings
+        ]
+
+    def _to_nodes(self, points) -> list[NodeWithScore]:
+        result = self.vector_store.parse_to_query_result(points)
+        return [NodeWithScore(node=node, score=score) for node, score in zip(result.nodes, result.similarities)]
+
+    @property
+    def _batch_search_available(self) -> bool:
+        return self.vector_store is not None and self.embed_model is not None
+
+    def _search(self, texts: list[str]) -> list[list[NodeWithScore]]:
+        """Search all texts: one embedding batch and one Qdrant batch query when available."""
+        if not self._batch_search_available:
+            return [self.base_retriever.retrieve(QueryBundle(query_str=text)) for text in texts]
+
+        # Query and hypothetical documents are embedded together (same model for queries and texts)
+        embeddings = self.embed_model.get_text_embedding_batch(texts)
+        responses = self.vector_store.client.query_batch_points(
+            collection_name=self.vector_store.collection_name, requests=self._batch_request(embeddings)
+        )
+        return [self._to_nodes(response.points) for response in responses]
+
+    async def _asearch(self, texts: list[str]) -> list[list[NodeWithScore]]:
+        """Async variant of ``_search``."""
+        aclient = getattr(self.vector_store, "_aclient", None)
+        if not self._batch_search_available or aclient is None:
+            return list(
+                await asyncio.gather(*(self.base_retriever.aretrieve(QueryBundle(query_str=t)) for t in texts))
+            )
+
+        embeddings = await self.embed_model.aget_text_embedding_batch(texts)
+        responses = await aclient.query_batch_points(
+            collection_name=self.vector_store.collection_name, requests=self._batch_request(embeddings)
+        )
+        return [self._to_nodes(response.points) for response in responses]
 
-                hypothetical_doc = response.text.strip()
+    def _fuse_results(self, results: list[list[NodeWithScore]]) -> list[NodeWithScore]:
+        """Fuse per-text results: best score over hypothetical docs, weighted with the original query."""
+        if self.config.include_original_query:
+            original_nodes, hypothetical_results = results[0], results[1:]
+        else:
+            original_nodes, hypothetical_results = [], results
 
-                # Add variation prompt for subsequent documents
-                if i > 0:
-                    variation_prompt = f"Provide another perspective on: {query}\n\nAlternative answer:"
-                    response = self.llm.complete(
-                        variation_prompt, temperature=min(temp, 1.0), max_tokens=self.config.hypothetical_doc_max_tokens
-                    )
-                    hypothetical_doc = response.text.strip()
+        node_scores = {}  # Track best score for each node
 
-                hypothetical_docs.append(hypothetical_doc)
-                logger.debug(f"Generated hypothetical doc {i + 1}: {hypothetical_doc[:100]}...")
+        # Retrieve with hypothetical documents
+        for nodes in hypothetical_results:
+            for node in nodes:
+                node_id = node.node.id_
+                if node_id not in node_scores or node.score > node_scores[node_id][1]:
+                    node_scores[node_id] = (node, node.score)
 
-            except Exception as e:
-                logger.warning(f"Failed to generate hypothetical doc {i + 1}: {str(e)}")
-                continue
+        # Optionally include results from original query
+        for node in original_nodes:
+            node_id = node.node.id_
+            # Weighted combination of scores
+            original_score = node.score * self.config.fusion_weight
+
+            if node_id in node_scores:
+                # Combine scores
+                combined_score = node_scores[node_id][1] * (1 - self.config.fusion_weight) + original_score
+                node_scores[node_id] = (node, combined_score)
+            else:
+                node_scores[node_id] = (node, original_score)
+
+        # Sort by score and return nodes with updated scores
+        sorted_nodes = sorted(node_scores.values(), key=lambda x: x[1], reverse=True)
+        result_nodes = [NodeWithScore(node=node.node, score=score) for node, score in sorted_nodes]
 
-        return hypothetical_docs
+        logger.info(f"HyDE retrieved {len(result_nodes)} unique nodes")
+        return result_nodes
 
     def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
         """
@@ -150,50 +363,20 @@ Business Analysis:""",
             logger.warning("No hypothetical documents generated, falling back to direct retrieval")
             return self.base_retriever.retrieve(query_bundle)
 
-        # Retrieve using each hypothetical document
-        node_scores = {}  # Track best score for each node
-
-        # Retrieve with hypothetical documents
-        for hypo_doc in hypothetical_docs:
-            hypo_bundle = QueryBundle(query_str=hypo_doc)
-            nodes = self.base_retriever.retrieve(hypo_bundle)
-
-            for node in nodes:
-                node_id = node.node.id_
-                if node_id not in node_scores or node.score > node_scores[node_id][1]:
-                    node_scores[node_id] = (node, node.score)
-
-        # Optionally include results from original query
-        if self.config.include_original_query:
-            original_nodes = self.base_retriever.retrieve(query_bundle)
-
-            for node in original_nodes:
-                node_id = node.node.id_
-                # Weighted combination of scores
-                original_score = node.score * self.config.fusion_weight
-
-                if node_id in node_scores:
-                    # Combine scores
-                    combined_score = node_scores[node_id][1] * (1 - self.config.fusion_weight) + original_score
-                    node_scores[node_id] = (node, combined_score)
-                else:
-                    node_scores[node_id] = (node, original_score)
+        return self._fuse_results(self._search(self._search_texts(query, hypothetical_docs)))
 
-        # Sort by score and return top results
-        sorted_nodes = sorted(node_scores.values(), key=lambda x: x[1], reverse=True)
+    async def _aretrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        """Async retrieve: concurrent generation and a single batched search."""
+        query = query_bundle.query_str
+        logger.info(f"HyDE retrieval for query: {query[:100]}...")
 
-        # Return nodes with updated scores
-        result_nodes = []
-        for node, score in sorted_nodes:
-            result_node = NodeWithScore(node=node.node, score=score)
-            result_nodes.append(result_node)
+        hypothetical_docs = await self._agenerate_hypothetical_documents(query)
 
-        logger.info(f"HyDE retrieved {len(result_nodes)} unique nodes")
-        return result_nodes
+        if not hypothetical_docs:
+            logger.warning("No hypothetical documents generated, falling back to direct retrieval")
+            return await self.base_retriever.aretrieve(query_bundle)
 
-    async def _aretrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
-        """Async retrieve - delegates to sync for now."""
-        return self._retrieve(query_bundle)
+        return self._fuse_results(await self._asearch(self._search_texts(query, hypothetical_docs)))
 
 
 class AdaptiveHyDERetriever(HyDERetriever):
@@ -215,8 +398,16 @@ class AdaptiveHyDERetriever(HyDERetriever):
         Returns:
             Retrieved nodes
         """
-        query = query_bundle.query_str
+        self._adapt_config(query_bundle.query_str)
+        return super()._retrieve(query_bundle)
 
+    async def _aretrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        """Async retrieve with adaptive HyDE strategy."""
+        self._adapt_config(query_bundle.query_str)
+        return await super()._aretrieve(query_bundle)
+
+    def _adapt_config(self, query: str) -> None:
+        """Adjust HyDE parameters to the query type."""
         # Classify query type
         query_type = self.query_classifier.classify(query)
 
@@ -239,8 +430,6 @@ class AdaptiveHyDERetriever(HyDERetriever):
             self.config.temperature = 0.0
             self.config.hypothetical_doc_max_tokens = 512
 
-        return super()._retrieve(query_bundle)
-
 
 class QueryClassifier:
     """Simple query classifier for adaptive HyDE."""
@@ -295,9 +484,15 @@ class HyDEQueryEngine:
         # Create base retriever
         base_retriever = index.as_retriever()
 
-        # Wrap with HyDE
+        # Wrap with HyDE; searches go to Qdrant as one batch request when the store supports it
+        vector_store = index.vector_store if hasattr(index.vector_store, "parse_to_query_result") else None
         self.hyde_retriever = HyDERetriever(
-            base_retriever=base_retriever, llm=self.llm, config=hyde_config, domain=domain
+            base_retriever=base_retriever,
+            llm=self.llm,
+            config=hyde_config,
+            domain=domain,
+            vector_store=vector_store,
+            embed_model=getattr(index, "_embed_model", None) if vector_store is not None else None,
         )
 
         # Create query engine with HyDE retriever
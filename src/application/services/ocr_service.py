@@ -0,0 +1,249 @@
+"""OCR service: bounded tesseract worker pool with a persistent result cache.
+
+Used for scanned PDF pages (only pages whose text layer is too thin) and for uploaded images.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+import logging
+import os
+import threading
+from typing import Any, Callable, Optional
+
+import fitz  # PyMuPDF
+
+try:
+    from PIL import Image
+    import pytesseract
+    PYTESSERACT_AVAILABLE = True
+except ImportError:
+    PYTESSERACT_AVAILABLE = False
+    pytesseract = None
+
+from config.settings import settings
+from src.infrastructure.performance.ocr_cache import OCRCache, get_ocr_cache
+
+logger = logging.getLogger(__name__)
+
+# Pages rendered and queued at once per worker (bounds memory for long scans)
+PAGES_PER_WORKER_BATCH = 4
+
+
+@dataclass
+class OCRResult:
+    """Text recognized in one image."""
+    text: str
+    data: Optional[dict[str, Any]] = None  # Word-level output of image_to_data, when requested
+    dpi: Optional[int] = None  # Render resolution, for PDF pages
+    cached: bool = False
+    error: Optional[str] = None
+
+
+def configure_tesseract() -> None:
+    """Point pytesseract at the default Windows install when tesseract is not on PATH."""
+    if os.name == 'nt' and PYTESSERACT_AVAILABLE:
+        tesseract_paths = [
+            r'C:\Program Files\Tesseract-OCR\tesseract.exe',
+            r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe',
+            r'C:\Tesseract-OCR\tesseract.exe'
+        ]
+        for path in tesseract_paths:
+            if os.path.exists(path):
+                pytesseract.pytesseract.tesseract_cmd = path
+                break
+
+
+def text_from_ocr_data(data: dict[str, list]) -> str:
+    """Page text from image_to_data output: one line per tesseract line, blank lines between paragraphs."""
+    lines: list[str] = []
+    line_key = paragraph_key = None
+    for i, word in enumerate(data.get('text', [])):
+        word = str(word).strip()
+        if not word:
+            continue
+        paragraph = (data['block_num'][i], data['par_num'][i])
+        line = paragraph + (data['line_num'][i],)
+        if line != line_key:
+            if lines and paragraph != paragraph_key:
+                lines.append("")
+            lines.append(word)
+            line_key, paragraph_key = line, paragraph
+        else:
+            lines[-1] = f"{lines[-1]} {word}"
+    return "\n".join(lines)
+
+
+def run_tesseract(image: bytes, language: str, with_data: bool = False) -> tuple[str, Optional[dict]]:
+    """OCR an encoded image; returns (text, word-level data or None)."""
+    if not PYTESSERACT_AVAILABLE:
+        raise RuntimeError("pytesseract not available")
+    with Image.open(BytesIO(image)) as img:
+        if not with_data:
+            return pytesseract.image_to_string(img, lang=language), None
+        # One tesseract pass: the text is rebuilt from the word boxes
+        data = pytesseract.image_to_data(img, lang=language, output_type=pytesseract.Output.DICT)
+    return text_from_ocr_data(data), data
+
+
+def page_ocr_dpi(page: "fitz.Page",
+                 default_dpi: int = 300,
+                 min_dpi: int = 150,
+                 max_dpi: int = 400) -> int:
+    """Render resolution for OCR of a PDF page.
+
+    Scanned pages are rendered at the native resolution of their largest image (more pixels
+    than the scan holds only slows tesseract down), clamped to [min_dpi, max_dpi].
+    """
+    page_width_inches = page.rect.width / 72
+    best_dpi = None
+    largest_area = 0
+    for image in page.get_images(full=True):
+        width, height = image[2], image[3]
+        if width * height > largest_area and page_width_inches > 0:
+            largest_area = width * height
+            best_dpi = width / page_width_inches
+    dpi = best_dpi if best_dpi else default_dpi
+    return int(min(max(dpi, min_dpi), max_dpi))
+
+
+class OCRService:
+    """Runs OCR in a bounded worker pool, serving repeated images from the cache."""
+
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 cache: Optional[OCRCache] = None,
+                 ocr_fn: Optional[Callable[[bytes, str, bool], tuple[str, Optional[dict]]]] = None):
+        """
+        Initialize OCR service.
+
+        Args:
+            max_workers: Concurrent tesseract processes (defaults from settings)
+            cache: Result cache; None disables caching
+            ocr_fn: OCR function (image bytes, language, with_data) -> (text, data)
+        """
+        self.max_workers = max(1, max_workers if max_workers is not None else settings.ocr_max_workers)
+        self.cache = cache
+        self.ocr_fn = ocr_fn or run_tesseract
+        # Tesseract's own OpenMP threads would oversubscribe the cores next to our workers
+        if self.max_workers > 1:
+            os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+        configure_tesseract()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ocr")
+
+    def ocr_images(self, images: list[bytes], language: str, with_data: bool = False) -> list[OCRResult]:
+        """
+        OCR encoded images (PNG, JPEG, ...), in parallel.
+
+        Args:
+            images: Encoded images
+            language: Tesseract language(s), e.g. 'ita+eng'
+            with_data: Also return word-level data (image_to_data)
+
+        Returns:
+            One OCRResult per image, in order; failures carry ``error`` and empty text
+        """
+        if not images:
+            return []
+
+        keys = [OCRCache.make_key(language, image) for image in images]
+        cached = self.cache.get_many(keys, with_data=with_data) if self.cache else {}
+
+        # Identical images in one call are recognized once
+        missing = {key: image for key, image in zip(keys, images) if key not in cached}
+        futures = {
+            key: self._executor.submit(self.ocr_fn, image, language, with_data) for key, image in missing.items()
+        }
+
+        computed: dict[str, tuple[str, Optional[dict]]] = {}
+        errors: dict[str, str] = {}
+        for key, future in futures.items():
+            try:
+                computed[key] = future.result()
+            except Exception as e:
+                logger.error(f"OCR failed: {e}")
+                errors[key] = str(e)
+
+        if self.cache and computed:
+            self.cache.set_many(language, computed)
+
+        results = []
+        for key in keys:
+            if key in cached:
+                text, data = cached[key]
+                results.append(OCRResult(text=text, data=data, cached=True))
+            elif key in computed:
+                text, data = computed[key]
+                results.append(OCRResult(text=text, data=data))
+            else:
+                results.append(OCRResult(text="", error=errors.get(key)))
+        return results
+
+    def ocr_image(self, image: bytes, language: str, with_data: bool = False) -> OCRResult:
+        """OCR a single encoded image."""
+        return self.ocr_images([image], language, with_data)[0]
+
+    def ocr_pdf_pages(self,
+                      file_path: str,
+                      page_numbers: list[int],
+                      language: str,
+                      with_data: bool = False) -> dict[int, OCRResult]:
+        """
+        Rasterize the given PDF pages at an adaptive DPI and OCR them.
+
+        Args:
+            file_path: Path to PDF file
+            page_numbers: 1-based pages to OCR (typically those without a usable text layer)
+            language: Tesseract language(s)
+            with_data: Also return word-level data (for tables on scanned pages)
+
+        Returns:
+            {page_number: OCRResult}
+        """
+        results: dict[int, OCRResult] = {}
+        if not page_numbers:
+            return results
+
+        batch_size = self.max_workers * PAGES_PER_WORKER_BATCH
+        with fitz.open(file_path) as doc:
+            for start in range(0, len(page_numbers), batch_size):
+                rendered, images, dpis = [], [], []
+                for page_number in page_numbers[start:start + batch_size]:
+                    try:
+                        page = doc[page_number - 1]
+                        dpi = page_ocr_dpi(page, settings.ocr_default_dpi, settings.ocr_min_dpi, settings.ocr_max_dpi)
+                        pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+                        images.append(pixmap.tobytes("png"))
+                    except Exception as e:
+                        # One unrenderable page must not cost the OCR of the others
+                        logger.error(f"Rendering page {page_number} of {file_path} for OCR failed: {e}")
+                        results[page_number] = OCRResult(text="", error=str(e))
+                        continue
+                    rendered.append(page_number)
+                    dpis.append(dpi)
+
+                for page_number, dpi, result in zip(rendered, dpis, self.ocr_images(images, language, with_data)):
+                    result.dpi = dpi
+                    results[page_number] = result
+
+        cached = sum(1 for result in results.values() if result.cached)
+        logger.info(f"OCR of {len(results)} pages in {file_path} ({cached} from cache)")
+        return results
+
+
+# Shared OCR service (one bounded pool per process)
+_ocr_service: Optional[OCRService] = None
+_ocr_service_lock = threading.Lock()
+
+
+def get_ocr_service() -> OCRService:
+    """Get singleton OCR service configured from settings."""
+    global _ocr_service
+    with _ocr_service_lock:
+        if _ocr_service is None:
+            cache = (
+                get_ocr_cache(settings.ocr_cache_path, settings.ocr_cache_max_mb * 1024 * 1024)
+                if settings.ocr_cache_enabled else None
+            )
+            _ocr_service = OCRService(cache=cache)
+        return _ocr_service
@@ -1,16 +1,21 @@
 """Ontology mapper for automatic metric synonym resolution."""
 
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 import re
+import threading
 from typing import Any, Optional
 
+import numpy as np
 import yaml
 
 try:
     from rapidfuzz import fuzz, process
     RAPIDFUZZ_AVAILABLE = True
+    CDIST_AVAILABLE = True  # Batch scoring (process.cdist) is rapidfuzz-only
 except ImportError:
+    CDIST_AVAILABLE = False
     try:
         from fuzzywuzzy import fuzz, process
         RAPIDFUZZ_AVAILABLE = True
@@ -24,6 +29,11 @@ logger = logging.getLogger(__name__)
 class OntologyMapper:
     """Maps financial terms to canonical metrics using ontology and fuzzy matching."""
 
+    # Mapped labels kept in memory: row labels recur across files, the ontology rarely changes
+    MAX_CACHED_MAPPINGS = 4096
+    # Threads used by process.cdist (-1 = all cores)
+    FUZZY_WORKERS = -1
+
     def __init__(self, ontology_path: str = None):
         """Initialize ontology mapper."""
         if ontology_path is None:
@@ -44,6 +54,10 @@ class OntologyMapper:
         self.ontology: dict[str, Any] = {}
         self.synonym_index: dict[str, str] = {}  # synonym -> canonical_metric
         self.canonical_metrics: dict[str, dict] = {}  # metric -> details
+        self._choices: list[str] = []  # synonym_index keys, in index order, for fuzzy scoring
+        # (clean_input, threshold, use_fuzzy) -> mapping, least recently used first
+        self._mapping_cache: OrderedDict[tuple[str, float, bool], Optional[dict[str, Any]]] = OrderedDict()
+        self._cache_lock = threading.Lock()
 
         self._load_ontology()
         self._build_synonym_index()
@@ -72,6 +86,10 @@ class OntologyMapper:
         # Handle both flat and hierarchical ontology structures
         self._process_ontology_section(self.ontology)
 
+        # Synonyms are cleaned at index time, so the keys are the pre-processed choice list
+        self._choices = list(self.synonym_index)
+        self._clear_mapping_cache()
+
     def _process_ontology_section(self, section: dict, prefix: str = "") -> None:
         """Process an ontology section recursively."""
         for key, value in section.items():
@@ -141,23 +159,21 @@ class OntologyMapper:
             return None
 
         clean_input = self._clean_text(input_text)
-
+        key = (clean_input, threshold, use_fuzzy)
+        found, mapping = self._cached_mapping(key)
+        if not found:
+            mapping = self._map_clean(clean_input, threshold, use_fuzzy)
+            self._cache_mapping(key, mapping)
+        return dict(mapping) if mapping else None
+
+    def _map_clean(self,
+                   clean_input: str,
+                   threshold: float,
+                   use_fuzzy: bool) -> Optional[dict[str, Any]]:
+        """Map an already cleaned label (exact lookup, then fuzzy)."""
         # Direct exact match
         if clean_input in self.synonym_index:
-            metric_key = self.synonym_index[clean_input]
-            metric_details = self.canonical_metrics[metric_key]
-            canonical_name = metric_details.get('canonical_name', metric_key)
-
-            return {
-                'metric_key': metric_key,
-                'canonical_name': canonical_name,
-                'confidence': 100.0,
-                'match_type': 'exact',
-                'category': metric_details.get('category'),
-                'subcategory': metric_details.get('subcategory'),
-                'unit': metric_details.get('unit'),
-                'calculation': metric_details.get('calculation')
-            }
+            return self._exact_mapping(clean_input)
 
         # Fuzzy matching if enabled and available
         if use_fuzzy and RAPIDFUZZ_AVAILABLE:
@@ -165,6 +181,43 @@ class OntologyMapper:
 
         return None
 
+    def _exact_mapping(self, clean_input: str) -> dict[str, Any]:
+        """Mapping for a label present in the synonym index."""
+        metric_key = self.synonym_index[clean_input]
+        metric_details = self.canonical_metrics[metric_key]
+        canonical_name = metric_details.get('canonical_name', metric_key)
+
+        return {
+            'metric_key': metric_key,
+            'canonical_name': canonical_name,
+            'confidence': 100.0,
+            'match_type': 'exact',
+            'category': metric_details.get('category'),
+            'subcategory': metric_details.get('subcategory'),
+            'unit': metric_details.get('unit'),
+            'calculation': metric_details.get('calculation')
+        }
+
+    def _fuzzy_mapping(self, clean_input: str, matched_synonym: str, score: float) -> dict[str, Any]:
+        """Mapping for a label resolved by fuzzy matching to ``matched_synonym``."""
+        metric_key = self.synonym_index[matched_synonym]
+        metric_details = self.canonical_metrics[metric_key]
+        canonical_name = metric_details.get('canonical_name', metric_key)
+
+        logger.debug(f"Fuzzy match: '{clean_input}' -> '{matched_synonym}' -> '{canonical_name}' (score: {score:.1f})")
+
+        return {
+            'metric_key': metric_key,
+            'canonical_name': canonical_name,
+            'confidence': float(score),
+            'match_type': 'fuzzy',
+            'matched_synonym': matched_synonym,
+            'category': metric_details.get('category'),
+            'subcategory': metric_details.get('subcategory'),
+            'unit': metric_details.get('unit'),
+            'calculation': metric_details.get('calculation')
+        }
+
     def _fuzzy_match(self,
                     clean_input: str,
                     threshold: float = 70.0) -> Optional[dict[str, Any]]:
@@ -175,45 +228,105 @@ class OntologyMapper:
         # Use rapidfuzz for fast fuzzy matching
         result = process.extractOne(
             clean_input,
-            self.synonym_index.keys(),
+            self._choices,
             scorer=fuzz.WRatio,  # Weighted ratio for better results
             score_cutoff=threshold
         )
 
         if result:
             matched_synonym, score, _ = result
-            metric_key = self.synonym_index[matched_synonym]
-            metric_details = self.canonical_metrics[metric_key]
-            canonical_name = metric_details.get('canonical_name', metric_key)
+            return self._fuzzy_mapping(clean_input, matched_synonym, score)
+
+        return None
 
-            logger.debug(f"Fuzzy match: '{clean_input}' -> '{matched_synonym}' -> '{canonical_name}' (score: {score:.1f})")
+    def _fuzzy_match_many(self,
+                          clean_inputs: list[str],
+                          threshold: float = 70.0) -> list[Optional[dict[str, Any]]]:
+        """Fuzzy match several cleaned labels with one multi-threaded ``process.cdist`` call.
 
-            return {
-                'metric_key': metric_key,
-                'canonical_name': canonical_name,
-                'confidence': float(score),
-                'match_type': 'fuzzy',
-                'matched_synonym': matched_synonym,
-                'category': metric_details.get('category'),
-                'subcategory': metric_details.get('subcategory'),
-                'unit': metric_details.get('unit'),
-                'calculation': metric_details.get('calculation')
-            }
+        Picks the same synonym as ``_fuzzy_match`` for every label (first choice with the best score).
+        """
+        if not clean_inputs or not self._choices:
+            return [None] * len(clean_inputs)
+        if not CDIST_AVAILABLE:
+            return [self._fuzzy_match(clean_input, threshold) for clean_input in clean_inputs]
+
+        scores = process.cdist(
+            clean_inputs,
+            self._choices,
+            scorer=fuzz.WRatio,
+            score_cutoff=threshold,
+            dtype=np.float64,  # Same precision as extractOne, so ties break identically
+            workers=self.FUZZY_WORKERS
+        )
+        best = scores.argmax(axis=1)
 
-        return None
+        mappings = []
+        for row, (clean_input, choice) in enumerate(zip(clean_inputs, best)):
+            score = scores[row, choice]
+            if clean_input and score >= threshold:
+                mappings.append(self._fuzzy_mapping(clean_input, self._choices[choice], score))
+            else:
+                mappings.append(None)
+        return mappings
 
     def batch_map_metrics(self,
                          input_texts: list[str],
                          threshold: float = 70.0) -> dict[str, Optional[dict[str, Any]]]:
-        """Map multiple texts to canonical metrics."""
-        results = {}
+        """Map multiple texts to canonical metrics.
 
+        Labels are cleaned and de-duplicated; repeats are served from the mapping cache and the
+        remaining fuzzy lookups are scored together.
+        """
+        cleaned = {text: self._clean_text(text) for text in input_texts if text}
+
+        mappings: dict[str, Optional[dict[str, Any]]] = {}
+        unresolved = []
+        for clean_input in dict.fromkeys(cleaned.values()):
+            found, mapping = self._cached_mapping((clean_input, threshold, True))
+            if found:
+                mappings[clean_input] = mapping
+            elif clean_input in self.synonym_index:
+                mappings[clean_input] = self._exact_mapping(clean_input)
+            else:
+                unresolved.append(clean_input)
+
+        if unresolved and RAPIDFUZZ_AVAILABLE:
+            mappings.update(zip(unresolved, self._fuzzy_match_many(unresolved, threshold)))
+        else:
+            mappings.update(dict.fromkeys(unresolved))
+
+        for clean_input, mapping in mappings.items():
+            self._cache_mapping((clean_input, threshold, True), mapping)
+
+        results = {}
         for text in input_texts:
-            mapping = self.map_metric(text, threshold)
-            results[text] = mapping
+            mapping = mappings.get(cleaned[text]) if text else None
+            results[text] = dict(mapping) if mapping else None
 
         return results
 
+    def _cached_mapping(self, key: tuple[str, float, bool]) -> tuple[bool, Optional[dict[str, Any]]]:
+        """Look up a mapping (``None`` is a valid cached miss); returns (found, mapping)."""
+        with self._cache_lock:
+            if key not in self._mapping_cache:
+                return False, None
+            self._mapping_cache.move_to_end(key)
+            return True, self._mapping_cache[key]
+
+    def _cache_mapping(self, key: tuple[str, float, bool], mapping: Optional[dict[str, Any]]) -> None:
+        """Store a mapping, evicting the least recently used entries beyond MAX_CACHED_MAPPINGS."""
+        with self._cache_lock:
+            self._mapping_cache[key] = mapping
+            self._mapping_cache.move_to_end(key)
+            while len(self._mapping_cache) > self.MAX_CACHED_MAPPINGS:
+                self._mapping_cache.popitem(last=False)
+
+    def _clear_mapping_cache(self) -> None:
+        """Drop cached mappings (they point into the previous synonym index)."""
+        with self._cache_lock:
+            self._mapping_cache.clear()
+
     # Backward compatibility alias
     def map_metrics_batch(self,
                          input_texts: list[str],
@@ -398,7 +511,7 @@ class OntologyMapper:
     def reload_ontology(self) -> None:
         """Reload ontology from file (useful for hot-reloading)."""
         self._load_ontology()
-        self._build_synonym_index()
+        self._build_synonym_index()  # Also rebuilds the fuzzy choices and clears the mapping cache
         logger.info("Ontology reloaded")
 
     def get_stats(self) -> dict[str, Any]:
@@ -426,3 +539,17 @@ class OntologyMapper:
             'units': list(units),
             'calculable_metrics': calculable_count
         }
+
+
+# Ontology shared by all tenants (read-only after load)
+_ontology_mapper = None
+_ontology_mapper_lock = threading.Lock()
+
+
+def get_ontology_mapper() -> OntologyMapper:
+    """Get singleton ontology mapper with the default ontology file."""
+    global _ontology_mapper
+    with _ontology_mapper_lock:
+        if _ontology_mapper is None:
+            _ontology_mapper = OntologyMapper()
+        return _ontology_mapper
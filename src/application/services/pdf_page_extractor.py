@@ -0,0 +1,456 @@
+"""Page-sharded PDF extraction shared by the RAG loader and the enterprise PDF processor.
+
+The page range of a document is split into shards; each shard is processed by one worker of a
+bounded process pool, which opens the file once for the whole range. Results are merged back in
+page order, so every page and table keeps its page number for provenance.
+
+When tables are requested, the text pass also scores every page for table evidence; only
+candidate pages are handed to a table engine, chosen per page from the engines' track record.
+"""
+
+from collections import Counter, defaultdict
+from collections.abc import Sequence
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+import logging
+import math
+import os
+from typing import Any, Callable, Optional
+
+import fitz  # PyMuPDF
+
+try:
+    import pdfplumber
+    PDFPLUMBER_AVAILABLE = True
+except ImportError:
+    PDFPLUMBER_AVAILABLE = False
+
+try:
+    import camelot
+    CAMELOT_AVAILABLE = True
+except ImportError:
+    CAMELOT_AVAILABLE = False
+
+try:
+    import tabula
+    TABULA_AVAILABLE = True
+except ImportError:
+    TABULA_AVAILABLE = False
+
+from src.application.services.table_detector import (
+    NUMERIC_TOKEN,
+    PageTableSignals,
+    TableDetector,
+    TableEngineSelector,
+    get_table_engine_selector,
+    page_table_signals,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PageTable:
+    """A table found on one page (plain data, so it can cross process boundaries)."""
+    page_number: int
+    table_index: int  # Position among the tables found by the method (renumbered in page order)
+    data: list[list[str]]
+    headers: Optional[list[str]] = None
+    extraction_method: str = ""
+    confidence: float = 0.0
+
+
+@dataclass
+class PageContent:
+    """Text and tables of one page."""
+    page_number: int
+    text: str = ""
+    tables: list[PageTable] = field(default_factory=list)
+    error: Optional[str] = None
+    table_signals: Optional[PageTableSignals] = None  # Set when tables were requested
+
+
+@dataclass
+class PDFPages:
+    """All pages of a document, in page order."""
+    file_path: str
+    page_count: int
+    metadata: dict[str, Any]
+    pages: list[PageContent]
+    table_method: Optional[str] = None  # Method that produced most tables, if any
+
+    @property
+    def tables(self) -> list[PageTable]:
+        """Tables of all pages, in page order."""
+        return [table for page in self.pages for table in page.tables]
+
+    @property
+    def errors(self) -> list[str]:
+        """Per-page extraction errors."""
+        return [f"Page {page.page_number}: {page.error}" for page in self.pages if page.error]
+
+
+def read_pdf_metadata(file_path: str) -> dict[str, Any]:
+    """Document-level metadata (page count, info dictionary, size)."""
+    with fitz.open(file_path) as doc:
+        return {
+            'page_count': len(doc),
+            'title': doc.metadata.get('title', ''),
+            'author': doc.metadata.get('author', ''),
+            'subject': doc.metadata.get('subject', ''),
+            'creator': doc.metadata.get('creator', ''),
+            'producer': doc.metadata.get('producer', ''),
+            'creation_date': str(doc.metadata.get('creationDate', '')),
+            'modification_date': str(doc.metadata.get('modDate', '')),
+            'file_size': os.path.getsize(file_path),
+            'is_encrypted': doc.is_encrypted,
+            'is_form': doc.is_form_pdf
+        }
+
+
+def _tables_camelot(file_path: str, page_numbers: list[int], flavor: str) -> list[PageTable]:
+    tables = camelot.read_pdf(
+        file_path, pages=",".join(str(number) for number in page_numbers), flavor=flavor, suppress_stdout=True
+    )
+    return [
+        PageTable(
+            page_number=int(table.page),
+            table_index=idx,
+            data=table.df.values.tolist(),
+            headers=table.df.columns.tolist() if not table.df.columns.empty else None,
+            extraction_method=f"camelot_{flavor}",
+            confidence=table.accuracy
+        )
+        for idx, table in enumerate(tables)
+        if not table.df.empty
+    ]
+
+
+def _tables_tabula(file_path: str, page_numbers: list[int]) -> list[PageTable]:
+    # DataFrames lose the page of each table; the JSON output keeps it, so pages can be batched
+    raw_tables = tabula.read_pdf(
+        file_path,
+        pages=page_numbers,
+        multiple_tables=True,
+        output_format="json",
+        silent=True
+    )
+    tables = []
+    for idx, raw_table in enumerate(raw_tables):
+        data = [[cell.get("text", "") for cell in row] for row in raw_table.get("data", [])]
+        if any(any(row) for row in data):
+            tables.append(PageTable(
+                page_number=int(raw_table["page_number"]),
+                table_index=idx,
+                data=data,
+                extraction_method="tabula",
+                confidence=0.7  # Tabula doesn't provide confidence
+            ))
+    return tables
+
+
+def _tables_pdfplumber(file_path: str, page_numbers: list[int]) -> list[PageTable]:
+    tables = []
+    with pdfplumber.open(file_path, pages=page_numbers) as pdf:
+        for page in pdf.pages:
+            for idx, table_data in enumerate(page.extract_tables()):
+                if not table_data:
+                    continue
+
+                # Clean None values; first non-empty row is the header
+                rows = [[cell if cell else "" for cell in row] for row in table_data]
+                headers = rows[0] if any(rows[0]) else None
+                data = rows[1:] if any(rows[0]) else rows
+                if data:
+                    tables.append(PageTable(
+                        page_number=page.page_number,
+                        table_index=idx,
+                        data=data,
+                        headers=headers,
+                        extraction_method="pdfplumber",
+                        confidence=0.6  # Lower confidence for fallback
+                    ))
+    return tables
+
+
+def tables_from_ocr_words(data: dict[str, list], page_number: int, min_numeric_rows: int) -> list[PageTable]:
+    """Tables in the word boxes tesseract found on a scanned page (image_to_data output).
+
+    Scans have no text layer for the table engines to read, so tables are rebuilt from the word
+    positions: words are grouped into rows by vertical center, rows into cells at wide gaps, and
+    runs of at least ``min_numeric_rows`` rows holding two or more numbers form a table whose
+    columns are the merged horizontal extents of its cells.
+    """
+    words = [
+        (int(data['left'][i]), int(data['top'][i]), int(data['width'][i]), int(data['height'][i]),
+         str(text).strip(), float(data['conf'][i]))
+        for i, text in enumerate(data.get('text', []))
+        if str(text).strip() and float(data['conf'][i]) >= 0
+    ]
+    if not words:
+        return []
+
+    # Row tolerance and cell gap scale with the text height (and so with the render DPI)
+    heights = sorted(word[3] for word in words)
+    line_height = max(heights[len(heights) // 2], 1)
+
+    rows: list[list[tuple]] = []
+    for word in sorted(words, key=lambda word: word[1] + word[3] / 2):
+        center = word[1] + word[3] / 2
+        if rows and abs(center - (rows[-1][0][1] + rows[-1][0][3] / 2)) <= line_height / 2:
+            rows[-1].append(word)
+        else:
+            rows.append([word])
+
+    # Cells: (left, right, text, confidences); a gap wider than a line height separates cells
+    row_cells: list[list[tuple[int, int, str, list[float]]]] = []
+    for row in rows:
+        cells: list[tuple[int, int, str, list[float]]] = []
+        for left, _, width, _, text, conf in sorted(row):
+            if cells and left - cells[-1][1] <= line_height:
+                cell_left, _, cell_text, confs = cells[-1]
+                cells[-1] = (cell_left, left + width, f"{cell_text} {text}", confs + [conf])
+            else:
+                cells.append((left, left + width, text, [conf]))
+        row_cells.append(cells)
+
+    def is_numeric_row(cells: list[tuple]) -> bool:
+        return sum(1 for cell in cells if NUMERIC_TOKEN.match(cell[2].replace(" ", ""))) >= 2
+
+    runs: list[list[list[tuple]]] = []
+    current: list[list[tuple]] = []
+    for cells in row_cells + [[]]:
+        if is_numeric_row(cells):
+            current.append(cells)
+            continue
+        if len(current) >= min_numeric_rows:
+            runs.append(current)
+        current = []
+
+    tables = []
+    for idx, run in enumerate(runs):
+        spans: list[list[int]] = []
+        for left, right, _, _ in sorted(cell for cells in run for cell in cells):
+            if spans and left <= spans[-1][1]:
+                spans[-1][1] = max(spans[-1][1], right)
+            else:
+                spans.append([left, right])
+
+        data_rows = []
+        confidences = []
+        for cells in run:
+            values = [""] * len(spans)
+            for left, _, text, confs in cells:
+                column = next(i for i, (_, span_right) in enumerate(spans) if left <= span_right)
+                values[column] = f"{values[column]} {text}".strip()
+                confidences.extend(confs)
+            data_rows.append(values)
+
+        tables.append(PageTable(
+            page_number=page_number,
+            table_index=idx,
+            data=data_rows,
+            extraction_method="tesseract_words",
+            confidence=round(sum(confidences) / len(confidences) / 100, 2)
+        ))
+    return tables
+
+
+# Table extraction methods in order of accuracy: name -> (available, extractor for 1-based pages)
+TABLE_METHODS: dict[str, tuple[bool, Callable[[str, list[int]], list[PageTable]]]] = {
+    'camelot_lattice': (CAMELOT_AVAILABLE, lambda path, pages: _tables_camelot(path, pages, 'lattice')),
+    'camelot_stream': (CAMELOT_AVAILABLE, lambda path, pages: _tables_camelot(path, pages, 'stream')),
+    'tabula': (TABULA_AVAILABLE, _tables_tabula),
+    'pdfplumber': (PDFPLUMBER_AVAILABLE, _tables_pdfplumber),
+}
+
+
+def extract_page_range(file_path: str,
+                       start: int,
+                       stop: int,
+                       detect_tables: bool = False) -> list[PageContent]:
+    """Extract the text of pages ``start``..``stop - 1`` (0-based) opening the file once.
+
+    With ``detect_tables`` each page also gets its table signals. Runs inside pool workers,
+    so it only takes and returns picklable values.
+    """
+    pages = [PageContent(page_number=number + 1) for number in range(start, stop)]
+
+    with fitz.open(file_path) as doc:
+        for page in pages:
+            try:
+                fitz_page = doc[page.page_number - 1]
+                page.text = fitz_page.get_text()
+                if detect_tables:
+                    page.table_signals = page_table_signals(fitz_page, page.page_number)
+            except Exception as e:
+                page.error = str(e)
+
+    return pages
+
+
+def extract_tables(file_path: str, page_numbers: list[int], method: str) -> list[PageTable]:
+    """Extract tables from the given 1-based pages with one method (runs inside pool workers)."""
+    try:
+        return TABLE_METHODS[method][1](file_path, page_numbers)
+    except Exception as e:
+        logger.warning(f"{method} table extraction failed on pages {page_numbers}: {e}")
+        return []
+
+
+class PDFPageExtractor:
+    """Extracts text (and optionally tables) page by page, sharding large PDFs over a process pool."""
+
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 parallel_min_pages: Optional[int] = None,
+                 min_pages_per_shard: Optional[int] = None,
+                 max_table_engines: Optional[int] = None,
+                 table_detector: Optional[TableDetector] = None,
+                 engine_selector: Optional[TableEngineSelector] = None):
+        """
+        Initialize extractor.
+
+        Args:
+            max_workers: Pool size; 1 extracts in-process (defaults from settings)
+            parallel_min_pages: PDFs with fewer pages are extracted in-process
+            min_pages_per_shard: Smallest page range handed to a worker
+            max_table_engines: Engines tried on a candidate page before giving up on it
+            table_detector: Decides which pages go to a table engine
+            engine_selector: Engine track record per page layout (defaults to the shared one)
+        """
+        from config.settings import settings
+
+        self.max_workers = max_workers if max_workers is not None else settings.pdf_extraction_max_workers
+        self.parallel_min_pages = (
+            parallel_min_pages if parallel_min_pages is not None else settings.pdf_parallel_min_pages
+        )
+        self.min_pages_per_shard = max(
+            1, min_pages_per_shard if min_pages_per_shard is not None else settings.pdf_min_pages_per_shard
+        )
+        self.max_table_engines = max(
+            1, max_table_engines if max_table_engines is not None else settings.pdf_table_max_engines
+        )
+        self.table_detector = table_detector or TableDetector()
+        self.engine_selector = engine_selector or get_table_engine_selector()
+
+    def extract(self, file_path: str, table_methods: Sequence[str] = ()) -> PDFPages:
+        """
+        Extract all pages of a PDF.
+
+        Args:
+            file_path: Path to PDF file
+            table_methods: Table extraction methods allowed; each candidate page is sent to the
+                one with the best record on its layout, and to the next one only if it found nothing
+
+        Returns:
+            PDFPages with one entry per page, in page order
+        """
+        metadata = read_pdf_metadata(file_path)
+        page_count = metadata['page_count']
+        methods = [method for method in table_methods if TABLE_METHODS.get(method, (False,))[0]]
+
+        calls = [(file_path, start, stop, bool(methods)) for start, stop in self._shards(page_count)]
+        pages = [page for shard in self._map(extract_page_range, calls) for page in shard]
+
+        table_method = None
+        if methods:
+            self._extract_tables(file_path, pages, methods)
+            tables = [table for page in pages for table in page.tables]
+            if tables:
+                # One running index in page order, as for a whole-file run
+                for idx, table in enumerate(tables):
+                    table.table_index = idx
+                counts = Counter(table.extraction_method for table in tables)
+                table_method = counts.most_common(1)[0][0]
+                logger.info(f"Extracted {len(tables)} tables ({dict(counts)})")
+
+        return PDFPages(
+            file_path=file_path,
+            page_count=page_count,
+            metadata=metadata,
+            pages=pages,
+            table_method=table_method
+        )
+
+    def _extract_tables(self, file_path: str, pages: list[PageContent], methods: list[str]) -> None:
+        """Send candidate pages to table engines, in parallel, filling ``page.tables``."""
+        pending = [page for page in pages if self.table_detector.is_candidate(page.table_signals)]
+        logger.info(f"Table detection: {len(pending)} of {len(pages)} pages are candidates")
+
+        tried: dict[int, set[str]] = defaultdict(set)
+        for _ in range(min(self.max_table_engines, len(methods))):
+            if not pending:
+                break
+
+            # Each page goes to the best engine for its layout that has not seen it yet
+            assignments: dict[tuple[str, str], list[PageContent]] = defaultdict(list)
+            for page in pending:
+                layout = page.table_signals.layout
+                method = next(
+                    method for method in self.engine_selector.rank(layout, methods)
+                    if method not in tried[page.page_number]
+                )
+                assignments[(method, layout)].append(page)
+
+            calls = []
+            for (method, _), assigned in assignments.items():
+                calls.extend(
+                    (file_path, batch, method) for batch in self._batches([page.page_number for page in assigned])
+                )
+            by_number = {page.page_number: page for page in pending}
+            for tables in self._map(extract_tables, calls):
+                for table in tables:
+                    if table.page_number in by_number:
+                        by_number[table.page_number].tables.append(table)
+
+            for (method, layout), assigned in assignments.items():
+                self.engine_selector.record(
+                    layout, method, tried=len(assigned), found=sum(1 for page in assigned if page.tables)
+                )
+                for page in assigned:
+                    tried[page.page_number].add(method)
+
+            pending = [page for page in pending if not page.tables]
+
+    def _shards(self, page_count: int) -> list[tuple[int, int]]:
+        """Split pages into contiguous ranges, about one per worker."""
+        if page_count == 0:
+            return []
+        if self.max_workers <= 1 or page_count < self.parallel_min_pages:
+            return [(0, page_count)]
+        size = max(self.min_pages_per_shard, math.ceil(page_count / self.max_workers))
+        return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+    def _batches(self, page_numbers: list[int]) -> list[list[int]]:
+        """Split candidate pages for one engine into about one batch per worker."""
+        size = max(1, math.ceil(len(page_numbers) / max(1, self.max_workers)))
+        return [page_numbers[start:start + size] for start in range(0, len(page_numbers), size)]
+
+    def _map(self, fn: Callable[..., Any], calls: list[tuple]) -> list[Any]:
+        """Run ``fn`` once per argument tuple, over the process pool when there is more than one call."""
+        if len(calls) <= 1 or self.max_workers <= 1:
+            return [fn(*args) for args in calls]
+
+        from src.infrastructure.performance.process_pool import get_process_pool, shutdown_process_pool
+
+        try:
+            pool = get_process_pool(self.max_workers)
+            futures = [pool.submit(fn, *args) for args in calls]
+            return [future.result() for future in futures]
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Process pool unavailable ({e}), running {fn.__name__} in-process")
+            shutdown_process_pool(wait=False)
+            return [fn(*args) for args in calls]
+
+
+# Extractor shared by the RAG loader and the PDF processor
+_pdf_page_extractor: Optional[PDFPageExtractor] = None
+
+
+def get_pdf_page_extractor() -> PDFPageExtractor:
+    """Get singleton page extractor configured from settings."""
+    global _pdf_page_extractor
+    if _pdf_page_extractor is None:
+        _pdf_page_extractor = PDFPageExtractor()
+    return _pdf_page_extractor
@@ -3,36 +3,24 @@
 from dataclasses import dataclass
 from datetime import datetime
 import logging
-import os
 from pathlib import Path
-import tempfile
 from typing import Any, Optional
 
 # PDF processing libraries
 import fitz  # PyMuPDF
-import pdfplumber
 
-# Optional libraries for advanced features
-try:
-    import camelot
-    CAMELOT_AVAILABLE = True
-except ImportError:
-    CAMELOT_AVAILABLE = False
-
-try:
-    import tabula
-    TABULA_AVAILABLE = True
-except ImportError:
-    TABULA_AVAILABLE = False
+from config.settings import settings
+from src.application.services.ocr_service import OCRResult, OCRService, get_ocr_service
+from src.application.services.pdf_page_extractor import (
+    PDFPageExtractor,
+    PDFPages,
+    get_pdf_page_extractor,
+    read_pdf_metadata,
+    tables_from_ocr_words,
+)
+from src.domain.value_objects.source_reference import SourceReference
 
 # Import OCR libraries separately
-try:
-    import ocrmypdf
-    OCRMYPDF_AVAILABLE = True
-except ImportError:
-    OCRMYPDF_AVAILABLE = False
-    ocrmypdf = None
-
 try:
     import pytesseract
     PYTESSERACT_AVAILABLE = True
@@ -43,8 +31,6 @@ except ImportError:
 # OCR is available if at least pytesseract is available
 OCR_AVAILABLE = PYTESSERACT_AVAILABLE
 
-from src.domain.value_objects.source_reference import SourceReference
-
 logger = logging.getLogger(__name__)
 
 
@@ -119,10 +105,20 @@ class PDFExtractionResult:
 class PDFProcessor:
     """Advanced PDF processor with multiple extraction methods."""
 
+    # Table extraction methods behind each table_extraction_method option, in order of accuracy
+    TABLE_METHODS = {
+        'auto': ['camelot_lattice', 'camelot_stream', 'tabula', 'pdfplumber'],
+        'camelot': ['camelot_lattice', 'camelot_stream'],
+        'tabula': ['tabula'],
+        'pdfplumber': ['pdfplumber'],
+    }
+
     def __init__(self,
                  enable_ocr: bool = True,
                  ocr_language: str = 'ita+eng',
-                 table_extraction_method: str = 'auto'):
+                 table_extraction_method: str = 'auto',
+                 page_extractor: Optional[PDFPageExtractor] = None,
+                 ocr_service: Optional[OCRService] = None):
         """
         Initialize PDF processor.
 
@@ -130,10 +126,14 @@ class PDFProcessor:
             enable_ocr: Enable OCR for scanned PDFs
             ocr_language: Languages for OCR (ita+eng for Italian and English)
             table_extraction_method: 'camelot', 'tabula', 'pdfplumber', or 'auto'
+            page_extractor: Page-sharded extractor (defaults to the shared one)
+            ocr_service: OCR worker pool and cache (defaults to the shared one)
         """
         self.enable_ocr = enable_ocr
         self.ocr_language = ocr_language
         self.table_extraction_method = table_extraction_method
+        self.page_extractor = page_extractor or get_pdf_page_extractor()
+        self._ocr_service = ocr_service
 
         # Check Tesseract availability
         if enable_ocr and OCR_AVAILABLE and pytesseract is not None:
@@ -168,30 +168,44 @@ class PDFProcessor:
         start_time = datetime.now()
         errors = []
 
-        # Check if PDF needs OCR
-        needs_ocr = self._check_needs_ocr(file_path)
-        ocr_file_path = file_path
-
-        if needs_ocr and self.enable_ocr:
-            logger.info("PDF appears to be scanned, running OCR...")
-            ocr_file_path = self._run_ocr(file_path)
-            if ocr_file_path is None:
-                errors.append("OCR failed")
-                ocr_file_path = file_path
-
-        # Extract text
-        texts = self._extract_text(ocr_file_path, is_ocr=needs_ocr)
+        # Extract text and tables page by page (sharded over the process pool for large files)
+        texts: list[ExtractedText] = []
+        tables: list[ExtractedTable] = []
+        try:
+            table_methods = self.TABLE_METHODS.get(self.table_extraction_method, [])
+            pages = self.page_extractor.extract(file_path, table_methods=table_methods)
+            errors.extend(pages.errors)
+
+            # OCR only the pages whose text layer is too thin (scans inside otherwise digital PDFs)
+            ocr_pages: dict[int, OCRResult] = {}
+            if self.enable_ocr:
+                low_text_pages = self._pages_needing_ocr(pages)
+                if low_text_pages:
+                    logger.info(f"Running OCR on {len(low_text_pages)} of {pages.page_count} pages")
+                    try:
+                        # Word boxes let tables be rebuilt on scanned pages, which the table engines cannot read
+                        ocr_pages = self.ocr_service.ocr_pdf_pages(
+                            file_path, low_text_pages, self.ocr_language, with_data=bool(table_methods)
+                        )
+                    except Exception as e:
+                        # Keep the text layer of every page even when OCR is unavailable
+                        logger.error(f"OCR failed: {e}")
+                        errors.append(f"OCR failed: {e}")
+                    errors.extend(
+                        f"OCR failed on page {page_number}: {result.error}"
+                        for page_number, result in ocr_pages.items() if result.error
+                    )
 
-        # Extract tables
-        tables = self._extract_tables(ocr_file_path)
+            texts = self._texts_from_pages(pages, ocr_pages)
+            tables = self._tables_from_pages(pages, ocr_pages)
+            logger.info(f"Extracted text from {len(texts)} pages ({sum(t.is_ocr for t in texts)} with OCR)")
+        except Exception as e:
+            logger.error(f"Page extraction failed: {e}")
+            errors.append(f"Page extraction failed: {e}")
 
         # Extract metadata
         metadata = self._extract_metadata(file_path)
 
-        # Clean up OCR file if created
-        if ocr_file_path != file_path and os.path.exists(ocr_file_path):
-            os.remove(ocr_file_path)
-
         elapsed_time = (datetime.now() - start_time).total_seconds()
 
         return PDFExtractionResult(
@@ -204,292 +218,81 @@ class PDFProcessor:
             errors=errors if errors else None
         )
 
-    def _check_needs_ocr(self, file_path: str) -> bool:
-        """Check if PDF needs OCR (is scanned/image-based)."""
-        try:
-            doc = fitz.open(file_path)
-
-            # Sample first few pages
-            sample_pages = min(3, len(doc))
-            total_chars = 0
-
-            for i in range(sample_pages):
-                page = doc[i]
-                text = page.get_text()
-                total_chars += len(text.strip())
-
-            doc.close()
-
-            # If very little text extracted, likely needs OCR
-            avg_chars_per_page = total_chars / sample_pages if sample_pages > 0 else 0
-            needs_ocr = avg_chars_per_page < 100
-
-            logger.info(f"PDF OCR check: avg {avg_chars_per_page:.0f} chars/page, needs_ocr={needs_ocr}")
-            return needs_ocr
-
-        except Exception as e:
-            logger.error(f"Error checking OCR need: {e}")
-            return False
-
-    def _run_ocr(self, file_path: str) -> Optional[str]:
-        """Run OCR on PDF and return path to OCR'd file."""
-        try:
-            # Create temporary file for OCR output
-            with tempfile.NamedTemporaryFile(suffix='_ocr.pdf', delete=False) as tmp:
-                output_path = tmp.name
-
-            # Run OCR
-            if not OCR_AVAILABLE:
-                logger.warning("OCR libraries not available, skipping OCR")
-                return file_path
-
-            if not OCRMYPDF_AVAILABLE:
-                logger.warning("ocrmypdf not available, skipping PDF OCR processing")
-                return file_path
-
-            ocrmypdf.ocr(
-                file_path,
-                output_path,
-                language=self.ocr_language,
-                deskew=True,
-                clean=True,
-                force_ocr=False,  # Only OCR pages that need it
-                skip_text=True,   # Skip pages with existing text
-                optimize=1        # Optimize file size
-            )
-
-            logger.info(f"OCR completed: {output_path}")
-            return output_path
-
-        except Exception as e:
-            logger.error(f"OCR failed: {e}")
-            return None
-
-    def _extract_text(self, file_path: str, is_ocr: bool = False) -> list[ExtractedText]:
-        """Extract text from PDF using PyMuPDF."""
+    @property
+    def ocr_service(self) -> OCRService:
+        """OCR service, created on first use."""
+        if self._ocr_service is None:
+            self._ocr_service = get_ocr_service()
+        return self._ocr_service
+
+    def _pages_needing_ocr(self, pages: PDFPages) -> list[int]:
+        """Pages whose text layer has fewer than ``ocr_min_page_chars`` characters."""
+        return [
+            page.page_number for page in pages.pages
+            if not page.error and len(page.text.strip()) < settings.ocr_min_page_chars
+        ]
+
+    def _texts_from_pages(self,
+                          pages: PDFPages,
+                          ocr_pages: Optional[dict[int, OCRResult]] = None) -> list[ExtractedText]:
+        """Pages with text, with provenance; OCR text replaces a thin text layer when it found anything."""
         texts = []
+        ocr_pages = ocr_pages or {}
 
-        try:
-            doc = fitz.open(file_path)
-
-            for page_num, page in enumerate(doc, 1):
-                text = page.get_text()
-
-                if text.strip():
-                    source_ref = SourceReference(
-                        file_path=file_path,
-                        page_number=page_num,
-                        extraction_method="pymupdf_ocr" if is_ocr else "pymupdf"
-                    )
-
-                    texts.append(ExtractedText(
-                        page_number=page_num,
-                        text=text,
-                        extraction_method="pymupdf",
-                        is_ocr=is_ocr,
-                        source_ref=source_ref
-                    ))
-
-            doc.close()
-            logger.info(f"Extracted text from {len(texts)} pages")
-
-        except Exception as e:
-            logger.error(f"Text extraction failed: {e}")
-
-        return texts
-
-    def _extract_tables(self, file_path: str) -> list[ExtractedTable]:
-        """Extract tables using multiple methods with fallback."""
-        tables = []
-
-        if self.table_extraction_method == 'auto':
-            # Try methods in order of accuracy
-            methods = ['camelot', 'tabula', 'pdfplumber']
-        else:
-            methods = [self.table_extraction_method]
-
-        for method in methods:
-            if method == 'camelot':
-                tables = self._extract_tables_camelot(file_path)
-            elif method == 'tabula':
-                tables = self._extract_tables_tabula(file_path)
-            elif method == 'pdfplumber':
-                tables = self._extract_tables_pdfplumber(file_path)
-
-            if tables:
-                logger.info(f"Successfully extracted {len(tables)} tables using {method}")
-                break
-
-        return tables
-
-    def _extract_tables_camelot(self, file_path: str) -> list[ExtractedTable]:
-        """Extract tables using Camelot."""
-        tables = []
-
-        try:
-            # Try lattice method first (for tables with lines)
-            if CAMELOT_AVAILABLE:
-                lattice_tables = camelot.read_pdf(
-                    file_path,
-                    pages='all',
-                    flavor='lattice',
-                    suppress_stdout=True
-                )
-            else:
-                lattice_tables = None
-
-            if lattice_tables:
-                for idx, table in enumerate(lattice_tables):
-                    if table.df.empty:
-                        continue
+        for page in pages.pages:
+            ocr_result = ocr_pages.get(page.page_number)
+            is_ocr = bool(ocr_result and ocr_result.text.strip())
+            text = ocr_result.text if is_ocr else page.text
 
+            if text.strip():
                 source_ref = SourceReference(
-                    file_path=file_path,
-                    page_number=table.page,
-                    table_index=idx,
-                    extraction_method="camelot_lattice"
+                    file_path=pages.file_path,
+                    page_number=page.page_number,
+                    extraction_method=f"tesseract_ocr_{self.ocr_language}" if is_ocr else "pymupdf"
                 )
 
-                tables.append(ExtractedTable(
-                    page_number=table.page,
-                    table_index=idx,
-                    data=table.df.values.tolist(),
-                    headers=table.df.columns.tolist() if not table.df.columns.empty else None,
-                    extraction_method="camelot_lattice",
-                    confidence=table.accuracy,
+                texts.append(ExtractedText(
+                    page_number=page.page_number,
+                    text=text,
+                    extraction_method="tesseract" if is_ocr else "pymupdf",
+                    is_ocr=is_ocr,
                     source_ref=source_ref
                 ))
 
-            # Try stream method for tables without lines
-            if not tables and CAMELOT_AVAILABLE:
-                stream_tables = camelot.read_pdf(
-                    file_path,
-                    pages='all',
-                    flavor='stream',
-                    suppress_stdout=True
-                )
-
-                for idx, table in enumerate(stream_tables):
-                    if table.df.empty:
-                        continue
-
-                    source_ref = SourceReference(
-                        file_path=file_path,
-                        page_number=table.page,
-                        table_index=idx,
-                        extraction_method="camelot_stream"
-                    )
-
-                    tables.append(ExtractedTable(
-                        page_number=table.page,
-                        table_index=idx,
-                        data=table.df.values.tolist(),
-                        headers=table.df.columns.tolist() if not table.df.columns.empty else None,
-                        extraction_method="camelot_stream",
-                        confidence=table.accuracy,
-                        source_ref=source_ref
-                    ))
-
-        except Exception as e:
-            logger.warning(f"Camelot extraction failed: {e}")
-
-        return tables
+        return texts
 
-    def _extract_tables_tabula(self, file_path: str) -> list[ExtractedTable]:
-        """Extract tables using Tabula."""
+    def _tables_from_pages(self,
+                           pages: PDFPages,
+                           ocr_pages: Optional[dict[int, OCRResult]] = None) -> list[ExtractedTable]:
+        """Tables of all pages, in page order, with provenance; scanned pages get tables from their OCR words."""
         tables = []
 
-        try:
-            if not TABULA_AVAILABLE:
-                logger.warning("Tabula not available, skipping table extraction")
-                return []
-
-            # Read all tables from PDF
-            dfs = tabula.read_pdf(
-                file_path,
-                pages='all',
-                multiple_tables=True,
-                pandas_options={'header': None},
-                silent=True
-            )
-
-            # Get page numbers for each table
-            # Note: Tabula doesn't directly provide page numbers, so we estimate
-            for idx, df in enumerate(dfs):
-                if df.empty:
-                    continue
-
-                # Estimate page number (this is approximate)
-                page_num = idx + 1
-
-                source_ref = SourceReference(
-                    file_path=file_path,
-                    page_number=page_num,
-                    table_index=idx,
-                    extraction_method="tabula"
+        page_tables = list(pages.tables)
+        for page_number, ocr_result in (ocr_pages or {}).items():
+            if ocr_result.data:
+                page_tables.extend(
+                    tables_from_ocr_words(ocr_result.data, page_number, settings.pdf_table_min_numeric_rows)
                 )
+        page_tables.sort(key=lambda table: table.page_number)
+
+        # One running index in page order, as the page extractor numbers them
+        for idx, table in enumerate(page_tables):
+            source_ref = SourceReference(
+                file_path=pages.file_path,
+                page_number=table.page_number,
+                table_index=idx,
+                extraction_method=table.extraction_method
+            )
 
-                tables.append(ExtractedTable(
-                    page_number=page_num,
-                    table_index=idx,
-                    data=df.values.tolist(),
-                    headers=df.columns.tolist() if not df.columns.empty else None,
-                    extraction_method="tabula",
-                    confidence=0.7,  # Tabula doesn't provide confidence
-                    source_ref=source_ref
-                ))
-
-        except Exception as e:
-            logger.warning(f"Tabula extraction failed: {e}")
-
-        return tables
-
-    def _extract_tables_pdfplumber(self, file_path: str) -> list[ExtractedTable]:
-        """Extract tables using pdfplumber as fallback."""
-        tables = []
-
-        try:
-            with pdfplumber.open(file_path) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
-                    page_tables = page.extract_tables()
-
-                    for idx, table_data in enumerate(page_tables):
-                        if not table_data:
-                            continue
-
-                        source_ref = SourceReference(
-                            file_path=file_path,
-                            page_number=page_num,
-                            table_index=idx,
-                            extraction_method="pdfplumber"
-                        )
-
-                        # Clean and process table data
-                        cleaned_data = []
-                        headers = None
-
-                        for row_idx, row in enumerate(table_data):
-                            # Clean None values
-                            cleaned_row = [cell if cell else "" for cell in row]
-
-                            if row_idx == 0 and any(cleaned_row):
-                                headers = cleaned_row
-                            else:
-                                cleaned_data.append(cleaned_row)
-
-                        if cleaned_data:
-                            tables.append(ExtractedTable(
-                                page_number=page_num,
-                                table_index=idx,
-                                data=cleaned_data,
-                                headers=headers,
-                                extraction_method="pdfplumber",
-                                confidence=0.6,  # Lower confidence for fallback
-                                source_ref=source_ref
-                            ))
-
-        except Exception as e:
-            logger.warning(f"pdfplumber extraction failed: {e}")
+            tables.append(ExtractedTable(
+                page_number=table.page_number,
+                table_index=idx,
+                data=table.data,
+                headers=table.headers,
+                extraction_method=table.extraction_method,
+                confidence=table.confidence,
+                source_ref=source_ref
+            ))
 
         return tables
 
@@ -498,23 +301,7 @@ class PDFProcessor:
         metadata = {}
 
         try:
-            doc = fitz.open(file_path)
-
-            metadata = {
-                'page_count': len(doc),
-                'title': doc.metadata.get('title', ''),
-                'author': doc.metadata.get('author', ''),
-                'subject': doc.metadata.get('subject', ''),
-                'creator': doc.metadata.get('creator', ''),
-                'producer': doc.metadata.get('producer', ''),
-                'creation_date': str(doc.metadata.get('creationDate', '')),
-                'modification_date': str(doc.metadata.get('modDate', '')),
-                'file_size': os.path.getsize(file_path),
-                'is_encrypted': doc.is_encrypted,
-                'is_form': doc.is_form_pdf
-            }
-
-            doc.close()
+            metadata = read_pdf_metadata(file_path)
 
         except Exception as e:
             logger.error(f"Metadata extraction failed: {e}")
@@ -10,15 +10,12 @@ from enum import Enum
 import json
 import logging
 from pathlib import Path
-import sys
 from typing import Any, Optional
 import uuid
 
+from services.collection_stats import collection_name_for, get_collection_stats_service
 from src.core.security.multi_tenant_manager import MultiTenantManager
 
-sys.path.append(str(Path(__file__).parent.parent.parent.parent / "services"))
-from rag_engine import RAGEngine
-
 logger = logging.getLogger(__name__)
 
 class ReportType(Enum):
@@ -349,8 +346,7 @@ class ReportScheduler:
 
     def _generate_document_stats(self, tenant_context, parameters: dict[str, Any]) -> dict[str, Any]:
         """Generate document statistics report."""
-        rag_engine = RAGEngine(tenant_context=tenant_context)
-        stats = rag_engine.get_index_stats()
+        stats = get_collection_stats_service().get_stats(collection_name_for(tenant_context))
 
         return {
             'title': f'Document Statistics - {tenant_context.organization}',
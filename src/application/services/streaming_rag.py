@@ -3,7 +3,7 @@ Streaming RAG implementation for real-time responses.
 Provides token-by-token streaming for better UX.
 """
 
-import asyncio
+from collections import deque
 from collections.abc import AsyncGenerator
 from dataclasses import dataclass
 import json
@@ -12,11 +12,13 @@ import time
 from typing import Any, Optional
 
 from llama_index.core import Response
-from llama_index.core.callbacks import TokenCountingHandler
 from llama_index.core.llms import ChatMessage
 from llama_index.core.query_engine import BaseQueryEngine
+from llama_index.core.schema import QueryBundle
 from llama_index.llms.openai import OpenAI
 
+from src.infrastructure.performance.blocking_executor import run_blocking
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,37 +43,74 @@ class StreamingChunk:
         }
 
 
+@dataclass
+class StreamingMetrics:
+    """Latency metrics of one streamed answer."""
+
+    retrieval_time: float = 0.0
+    time_to_first_token: Optional[float] = None  # From request start to first generated token
+    generation_time: float = 0.0
+    tokens: int = 0  # Streamed deltas (one per LLM token with OpenAI streaming)
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Generation throughput after the first token."""
+        if self.time_to_first_token is None or self.tokens < 2:
+            return 0.0
+        decode_time = self.retrieval_time + self.generation_time - self.time_to_first_token
+        return (self.tokens - 1) / decode_time if decode_time > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "retrieval_time": round(self.retrieval_time, 4),
+            "time_to_first_token": round(self.time_to_first_token, 4) if self.time_to_first_token is not None else None,
+            "generation_time": round(self.generation_time, 4),
+            "tokens": self.tokens,
+            "tokens_per_second": round(self.tokens_per_second, 1),
+        }
+
+
+def format_sse(payload: dict[str, Any], event: Optional[str] = None) -> str:
+    """Format a payload as a Server-Sent Events message."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(payload, default=str)}\n\n"
+
+
 class StreamingRAGEngine:
     """
     Enhanced RAG engine with streaming capabilities.
     Streams responses token-by-token for real-time UX.
+
+    Retrieval and synthesis run as separate steps: sources are emitted as soon as
+    retrieval finishes, then LLM tokens are forwarded as they arrive.
     """
 
     def __init__(
         self,
         query_engine: BaseQueryEngine,
         llm: Optional[OpenAI] = None,
-        chunk_size: int = 10,
-        stream_delay: float = 0.01
+        chunk_size: int = 1,
+        metrics_history: int = 200,
     ):
         """
         Initialize streaming RAG engine.
 
         Args:
-            query_engine: Base query engine for retrieval
+            query_engine: Default query engine (created with ``streaming=True`` for token streaming)
             llm: Language model for generation
-            chunk_size: Number of tokens to buffer before streaming
-            stream_delay: Delay between chunks for smooth streaming
+            chunk_size: Number of tokens to buffer per chunk after the first one (1 = every token)
+            metrics_history: Number of recent requests kept for ``get_metrics_summary``
         """
         self.query_engine = query_engine
         self.llm = llm or OpenAI(model="gpt-3.5-turbo", streaming=True)
-        self.chunk_size = chunk_size
-        self.stream_delay = stream_delay
-        self.token_counter = TokenCountingHandler()
+        self.chunk_size = max(1, chunk_size)
+        self.recent_metrics: deque[StreamingMetrics] = deque(maxlen=metrics_history)
 
     async def stream_query(
         self,
         query: str,
+        query_engine: Optional[BaseQueryEngine] = None,
+        max_sources: int = 3,
         **kwargs
     ) -> AsyncGenerator[StreamingChunk, None]:
         """
@@ -79,13 +118,17 @@ class StreamingRAGEngine:
 
         Args:
             query: User query
+            query_engine: Query engine for this request (e.g. with per-request top_k or filters)
+            max_sources: Maximum number of sources emitted before generation
             **kwargs: Additional arguments for query engine
 
         Yields:
             StreamingChunk objects containing tokens and metadata
         """
+        engine = query_engine or self.query_engine
+        metrics = StreamingMetrics()
+        start_time = time.perf_counter()
         try:
-            # First, get context from RAG
             logger.info(f"Streaming query: {query[:100]}...")
 
             # Yield initial status
@@ -94,71 +137,71 @@ class StreamingRAGEngine:
                 metadata={"status": "retrieving", "message": "Searching documents..."}
             )
 
-            # Get retrieved context
-            retrieval_start = time.time()
-            response = await self._async_query(query, **kwargs)
-            retrieval_time = time.time() - retrieval_start
-
-            # Extract source nodes for context
-            source_nodes = []
-            if hasattr(response, 'source_nodes'):
-                source_nodes = [
-                    {
-                        "text": node.node.text[:200] + "...",
-                        "score": node.score,
-                        "metadata": node.node.metadata
-                    }
-                    for node in response.source_nodes[:3]
-                ]
-
-            # Yield retrieval complete status
+            query_bundle = QueryBundle(query_str=query)
+            split_pipeline = hasattr(engine, "aretrieve") and hasattr(engine, "asynthesize")
+            if split_pipeline:
+                nodes = await engine.aretrieve(query_bundle)
+            else:
+                response = await self._async_query(query, engine, **kwargs)
+                nodes = getattr(response, "source_nodes", None) or []
+            metrics.retrieval_time = time.perf_counter() - start_time
+
+            # Sources go out before generation starts
+            source_nodes = [
+                {
+                    "text": node.node.text[:200] + "...",
+                    "score": node.score,
+                    "metadata": node.node.metadata
+                }
+                for node in nodes[:max_sources]
+            ]
             yield StreamingChunk(
                 token="",
                 metadata={
                     "status": "generating",
                     "message": "Generating response...",
-                    "retrieval_time": retrieval_time,
+                    "retrieval_time": metrics.retrieval_time,
                     "sources": source_nodes
                 }
             )
 
-            # Stream the response
-            if hasattr(response, 'response_gen'):
-                # Response is already a generator
-                buffer = []
-                async for token in response.response_gen:
-                    buffer.append(token)
-
-                    # Stream when buffer is full
-                    if len(buffer) >= self.chunk_size:
-                        chunk_text = "".join(buffer)
-                        yield StreamingChunk(token=chunk_text)
-                        buffer = []
-                        await asyncio.sleep(self.stream_delay)
-
-                # Yield remaining buffer
-                if buffer:
+            if split_pipeline:
+                response = await engine.asynthesize(query_bundle, nodes)
+
+            # Forward tokens as the LLM produces them
+            buffer = []
+            async for token in self._iter_tokens(response):
+                if not token:
+                    continue
+                metrics.tokens += 1
+                if metrics.time_to_first_token is None:
+                    metrics.time_to_first_token = time.perf_counter() - start_time
+                    yield StreamingChunk(token=token)
+                    continue
+                buffer.append(token)
+                if len(buffer) >= self.chunk_size:
                     yield StreamingChunk(token="".join(buffer))
+                    buffer = []
 
-            else:
-                # Response is complete, stream it word by word
-                response_text = str(response)
-                words = response_text.split()
+            # Yield remaining buffer
+            if buffer:
+                yield StreamingChunk(token="".join(buffer))
 
-                for i in range(0, len(words), self.chunk_size):
-                    chunk = " ".join(words[i:i+self.chunk_size])
-                    if i + self.chunk_size < len(words):
-                        chunk += " "
-                    yield StreamingChunk(token=chunk)
-                    await asyncio.sleep(self.stream_delay)
+            metrics.generation_time = time.perf_counter() - start_time - metrics.retrieval_time
+            self.recent_metrics.append(metrics)
+            logger.info(
+                f"Streamed {metrics.tokens} tokens: TTFT {metrics.time_to_first_token or 0:.3f}s, "
+                f"{metrics.tokens_per_second:.1f} tokens/s"
+            )
 
             # Final chunk with metadata
             yield StreamingChunk(
                 token="",
                 metadata={
                     "status": "complete",
-                    "total_tokens": self.token_counter.total_llm_token_count,
-                    "sources_count": len(source_nodes)
+                    "total_tokens": metrics.tokens,
+                    "sources_count": len(source_nodes),
+                    "metrics": metrics.to_dict(),
                 },
                 is_final=True
             )
@@ -171,30 +214,52 @@ class StreamingRAGEngine:
                 is_final=True
             )
 
-    async def _async_query(self, query: str, **kwargs) -> Response:
+    @staticmethod
+    async def _iter_tokens(response) -> AsyncGenerator[str, None]:
+        """Yield the tokens of an async streaming, sync streaming or complete response."""
+        if hasattr(response, "async_response_gen"):
+            async for token in response.async_response_gen():
+                yield token
+        elif getattr(response, "response_gen", None) is not None:
+            # Sync generator: pull each token in the shared executor so the event loop stays free
+            generator = response.response_gen
+            while True:
+                token = await run_blocking(next, generator, None)
+                if token is None:
+                    break
+                yield token
+        else:
+            yield str(response)
+
+    async def _async_query(self, query: str, query_engine: Optional[BaseQueryEngine] = None, **kwargs) -> Response:
         """
         Execute query asynchronously.
 
         Args:
             query: User query
+            query_engine: Query engine to use (defaults to the engine's own)
             **kwargs: Additional arguments
 
         Returns:
             Query response
         """
+        engine = query_engine or self.query_engine
         # If query engine has async support
-        if hasattr(self.query_engine, 'aquery'):
-            return await self.query_engine.aquery(query, **kwargs)
-        else:
-            # Fall back to sync in thread pool
-            import concurrent.futures
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as pool:
-                return await loop.run_in_executor(
-                    pool,
-                    self.query_engine.query,
-                    query
-                )
+        if hasattr(engine, 'aquery'):
+            return await engine.aquery(query, **kwargs)
+        # Fall back to sync in the shared bounded executor
+        return await run_blocking(engine.query, query)
+
+    def get_metrics_summary(self) -> dict[str, Any]:
+        """Aggregate time-to-first-token and throughput over recent requests."""
+        ttfts = sorted(m.time_to_first_token for m in self.recent_metrics if m.time_to_first_token is not None)
+        rates = [m.tokens_per_second for m in self.recent_metrics if m.tokens_per_second > 0]
+        return {
+            "requests": len(self.recent_metrics),
+            "ttft_p50": ttfts[len(ttfts) // 2] if ttfts else None,
+            "ttft_p95": ttfts[min(len(ttfts) - 1, int(len(ttfts) * 0.95))] if ttfts else None,
+            "avg_tokens_per_second": sum(rates) / len(rates) if rates else 0.0,
+        }
 
     async def stream_with_sources(
         self,
@@ -241,12 +306,10 @@ class StreamingRAGEngine:
         """
         async def generate():
             async for chunk in self.stream_query(query, **kwargs):
-                # Format as SSE
-                data = json.dumps(chunk.to_dict())
-                yield f"data: {data}\n\n"
+                yield format_sse(chunk.to_dict())
 
                 if chunk.is_final:
-                    yield "event: close\ndata: {}\n\n"
+                    yield format_sse({}, event="close")
 
         return generate()
 
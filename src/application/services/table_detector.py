@@ -0,0 +1,203 @@
+"""Cheap per-page table detection and learned table-engine selection.
+
+Table extraction engines (camelot, tabula, pdfplumber) are far more expensive than reading the
+text layer, and most pages of a report hold no table. Pages are scored from what PyMuPDF already
+knows about them (ruling lines and numeric tokens); only candidate pages reach an engine, and the
+engine tried first for each page layout is the one that has found tables on similar pages.
+"""
+
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
+import logging
+import re
+import threading
+from typing import Optional
+
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+# Ruling lines: segments at most RULE_THICKNESS thick and at least RULE_MIN_LENGTH long (points)
+RULE_THICKNESS = 2.0
+RULE_MIN_LENGTH = 20.0
+
+# Stroked rectangles count as table cells only when a page has at least this many
+# (one or two are a page frame or a callout box)
+MIN_CELL_RECTS = 4
+
+# A grid needs rules on both sides of at least two rows and two columns
+MIN_GRID_RULES = 3
+
+# Words on the same baseline (within ROW_TOLERANCE points) form one text row
+ROW_TOLERANCE = 3.0
+
+# Amounts, percentages and years as printed in financial tables: 1.234,5  (12,3)  -4%  €1,2
+NUMERIC_TOKEN = re.compile(r"^[(\-–+]?[€$£]?\d[\d.,']*%?\)?$")
+
+# Layouts: 'grid' has horizontal and vertical rules, 'rules' only horizontal ones, 'plain' none
+LAYOUTS = ('grid', 'rules', 'plain')
+
+
+@dataclass
+class PageTableSignals:
+    """Table evidence for one page, read from its text layer and vector drawings."""
+    page_number: int
+    horizontal_rules: int = 0
+    vertical_rules: int = 0
+    word_count: int = 0
+    numeric_tokens: int = 0
+    numeric_rows: int = 0  # Text rows holding two or more numeric tokens
+
+    @property
+    def numeric_ratio(self) -> float:
+        """Share of words that are numbers."""
+        return self.numeric_tokens / self.word_count if self.word_count else 0.0
+
+    @property
+    def layout(self) -> str:
+        """Page layout used to pick the table engine."""
+        if self.horizontal_rules >= MIN_GRID_RULES and self.vertical_rules >= MIN_GRID_RULES:
+            return 'grid'
+        if self.horizontal_rules >= 2:
+            return 'rules'
+        return 'plain'
+
+
+def page_table_signals(page: "fitz.Page", page_number: int) -> PageTableSignals:
+    """Measure ruling lines and numeric text rows of a page (no table engine involved)."""
+    signals = PageTableSignals(page_number=page_number)
+
+    boxes = 0
+    for drawing in page.get_drawings():
+        for item in drawing["items"]:
+            if item[0] == "l":
+                width, height = abs(item[2].x - item[1].x), abs(item[2].y - item[1].y)
+            elif item[0] == "re":
+                width, height = item[1].width, item[1].height
+                if drawing.get("color") is not None and min(width, height) >= RULE_MIN_LENGTH:
+                    boxes += 1
+                    continue
+            else:
+                continue
+            if height <= RULE_THICKNESS and width >= RULE_MIN_LENGTH:
+                signals.horizontal_rules += 1
+            elif width <= RULE_THICKNESS and height >= RULE_MIN_LENGTH:
+                signals.vertical_rules += 1
+
+    if boxes >= MIN_CELL_RECTS:
+        # Stroked cell borders: two rules in each direction
+        signals.horizontal_rules += 2 * boxes
+        signals.vertical_rules += 2 * boxes
+
+    # Table cells are often separate text blocks, so rows are grouped by baseline, not by line
+    numbers_per_row: dict[int, int] = defaultdict(int)
+    for word in page.get_text("words"):
+        signals.word_count += 1
+        if NUMERIC_TOKEN.match(word[4]):
+            signals.numeric_tokens += 1
+            numbers_per_row[round(word[3] / ROW_TOLERANCE)] += 1
+    signals.numeric_rows = sum(1 for count in numbers_per_row.values() if count >= 2)
+
+    return signals
+
+
+class TableDetector:
+    """Decides which pages are worth sending to a table engine."""
+
+    def __init__(self,
+                 min_numeric_rows: Optional[int] = None,
+                 min_numeric_ratio: Optional[float] = None):
+        """
+        Initialize detector.
+
+        Args:
+            min_numeric_rows: Rows with two or more numbers needed on unruled pages
+            min_numeric_ratio: Numeric share of words needed on pages without rules
+        """
+        from config.settings import settings
+
+        self.min_numeric_rows = (
+            min_numeric_rows if min_numeric_rows is not None else settings.pdf_table_min_numeric_rows
+        )
+        self.min_numeric_ratio = (
+            min_numeric_ratio if min_numeric_ratio is not None else settings.pdf_table_min_numeric_ratio
+        )
+
+    def is_candidate(self, signals: Optional[PageTableSignals]) -> bool:
+        """Whether the page probably holds a table."""
+        if signals is None:
+            return False
+        if signals.layout == 'grid':
+            # Ruled cells are a table even with few numbers, but a frame around prose is not
+            return signals.numeric_rows >= 1
+        if signals.numeric_rows < self.min_numeric_rows:
+            return False
+        # Rows of numbers between horizontal rules are a table; without rules they must dominate the page
+        return signals.layout == 'rules' or signals.numeric_ratio >= self.min_numeric_ratio
+
+
+class TableEngineSelector:
+    """Learns which table engine succeeds on each page layout.
+
+    Engines are ranked per layout by their smoothed success rate on candidate pages
+    ((found + 1) / (tried + 2), so untried engines rank at 0.5); ties keep the prior order.
+    """
+
+    # Prior order per layout: lattice needs ruling lines, stream-style engines read column gaps
+    PRIORS = {
+        'grid': ['camelot_lattice', 'camelot_stream', 'tabula', 'pdfplumber'],
+        'rules': ['camelot_stream', 'pdfplumber', 'tabula', 'camelot_lattice'],
+        'plain': ['camelot_stream', 'tabula', 'pdfplumber', 'camelot_lattice'],
+    }
+
+    def __init__(self):
+        """Initialize selector with no history."""
+        self._lock = threading.Lock()
+        self._tried: dict[tuple[str, str], int] = defaultdict(int)
+        self._found: dict[tuple[str, str], int] = defaultdict(int)
+
+    def rank(self, layout: str, methods: Sequence[str]) -> list[str]:
+        """Order the allowed methods for a layout, most likely to find tables first."""
+        prior = self.PRIORS.get(layout, [])
+
+        def prior_position(method: str) -> int:
+            return prior.index(method) if method in prior else len(prior) + list(methods).index(method)
+
+        with self._lock:
+            rates = {
+                method: (self._found[(layout, method)] + 1) / (self._tried[(layout, method)] + 2)
+                for method in methods
+            }
+        return sorted(methods, key=lambda method: (-rates[method], prior_position(method)))
+
+    def record(self, layout: str, method: str, tried: int, found: int) -> None:
+        """Record that ``method`` found tables on ``found`` of ``tried`` pages with ``layout``."""
+        with self._lock:
+            self._tried[(layout, method)] += tried
+            self._found[(layout, method)] += found
+
+    def get_stats(self) -> dict[str, dict[str, str]]:
+        """Success counts per layout and method."""
+        with self._lock:
+            return {
+                layout: {
+                    method: f"{self._found[(layout, method)]}/{tried}"
+                    for (stats_layout, method), tried in self._tried.items() if stats_layout == layout
+                }
+                for layout in LAYOUTS
+            }
+
+
+# Engine history shared by all extractions in the process
+_table_engine_selector: Optional[TableEngineSelector] = None
+_table_engine_selector_lock = threading.Lock()
+
+
+def get_table_engine_selector() -> TableEngineSelector:
+    """Get singleton table engine selector."""
+    global _table_engine_selector
+    with _table_engine_selector_lock:
+        if _table_engine_selector is None:
+            _table_engine_selector = TableEngineSelector()
+        return _table_engine_selector
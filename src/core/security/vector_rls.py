@@ -0,0 +1,99 @@
+"""Compile RLS filters into Qdrant payload filters applied at retrieval time."""
+
+import logging
+from typing import Optional
+
+from qdrant_client.models import (
+    FieldCondition,
+    Filter,
+    IsEmptyCondition,
+    MatchAny,
+    MatchValue,
+    PayloadField,
+    Range,
+)
+
+from .access_control import AccessConstraint, RLSFilter
+from .user_context import DataClassification
+
+logger = logging.getLogger(__name__)
+
+# RLS constraint field -> chunk payload key (indexed via RAGEngine.PAYLOAD_INDEXES)
+RLS_PAYLOAD_FIELDS = {
+    "entity_id": "entity",
+    "period": "period",
+    "classification_level": "classification_level",
+    "cost_center_code": "cost_center_code",
+    "region": "region",
+    "department": "department",
+}
+
+# Chunks indexed without a classification are treated as INTERNAL
+DEFAULT_CLASSIFICATION_LEVEL = DataClassification.INTERNAL.value
+
+
+def _missing(key: str) -> IsEmptyCondition:
+    return IsEmptyCondition(is_empty=PayloadField(key=key))
+
+
+def _deny_all(key: str) -> Filter:
+    """Contradictory filter matching no point."""
+    return Filter(must=[_missing(key)], must_not=[_missing(key)])
+
+
+def _compile_constraint(constraint: AccessConstraint) -> Optional[Filter]:
+    """Compile one constraint into a nested filter.
+
+    Chunks without the constrained field stay visible, as in the post-retrieval
+    checks of ``SecureRAGEngine``; a missing classification counts as INTERNAL.
+    """
+    key = RLS_PAYLOAD_FIELDS.get(constraint.field)
+    if key is None:
+        logger.debug(f"RLS constraint on '{constraint.field}' has no chunk payload field, skipped")
+        return None
+
+    values = constraint.values
+    if constraint.operator in ("in", "eq"):
+        values = list(values) if isinstance(values, (list, tuple, set)) else [values]
+        if not values:
+            return Filter(must=[_missing(key)])
+        match = MatchValue(value=values[0]) if len(values) == 1 else MatchAny(any=values)
+        return Filter(should=[FieldCondition(key=key, match=match), _missing(key)])
+
+    if constraint.operator == "not_in":
+        values = list(values) if isinstance(values, (list, tuple, set)) else [values]
+        return Filter(must_not=[FieldCondition(key=key, match=MatchAny(any=values))]) if values else None
+
+    if constraint.operator in ("lte", "gte"):
+        range_condition = FieldCondition(key=key, range=Range(**{constraint.operator: values}))
+        if constraint.operator == "lte":
+            default_allowed = values >= DEFAULT_CLASSIFICATION_LEVEL
+        else:
+            default_allowed = values <= DEFAULT_CLASSIFICATION_LEVEL
+        if key == "classification_level" and default_allowed:
+            return Filter(should=[range_condition, _missing(key)])
+        return Filter(must=[range_condition])
+
+    logger.warning(f"Unsupported RLS operator '{constraint.operator}' on '{constraint.field}', denying access")
+    return _deny_all(key)
+
+
+def compile_rls_filter(rls_filter: RLSFilter) -> Optional[Filter]:
+    """Compile an RLS filter into a Qdrant filter.
+
+    The tenant constraint is not compiled: each tenant has its own collection.
+
+    Args:
+        rls_filter: Filter generated by ``AccessControlService.generate_rls_filter``
+
+    Returns:
+        Qdrant Filter, or None when access is unrestricted (admin bypass)
+    """
+    if rls_filter.metadata.get("bypass"):
+        return None
+    if rls_filter.metadata.get("fallback"):
+        # RLS generation failed: fail closed
+        return _deny_all("entity")
+
+    conditions = [compiled for compiled in map(_compile_constraint, rls_filter.constraints) if compiled is not None]
+    return Filter(must=conditions) if conditions else None
@@ -0,0 +1,57 @@
+"""
+Bounded thread pool for blocking work invoked from async code.
+Keeps document parsing, CPU-bound reranking and synchronous SDK calls off the event loop.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import logging
+import threading
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Singleton executor shared by the whole process
+_blocking_executor: Optional[ThreadPoolExecutor] = None
+_blocking_executor_lock = threading.Lock()
+
+
+def get_blocking_executor(max_workers: Optional[int] = None) -> ThreadPoolExecutor:
+    """Get singleton executor for blocking calls, created with the given size on first use."""
+    global _blocking_executor
+    with _blocking_executor_lock:
+        if _blocking_executor is None:
+            if max_workers is None:
+                from config.settings import settings
+
+                max_workers = settings.blocking_executor_max_workers
+            _blocking_executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="blocking")
+            logger.info(f"Blocking executor started with {max(1, max_workers)} workers")
+        return _blocking_executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking callable in the bounded executor and await its result.
+
+    Args:
+        func: Synchronous callable
+        *args: Positional arguments for ``func``
+        **kwargs: Keyword arguments for ``func``
+
+    Returns:
+        The value returned by ``func``
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_blocking_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_blocking_executor(wait: bool = True) -> None:
+    """Shut down the executor; a new one is created on next use."""
+    global _blocking_executor
+    with _blocking_executor_lock:
+        if _blocking_executor is not None:
+            _blocking_executor.shutdown(wait=wait)
+            _blocking_executor = None
@@ -13,7 +13,7 @@ import time
 from typing import Any, Optional
 
 import duckdb
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
 
 logger = logging.getLogger(__name__)
 
@@ -168,11 +168,19 @@ class QdrantConnectionPool(ConnectionPool):
 
     def __init__(self, url: str = "http://localhost:6333", **kwargs):
         self.url = url
+        self._async_client = None
         super().__init__(
             factory=lambda: QdrantClient(url=self.url),
             **kwargs
         )
 
+    def get_async_client(self) -> AsyncQdrantClient:
+        """Get the shared async client (httpx keeps its own connection pool)."""
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = AsyncQdrantClient(url=self.url)
+            return self._async_client
+
 
 class DuckDBConnectionPool(ConnectionPool):
     """Specialized connection pool for DuckDB."""
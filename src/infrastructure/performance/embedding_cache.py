@@ -0,0 +1,230 @@
+"""
+Persistent content-hash embedding cache.
+Skips re-embedding chunks whose text has already been embedded with the same model.
+"""
+
+from array import array
+import hashlib
+import logging
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache keyed by (embedding model, normalized text hash).
+
+    Vectors are stored as float32 blobs. When the stored bytes exceed
+    ``max_size_bytes`` the least recently used entries are evicted down to
+    ``(1 - evict_fraction) * max_size_bytes``.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/cache/embeddings.sqlite",
+        max_size_bytes: int = 512 * 1024 * 1024,
+        evict_fraction: float = 0.1,
+    ):
+        """Initialize cache, creating the database if needed."""
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_bytes
+        self.evict_fraction = min(max(evict_fraction, 0.0), 1.0)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)")
+        self._conn.commit()
+
+        self._size_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'evictions': 0,
+        }
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize chunk text so that whitespace-only differences share an entry."""
+        return " ".join(text.split())
+
+    @classmethod
+    def make_key(cls, model: str, text: str) -> str:
+        """Build the cache key for a (model, text) pair."""
+        digest = hashlib.sha256(cls.normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{model}:{digest}"
+
+    def get_many(self, model: str, texts: list[str]) -> list[Optional[list[float]]]:
+        """Look up embeddings for many texts; missing entries are returned as None."""
+        if not texts:
+            return []
+
+        keys = [self.make_key(model, text) for text in texts]
+        found: dict[str, list[float]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+
+        with self._lock:
+            for key, blob in self._fetch_chunked("SELECT key, vector", unique_keys):
+                vector = array("f")
+                vector.frombytes(blob)
+                found[key] = vector.tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?", [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+            hits = sum(1 for key in keys if key in found)
+            self.stats['hits'] += hits
+            self.stats['misses'] += len(keys) - hits
+
+        return [found.get(key) for key in keys]
+
+    def set_many(self, model: str, texts: list[str], embeddings: list[list[float]]) -> None:
+        """Store embeddings for many texts."""
+        if not texts:
+            return
+
+        now = time.time()
+        rows = {}
+        for text, embedding in zip(texts, embeddings):
+            blob = array("f", embedding).tobytes()
+            rows[self.make_key(model, text)] = (model, len(embedding), blob, len(blob), now)
+
+        with self._lock:
+            replaced = sum(size for _, size in self._fetch_chunked("SELECT key, size", list(rows)))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dim, vector, size, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, *values) for key, values in rows.items()],
+            )
+            self._conn.commit()
+            self._size_bytes += sum(values[3] for values in rows.values()) - replaced
+            self.stats['sets'] += len(rows)
+
+            if self._size_bytes > self.max_size_bytes:
+                self._evict()
+
+    def get_or_compute(
+        self, model: str, texts: list[str], compute_fn: Callable[[list[str]], list[list[float]]]
+    ) -> list[list[float]]:
+        """Return embeddings for texts, computing and caching only the missing ones.
+
+        Args:
+            model: Embedding model name (part of the cache key)
+            texts: Texts to embed
+            compute_fn: Function embedding a list of texts in one call
+
+        Returns:
+            Embeddings in the same order as ``texts``
+        """
+        cached = self.get_many(model, texts)
+
+        # Deduplicate misses so identical chunks in one batch are embedded once
+        missing: dict[str, str] = {}
+        for text, embedding in zip(texts, cached):
+            if embedding is None:
+                missing.setdefault(self.make_key(model, text), text)
+
+        if missing:
+            missing_texts = list(missing.values())
+            computed = compute_fn(missing_texts)
+            self.set_many(model, missing_texts, computed)
+            computed_by_key = dict(zip(missing, computed))
+            cached = [
+                embedding if embedding is not None else computed_by_key[self.make_key(model, text)]
+                for text, embedding in zip(texts, cached)
+            ]
+
+        return cached
+
+    def _fetch_chunked(self, select: str, keys: list[str]) -> list[tuple]:
+        """Run ``<select> FROM embeddings WHERE key IN (...)`` below SQLite's bound-parameter limit."""
+        rows = []
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(self._conn.execute(f"{select} FROM embeddings WHERE key IN ({placeholders})", chunk))
+        return rows
+
+    def _evict(self) -> None:
+        """Evict least recently used entries down to the low watermark (caller holds the lock)."""
+        target = int(self.max_size_bytes * (1.0 - self.evict_fraction))
+        to_free = self._size_bytes - target
+        if to_free <= 0:
+            return
+
+        freed = 0
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM embeddings ORDER BY last_access ASC"):
+            evicted.append((key,))
+            freed += size
+            if freed >= to_free:
+                break
+
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", evicted)
+        self._conn.commit()
+        self._size_bytes -= freed
+        self.stats['evictions'] += len(evicted)
+        logger.info(f"Embedding cache evicted {len(evicted)} entries ({freed / 1024 / 1024:.1f} MB)")
+
+    def clear(self) -> None:
+        """Remove all cached embeddings."""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._size_bytes = 0
+        logger.info("Embedding cache cleared")
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        total = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'entries': entries,
+            'size_bytes': self._size_bytes,
+            'max_size_bytes': self.max_size_bytes,
+            'hit_rate': f"{(self.stats['hits'] / total * 100) if total else 0:.1f}%",
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+# Singleton instances, one per database path
+_embedding_caches: dict[str, EmbeddingCache] = {}
+_embedding_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(
+    db_path: str = "data/cache/embeddings.sqlite", max_size_bytes: int = 512 * 1024 * 1024
+) -> EmbeddingCache:
+    """Get singleton embedding cache for a database path."""
+    with _embedding_caches_lock:
+        cache = _embedding_caches.get(db_path)
+        if cache is None:
+            cache = EmbeddingCache(db_path=db_path, max_size_bytes=max_size_bytes)
+            _embedding_caches[db_path] = cache
+        return cache
@@ -0,0 +1,191 @@
+"""
+Persistent OCR result cache.
+Re-uploaded scans and repeated page images are recognized once per OCR language.
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class OCRCache:
+    """SQLite-backed OCR cache keyed by (OCR language, image content hash).
+
+    Stores the recognized text and, when requested, the word-level OCR data.
+    When the stored bytes exceed ``max_size_bytes`` the least recently used
+    entries are evicted down to ``(1 - evict_fraction) * max_size_bytes``.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/cache/ocr.sqlite",
+        max_size_bytes: int = 256 * 1024 * 1024,
+        evict_fraction: float = 0.1,
+    ):
+        """Initialize cache, creating the database if needed."""
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_bytes
+        self.evict_fraction = min(max(evict_fraction, 0.0), 1.0)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_results (
+                key TEXT PRIMARY KEY,
+                language TEXT NOT NULL,
+                text TEXT NOT NULL,
+                data TEXT,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_results_last_access ON ocr_results (last_access)")
+        self._conn.commit()
+
+        self._size_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_results").fetchone()[0]
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'evictions': 0,
+        }
+
+    @staticmethod
+    def make_key(language: str, image: bytes) -> str:
+        """Build the cache key for an encoded image OCR'd with ``language``."""
+        return f"{language}:{hashlib.sha256(image).hexdigest()}"
+
+    def get_many(self, keys: list[str], with_data: bool = False) -> dict[str, tuple[str, Optional[dict]]]:
+        """Look up OCR results; returns {key: (text, data)} for the keys found.
+
+        With ``with_data`` only entries that also hold word-level data count as hits.
+        """
+        if not keys:
+            return {}
+
+        found: dict[str, tuple[str, Optional[dict]]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+
+        with self._lock:
+            for key, text, data in self._fetch_chunked("SELECT key, text, data", unique_keys):
+                if with_data and data is None:
+                    continue
+                found[key] = (text, json.loads(data) if data is not None else None)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE ocr_results SET last_access = ? WHERE key = ?", [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+            self.stats['hits'] += len(found)
+            self.stats['misses'] += len(unique_keys) - len(found)
+
+        return found
+
+    def set_many(self, language: str, results: dict[str, tuple[str, Optional[dict]]]) -> None:
+        """Store OCR results given as {key: (text, data)}."""
+        if not results:
+            return
+
+        now = time.time()
+        rows = {}
+        for key, (text, data) in results.items():
+            serialized = json.dumps(data) if data is not None else None
+            size = len(text.encode("utf-8")) + (len(serialized) if serialized else 0)
+            rows[key] = (language, text, serialized, size, now)
+
+        with self._lock:
+            replaced = sum(size for _, size in self._fetch_chunked("SELECT key, size", list(rows)))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ocr_results (key, language, text, data, size, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, *values) for key, values in rows.items()],
+            )
+            self._conn.commit()
+            self._size_bytes += sum(values[3] for values in rows.values()) - replaced
+            self.stats['sets'] += len(rows)
+
+            if self._size_bytes > self.max_size_bytes:
+                self._evict()
+
+    def _fetch_chunked(self, select: str, keys: list[str]) -> list[tuple]:
+        """Run ``<select> FROM ocr_results WHERE key IN (...)`` below SQLite's bound-parameter limit."""
+        rows = []
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(self._conn.execute(f"{select} FROM ocr_results WHERE key IN ({placeholders})", chunk))
+        return rows
+
+    def _evict(self) -> None:
+        """Evict least recently used entries down to the low watermark (caller holds the lock)."""
+        target = int(self.max_size_bytes * (1.0 - self.evict_fraction))
+        to_free = self._size_bytes - target
+        if to_free <= 0:
+            return
+
+        freed = 0
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM ocr_results ORDER BY last_access ASC"):
+            evicted.append((key,))
+            freed += size
+            if freed >= to_free:
+                break
+
+        self._conn.executemany("DELETE FROM ocr_results WHERE key = ?", evicted)
+        self._conn.commit()
+        self._size_bytes -= freed
+        self.stats['evictions'] += len(evicted)
+        logger.info(f"OCR cache evicted {len(evicted)} entries ({freed / 1024 / 1024:.1f} MB)")
+
+    def clear(self) -> None:
+        """Remove all cached OCR results."""
+        with self._lock:
+            self._conn.execute("DELETE FROM ocr_results")
+            self._conn.commit()
+            self._size_bytes = 0
+        logger.info("OCR cache cleared")
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM ocr_results").fetchone()[0]
+        total = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'entries': entries,
+            'size_bytes': self._size_bytes,
+            'max_size_bytes': self.max_size_bytes,
+            'hit_rate': f"{(self.stats['hits'] / total * 100) if total else 0:.1f}%",
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+# Singleton instances, one per database path
+_ocr_caches: dict[str, OCRCache] = {}
+_ocr_caches_lock = threading.Lock()
+
+
+def get_ocr_cache(db_path: str = "data/cache/ocr.sqlite", max_size_bytes: int = 256 * 1024 * 1024) -> OCRCache:
+    """Get singleton OCR cache for a database path."""
+    with _ocr_caches_lock:
+        cache = _ocr_caches.get(db_path)
+        if cache is None:
+            cache = OCRCache(db_path=db_path, max_size_bytes=max_size_bytes)
+            _ocr_caches[db_path] = cache
+        return cache
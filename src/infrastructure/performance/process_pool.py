@@ -0,0 +1,45 @@
+"""
+Bounded process pool for CPU-bound parsing (PDF page extraction, OCR).
+Thread pools cannot spread pure-Python parsing over cores because of the GIL.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import multiprocessing
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Singleton pool shared by the whole process
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Get singleton process pool, created with the given size on first use.
+
+    Workers are spawned rather than forked: the parent holds Qdrant/HTTP client threads
+    that must not be duplicated into children.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            if max_workers is None:
+                from config.settings import settings
+
+                max_workers = settings.pdf_extraction_max_workers
+            _process_pool = ProcessPoolExecutor(
+                max_workers=max(1, max_workers), mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Process pool started with {max(1, max_workers)} workers")
+        return _process_pool
+
+
+def shutdown_process_pool(wait: bool = True) -> None:
+    """Shut down the pool (e.g. after a worker crashed); a new one is created on next use."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=wait, cancel_futures=True)
+            _process_pool = None
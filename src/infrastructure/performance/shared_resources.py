@@ -0,0 +1,90 @@
+"""
+Process-wide heavy objects shared by all tenant engines.
+Tenant-independent clients and models are created once instead of once per RAGEngine.
+"""
+
+import logging
+import threading
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+_openai_clients: dict[str, Any] = {}
+_cross_encoders: dict[tuple, Any] = {}
+_llama_models: dict[tuple, Any] = {}
+
+
+def get_openai_client(api_key: str):
+    """Get the shared OpenAI client for an API key (thread-safe, keeps one HTTP connection pool)."""
+    with _lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            from openai import OpenAI
+
+            client = OpenAI(api_key=api_key)
+            _openai_clients[api_key] = client
+        return client
+
+
+def get_cross_encoder(model_path: str, backend: str = "torch", onnx_file_name: Optional[str] = None):
+    """Get the shared CrossEncoder model, loading it on first use.
+
+    Args:
+        model_path: Hugging Face model id or local path
+        backend: "torch" (default) or "onnx" (ONNX Runtime, CPU friendly)
+        onnx_file_name: ONNX file inside the model repo, e.g. an int8-quantized export
+
+    Raises:
+        ImportError: If sentence-transformers (or the ONNX extras for the onnx backend) is not installed
+    """
+    key = (model_path, backend, onnx_file_name)
+    with _lock:
+        model = _cross_encoders.get(key)
+        if model is None:
+            from sentence_transformers import CrossEncoder
+
+            logger.info(f"Loading shared CrossEncoder: {model_path} (backend: {backend})")
+            if backend == "torch":
+                model = CrossEncoder(model_path)
+            else:
+                model_kwargs = {"file_name": onnx_file_name} if onnx_file_name else None
+                model = CrossEncoder(model_path, backend=backend, model_kwargs=model_kwargs)
+            _cross_encoders[key] = model
+        return model
+
+
+def get_llama_llm(model: str, temperature: float, max_tokens: int, api_key: str):
+    """Get the shared LlamaIndex OpenAI LLM for the given configuration."""
+    key = ("llm", model, temperature, max_tokens, api_key)
+    with _lock:
+        llm = _llama_models.get(key)
+        if llm is None:
+            from llama_index.llms.openai import OpenAI
+
+            llm = OpenAI(model=model, temperature=temperature, max_tokens=max_tokens, api_key=api_key)
+            _llama_models[key] = llm
+        return llm
+
+
+def get_llama_embed_model(model: str, api_key: str, embed_batch_size: int):
+    """Get the shared LlamaIndex OpenAI embedding model for the given configuration."""
+    key = ("embed", model, api_key, embed_batch_size)
+    with _lock:
+        embed_model = _llama_models.get(key)
+        if embed_model is None:
+            from llama_index.embeddings.openai import OpenAIEmbedding
+
+            embed_model = OpenAIEmbedding(model=model, api_key=api_key, embed_batch_size=embed_batch_size)
+            _llama_models[key] = embed_model
+        return embed_model
+
+
+def get_shared_resources_stats() -> dict[str, Any]:
+    """Get counts of the shared objects currently loaded."""
+    with _lock:
+        return {
+            "openai_clients": len(_openai_clients),
+            "cross_encoders": ["/".join(filter(None, key)) for key in _cross_encoders],
+            "llama_models": len(_llama_models),
+        }
@@ -0,0 +1,271 @@
+"""
+Bounded registry of per-tenant engines.
+Engines are evicted by LRU order, idle timeout and an approximate memory budget.
+"""
+
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _RegistryEntry(Generic[T]):
+    """Engine with its last access time and estimated size."""
+
+    engine: T
+    created_at: float
+    last_used: float
+    size_bytes: int = 0
+
+
+class TenantEngineRegistry(Generic[T]):
+    """Thread-safe LRU registry of tenant engines with idle timeout and memory budget.
+
+    Requests lease their engine (``lease``/``acquire``). An evicted engine leaves the
+    registry at once, so new requests build a fresh one, but it is only handed to
+    ``on_evict`` (which closes it) when its last lease is released; requests in flight
+    keep working. Each tenant engine is built at most once concurrently, without
+    blocking lookups of other tenants.
+    """
+
+    def __init__(
+        self,
+        max_engines: int = 50,
+        idle_timeout_seconds: float = 1800,
+        max_memory_bytes: int = 2048 * 1024 * 1024,
+        size_fn: Optional[Callable[[T], int]] = None,
+        on_evict: Optional[Callable[[str, T], None]] = None,
+    ):
+        """Initialize registry.
+
+        Args:
+            max_engines: Maximum number of cached engines
+            idle_timeout_seconds: Engines unused for longer than this are evicted
+            max_memory_bytes: Approximate memory budget for all cached engines
+            size_fn: Callable estimating the memory held by an engine
+            on_evict: Optional callback receiving (tenant_id, engine) once an evicted engine is no longer leased
+        """
+        self.max_engines = max(1, max_engines)
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self.size_fn = size_fn
+        self.on_evict = on_evict
+        self._entries: OrderedDict[str, _RegistryEntry[T]] = OrderedDict()
+        self._build_locks: dict[str, threading.Lock] = {}
+        # Lease counts by engine id, and evicted engines waiting for their last lease
+        self._leases: dict[int, int] = {}
+        self._pending_evict: dict[int, tuple[str, T]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions_lru": 0, "evictions_idle": 0, "evictions_memory": 0}
+
+    def get_or_create(self, tenant_id: str, factory: Callable[[], T]) -> T:
+        """Get the engine of a tenant, building it with ``factory`` on a miss (without a lease)."""
+        return self._get_or_create(tenant_id, factory, lease=False)
+
+    def acquire(self, tenant_id: str, factory: Callable[[], T]) -> T:
+        """Get the engine of a tenant like ``get_or_create`` and lease it until ``release``."""
+        return self._get_or_create(tenant_id, factory, lease=True)
+
+    def retain(self, engine: T) -> bool:
+        """Take one more lease on an engine the caller already leases (e.g. for a background task).
+
+        Returns False, taking no lease, for engines without leases (such as engines not from this registry).
+        """
+        with self._lock:
+            if id(engine) not in self._leases:
+                return False
+            self._leases[id(engine)] += 1
+            return True
+
+    def release(self, engine: T) -> None:
+        """Return a lease; an evicted engine is handed to ``on_evict`` when its last lease is returned."""
+        with self._lock:
+            key = id(engine)
+            if key not in self._leases:
+                return
+            self._leases[key] -= 1
+            if self._leases[key] > 0:
+                return
+            del self._leases[key]
+            pending = self._pending_evict.pop(key, None)
+        if pending is not None:
+            self._run_on_evict(*pending)
+
+    @contextmanager
+    def lease(self, tenant_id: str, factory: Callable[[], T]) -> Iterator[T]:
+        """Lease the engine of a tenant for the duration of a ``with`` block."""
+        engine = self.acquire(tenant_id, factory)
+        try:
+            yield engine
+        finally:
+            self.release(engine)
+
+    def _get_or_create(self, tenant_id: str, factory: Callable[[], T], lease: bool) -> T:
+        engine = self._get(tenant_id, lease=lease)
+        if engine is not None:
+            return engine
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(tenant_id, threading.Lock())
+
+        with build_lock:
+            # Another request may have built it while we waited
+            engine = self._get(tenant_id, count_miss=True, lease=lease)
+            if engine is not None:
+                return engine
+
+            start_time = time.perf_counter()
+            try:
+                engine = factory()
+            except Exception:
+                # Let the next request retry with a fresh lock instead of leaking this one
+                with self._lock:
+                    self._build_locks.pop(tenant_id, None)
+                raise
+            size = self._estimate_size(engine)
+            logger.info(
+                f"Built engine for tenant {tenant_id} in {time.perf_counter() - start_time:.2f}s "
+                f"(~{size / (1024 * 1024):.1f} MB)"
+            )
+
+            now = time.monotonic()
+            with self._lock:
+                self._entries[tenant_id] = _RegistryEntry(engine=engine, created_at=now, last_used=now, size_bytes=size)
+                if lease:
+                    self._leases[id(engine)] = 1
+                self._build_locks.pop(tenant_id, None)
+                evicted = self._enforce_limits(keep=tenant_id)
+
+        self._notify_evicted(evicted)
+        return engine
+
+    def _get(self, tenant_id: str, count_miss: bool = False, lease: bool = False) -> Optional[T]:
+        """Return a cached engine (leased if requested) and refresh its LRU position."""
+        with self._lock:
+            evicted = self._evict_idle()
+            entry = self._entries.get(tenant_id)
+            if entry is not None:
+                entry.last_used = time.monotonic()
+                self._entries.move_to_end(tenant_id)
+                self._stats["hits"] += 1
+                if lease:
+                    self._leases[id(entry.engine)] = self._leases.get(id(entry.engine), 0) + 1
+            elif count_miss:
+                self._stats["misses"] += 1
+        self._notify_evicted(evicted)
+        return entry.engine if entry is not None else None
+
+    def _estimate_size(self, engine: T) -> int:
+        if self.size_fn is None:
+            return 0
+        try:
+            return int(self.size_fn(engine))
+        except Exception as e:
+            logger.warning(f"Could not estimate engine size: {e}")
+            return 0
+
+    def _evict_idle(self) -> list[tuple[str, T]]:
+        """Evict engines idle for longer than the timeout (caller holds the lock)."""
+        evicted = []
+        now = time.monotonic()
+        # Entries are in access order, so idle engines are at the front
+        while self._entries:
+            tenant_id, entry = next(iter(self._entries.items()))
+            if now - entry.last_used < self.idle_timeout_seconds:
+                break
+            del self._entries[tenant_id]
+            self._stats["evictions_idle"] += 1
+            evicted.append((tenant_id, entry.engine))
+        return evicted
+
+    def _enforce_limits(self, keep: Optional[str] = None) -> list[tuple[str, T]]:
+        """Evict least recently used engines until count and memory are within budget (caller holds the lock)."""
+        evicted = self._evict_idle()
+        while len(self._entries) > 1:
+            if len(self._entries) > self.max_engines:
+                reason = "evictions_lru"
+            elif self._total_bytes() > self.max_memory_bytes:
+                reason = "evictions_memory"
+            else:
+                break
+            tenant_id = next(iter(self._entries))
+            if tenant_id == keep:
+                break
+            entry = self._entries.pop(tenant_id)
+            self._stats[reason] += 1
+            evicted.append((tenant_id, entry.engine))
+        return evicted
+
+    def _total_bytes(self) -> int:
+        return sum(entry.size_bytes for entry in self._entries.values())
+
+    def _notify_evicted(self, evicted: list[tuple[str, T]]) -> None:
+        for tenant_id, engine in evicted:
+            with self._lock:
+                leases = self._leases.get(id(engine), 0)
+                if leases:
+                    self._pending_evict[id(engine)] = (tenant_id, engine)
+            if leases:
+                logger.info(f"Evicted engine for tenant {tenant_id} (released after {leases} leased requests)")
+                continue
+            logger.info(f"Evicted engine for tenant {tenant_id}")
+            self._run_on_evict(tenant_id, engine)
+
+    def _run_on_evict(self, tenant_id: str, engine: T) -> None:
+        if self.on_evict:
+            try:
+                self.on_evict(tenant_id, engine)
+            except Exception as e:
+                logger.warning(f"Eviction callback failed for tenant {tenant_id}: {e}")
+
+    def refresh_size(self, tenant_id: str) -> None:
+        """Re-estimate the memory of an engine (e.g. after indexing) and enforce the budget."""
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+        if entry is None:
+            return
+        size = self._estimate_size(entry.engine)
+        with self._lock:
+            entry.size_bytes = size
+            evicted = self._enforce_limits(keep=tenant_id)
+        self._notify_evicted(evicted)
+
+    def evict(self, tenant_id: str) -> bool:
+        """Drop the engine of a tenant; returns True if it was cached."""
+        with self._lock:
+            entry = self._entries.pop(tenant_id, None)
+        if entry is None:
+            return False
+        self._notify_evicted([(tenant_id, entry.engine)])
+        return True
+
+    def __contains__(self, tenant_id: str) -> bool:
+        with self._lock:
+            return tenant_id in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get registry statistics."""
+        with self._lock:
+            return {
+                **self._stats,
+                "engines": len(self._entries),
+                "leased_engines": len(self._leases),
+                "evicted_in_use": len(self._pending_evict),
+                "max_engines": self.max_engines,
+                "memory_bytes": self._total_bytes(),
+                "max_memory_bytes": self.max_memory_bytes,
+                "idle_timeout_seconds": self.idle_timeout_seconds,
+            }
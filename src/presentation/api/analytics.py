@@ -13,9 +13,10 @@ from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 
-from services.rag_engine import RAGEngine
+from services.collection_stats import collection_name_for, get_collection_stats_service
 from src.application.services.report_scheduler import ReportScheduler
 from src.core.security.multi_tenant_manager import MultiTenantManager, TenantSession
+from src.infrastructure.performance.blocking_executor import run_blocking
 from src.presentation.ui.dashboard_embed import DashboardEmbed
 
 router = APIRouter(prefix="/api/v1/analytics", tags=["analytics"])
@@ -103,9 +104,10 @@ async def get_metrics_overview(
         # Get usage statistics
         usage = tenant_manager.get_tenant_usage(session.tenant_id)
 
-        # Get RAG engine statistics
-        rag_engine = RAGEngine(tenant_context=tenant_context)
-        index_stats = rag_engine.get_index_stats()
+        # Get cached collection statistics (no RAG engine needed)
+        index_stats = await run_blocking(
+            get_collection_stats_service().get_stats, collection_name_for(tenant_context)
+        )
 
         # Calculate date range
         end_date = datetime.now()
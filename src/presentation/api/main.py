@@ -18,6 +18,8 @@ Autore: ZCS Company
 Versione: 1.0.0
 """
 
+import asyncio
+from collections.abc import Callable, Iterator
 from datetime import datetime, timezone
 import logging
 import os
@@ -28,6 +30,11 @@ from typing import Any, Optional
 # Load environment variables from .env file
 from dotenv import load_dotenv
 
+from src.application.services.streaming_rag import format_sse
+from src.infrastructure.performance.blocking_executor import run_blocking, shutdown_blocking_executor
+from src.infrastructure.performance.process_pool import shutdown_process_pool
+from src.infrastructure.performance.tenant_engine_registry import TenantEngineRegistry
+
 load_dotenv()
 
 # FastAPI imports
@@ -35,7 +42,7 @@ from fastapi import BackgroundTasks, Depends, FastAPI, File, HTTPException, Quer
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.openapi.utils import get_openapi
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 # Pydantic models
 from pydantic import BaseModel, Field
@@ -78,6 +85,7 @@ csv_analyzer = None
 pdf_processor = None
 calculation_engine = None
 pdf_exporter = None
+tenant_engine_registry = None
 
 
 def get_rag_engine() -> RAGEngine:
@@ -88,35 +96,50 @@ def get_rag_engine() -> RAGEngine:
     return rag_engine
 
 
-def get_tenant_rag_engine(tenant: TenantContext = Depends(get_current_tenant)) -> RAGEngine:
-    """Dependency injection for tenant-specific RAG Engine."""
-    # Use a cache for tenant-specific engines
-    if not hasattr(get_tenant_rag_engine, "_tenant_engines"):
-        get_tenant_rag_engine._tenant_engines = {}
+def get_tenant_engine_registry() -> TenantEngineRegistry[RAGEngine]:
+    """Registry of tenant-specific RAG Engines, bounded by count, idle time and memory."""
+    global tenant_engine_registry
+    if tenant_engine_registry is None:
+        tenant_engine_registry = TenantEngineRegistry(
+            max_engines=settings.tenant_engine_max_count,
+            idle_timeout_seconds=settings.tenant_engine_idle_seconds,
+            max_memory_bytes=settings.tenant_engine_memory_mb * 1024 * 1024,
+            size_fn=lambda engine: engine.estimate_memory_bytes(),
+            on_evict=lambda tenant_id, engine: engine.close(),
+        )
+    return tenant_engine_registry
 
-    if tenant.tenant_id not in get_tenant_rag_engine._tenant_engines:
-        get_tenant_rag_engine._tenant_engines[tenant.tenant_id] = RAGEngine(tenant_context=tenant)
 
-    return get_tenant_rag_engine._tenant_engines[tenant.tenant_id]
+def get_tenant_rag_engine(tenant: TenantContext = Depends(get_current_tenant)) -> Iterator[RAGEngine]:
+    """Dependency injection for tenant-specific RAG Engine, leased so eviction cannot close it mid-request."""
+    with get_tenant_engine_registry().lease(tenant.tenant_id, lambda: RAGEngine(tenant_context=tenant)) as engine:
+        yield engine
 
 
-def get_optional_rag_engine(tenant: Optional[TenantContext] = Depends(get_optional_tenant)) -> RAGEngine:
+def get_optional_rag_engine(tenant: Optional[TenantContext] = Depends(get_optional_tenant)) -> Iterator[RAGEngine]:
     """Dependency injection for RAG Engine with optional tenant support."""
     if tenant:
-        # Use a cache for tenant-specific engines
-        if not hasattr(get_optional_rag_engine, "_tenant_engines"):
-            get_optional_rag_engine._tenant_engines = {}
+        yield from get_tenant_rag_engine(tenant)
+        return
 
-        if tenant.tenant_id not in get_optional_rag_engine._tenant_engines:
-            get_optional_rag_engine._tenant_engines[tenant.tenant_id] = RAGEngine(tenant_context=tenant)
+    # Return default engine for non-tenant requests
+    yield get_rag_engine()
 
-        return get_optional_rag_engine._tenant_engines[tenant.tenant_id]
 
-    # Return default engine for non-tenant requests
-    global rag_engine
-    if rag_engine is None:
-        rag_engine = RAGEngine()
-    return rag_engine
+def hold_engine(engine: RAGEngine) -> Callable[[], None]:
+    """Keep a tenant engine open for work that outlives the request (streams, background tasks).
+
+    Returns the function releasing it; the default engine is never evicted, so it is a no-op there.
+    """
+    if tenant_engine_registry is not None and tenant_engine_registry.retain(engine):
+        return lambda: tenant_engine_registry.release(engine)
+    return lambda: None
+
+
+def refresh_tenant_engine_size(engine: RAGEngine) -> None:
+    """Re-estimate a tenant engine's memory after indexing so the registry budget stays accurate."""
+    if engine.tenant_context and tenant_engine_registry is not None:
+        tenant_engine_registry.refresh_size(engine.tenant_context.tenant_id)
 
 
 def get_csv_analyzer() -> CSVAnalyzer:
@@ -261,6 +284,16 @@ class QueryRequest(BaseModel):
     enterprise_mode: bool = Field(False, description="Use enterprise features")
 
 
+class DeleteDocumentsRequest(BaseModel):
+    """Bulk document deletion request model."""
+
+    sources: list[str] = Field(
+        default_factory=list, description="Document sources to delete", example=["bilancio_2023.pdf"]
+    )
+    document_ids: list[str] = Field(default_factory=list, description="Document ids to delete")
+    wait: bool = Field(False, description="Wait until the chunks are removed")
+
+
 class QueryResponse(BaseModel):
     """Query response model."""
 
@@ -548,7 +581,8 @@ async def upload_documents(
 
         # Load into DB
         file_paths = [path for path, _ in temp_files]
-        result = rag_engine.parse_insert_docs(file_paths)
+        result = await rag_engine.aparse_insert_docs(file_paths)
+        refresh_tenant_engine_size(rag_engine)
         # Clear temp files
         for path, _ in temp_files:
             if os.path.exists(path):
@@ -586,11 +620,11 @@ async def analyze_stored_documents(
     logger.info("CECCO")
     try:
         if enterprise_mode:
-            analysis_response = rag_engine.enterprise_query(
+            analysis_response = await rag_engine.enterprise_query(
                 "Fornisci un'analisi completa e dettagliata del documento, includendo tutti i dati finanziari chiave, tendenze, rischi e opportunità identificate."
             )
         else:
-            analysis_response = rag_engine.query(
+            analysis_response = await rag_engine.aquery(
                 "Fornisci un'analisi completa e dettagliata del documento, includendo tutti i dati finanziari chiave, tendenze, rischi e opportunità identificate."
             )
         analysis_result = AnalysisResult(
@@ -778,18 +812,19 @@ async def analyze_pdf(
         try:
             # Process PDF
             logger.info(f"Processing PDF: {file.filename}")
-            pdf_result = pdf_processor.process_pdf(tmp_file_path)
+            pdf_result = await run_blocking(pdf_processor.process_pdf, tmp_file_path)
 
             # Index document for RAG
-            rag_engine.index_documents([tmp_file_path])
+            await rag_engine.aindex_documents([tmp_file_path])
+            refresh_tenant_engine_size(rag_engine)
 
             # Get main analysis using best prompt
             if enterprise_mode:
-                analysis_response = rag_engine.enterprise_query(
+                analysis_response = await rag_engine.enterprise_query(
                     "Fornisci un'analisi completa e dettagliata del documento, includendo tutti i dati finanziari chiave, tendenze, rischi e opportunità identificate."
                 )
             else:
-                analysis_response = rag_engine.query(
+                analysis_response = await rag_engine.aquery(
                     "Fornisci un'analisi completa e dettagliata del documento, includendo tutti i dati finanziari chiave, tendenze, rischi e opportunità identificate."
                 )
 
@@ -807,22 +842,26 @@ async def analyze_pdf(
                 "Qual è l'outlook per il futuro?",
             ]
 
+            # Le domande FAQ sono indipendenti: eseguile in parallelo
+            faq_responses = await asyncio.gather(
+                *(rag_engine.aquery(question) for question in faq_questions), return_exceptions=True
+            )
+
             faqs = []
-            for question in faq_questions:
-                try:
-                    faq_response = rag_engine.query(question)
-                    faqs.append(
-                        FAQItem(
-                            question=question,
-                            answer=faq_response["answer"],
-                            confidence=faq_response.get("confidence", 0.8),
-                        )
-                    )
-                except Exception as e:
-                    logger.warning(f"FAQ generation failed for question: {question}, error: {e}")
+            for question, faq_response in zip(faq_questions, faq_responses):
+                if isinstance(faq_response, Exception):
+                    logger.warning(f"FAQ generation failed for question: {question}, error: {faq_response}")
                     faqs.append(
                         FAQItem(question=question, answer="Informazione non disponibile nel documento.", confidence=0.0)
                     )
+                    continue
+                faqs.append(
+                    FAQItem(
+                        question=question,
+                        answer=faq_response["answer"],
+                        confidence=faq_response.get("confidence", 0.8),
+                    )
+                )
 
             # Create analysis result
             analysis_result = AnalysisResult(
@@ -1133,9 +1172,9 @@ async def query_knowledge_base(request: QueryRequest, rag_engine: RAGEngine = De
     """
     try:
         if request.enterprise_mode:
-            response = rag_engine.enterprise_query(request.question)
+            response = await rag_engine.enterprise_query(request.question)
         else:
-            response = rag_engine.query(request.question)
+            response = await rag_engine.aquery(request.question)
 
         return QueryResponse(
             answer=response["answer"],
@@ -1149,6 +1188,60 @@ async def query_knowledge_base(request: QueryRequest, rag_engine: RAGEngine = De
         raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}") from e
 
 
+@app.post(
+    "/query/stream",
+    summary="Interroga Knowledge Base (streaming)",
+    description="""
+    Come `/query`, ma la risposta arriva come Server-Sent Events.
+
+    Sequenza eventi:
+    - `status: retrieving` all'avvio
+    - `status: generating` con le fonti, appena termina il retrieval
+    - un evento per token generato dal modello
+    - `status: complete` con metriche (time-to-first-token, token/s), poi `event: close`
+
+    Esempio utilizzo:
+    ```bash
+    curl -N -X POST "http://localhost:8000/query/stream" \\
+         -H "Content-Type: application/json" \\
+         -d '{"question": "Qual è il fatturato totale per il 2024?"}'
+    ```
+    """,
+    tags=["Base Conoscenza"],
+)
+async def stream_knowledge_base(request: QueryRequest, rag_engine: RAGEngine = Depends(get_optional_rag_engine)):
+    """
+    Stream the answer to a question token by token as Server-Sent Events.
+
+    Args:
+        request: Query request with question
+
+    Returns:
+        StreamingResponse: text/event-stream of answer chunks
+    """
+
+    release_engine = hold_engine(rag_engine)
+
+    async def event_stream():
+        try:
+            async for chunk in rag_engine.query_stream(request.question):
+                payload = chunk.to_dict() if hasattr(chunk, "to_dict") else chunk
+                yield format_sse(payload)
+        except Exception as e:
+            logger.error(f"Streaming query failed: {str(e)}")
+            yield format_sse({"token": "", "metadata": {"status": "error", "error": str(e)}, "is_final": True})
+        finally:
+            release_engine()
+        yield format_sse({}, event="close")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Disable proxy buffering (nginx) so tokens reach the client as they are generated
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get(
     "/documents",
     summary="Lista Documenti Indicizzati",
@@ -1164,7 +1257,7 @@ async def query_knowledge_base(request: QueryRequest, rag_engine: RAGEngine = De
     """,
     tags=["Base Conoscenza"],
 )
-async def list_documents():
+async def list_documents(rag_engine: RAGEngine = Depends(get_optional_rag_engine)):
     """
     Get list of all indexed documents.
 
@@ -1172,17 +1265,18 @@ async def list_documents():
         Dict: List of documents with metadata
     """
     try:
-        import requests
-
-        # Get Qdrant collection info
-        response = requests.get("http://localhost:6333/collections/business_documents")
-        collection_info = response.json()
+        # Served from the document catalog; no scroll over the collection's chunks
+        documents = await run_blocking(rag_engine.list_documents)
+        stats = rag_engine.document_catalog.get_stats()
+        collection_info = await run_blocking(rag_engine.client.get_collection, rag_engine.collection_name)
 
         return {
-            "total_documents": collection_info["result"]["points_count"],
-            "status": collection_info["result"]["status"],
-            "indexed_vectors": collection_info["result"]["points_count"],
-            "collection_info": collection_info["result"]["config"],
+            "total_documents": len(documents),
+            "status": collection_info.status,
+            "indexed_vectors": stats["total_chunks"],
+            "collection_info": collection_info.config.model_dump(mode="json"),
+            "file_types": stats["file_types"],
+            "documents": documents,
         }
 
     except Exception as e:
@@ -1253,6 +1347,58 @@ async def clear_knowledge_base():
         raise HTTPException(status_code=500, detail=f"Failed to clear knowledge base: {str(e)}") from e
 
 
+@app.post(
+    "/documents/delete",
+    summary="Elimina Documenti",
+    description="""
+    Elimina i chunk di uno o più documenti con un'unica richiesta filtrata su `source`/`document_id`.
+
+    Per default la cancellazione è asincrona: la risposta contiene un `operation_id`
+    da interrogare su `/documents/delete/{operation_id}`. Con `wait: true` la risposta
+    arriva a cancellazione completata.
+    """,
+    tags=["Base Conoscenza"],
+)
+async def delete_documents(request: DeleteDocumentsRequest, rag_engine: RAGEngine = Depends(get_optional_rag_engine)):
+    """
+    Delete the chunks of many documents with one filtered delete.
+
+    Args:
+        request: Sources and/or document ids to delete
+
+    Returns:
+        Dict: Operation id, status and number of matched chunks
+    """
+    if not request.sources and not request.document_ids:
+        raise HTTPException(status_code=400, detail="Specify at least one source or document id")
+
+    result = await run_blocking(
+        rag_engine.delete_by_filter, request.sources or None, request.document_ids or None, request.wait
+    )
+    if not result["success"]:
+        raise HTTPException(status_code=500, detail=f"Delete failed: {result.get('error')}")
+    return result
+
+
+@app.get(
+    "/documents/delete/{operation_id}",
+    summary="Stato Eliminazione",
+    description="Restituisce lo stato di una cancellazione asincrona (pending, completed, unknown).",
+    tags=["Base Conoscenza"],
+)
+async def get_deletion_status(operation_id: int, rag_engine: RAGEngine = Depends(get_optional_rag_engine)):
+    """
+    Get the status of an asynchronous document deletion.
+
+    Args:
+        operation_id: Operation id returned by ``/documents/delete``
+
+    Returns:
+        Dict: Deletion status and remaining chunks
+    """
+    return await run_blocking(rag_engine.get_deletion_status, operation_id)
+
+
 @app.post(
     "/documents/index",
     summary="Indicizza Nuovi Documenti",
@@ -1298,6 +1444,8 @@ async def index_documents(
                 temp_files.append((tmp_file.name, file.filename))
 
         # Index documents in background
+        release_engine = hold_engine(rag_engine)
+
         def index_files():
             try:
                 file_paths = [path for path, _ in temp_files]
@@ -1308,6 +1456,8 @@ async def index_documents(
                         os.unlink(path)
             except Exception as e:
                 logger.error(f"Background indexing failed: {str(e)}")
+            finally:
+                release_engine()
 
         background_tasks.add_task(index_files)
 
@@ -1411,6 +1561,8 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("Shutting down Business Intelligence RAG API...")
+    shutdown_blocking_executor(wait=False)
+    shutdown_process_pool(wait=False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+"""Tests for the bounded executor used to keep blocking calls off the event loop."""
+
+import asyncio
+import threading
+import time
+
+from src.infrastructure.performance import blocking_executor
+from src.infrastructure.performance.blocking_executor import get_blocking_executor, run_blocking
+
+
+class TestBlockingExecutor:
+    """Test that blocking work runs in worker threads with bounded concurrency."""
+
+    def setup_method(self):
+        blocking_executor.shutdown_blocking_executor()
+
+    def teardown_method(self):
+        blocking_executor.shutdown_blocking_executor()
+
+    def test_runs_outside_event_loop_thread(self):
+        get_blocking_executor(max_workers=2)
+
+        async def main():
+            return threading.get_ident(), await run_blocking(threading.get_ident)
+
+        loop_thread, worker_thread = asyncio.run(main())
+
+        assert loop_thread != worker_thread
+
+    def test_event_loop_stays_responsive_and_concurrency_is_bounded(self):
+        get_blocking_executor(max_workers=2)
+        active, peak = 0, 0
+        lock = threading.Lock()
+
+        def blocking_call(value):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            return value * 2
+
+        async def main():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.005)
+
+            tick_task = asyncio.create_task(ticker())
+            results = await asyncio.gather(*(run_blocking(blocking_call, i) for i in range(4)))
+            tick_task.cancel()
+            return results, ticks
+
+        results, ticks = asyncio.run(main())
+
+        assert results == [0, 2, 4, 6]
+        assert peak == 2
+        assert ticks > 5
@@ -0,0 +1,150 @@
+"""Tests for the retrieval-only chunk search helpers."""
+
+import json
+from types import SimpleNamespace
+
+from services.chunk_search import highlight_snippets, keyword_score, payload_text, query_terms, rank_keyword_hits
+
+
+def point(point_id, text, **metadata):
+    node_content = json.dumps({"id_": point_id, "text": text})
+    return SimpleNamespace(id=point_id, payload={"_node_content": node_content, "_node_type": "TextNode", **metadata})
+
+
+class TestChunkSearch:
+    """Test tokenization, keyword ranking and highlighting."""
+
+    def test_query_terms_match_full_text_tokenizer(self):
+        assert query_terms("Ricavi 2024, ricavi e EBITDA") == ["ricavi", "2024", "ebitda"]
+
+    def test_payload_text_reads_serialized_node(self):
+        assert payload_text(point("p1", "Ricavi in crescita").payload) == "Ricavi in crescita"
+        assert payload_text({"text": "plain"}) == "plain"
+
+    def test_keyword_score_prefers_denser_matches(self):
+        terms = ["ricavi"]
+        dense = keyword_score("ricavi ricavi crescita", terms)
+        sparse = keyword_score("ricavi " + "altro " * 200, terms)
+        assert dense > sparse > 0
+        assert keyword_score("nessuna corrispondenza", terms) == 0
+
+    def test_highlights_wrap_terms_and_merge_overlaps(self):
+        snippets = highlight_snippets("I ricavi e l'EBITDA sono cresciuti.", ["ricavi", "ebitda"])
+        assert snippets == ["I **ricavi** e l'**EBITDA** sono cresciuti."]
+
+    def test_rank_keyword_hits_orders_and_strips_node_payload(self):
+        points = [
+            point("a", "costi del personale e ricavi " + "testo " * 100, source="a.pdf"),
+            point("b", "ricavi netti, ricavi lordi", source="b.pdf", page=3),
+        ]
+
+        hits = rank_keyword_hits(points, ["ricavi"], limit=1)
+
+        assert [hit.id for hit in hits] == ["b"]
+        result = hits[0].to_dict()
+        assert (result["source"], result["page"]) == ("b.pdf", 3)
+        assert result["metadata"] == {"source": "b.pdf", "page": 3}
+        assert result["highlights"] == ["**ricavi** netti, **ricavi** lordi"]
+
+
+class TestChunkTextPayload:
+    """The full-text index covers a plain chunk text field, not the serialized node."""
+
+    def test_points_carry_plain_chunk_text(self):
+        from llama_index.core.schema import TextNode
+        from qdrant_client import QdrantClient
+
+        from services.chunk_search import CHUNK_TEXT_FIELD, ChunkTextQdrantVectorStore
+
+        store = ChunkTextQdrantVectorStore(client=QdrantClient(location=":memory:"), collection_name="chunks")
+        node = TextNode(text="Ricavi netti\nEBITDA in crescita", metadata={"source": "a.pdf"}, embedding=[0.1, 0.2])
+
+        [built], _ = store._build_points([node], store.sparse_vector_name)
+
+        assert built.payload[CHUNK_TEXT_FIELD] == "Ricavi netti\nEBITDA in crescita"
+        assert query_terms(built.payload[CHUNK_TEXT_FIELD]) == ["ricavi", "netti", "ebitda", "in", "crescita"]
+        assert payload_text(built.payload) == node.text
+        [hit] = rank_keyword_hits([SimpleNamespace(id="p", payload=built.payload)], ["ebitda"], 1)
+        assert "text" not in hit.metadata
+
+    def test_keyword_search_matches_words_only_in_chunk_text(self, tmp_path):
+        from qdrant_client import QdrantClient
+        from qdrant_client.models import PointStruct
+
+        from services.document_catalog import DocumentCatalog
+        from services.rag_engine import RAGEngine
+
+        engine = RAGEngine.__new__(RAGEngine)
+        engine.client = QdrantClient(location=":memory:")
+        engine.collection_name = "keyword_search"
+        engine.document_catalog = DocumentCatalog(str(tmp_path / "catalog.db"))
+        engine.client.create_collection("keyword_search", vectors_config={})
+        for idx, text in enumerate(["Ricavi netti\nEBITDA in crescita", "Costi del personale"]):
+            payload = point(str(idx), text, source="a.pdf").payload
+            engine.client.upsert("keyword_search", [PointStruct(id=idx, vector={}, payload=payload)])
+        engine._ensure_payload_indexes().join()
+
+        hits = engine._keyword_search("ebitda", ["ebitda"], 5, None)
+        assert [hit.id for hit in hits] == ["0"]
+        # JSON keys and metadata values of the serialized node are not searchable
+        assert engine._keyword_search("source", ["source"], 5, None) == []
+        assert engine._keyword_search("pdf", ["pdf"], 5, None) == []
+
+    def test_best_hits_are_found_beyond_the_first_scroll_page(self, monkeypatch):
+        from config.settings import settings
+        from services.rag_engine import RAGEngine
+
+        texts = ["ricavi " + "altro " * 200] * 600 + ["ricavi ricavi ricavi"]
+
+        class PagingClient:
+            def __init__(self):
+                self.pages = 0
+
+            def scroll(self, collection_name, scroll_filter, limit, offset, with_payload, with_vectors):
+                self.pages += 1
+                start = offset or 0
+                page = [point(str(idx), texts[idx]) for idx in range(start, min(start + limit, len(texts)))]
+                return page, start + limit if start + limit < len(texts) else None
+
+        engine = RAGEngine.__new__(RAGEngine)
+        engine.client = PagingClient()
+        engine.collection_name = "paged"
+
+        hits = engine._keyword_search("ricavi", ["ricavi"], 1, None)
+        assert [hit.id for hit in hits] == ["600"]
+        assert engine.client.pages == 3
+
+        monkeypatch.setattr(settings, "keyword_search_max_scan", 300)
+        engine.client = PagingClient()
+        assert engine._keyword_search("ricavi", ["ricavi"], 1, None)[0].id == "0"
+        assert engine.client.pages == 2
+
+    def test_interrupted_backfill_resumes_on_next_start(self, tmp_path):
+        from qdrant_client import QdrantClient
+        from qdrant_client.models import PointStruct
+
+        from services.chunk_search import CHUNK_TEXT_FIELD
+        from services.document_catalog import DocumentCatalog
+        from services.rag_engine import RAGEngine
+
+        engine = RAGEngine.__new__(RAGEngine)
+        engine.client = QdrantClient(location=":memory:")
+        engine.collection_name = "backfill"
+        engine.document_catalog = DocumentCatalog(str(tmp_path / "catalog.db"))
+        engine.client.create_collection("backfill", vectors_config={})
+        engine.client.upsert(
+            "backfill", [PointStruct(id=idx, vector={}, payload=point(str(idx), f"testo {idx}").payload) for idx in range(3)]
+        )
+
+        # First start: the backfill fails midway (the text index is created regardless)
+        update_points = engine.client.batch_update_points
+        engine.client.batch_update_points = lambda **kwargs: (_ for _ in ()).throw(ConnectionError("qdrant restarted"))
+        engine._ensure_payload_indexes().join()
+        assert not engine.document_catalog.chunk_text_backfilled
+
+        engine.client.batch_update_points = update_points
+        engine._ensure_payload_indexes().join()
+        points, _ = engine.client.scroll("backfill", limit=10, with_payload=[CHUNK_TEXT_FIELD])
+        assert sorted(p.payload[CHUNK_TEXT_FIELD] for p in points) == ["testo 0", "testo 1", "testo 2"]
+        assert engine.document_catalog.chunk_text_backfilled
+        assert engine._ensure_payload_indexes() is None
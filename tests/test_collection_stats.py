@@ -0,0 +1,122 @@
+"""Tests for the cached collection statistics service."""
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from services.collection_stats import CollectionStatsService
+
+
+class FakeQdrant:
+    """Minimal Qdrant client exposing get_collection and scroll."""
+
+    def __init__(self, sources):
+        self.payloads = [{"source": source} for source in sources]
+        self.get_collection_calls = 0
+        self.scroll_calls = 0
+
+    def get_collection(self, collection_name):
+        self.get_collection_calls += 1
+        vectors = SimpleNamespace(size=1536, distance="Cosine")
+        config = SimpleNamespace(params=SimpleNamespace(vectors=vectors))
+        return SimpleNamespace(points_count=len(self.payloads), config=config)
+
+    def scroll(self, collection_name, limit, offset=None, with_payload=True, with_vectors=False):
+        self.scroll_calls += 1
+        start = offset or 0
+        batch = [SimpleNamespace(payload=payload) for payload in self.payloads[start : start + limit]]
+        next_offset = start + limit if start + limit < len(self.payloads) else None
+        return batch, next_offset
+
+
+def make_service(client, refresh_seconds=30.0):
+    @contextmanager
+    def provider():
+        yield client
+
+    return CollectionStatsService(client_provider=provider, refresh_seconds=refresh_seconds, scroll_batch_size=2)
+
+
+class TestCollectionStatsService:
+    """Test caching, incremental updates and drift detection."""
+
+    def test_stats_are_cached_between_calls(self):
+        client = FakeQdrant(["a.pdf", "a.pdf", "b.csv"])
+        service = make_service(client)
+
+        first = service.get_stats("docs", include_sources=True)
+        second = service.get_stats("docs")
+
+        assert first["total_vectors"] == 3
+        assert first["vector_dimension"] == 1536
+        assert first["chunks_per_source"] == {"a.pdf": 2, "b.csv": 1}
+        assert second["document_count"] == 2
+        assert client.get_collection_calls == 1
+
+    def test_incremental_insert_and_delete(self):
+        client = FakeQdrant(["a.pdf", "a.pdf"])
+        service = make_service(client)
+        service.get_stats("docs", include_sources=True)
+
+        service.record_insert("docs", {"b.csv": 3})
+        service.record_delete("docs", "a.pdf", 2)
+
+        stats = service.get_stats("docs", include_sources=True)
+        assert stats["total_vectors"] == 3
+        assert stats["chunks_per_source"] == {"b.csv": 3}
+
+    def test_rescan_only_when_point_count_drifts(self):
+        client = FakeQdrant(["a.pdf"])
+        service = make_service(client, refresh_seconds=0)
+        service.get_stats("docs", include_sources=True)
+        scrolls = client.scroll_calls
+
+        service.get_stats("docs", include_sources=True)
+        assert client.scroll_calls == scrolls
+
+        client.payloads.append({"source": "c.txt"})  # Written by another process
+        stats = service.get_stats("docs", include_sources=True)
+        assert client.scroll_calls > scrolls
+        assert stats["chunks_per_source"] == {"a.pdf": 1, "c.txt": 1}
+
+    def test_sources_are_scanned_only_when_requested(self):
+        client = FakeQdrant(["a.pdf", "b.csv"])
+        service = make_service(client, refresh_seconds=0)
+
+        stats = service.get_stats("docs")
+        client.payloads.append({"source": "c.txt"})  # Drift alone does not trigger a scan
+        service.record_insert("docs", {"d.pdf": 2})
+        drifted = service.get_stats("docs")
+
+        assert stats["total_vectors"] == 2 and "chunks_per_source" not in stats
+        assert drifted["total_vectors"] == 3
+        assert client.scroll_calls == 0
+
+        with_sources = service.get_stats("docs", include_sources=True)
+        assert with_sources["chunks_per_source"] == {"a.pdf": 1, "b.csv": 1, "c.txt": 1}
+        assert client.scroll_calls == 2
+
+    def test_counts_without_sources_follow_inserts_and_deletes(self):
+        client = FakeQdrant(["a.pdf", "a.pdf"])
+        service = make_service(client)
+        service.get_stats("docs")
+
+        service.record_insert("docs", {"b.csv": 3})
+        service.record_delete("docs", "b.csv", 1)
+
+        assert service.get_stats("docs")["total_vectors"] == 4
+        assert client.get_collection_calls == 1
+
+        service.record_delete("docs", "a.pdf")  # Unknown count: re-read from Qdrant
+        assert service.get_stats("docs")["total_vectors"] == 2
+        assert client.get_collection_calls == 2
+        assert client.scroll_calls == 0
+
+    def test_errors_are_reported(self):
+        class BrokenClient(FakeQdrant):
+            def get_collection(self, collection_name):
+                raise RuntimeError("collection not found")
+
+        stats = make_service(BrokenClient([])).get_stats("missing")
+
+        assert stats["total_vectors"] == 0
+        assert "collection not found" in stats["error"]
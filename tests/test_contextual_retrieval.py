@@ -0,0 +1,103 @@
+"""Tests for batched neighbor expansion in contextual retrieval."""
+
+from types import SimpleNamespace
+
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores.utils import node_to_metadata_dict
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as rest
+
+from services.contextual_retrieval_service import ContextualRetrievalService
+
+
+def make_chunk(source: str, chunk_index: int) -> TextNode:
+    return TextNode(
+        id_=f"{source}-{chunk_index}",
+        text=f"{source} chunk {chunk_index}",
+        metadata={"source": source, "chunk_index": chunk_index},
+    )
+
+
+class FakeQdrantClient:
+    """Serve scroll requests from in-memory chunks, honouring the neighbor filter."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.scroll_calls = []
+
+    def scroll(self, collection_name, scroll_filter, limit, with_payload, with_vectors):
+        self.scroll_calls.append(scroll_filter)
+        wanted = {
+            (sub.must[0].match.value, index) for sub in scroll_filter.should for index in sub.must[1].match.any
+        }
+        points = [
+            SimpleNamespace(id=chunk.node_id, payload=node_to_metadata_dict(chunk, flat_metadata=False))
+            for chunk in self.chunks
+            if (chunk.metadata["source"], chunk.metadata["chunk_index"]) in wanted
+        ]
+        return points[:limit], None
+
+
+class TestContextualRetrievalService:
+    """Test that neighbors of all results are fetched with one request."""
+
+    def test_neighbors_fetched_in_single_scroll(self):
+        chunks = [make_chunk("bilancio.pdf", i) for i in range(6)] + [make_chunk("nota.pdf", i) for i in range(3)]
+        client = FakeQdrantClient(chunks)
+        vector_store = SimpleNamespace(client=client, collection_name="business_documents")
+        results = [
+            {"id": "bilancio.pdf-2", "content": "bilancio.pdf chunk 2", "score": 0.9, "metadata": chunks[2].metadata},
+            {"id": "nota.pdf-0", "content": "nota.pdf chunk 0", "score": 0.8, "metadata": chunks[6].metadata},
+        ]
+        service = ContextualRetrievalService(window_size=1)
+
+        enhanced = service.enhance_retrieval_results(results, vector_store)
+
+        assert len(client.scroll_calls) == 1
+        assert [(c.chunk_id, c.context_type) for c in enhanced] == [
+            ("bilancio.pdf-2", "original"),
+            ("bilancio.pdf-1", "before"),
+            ("bilancio.pdf-3", "after"),
+            ("nota.pdf-0", "original"),
+            ("nota.pdf-1", "after"),
+        ]
+        assert enhanced[1].content == "bilancio.pdf chunk 1"
+
+    def test_chunks_without_position_are_not_expanded(self):
+        client = FakeQdrantClient([])
+        vector_store = SimpleNamespace(client=client, collection_name="business_documents")
+        results = [{"id": "legacy", "content": "testo", "score": 0.9, "metadata": {"source": "old.pdf"}}]
+
+        enhanced = ContextualRetrievalService().enhance_retrieval_results(results, vector_store)
+
+        assert [c.chunk_id for c in enhanced] == ["legacy"]
+        assert client.scroll_calls == []
+
+    def test_neighbors_excluded_by_the_search_filter_are_not_returned(self):
+        client = QdrantClient(":memory:")
+        client.create_collection("docs", vectors_config=rest.VectorParams(size=2, distance=rest.Distance.COSINE))
+        levels = ["public", "public", "restricted", "public"]
+        client.upsert(
+            "docs",
+            points=[
+                rest.PointStruct(
+                    id=index,
+                    vector=[1.0, 0.0],
+                    payload={**node_to_metadata_dict(make_chunk("bilancio.pdf", index)), "classification": level},
+                )
+                for index, level in enumerate(levels)
+            ],
+        )
+        vector_store = SimpleNamespace(client=client, collection_name="docs")
+        public_only = rest.Filter(
+            must=[rest.FieldCondition(key="classification", match=rest.MatchValue(value="public"))]
+        )
+        results = [{"id": "1", "content": "bilancio.pdf chunk 1", "score": 0.9,
+                    "metadata": {"source": "bilancio.pdf", "chunk_index": 1}}]
+        service = ContextualRetrievalService(window_size=1)
+
+        unfiltered = service.enhance_retrieval_results(results, vector_store)
+        filtered = service.enhance_retrieval_results(results, vector_store, qdrant_filter=public_only)
+
+        assert sorted(c.chunk_index for c in unfiltered) == [0, 1, 2]
+        assert sorted(c.chunk_index for c in filtered) == [0, 1]
@@ -0,0 +1,81 @@
+"""Tests for vectorized number normalization over pandas columns."""
+
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.csv_analyzer import CSVAnalyzer
+from src.application.services.data_normalizer import DataNormalizer, ScaleUnit
+
+VALUES = [
+    "1.234,56", "1,234.56", "1234,5", "1,234,567", "12,345", "0,123", "1.234", "-12.75", "5.",
+    "1.234.567", "1.234.567,89", "€ 1.234", "1.234,56 EUR", "USD 1,000.00", "(500)", "(1.234,5)",
+    "-12,3", "12%", "3 mln", "800k", "abc", "", "  ", "1.2.3", "(-)",
+]
+
+
+@pytest.fixture
+def normalizer():
+    return DataNormalizer()
+
+
+class TestSeriesNormalization:
+    """The vectorized path must agree with ``normalize_number`` cell by cell."""
+
+    def test_matches_scalar_parser(self, normalizer):
+        series = pd.Series(VALUES)
+        result = normalizer.batch_normalize(series, context="fatturato")
+
+        for position, raw in enumerate(VALUES):
+            row = result.iloc[position]
+            scalar = normalizer.normalize_number(raw, "fatturato")
+            if scalar is None:
+                assert not row["parsed"], raw
+                continue
+            assert row["parsed"], raw
+            assert row["value"] == pytest.approx(float(scalar.value)), raw
+            assert Decimal(row["number"]) == abs(scalar.value), raw
+            assert row["currency"] == scalar.currency, raw
+            assert row["is_negative"] == scalar.is_negative, raw
+            assert row["is_percentage"] == scalar.is_percentage, raw
+            assert row["confidence"] == pytest.approx(scalar.confidence), raw
+            assert row["scale"] is scalar.scale_applied, raw
+
+    def test_keeps_series_index(self, normalizer):
+        series = pd.Series(["1,5", "2"], index=[10, 20])
+        result = normalizer.batch_normalize(series)
+        assert list(result.index) == [10, 20]
+        assert list(result["value"]) == [1.5, 2.0]
+
+    def test_dict_input_still_returns_normalized_values(self, normalizer):
+        result = normalizer.batch_normalize({"ricavi": "1.234,56", "nota": "n/d"})
+        assert set(result) == {"ricavi"}
+        assert result["ricavi"].value == Decimal("1234.56")
+
+    def test_dotted_thousands_and_scale_suffix(self, normalizer):
+        assert normalizer.normalize_number("1.234.567").value == Decimal("1234567")
+        millions = normalizer.normalize_number("1,5 mln")
+        assert millions.value == Decimal("1.5")
+        assert millions.scale_applied is ScaleUnit.MILLIONS
+
+
+class TestCSVNumericColumn:
+    """CSVAnalyzer parses object columns through the batch normalizer."""
+
+    def test_parses_values_with_provenance(self):
+        series = pd.Series(["1.234,56", None, "n/d", "(500)", "7"])
+        parsed, provenance = CSVAnalyzer()._parse_numeric_column(series, "fatturato", "/tmp/vendite.csv")
+
+        assert parsed.iloc[0] == pytest.approx(1234.56)
+        assert np.isnan(parsed.iloc[1]) and np.isnan(parsed.iloc[2])
+        assert parsed.iloc[3] == -500
+        assert [value.value for value in provenance] == [Decimal("1234.56"), Decimal("-500"), Decimal("7")]
+        assert [value.source_ref.page for value in provenance] == [2, 5, 6]
+        assert provenance[0].source_ref.file_name == "vendite.csv"
+        assert provenance[-1].source_ref.source_type == provenance[0].source_ref.source_type
+
+    def test_non_numeric_column_is_left_alone(self):
+        parsed, provenance = CSVAnalyzer()._parse_numeric_column(pd.Series(["nord", "sud"]), "area", "x.csv")
+        assert parsed is None and provenance == []
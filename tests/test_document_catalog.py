@@ -0,0 +1,189 @@
+"""Tests for the per-collection document catalog."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from services.document_catalog import (
+    DocumentCatalog,
+    DocumentVectorBuilder,
+    entries_from_payloads,
+    vectors_from_chunks,
+)
+
+
+def chunk(source, document_id, page=None, size=100, **extra):
+    return {"source": source, "document_id": document_id, "page": page, "document_size": size, **extra}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    return DocumentCatalog(str(tmp_path / "catalog.sqlite"))
+
+
+class TestDocumentCatalog:
+    """Test ingest, delete and rebuild bookkeeping."""
+
+    def test_entries_group_chunks_by_source(self):
+        entries = entries_from_payloads(
+            [
+                chunk("bilancio.pdf", "p1", page=1, file_type=".pdf", indexed_at="2024-03-01"),
+                chunk("bilancio.pdf", "p2", page=2),
+                chunk("bilancio.pdf", "p2", page=2),
+                chunk("vendite.csv", "c1", file_types=".csv"),
+            ]
+        )
+
+        bilancio, vendite = entries
+        assert (bilancio.chunk_count, bilancio.text_size, bilancio.pages) == (3, 300, [1, 2])
+        assert bilancio.document_chunks == {"p1": 1, "p2": 2}
+        assert vendite.file_type == ".csv"
+
+    def test_reingest_adds_chunks_and_lists_newest_first(self, catalog):
+        catalog.record_ingest(entries_from_payloads([chunk("a.pdf", "a1", page=1, indexed_at="2024-01-01")]))
+        catalog.record_ingest(entries_from_payloads([chunk("b.pdf", "b1", indexed_at="2024-02-01")]))
+        catalog.record_ingest(entries_from_payloads([chunk("a.pdf", "a2", page=2, indexed_at="2024-03-01")]))
+
+        listed = catalog.list_documents()
+        assert [entry.source for entry in listed] == ["a.pdf", "b.pdf"]
+        assert (listed[0].chunk_count, listed[0].pages) == (2, [1, 2])
+        assert catalog.get_stats()["total_chunks"] == 3
+
+    def test_document_id_delete_subtracts_chunks(self, catalog):
+        catalog.record_ingest(entries_from_payloads([chunk("a.pdf", "a1"), chunk("a.pdf", "a2"), chunk("b.pdf", "b1")]))
+
+        assert sorted(catalog.remove_document_ids(["a1", "b1"])) == ["a.pdf", "b.pdf"]
+
+        assert [(entry.source, entry.chunk_count) for entry in catalog.list_documents()] == [("a.pdf", 1)]
+
+    def test_rebuild_replaces_contents_and_marks_synced(self, catalog):
+        catalog.record_ingest(entries_from_payloads([chunk("old.pdf", "o1")]))
+        assert not catalog.synced
+
+        catalog.rebuild(entries_from_payloads([chunk("new.pdf", "n1")]))
+
+        assert catalog.synced
+        assert [entry.source for entry in catalog.list_documents()] == ["new.pdf"]
+        assert catalog.remove_sources(["new.pdf"]) == 1
+
+
+class TestDocumentVectors:
+    """Test centroid and medoid bookkeeping of document vectors."""
+
+    def ingest(self, catalog, chunks):
+        payloads = [payload for payload, _ in chunks]
+        catalog.record_ingest(entries_from_payloads(payloads), vectors_from_chunks(chunks))
+
+    def test_centroid_accumulates_across_ingests(self, catalog):
+        self.ingest(catalog, [(chunk("a.pdf", "a1"), [1.0, 0.0]), (chunk("a.pdf", "a1"), [0.0, 1.0])])
+        self.ingest(catalog, [(chunk("a.pdf", "a2"), [1.0, 1.0]), (chunk("b.pdf", "b1"), None)])
+
+        names, vectors = catalog.get_document_vectors()
+
+        assert names == ["a.pdf"]
+        np.testing.assert_allclose(vectors[0], [2 / 3, 2 / 3])
+
+    def test_medoid_is_a_chunk_vector_closest_to_centroid(self, catalog):
+        chunks = [(chunk("a.pdf", "a1"), vector) for vector in ([1.0, 0.0], [0.9, 0.4], [0.0, 1.0])]
+        self.ingest(catalog, chunks)
+
+        _, medoids = catalog.get_document_vectors(["a.pdf", "missing.pdf"], kind="medoid")
+
+        np.testing.assert_allclose(medoids, [[0.9, 0.4]], rtol=1e-6)
+
+    def test_deletes_drop_document_vectors(self, catalog):
+        self.ingest(
+            catalog,
+            [(chunk("a.pdf", "a1"), [1.0, 0.0]), (chunk("a.pdf", "a2"), [0.0, 1.0]), (chunk("b.pdf", "b1"), [1.0, 1.0])],
+        )
+
+        catalog.remove_document_ids(["a2"])
+        catalog.remove_sources(["b.pdf"])
+
+        names, vectors = catalog.get_document_vectors()
+        assert names == ["a.pdf"]
+        np.testing.assert_allclose(vectors[0], [1.0, 0.0])
+
+
+class TestCatalogBackfill:
+    """Listing backfill scrolls payloads only; document vectors are built page by page."""
+
+    class FakeClient:
+        """Qdrant client paging through (payload, vector) points and recording every scroll."""
+
+        def __init__(self, points):
+            self.points = points
+            self.scrolls = []
+
+        def scroll(self, collection_name, limit, offset, with_payload, with_vectors):
+            start = offset or 0
+            page = self.points[start:start + limit]
+            self.scrolls.append((limit, with_vectors))
+            next_offset = start + limit if start + limit < len(self.points) else None
+            records = [
+                SimpleNamespace(payload=payload, vector=vector if with_vectors else None) for payload, vector in page
+            ]
+            return records, next_offset
+
+    def make_engine(self, tmp_path, points):
+        from services.rag_engine import RAGEngine
+
+        engine = RAGEngine.__new__(RAGEngine)
+        engine.client = self.FakeClient(points)
+        engine.collection_name = "test_backfill"
+        engine.document_catalog = DocumentCatalog(str(tmp_path / "catalog.sqlite"))
+        return engine
+
+    POINTS = [
+        (chunk("a.pdf", "a1"), [1.0, 0.0]),
+        (chunk("b.pdf", "b1"), [0.0, 1.0]),
+        (chunk("a.pdf", "a1"), [0.9, 0.4]),
+        (chunk("a.pdf", "a1"), [0.0, 1.0]),
+    ]
+
+    def test_listing_never_downloads_vectors(self, tmp_path):
+        engine = self.make_engine(tmp_path, list(self.POINTS))
+
+        listed = engine.list_documents()
+
+        assert [(doc["name"], doc["chunk_count"]) for doc in listed] == [("a.pdf", 3), ("b.pdf", 1)]
+        assert engine.client.scrolls and not any(with_vectors for _, with_vectors in engine.client.scrolls)
+        assert engine.document_catalog.synced and not engine.document_catalog.vectors_synced
+
+    def test_catalog_is_aggregated_across_scroll_pages(self, tmp_path):
+        points = [(chunk("a.pdf", "a1"), None)] * 1500 + [(chunk("b.pdf", "b1"), None)] * 600
+        engine = self.make_engine(tmp_path, points)
+
+        assert engine.rebuild_document_catalog() == 2
+
+        assert len(engine.client.scrolls) == 3
+        entries = {entry.source: entry.chunk_count for entry in engine.document_catalog.list_documents()}
+        assert entries == {"a.pdf": 1500, "b.pdf": 600}
+
+    def test_vectors_are_built_from_scroll_pages(self, tmp_path):
+        engine = self.make_engine(tmp_path, list(self.POINTS))
+        engine.list_documents()
+
+        names, vectors = engine._get_document_vectors(kind="medoid")
+
+        vector_scrolls = [limit for limit, with_vectors in engine.client.scrolls if with_vectors]
+        assert len(vector_scrolls) == 2  # Centroid pass and medoid pass
+        assert names == ["a.pdf", "b.pdf"]
+        np.testing.assert_allclose(vectors[0], np.array([0.9, 0.4]) / np.linalg.norm([0.9, 0.4]), rtol=1e-6)
+        assert engine.document_catalog.vectors_synced
+
+    def test_builder_matches_in_memory_aggregation(self):
+        vectors = [(chunk("a.pdf", "a1"), list(v)) for v in np.random.default_rng(0).normal(size=(50, 8))]
+        builder = DocumentVectorBuilder()
+        for start in range(0, 50, 7):
+            builder.add_chunks(vectors[start:start + 7])
+        for start in range(0, 50, 7):
+            builder.add_medoid_candidates(vectors[start:start + 7])
+
+        [paged] = builder.build()
+        [whole] = vectors_from_chunks(vectors)
+        matrix = np.array([v for _, v in vectors])
+        np.testing.assert_allclose(paged.vector_sum, matrix.sum(axis=0))
+        np.testing.assert_allclose(paged.medoid, whole.medoid)
+        assert paged.chunk_count == 50
@@ -0,0 +1,98 @@
+"""Tests for filter-based document deletion in the RAG engine."""
+
+from types import SimpleNamespace
+
+from qdrant_client.models import FilterSelector
+
+from services.document_catalog import CatalogEntry, DocumentCatalog
+from services.rag_engine import RAGEngine
+
+
+class FakeQdrantClient:
+    """Qdrant client holding (source, document_id) points; deletes apply on the next count unless waited."""
+
+    def __init__(self, points):
+        self.points = points
+        self.delete_calls = []
+        self._pending = None
+
+    @staticmethod
+    def _matches(point, query_filter):
+        values = {"source": point[0], "document_id": point[1]}
+        return any(values[condition.key] in condition.match.any for condition in query_filter.should)
+
+    def count(self, collection_name, count_filter, exact):
+        if self._pending is not None:
+            self.points = [p for p in self.points if not self._matches(p, self._pending)]
+            self._pending = None
+        return SimpleNamespace(count=sum(self._matches(p, count_filter) for p in self.points))
+
+    def delete(self, collection_name, points_selector, wait):
+        self.delete_calls.append(points_selector)
+        self._pending = points_selector.filter
+        if wait:
+            self.count(collection_name, points_selector.filter, exact=True)
+        return SimpleNamespace(operation_id=len(self.delete_calls), status="acknowledged")
+
+
+def make_engine(points, catalog_path) -> RAGEngine:
+    engine = RAGEngine.__new__(RAGEngine)
+    engine.client = FakeQdrantClient(points)
+    engine.collection_name = "test_document_deletion"
+    engine.query_cache = None
+    engine.document_catalog = DocumentCatalog(str(catalog_path))
+    engine.document_catalog.record_ingest(
+        CatalogEntry(source=source, chunk_count=2, document_chunks={document_id: 2})
+        for source, document_id in {("a.pdf", "d1"), ("b.pdf", "d2"), ("c.pdf", "d3")}
+    )
+    return engine
+
+
+POINTS = [("a.pdf", "d1"), ("a.pdf", "d1"), ("b.pdf", "d2"), ("c.pdf", "d3")]
+
+
+class TestDocumentDeletion:
+    """Test single-request bulk deletes and asynchronous status."""
+
+    def test_bulk_delete_uses_one_filter_request(self, tmp_path):
+        engine = make_engine(list(POINTS), tmp_path / "catalog.sqlite")
+
+        result = engine.delete_sources(["a.pdf", "b.pdf", "a.pdf"])
+
+        assert result["matched_chunks"] == 3
+        assert result["status"] == "pending"
+        assert len(engine.client.delete_calls) == 1
+        assert isinstance(engine.client.delete_calls[0], FilterSelector)
+        assert engine.get_deletion_status(result["operation_id"])["status"] == "completed"
+        assert engine.client.points == [("c.pdf", "d3")]
+        assert [entry.source for entry in engine.document_catalog.list_documents()] == ["c.pdf"]
+
+    def test_delete_by_document_id(self, tmp_path):
+        engine = make_engine(list(POINTS), tmp_path / "catalog.sqlite")
+
+        result = engine.delete_by_filter(document_ids=["d3"], wait=True)
+
+        assert result["status"] == "completed"
+        assert ("c.pdf", "d3") not in engine.client.points
+        assert engine.document_catalog.get("c.pdf") is None
+
+    def test_missing_source_sends_no_delete(self, tmp_path):
+        engine = make_engine(list(POINTS), tmp_path / "catalog.sqlite")
+
+        assert engine.delete_document_by_source("missing.pdf") is False
+        assert engine.client.delete_calls == []
+        assert engine.get_deletion_status(42)["status"] == "unknown"
+
+    def test_status_is_shared_by_engines_of_the_collection(self, tmp_path):
+        engine = make_engine(list(POINTS), tmp_path / "catalog.sqlite")
+        result = engine.delete_sources(["b.pdf"])
+
+        # Another worker process (or the engine rebuilt after eviction) opens the same catalog
+        other = RAGEngine.__new__(RAGEngine)
+        other.client = engine.client
+        other.collection_name = engine.collection_name
+        other.document_catalog = DocumentCatalog(str(tmp_path / "catalog.sqlite"))
+
+        status = other.get_deletion_status(result["operation_id"])
+        assert (status["status"], status["matched_chunks"], status["remaining_chunks"]) == ("completed", 1, 0)
+        assert engine.document_catalog.get_deletion(result["operation_id"])["status"] == "completed"
@@ -0,0 +1,77 @@
+"""Tests for the persistent content-hash embedding cache."""
+
+import pytest
+
+from src.infrastructure.performance.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    embedding_cache = EmbeddingCache(db_path=str(tmp_path / "embeddings.sqlite"))
+    yield embedding_cache
+    embedding_cache.close()
+
+
+class Recorder:
+    """Embedding function recording every batch it is asked to embed."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 0.5] for text in texts]
+
+
+class TestEmbeddingCache:
+    """Test lookups, deduplication, persistence and eviction."""
+
+    def test_only_missing_texts_are_computed(self, cache):
+        compute = Recorder()
+        cache.get_or_compute("model-a", ["ricavi 2023", "ebitda"], compute)
+
+        result = cache.get_or_compute("model-a", ["ricavi 2023", "ebitda", "pfn"], compute)
+
+        assert compute.calls == [["ricavi 2023", "ebitda"], ["pfn"]]
+        assert result[0] == pytest.approx([11.0, 0.5])
+        assert cache.get_stats()["hits"] == 2
+
+    def test_whitespace_normalization_and_deduplication(self, cache):
+        compute = Recorder()
+
+        result = cache.get_or_compute("model-a", ["Totale  attivo\n", "Totale attivo"], compute)
+
+        assert compute.calls == [["Totale  attivo\n"]]
+        assert result[0] == result[1]
+
+    def test_model_is_part_of_the_key(self, cache):
+        compute = Recorder()
+        cache.get_or_compute("model-a", ["ricavi"], compute)
+        cache.get_or_compute("model-b", ["ricavi"], compute)
+
+        assert len(compute.calls) == 2
+
+    def test_entries_persist_across_instances(self, tmp_path):
+        path = str(tmp_path / "persist.sqlite")
+        first = EmbeddingCache(db_path=path)
+        first.set_many("model-a", ["testo"], [[1.0, 2.0]])
+        first.close()
+
+        second = EmbeddingCache(db_path=path)
+        assert second.get_many("model-a", ["testo", "altro"]) == [[1.0, 2.0], None]
+        second.close()
+
+    def test_size_based_eviction_drops_least_recently_used(self, tmp_path):
+        # Each 2-dim float32 vector takes 8 bytes
+        cache = EmbeddingCache(db_path=str(tmp_path / "small.sqlite"), max_size_bytes=32, evict_fraction=0.25)
+        for i in range(4):
+            cache.set_many("m", [f"chunk {i}"], [[float(i), 0.0]])
+        cache.get_many("m", ["chunk 0"])  # refresh chunk 0
+
+        cache.set_many("m", ["chunk 4"], [[4.0, 0.0]])
+
+        stats = cache.get_stats()
+        assert stats["size_bytes"] <= 24
+        assert cache.get_many("m", ["chunk 0"])[0] is not None
+        assert cache.get_many("m", ["chunk 1"])[0] is None
+        cache.close()
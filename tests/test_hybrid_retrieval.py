@@ -0,0 +1,132 @@
+"""Tests for incremental indexing in the hybrid retriever."""
+
+import numpy as np
+import pytest
+
+from src.application.services.bm25_index import InvertedBM25Index, top_k_indices
+from src.application.services.hybrid_retrieval import HybridRetriever
+
+CORPUS = [
+    "ricavi delle vendite in crescita nel 2023",
+    "ebitda margin in calo rispetto al 2022",
+    "posizione finanziaria netta e debiti verso banche",
+    "ricavi e costi operativi del gruppo",
+    "debiti verso fornitori e crediti commerciali",
+]
+
+
+@pytest.fixture
+def retriever(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    hybrid = HybridRetriever(cache_dir=str(tmp_path / "hybrid"))
+    hybrid.reranker = None
+    return hybrid
+
+
+class TestInvertedBM25Index:
+    """Test BM25 scores and postings maintenance."""
+
+    def test_scores_match_rank_bm25(self):
+        rank_bm25 = pytest.importorskip("rank_bm25")
+        corpus = [text.split() for text in CORPUS]
+        index = InvertedBM25Index()
+        for tokens in corpus:
+            index.add(tokens)
+
+        query = ["ricavi", "debiti", "verso", "2023"]
+        expected = rank_bm25.BM25Okapi(corpus).get_scores(query)
+
+        np.testing.assert_allclose(index.get_scores(query), expected)
+
+    def test_remove_moves_last_document_into_slot(self):
+        rank_bm25 = pytest.importorskip("rank_bm25")
+        corpus = [text.split() for text in CORPUS]
+        index = InvertedBM25Index()
+        for tokens in corpus:
+            index.add(tokens)
+
+        assert index.remove(1) == 4
+        remaining = [corpus[0], corpus[4], corpus[2], corpus[3]]
+
+        query = ["ebitda", "debiti", "ricavi"]
+        np.testing.assert_allclose(index.get_scores(query), rank_bm25.BM25Okapi(remaining).get_scores(query))
+        assert index.document_frequency("ebitda") == 0
+        assert index.vocabulary_size == len({token for tokens in remaining for token in tokens})
+
+    def test_delta_and_compacted_scores_agree(self):
+        corpus = [text.split() for text in CORPUS]
+        index = InvertedBM25Index(min_delta_docs=2, max_delta_ratio=0.0)
+        for tokens in corpus[:3]:
+            index.add(tokens)
+        index.compact()
+        for tokens in corpus[3:]:
+            index.add(tokens)
+
+        queries = [["ricavi", "2023"], ["debiti", "verso", "verso"], ["sconosciuto"]]
+        with_delta = index.get_scores_batch(queries)
+        assert index.get_stats()["compacted_documents"] == 3
+
+        index.compact()
+        np.testing.assert_allclose(with_delta, index.get_scores_batch(queries))
+        np.testing.assert_allclose(with_delta[1], index.get_scores(queries[1]))
+        assert not with_delta[2].any()
+
+
+def test_top_k_indices_returns_best_first():
+    scores = np.array([0.1, 0.9, 0.3, 0.7, 0.5])
+
+    assert top_k_indices(scores, 3).tolist() == [1, 3, 4]
+    assert top_k_indices(scores, 10).tolist() == [1, 3, 4, 2, 0]
+
+
+class TestHybridRetrieverIndexing:
+    """Test add/remove without full index rebuilds."""
+
+    def test_repeated_adds_keep_slots_aligned(self, retriever):
+        for i, text in enumerate(CORPUS):
+            retriever.add_documents([{"content": text, "id": f"doc-{i}"}])
+
+        assert len(retriever.bm25_index) == len(retriever.documents) == 5
+        best_slot, _ = retriever._bm25_search("posizione finanziaria netta")[0]
+        assert retriever.documents[best_slot].doc_id == "doc-2"
+
+    def test_same_id_replaces_document(self, retriever):
+        retriever.add_documents([{"content": CORPUS[0], "id": "bilancio.pdf"}])
+        retriever.add_documents([{"content": CORPUS[1], "id": "bilancio.pdf"}])
+
+        assert [doc.content for doc in retriever.documents] == [CORPUS[1]]
+        assert retriever._bm25_search("ricavi vendite") == []
+
+    def test_remove_documents_updates_embedding_rows(self, retriever):
+        retriever.add_documents([{"content": text, "id": f"doc-{i}"} for i, text in enumerate(CORPUS[:3])])
+        for slot in range(3):
+            retriever._store_embedding(slot, np.eye(4)[slot] * 3.0)
+
+        assert retriever.remove_documents(["doc-0", "missing"]) == 1
+
+        assert [doc.doc_id for doc in retriever.documents] == ["doc-2", "doc-1"]
+        np.testing.assert_array_equal(retriever.doc_embeddings, np.eye(4)[[2, 1]])
+
+    def test_unchanged_documents_are_not_reindexed(self, retriever, monkeypatch):
+        docs = [{"content": text, "id": f"doc-{i}"} for i, text in enumerate(CORPUS)]
+        retriever.add_documents(docs)
+        retriever._bm25_search("ricavi")  # Materializes the CSR index
+
+        def fail(slot):
+            raise AssertionError("unchanged document removed")
+
+        monkeypatch.setattr(retriever.bm25_index, "remove", fail)
+
+        retriever.add_documents(docs)
+
+        assert [doc.doc_id for doc in retriever.documents] == [f"doc-{i}" for i in range(5)]
+        assert not retriever.bm25_index._csr_stale
+
+    def test_removed_slot_embedding_is_zeroed(self, retriever):
+        retriever.add_documents([{"content": text, "id": f"doc-{i}"} for i, text in enumerate(CORPUS[:3])])
+        for slot in range(3):
+            retriever._store_embedding(slot, np.eye(4)[slot])
+
+        retriever.remove_documents(["doc-0"])
+
+        np.testing.assert_array_equal(retriever._embedding_matrix[2], np.zeros(4))
@@ -0,0 +1,104 @@
+"""Tests for concurrent, cached HyDE generation and batched search."""
+
+import asyncio
+from types import SimpleNamespace
+
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
+from llama_index.core.vector_stores.types import VectorStoreQueryResult
+
+from src.application.services.hyde_retriever import HyDEConfig, HyDERetriever, HypotheticalDocumentCache
+
+
+class FakeLLM:
+    """LLM echoing the prompt temperature, recording every call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def complete(self, prompt, temperature, max_tokens):
+        self.calls.append(prompt)
+        return SimpleNamespace(text=f"ipotesi t={temperature:.1f}")
+
+    async def acomplete(self, prompt, temperature, max_tokens):
+        return self.complete(prompt, temperature, max_tokens)
+
+
+class FakeEmbedModel:
+    def __init__(self):
+        self.batches = []
+
+    def get_text_embedding_batch(self, texts):
+        self.batches.append(list(texts))
+        return [[float(i), 1.0] for i in range(len(texts))]
+
+
+class FakeVectorStore:
+    """Qdrant store answering batch queries; request i returns node n{i} with score 0.5 + i/10."""
+
+    dense_vector_name = ""
+    collection_name = "business_documents"
+
+    def __init__(self):
+        self.batch_calls = []
+        self.client = SimpleNamespace(query_batch_points=self._query_batch_points)
+
+    def _query_batch_points(self, collection_name, requests):
+        self.batch_calls.append(requests)
+        return [SimpleNamespace(points=[i]) for i in range(len(requests))]
+
+    def parse_to_query_result(self, points):
+        nodes = [TextNode(id_=f"n{i}", text=f"chunk {i}") for i in points]
+        return VectorStoreQueryResult(nodes=nodes, similarities=[0.5 + i / 10 for i in points], ids=None)
+
+
+class FailingRetriever:
+    similarity_top_k = 4
+
+    def retrieve(self, query_bundle):
+        raise AssertionError("base retriever must not be used")
+
+
+def make_retriever(**config) -> HyDERetriever:
+    return HyDERetriever(
+        base_retriever=FailingRetriever(),
+        llm=FakeLLM(),
+        config=HyDEConfig(num_hypothetical_docs=3, **config),
+        vector_store=FakeVectorStore(),
+        embed_model=FakeEmbedModel(),
+        cache=HypotheticalDocumentCache(),
+    )
+
+
+class TestHyDERetriever:
+    """Test generation, caching and the single batched search."""
+
+    def test_one_generation_call_per_document(self):
+        retriever = make_retriever()
+
+        docs = retriever._generate_hypothetical_documents("Qual è l'EBITDA?")
+
+        assert sorted(docs) == ["ipotesi t=0.0", "ipotesi t=0.1", "ipotesi t=0.2"]
+        assert len(retriever.llm.calls) == 3
+
+    def test_generated_documents_cached_per_normalized_query(self):
+        retriever = make_retriever()
+        retriever._generate_hypothetical_documents("Qual è l'EBITDA?")
+
+        asyncio.run(retriever._agenerate_hypothetical_documents("  qual è   l'ebitda? "))
+
+        assert len(retriever.llm.calls) == 3
+        assert retriever.cache.get_stats()["hits"] == 1
+
+    def test_single_embedding_batch_and_qdrant_request(self):
+        retriever = make_retriever(include_original_query=True, fusion_weight=0.3)
+
+        nodes = retriever.retrieve(QueryBundle(query_str="ricavi 2023"))
+
+        assert len(retriever.embed_model.batches) == 1
+        assert retriever.embed_model.batches[0][0] == "ricavi 2023"
+        assert len(retriever.vector_store.batch_calls) == 1
+        assert [request.limit for request in retriever.vector_store.batch_calls[0]] == [4, 4, 4, 4]
+        # n0 comes from the original query only and is down-weighted by the fusion weight
+        assert [node.node.id_ for node in nodes] == ["n3", "n2", "n1", "n0"]
+        assert isinstance(nodes[0], NodeWithScore)
+        assert nodes[-1].score == 0.5 * 0.3
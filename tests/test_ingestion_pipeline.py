@@ -0,0 +1,142 @@
+"""Tests for the batched embedding ingestion pipeline."""
+
+import threading
+from unittest.mock import Mock
+
+from llama_index.core.schema import TextNode
+
+from services.ingestion_pipeline import EmbeddingIngestionPipeline
+
+
+class FakeEmbedModel:
+    """Embedding model recording the size of every batch request."""
+
+    def __init__(self, fail_on: str = None):
+        self.calls = []
+        self.fail_on = fail_on
+        self._lock = threading.Lock()
+
+    def get_text_embedding_batch(self, texts):
+        with self._lock:
+            self.calls.append(len(texts))
+        if self.fail_on and any(self.fail_on in text for text in texts):
+            raise RuntimeError("embedding service unavailable")
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def _nodes(prefix: str, count: int) -> list:
+    return [TextNode(text=f"{prefix} chunk {i}") for i in range(count)]
+
+
+class TestEmbeddingIngestionPipeline:
+    """Test batching, bulk upsert and failure reporting."""
+
+    def test_nodes_from_many_files_share_batches(self):
+        index = Mock()
+        embed_model = FakeEmbedModel()
+        pipeline = EmbeddingIngestionPipeline(
+            index, embed_model, max_batch_nodes=10, max_concurrency=2, upsert_batch_size=1000
+        )
+
+        result = pipeline.run({f"file_{i}.pdf": _nodes(f"file_{i}", 3) for i in range(10)})
+
+        assert sum(embed_model.calls) == 30
+        assert max(embed_model.calls) == 10
+        assert len(embed_model.calls) == 3
+        # A single bulk upsert for all embedded nodes
+        index.insert_nodes.assert_called_once()
+        upserted = index.insert_nodes.call_args[0][0]
+        assert len(upserted) == 30
+        assert all(node.embedding is not None for node in upserted)
+        assert result.failed_keys == {}
+        assert result.stats.upserted_nodes == 30
+        assert 1 <= result.stats.peak_batches_in_flight <= 2
+
+    def test_batches_are_bounded_by_characters(self):
+        embed_model = FakeEmbedModel()
+        pipeline = EmbeddingIngestionPipeline(Mock(), embed_model, max_batch_nodes=100, max_batch_chars=30)
+
+        pipeline.run({"doc.txt": [TextNode(text="x" * 20) for _ in range(4)]})
+
+        assert embed_model.calls == [1, 1, 1, 1]
+
+    def test_failed_batch_marks_only_its_files(self):
+        index = Mock()
+        embed_model = FakeEmbedModel(fail_on="broken")
+        pipeline = EmbeddingIngestionPipeline(index, embed_model, max_batch_nodes=2, max_concurrency=1)
+
+        result = pipeline.run({"ok.pdf": _nodes("ok", 2), "bad.pdf": _nodes("broken", 2)})
+
+        assert set(result.failed_keys) == {"bad.pdf"}
+        assert result.stats.failed_batches == 1
+        assert result.stats.upserted_nodes == 2
+
+    def test_file_spanning_a_failed_batch_is_rolled_back(self):
+        index = Mock()
+        embed_model = FakeEmbedModel(fail_on="broken")
+        pipeline = EmbeddingIngestionPipeline(
+            index, embed_model, max_batch_nodes=2, max_concurrency=1, upsert_batch_size=1
+        )
+        mixed = _nodes("big", 3) + [TextNode(text="broken chunk")]
+
+        result = pipeline.run({"ok.pdf": _nodes("ok", 2), "big.pdf": mixed})
+
+        # ok.pdf fills the first batch; big.pdf's first two chunks are upserted before its last batch fails
+        assert set(result.failed_keys) == {"big.pdf"}
+        index.delete_nodes.assert_called_once_with([node.node_id for node in mixed[:2]])
+        assert result.stats.rolled_back_nodes == 2
+        assert result.stats.upserted_nodes == 2
+        assert result.partial_keys == {}
+
+    def test_failed_rollback_reports_a_partial_file(self):
+        index = Mock()
+        index.delete_nodes.side_effect = RuntimeError("qdrant unreachable")
+        pipeline = EmbeddingIngestionPipeline(
+            index, FakeEmbedModel(fail_on="broken"), max_batch_nodes=2, max_concurrency=1, upsert_batch_size=1
+        )
+
+        result = pipeline.run({"big.pdf": _nodes("big", 2) + [TextNode(text="broken chunk")]})
+
+        assert result.partial_keys == {"big.pdf": 2}
+        assert "partially indexed: 2 chunks" in result.failed_keys["big.pdf"]
+
+    def test_empty_input(self):
+        index = Mock()
+        result = EmbeddingIngestionPipeline(index, FakeEmbedModel()).run({})
+
+        assert result.stats.total_nodes == 0
+        index.insert_nodes.assert_not_called()
+
+
+class TestReupload:
+    """Re-indexing an unchanged file must be served from the embedding cache."""
+
+    def test_second_upload_makes_no_embedding_calls(self, tmp_path, monkeypatch):
+        from llama_index.core import Settings
+
+        from services.document_catalog import DocumentCatalog
+        from services.rag_engine import RAGEngine
+        from src.infrastructure.performance.embedding_cache import EmbeddingCache
+
+        embed_model = FakeEmbedModel()
+        monkeypatch.setattr(Settings, "_embed_model", embed_model)
+
+        engine = RAGEngine.__new__(RAGEngine)
+        engine.index = Mock()
+        engine.collection_name = "test_reupload"
+        engine.embedding_cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"))
+        engine.document_catalog = DocumentCatalog(str(tmp_path / "catalog.sqlite"))
+        engine.analyze_document_content = lambda text, name, prompt_type=None: ""
+
+        report = tmp_path / "report.txt"
+        report.write_text("Ricavi in crescita del 12%.\n\nEBITDA stabile rispetto al 2023.", encoding="utf-8")
+
+        engine.index_documents([str(report)], original_names=["report.txt"], permanent_paths=["/data/1/report.txt"])
+        first_calls = len(embed_model.calls)
+        engine.index_documents([str(report)], original_names=["report.txt"], permanent_paths=["/data/2/report.txt"])
+
+        assert first_calls > 0
+        assert len(embed_model.calls) == first_calls
+        embedded = engine.index.insert_nodes.call_args[0][0][0]
+        assert "indexed_at" in embedded.metadata
+        assert "indexed_at" not in embedded.get_content(metadata_mode="embed")
@@ -0,0 +1,203 @@
+"""Tests for page-level OCR gating, the OCR worker pool and the OCR result cache."""
+
+import threading
+
+import fitz
+import pytest
+
+from src.application.services.ocr_service import OCRService, page_ocr_dpi, text_from_ocr_data
+from src.application.services.pdf_page_extractor import PDFPageExtractor
+from src.application.services.pdf_processor import PDFProcessor
+from src.infrastructure.performance.ocr_cache import OCRCache
+
+DIGITAL_TEXT = "Il margine operativo lordo cresce rispetto all'esercizio precedente. " * 3
+
+
+def word_boxes(lines):
+    """image_to_data output for lines of (text, left) words, 40 px apart vertically."""
+    data = {key: [] for key in ("text", "conf", "left", "top", "width", "height", "block_num", "par_num", "line_num")}
+    for line_num, words in enumerate(lines, start=1):
+        for text, left in words:
+            for key, value in (("text", text), ("conf", 90), ("left", left), ("top", 40 * line_num),
+                               ("width", 12 * len(text)), ("height", 20), ("block_num", 1), ("par_num", 1),
+                               ("line_num", line_num)):
+                data[key].append(value)
+    return data
+
+
+class FakeTesseract:
+    """Records the images it is asked to recognize."""
+
+    def __init__(self, data=None):
+        self.calls = []
+        self.data = data or word_boxes([[("testo", 100)]])
+        self._lock = threading.Lock()
+
+    def __call__(self, image, language, with_data=False):
+        with self._lock:
+            self.calls.append((image, language, with_data))
+        return f"testo riconosciuto ({language})", self.data if with_data else None
+
+
+def write_mixed_pdf(path):
+    """Pages 1 and 3 have a text layer, page 2 is a scan (image only)."""
+    doc = fitz.open()
+    for number in (1, 2, 3):
+        page = doc.new_page()
+        if number == 2:
+            scan = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 1240, 1754), False)
+            scan.clear_with(200)
+            page.insert_image(page.rect, pixmap=scan)
+        else:
+            page.insert_text((72, 72), DIGITAL_TEXT[:90])
+            page.insert_text((72, 90), DIGITAL_TEXT[90:180])
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = OCRCache(str(tmp_path / "ocr.sqlite"))
+    yield cache
+    cache.close()
+
+
+class TestOCRService:
+    """Pool, de-duplication and cache behaviour."""
+
+    def test_identical_images_are_recognized_once(self, cache):
+        fake = FakeTesseract()
+        service = OCRService(max_workers=2, cache=cache, ocr_fn=fake)
+
+        results = service.ocr_images([b"scan-a", b"scan-b", b"scan-a"], "ita+eng")
+
+        assert [result.text for result in results] == ["testo riconosciuto (ita+eng)"] * 3
+        assert sorted(call[0] for call in fake.calls) == [b"scan-a", b"scan-b"]
+
+    def test_cache_is_keyed_by_image_and_language(self, cache):
+        fake = FakeTesseract()
+        service = OCRService(max_workers=1, cache=cache, ocr_fn=fake)
+
+        service.ocr_image(b"scan", "ita")
+        again = service.ocr_image(b"scan", "ita")
+        service.ocr_image(b"scan", "eng")
+
+        assert again.cached
+        assert [call[1] for call in fake.calls] == ["ita", "eng"]
+
+    def test_word_data_requests_skip_text_only_entries(self, cache):
+        fake = FakeTesseract()
+        service = OCRService(max_workers=1, cache=cache, ocr_fn=fake)
+
+        service.ocr_image(b"scan", "ita")
+        result = service.ocr_image(b"scan", "ita", with_data=True)
+
+        assert result.data == fake.data
+        assert service.ocr_image(b"scan", "ita").cached
+        assert len(fake.calls) == 2
+
+    def test_text_is_rebuilt_from_word_data(self):
+        data = word_boxes([[("Relazione", 100), ("annuale", 220)], [("2023", 100)], [("Bilancio", 100)]])
+        data["par_num"][-1] = 2
+
+        assert text_from_ocr_data(data) == "Relazione annuale\n2023\n\nBilancio"
+
+    def test_failures_are_reported_and_not_cached(self, cache):
+        def broken(image, language, with_data=False):
+            raise RuntimeError("tesseract crashed")
+
+        service = OCRService(max_workers=1, cache=cache, ocr_fn=broken)
+        result = service.ocr_image(b"scan", "ita")
+
+        assert result.text == "" and "crashed" in result.error
+        assert cache.get_many([OCRCache.make_key("ita", b"scan")]) == {}
+
+
+class TestPageGating:
+    """Only pages without a usable text layer are rasterized and OCR'd."""
+
+    def test_scanned_page_dpi_follows_the_image(self, tmp_path):
+        with fitz.open(write_mixed_pdf(tmp_path / "mixed.pdf")) as doc:
+            # 1240 px across an A4 page (8.26 in) is a 150 dpi scan
+            assert page_ocr_dpi(doc[1], default_dpi=300, min_dpi=100, max_dpi=400) == 150
+            assert page_ocr_dpi(doc[1], default_dpi=300, min_dpi=200, max_dpi=400) == 200
+            assert page_ocr_dpi(doc[0], default_dpi=300) == 300
+
+    def test_processor_ocrs_only_low_text_pages(self, tmp_path, cache):
+        fake = FakeTesseract()
+        processor = PDFProcessor(
+            enable_ocr=False,
+            table_extraction_method="pdfplumber",
+            page_extractor=PDFPageExtractor(max_workers=1),
+            ocr_service=OCRService(max_workers=2, cache=cache, ocr_fn=fake),
+        )
+        processor.enable_ocr = True  # tesseract itself is faked
+
+        result = processor.process_pdf(write_mixed_pdf(tmp_path / "mixed.pdf"))
+
+        assert len(fake.calls) == 1
+        assert [(text.page_number, text.is_ocr) for text in result.texts] == [(1, False), (2, True), (3, False)]
+        assert result.texts[1].text.startswith("testo riconosciuto")
+        assert result.texts[1].source_ref.extraction_method == "tesseract_ocr_ita+eng"
+        assert result.texts[0].source_ref.extraction_method == "pymupdf"
+
+        # Re-upload: the scanned page comes from the cache
+        processor.process_pdf(str(tmp_path / "mixed.pdf"))
+        assert len(fake.calls) == 1
+
+    def test_scanned_pages_keep_their_tables(self, tmp_path, cache):
+        fake = FakeTesseract(word_boxes([
+            [("Conto", 100), ("economico", 172)],
+            [("Ricavi", 100), ("delle", 180), ("vendite", 248), ("1.250,3", 600), ("1.100,0", 800)],
+            [("EBITDA", 100), ("310,2", 624), ("(12,5)", 812)],
+            [("Utile", 100), ("netto", 172), ("98,7", 636), ("87,1", 836)],
+            [("Fonte:", 100), ("bilancio", 184), ("2023", 300)],
+        ]))
+        processor = PDFProcessor(
+            enable_ocr=False,
+            table_extraction_method="pdfplumber",
+            page_extractor=PDFPageExtractor(max_workers=1),
+            ocr_service=OCRService(max_workers=1, cache=cache, ocr_fn=fake),
+        )
+        processor.enable_ocr = True
+
+        result = processor.process_pdf(write_mixed_pdf(tmp_path / "mixed.pdf"))
+
+        assert fake.calls[0][2] is True
+        assert len(result.tables) == 1
+        table = result.tables[0]
+        assert (table.page_number, table.table_index, table.extraction_method) == (2, 0, "tesseract_words")
+        assert table.data == [
+            ["Ricavi delle vendite", "1.250,3", "1.100,0"],
+            ["EBITDA", "310,2", "(12,5)"],
+            ["Utile netto", "98,7", "87,1"],
+        ]
+        assert table.confidence == 0.9
+        assert table.source_ref.page_number == 2
+
+    def test_a_page_that_cannot_be_rendered_does_not_stop_the_others(self, tmp_path, cache):
+        service = OCRService(max_workers=1, cache=cache, ocr_fn=FakeTesseract())
+
+        results = service.ocr_pdf_pages(write_mixed_pdf(tmp_path / "mixed.pdf"), [2, 9], "ita")
+
+        assert results[2].text.startswith("testo riconosciuto") and results[2].error is None
+        assert results[9].text == "" and results[9].error
+
+    def test_ocr_failure_keeps_the_text_layer(self, tmp_path):
+        class BrokenOCR:
+            def ocr_pdf_pages(self, file_path, page_numbers, language, with_data=False):
+                raise RuntimeError("tesseract missing")
+
+        processor = PDFProcessor(
+            enable_ocr=False,
+            table_extraction_method="pdfplumber",
+            page_extractor=PDFPageExtractor(max_workers=1),
+            ocr_service=BrokenOCR(),
+        )
+        processor.enable_ocr = True
+
+        result = processor.process_pdf(write_mixed_pdf(tmp_path / "mixed.pdf"))
+
+        assert [text.page_number for text in result.texts] == [1, 3]
+        assert result.errors == ["OCR failed: tesseract missing"]
@@ -0,0 +1,77 @@
+"""Tests for cached, batched metric mapping in OntologyMapper."""
+
+import pytest
+import yaml
+
+from src.application.services.ontology_mapper import OntologyMapper
+
+ONTOLOGY = {
+    "ricavi": {
+        "canonical_name": "Ricavi",
+        "category": "income_statement",
+        "synonyms": ["ricavi netti", "fatturato", "revenue"],
+    },
+    "ebitda": {
+        "canonical_name": "EBITDA",
+        "category": "income_statement",
+        "synonyms": {"italian": ["margine operativo lordo"], "english": ["ebitda adjusted"]},
+    },
+    "balance_sheet": {
+        "cassa": {"canonical_name": "Cassa e Disponibilità", "synonyms": ["cassa", "disponibilità liquide"]},
+    },
+}
+
+LABELS = ["Ricavi netti", "EBITDA adj.", "Fatturato 2024", "cassa", "Disponibilita liquide", "zzz qwerty", "", "ricavi netti"]
+
+
+@pytest.fixture
+def ontology_file(tmp_path):
+    path = tmp_path / "ontology.yaml"
+    path.write_text(yaml.safe_dump(ONTOLOGY, allow_unicode=True), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def mapper(ontology_file):
+    return OntologyMapper(str(ontology_file))
+
+
+class TestBatchMapping:
+    """batch_map_metrics must agree with map_metric while scoring misses in one pass."""
+
+    def test_batch_matches_single_mapping(self, mapper, ontology_file):
+        reference = OntologyMapper(str(ontology_file))
+        expected = {label: reference.map_metric(label) for label in LABELS}
+
+        assert mapper.batch_map_metrics(LABELS) == expected
+        assert expected["EBITDA adj."]["metric_key"] == "ebitda"
+        assert expected["zzz qwerty"] is None
+
+    def test_repeated_labels_are_served_from_cache(self, mapper, monkeypatch):
+        mapper.batch_map_metrics(LABELS)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("fuzzy scoring should not run for cached labels")
+
+        monkeypatch.setattr(mapper, "_fuzzy_match_many", fail)
+        monkeypatch.setattr(mapper, "_fuzzy_match", fail)
+        assert mapper.batch_map_metrics(["EBITDA adj."])["EBITDA adj."]["metric_key"] == "ebitda"
+        assert mapper.map_metric("Fatturato 2024")["metric_key"] == "ricavi"
+
+    def test_returned_mappings_do_not_alias_the_cache(self, mapper):
+        mapper.map_metric("EBITDA adj.")["canonical_name"] = "changed"
+        assert mapper.map_metric("EBITDA adj.")["canonical_name"] == "EBITDA"
+
+    def test_cache_is_bounded(self, mapper, monkeypatch):
+        monkeypatch.setattr(OntologyMapper, "MAX_CACHED_MAPPINGS", 3)
+        mapper.batch_map_metrics([f"voce {i}" for i in range(10)])
+        assert len(mapper._mapping_cache) == 3
+
+    def test_reload_invalidates_cache(self, mapper, ontology_file):
+        assert mapper.map_metric("utile netto") is None
+
+        ontology = dict(ONTOLOGY, utile={"canonical_name": "Utile Netto", "synonyms": ["utile netto"]})
+        ontology_file.write_text(yaml.safe_dump(ontology, allow_unicode=True), encoding="utf-8")
+        mapper.reload_ontology()
+
+        assert mapper.batch_map_metrics(["utile netto"])["utile netto"]["metric_key"] == "utile"
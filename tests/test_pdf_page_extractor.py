@@ -0,0 +1,150 @@
+"""Tests for page-sharded PDF extraction."""
+
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz
+import pytest
+
+from services.rag_engine import RAGEngine
+from src.application.services import pdf_page_extractor
+from src.application.services.pdf_page_extractor import PageTable, PDFPageExtractor
+from src.application.services.pdf_processor import PDFProcessor
+from src.application.services.table_detector import TableDetector, TableEngineSelector
+
+
+def write_pdf(path, page_count, blank_pages=()):
+    doc = fitz.open()
+    for number in range(1, page_count + 1):
+        page = doc.new_page()
+        if number not in blank_pages:
+            page.insert_text((72, 72), f"Pagina {number}: ricavi netti {number * 1000}")
+            page.insert_text((72, 100), "Il margine operativo lordo cresce rispetto all'esercizio precedente. " * 2)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+class EveryPage(TableDetector):
+    """Treats every page as a table candidate."""
+
+    def __init__(self):
+        super().__init__(min_numeric_rows=0, min_numeric_ratio=0.0)
+
+    def is_candidate(self, signals):
+        return signals is not None
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    return write_pdf(tmp_path / "report.pdf", 7, blank_pages={4})
+
+
+class TestShards:
+    """Page ranges handed to the workers."""
+
+    def test_small_documents_stay_in_one_shard(self):
+        extractor = PDFPageExtractor(max_workers=4, parallel_min_pages=16, min_pages_per_shard=8)
+        assert extractor._shards(10) == [(0, 10)]
+        assert extractor._shards(0) == []
+
+    def test_large_documents_split_into_contiguous_ranges(self):
+        extractor = PDFPageExtractor(max_workers=4, parallel_min_pages=16, min_pages_per_shard=8)
+        assert extractor._shards(400) == [(0, 100), (100, 200), (200, 300), (300, 400)]
+        assert extractor._shards(20) == [(0, 8), (8, 16), (16, 20)]
+
+    def test_single_worker_extracts_in_process(self):
+        assert PDFPageExtractor(max_workers=1, parallel_min_pages=1)._shards(400) == [(0, 400)]
+
+
+class TestExtraction:
+    """Sharded extraction must return the same pages as a single pass, in page order."""
+
+    def test_sharded_matches_single_pass(self, pdf_path):
+        single = PDFPageExtractor(max_workers=1).extract(pdf_path)
+        sharded = PDFPageExtractor(max_workers=2, parallel_min_pages=1, min_pages_per_shard=2).extract(pdf_path)
+
+        assert [page.page_number for page in sharded.pages] == list(range(1, 8))
+        assert [page.text for page in sharded.pages] == [page.text for page in single.pages]
+        assert "Pagina 7" in sharded.pages[6].text
+        assert sharded.pages[3].text.strip() == ""
+        assert sharded.page_count == 7
+
+    def test_falls_back_in_process_when_pool_is_broken(self, pdf_path, monkeypatch):
+        from src.infrastructure.performance import process_pool
+
+        def broken(max_workers=None):
+            raise BrokenProcessPool("worker died")
+
+        monkeypatch.setattr(process_pool, "get_process_pool", broken)
+        pages = PDFPageExtractor(max_workers=2, parallel_min_pages=1, min_pages_per_shard=2).extract(pdf_path)
+        assert [page.page_number for page in pages.pages] == list(range(1, 8))
+
+    def test_tables_are_renumbered_in_page_order(self, pdf_path, monkeypatch):
+        def two_tables_per_page(file_path, page_numbers):
+            return [
+                PageTable(page_number=number, table_index=idx, data=[["1"]], extraction_method="fake_stream")
+                for number in page_numbers for idx in range(2)
+            ]
+
+        monkeypatch.setitem(pdf_page_extractor.TABLE_METHODS, "fake_stream", (True, two_tables_per_page))
+        monkeypatch.setitem(pdf_page_extractor.TABLE_METHODS, "missing", (False, None))
+
+        extractor = PDFPageExtractor(max_workers=1, table_detector=EveryPage(), engine_selector=TableEngineSelector())
+        pages = extractor.extract(pdf_path, table_methods=["missing", "fake_stream"])
+
+        assert pages.table_method == "fake_stream"
+        assert [table.page_number for table in pages.tables] == [1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7]
+        assert [table.table_index for table in pages.tables] == list(range(14))
+
+
+    def test_tabula_tables_keep_their_page(self, pdf_path, monkeypatch):
+        class FakeTabula:
+            calls = []
+
+            @classmethod
+            def read_pdf(cls, file_path, pages, output_format, **kwargs):
+                cls.calls.append(list(pages))
+                return [
+                    {"page_number": page, "data": [[{"text": f"page {page}"}, {"text": ""}]]} for page in pages
+                ] + [{"page_number": pages[0], "data": [[{"text": ""}]]}]
+
+        class OddPages(EveryPage):
+            def is_candidate(self, signals):
+                return signals is not None and signals.page_number in (2, 5, 7)
+
+        monkeypatch.setattr(pdf_page_extractor, "tabula", FakeTabula, raising=False)
+        monkeypatch.setitem(pdf_page_extractor.TABLE_METHODS, "tabula", (True, pdf_page_extractor._tables_tabula))
+
+        extractor = PDFPageExtractor(max_workers=1, table_detector=OddPages(), engine_selector=TableEngineSelector())
+        pages = extractor.extract(pdf_path, table_methods=["tabula"])
+
+        # One batched call; empty tables are dropped
+        assert FakeTabula.calls == [[2, 5, 7]]
+        assert [(table.page_number, table.data) for table in pages.tables] == [
+            (2, [["page 2", ""]]), (5, [["page 5", ""]]), (7, [["page 7", ""]])
+        ]
+
+
+class TestConsumers:
+    """The RAG loader and the enterprise processor share the extractor."""
+
+    def test_processor_keeps_page_provenance(self, pdf_path):
+        processor = PDFProcessor(enable_ocr=False, table_extraction_method="pdfplumber",
+                                 page_extractor=PDFPageExtractor(max_workers=1))
+        result = processor.process_pdf(pdf_path)
+
+        assert [text.page_number for text in result.texts] == [1, 2, 3, 5, 6, 7]
+        assert result.texts[-1].source_ref.page == 7
+        assert result.texts[-1].source_ref.extraction_method == "pymupdf"
+        assert result.page_count == 7
+
+    def test_rag_loader_builds_one_document_per_page(self, pdf_path, monkeypatch):
+        monkeypatch.setattr(pdf_page_extractor, "_pdf_page_extractor", PDFPageExtractor(max_workers=1))
+        engine = RAGEngine.__new__(RAGEngine)
+
+        documents = engine._load_pdf(pdf_path, {"file_type": ".pdf"})
+
+        assert [doc.metadata["page"] for doc in documents] == [1, 2, 3, 5, 6, 7]
+        assert documents[0].metadata["total_pages"] == 7
+        assert documents[0].metadata["file_type"] == ".pdf"
+        assert "ricavi netti 1000" in documents[0].text
@@ -0,0 +1,41 @@
+"""Tests for the compiled keyword matcher of the prompt router."""
+
+import json
+import re
+
+from services.prompt_router import ROUTER, KeywordMatcher, _norm, _score_case, choose_prompt
+
+
+def regex_count(keyword: str, text: str) -> int:
+    kw_re = re.escape(keyword).replace(r"\ ", r"\s+")
+    return len(re.findall(rf"\b{kw_re}\b", text, flags=re.IGNORECASE))
+
+
+class TestKeywordMatcher:
+    """Test that one scan counts keywords like one regex per keyword."""
+
+    def test_counts_match_per_keyword_regex(self):
+        keywords = ["ricavi", "ricavi netti", "inter", "inter-company", "cost center", "ebit", "ebitda"]
+        text = _norm("Ricavi netti e RICAVI;  inter-company costs, cost   center X, EBITDA > ebit, ricavinetti")
+
+        counts = KeywordMatcher(keywords).count(text)
+
+        assert counts == {kw: regex_count(kw, text) for kw in keywords if regex_count(kw, text)}
+        assert counts["ricavi"] == 2 and counts["ricavi netti"] == 1 and counts["inter"] == 1
+
+    def test_same_keyword_occurrences_do_not_overlap(self):
+        assert KeywordMatcher(["ab ab"]).count("ab ab ab") == {"ab ab": 1}
+
+    def test_rule_scores_use_shared_signals(self):
+        text = "Bilancio 2024: ricavi € 1,2 mln, EBITDA in crescita del 5,2%, FY2024 vs FY2023."
+        expected = {name: _score_case(rule, "bilancio.pdf", text) for name, rule in ROUTER.items()}
+
+        name, _, debug = choose_prompt("bilancio.pdf", text)
+
+        assert name == "bilancio"
+        assert debug["scores"] == expected
+
+    def test_structured_json_routes_to_scadenzario(self):
+        text = json.dumps({"aging_bucket": [], "past_due": 10, "dso": 45, "totale_scaduto": 1000})
+
+        assert choose_prompt("export.json", text)[0] == "scadenzario"
@@ -0,0 +1,99 @@
+"""Tests for the bounded LRU/TTL query cache."""
+
+import threading
+import time
+
+from services.query_cache import BoundedTTLCache, QueryCache
+
+
+def _result(answer: str) -> dict:
+    return {"answer": answer, "sources": [], "confidence": 0.9}
+
+
+class TestQueryCache:
+    """Test the QueryCache surface used by RAGEngine."""
+
+    def test_get_set_and_stats(self):
+        cache = QueryCache(ttl_seconds=60, namespace="tenant_a", store=BoundedTTLCache())
+
+        assert cache.get("Qual è l'EBITDA?", 3) is None
+        cache.set("Qual è l'EBITDA?", 3, _result("10 mln"))
+
+        assert cache.get("  qual è l'ebitda?  ", 3)["answer"] == "10 mln"
+        assert cache.get("Qual è l'EBITDA?", 5) is None
+        stats = cache.get_stats()
+        assert stats["cache_size"] == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["hit_rate"] == "33.3%"
+
+    def test_namespaces_are_isolated(self):
+        store = BoundedTTLCache()
+        tenant_a = QueryCache(namespace="tenant_a", store=store)
+        tenant_b = QueryCache(namespace="tenant_b", store=store)
+        tenant_a.set("ricavi", 3, _result("a"))
+        tenant_b.set("ricavi", 3, _result("b"))
+
+        tenant_a.clear()
+
+        assert tenant_a.get("ricavi", 3) is None
+        assert tenant_b.get("ricavi", 3)["answer"] == "b"
+        assert set(store.get_stats()["namespaces"]) == {"tenant_a", "tenant_b"}
+
+    def test_ttl_expiry(self):
+        cache = QueryCache(ttl_seconds=0.05, store=BoundedTTLCache())
+        cache.set("q", 3, _result("x"))
+        time.sleep(0.1)
+
+        assert cache.get("q", 3) is None
+        assert cache.get_stats()["expirations"] == 1
+        assert cache.get_stats()["cache_size"] == 0
+
+
+class TestBoundedTTLCache:
+    """Test capacity bounds and eviction order."""
+
+    def test_lru_eviction_by_entry_count(self):
+        store = BoundedTTLCache(max_entries=2)
+        store.set("ns", "a", 1, 60)
+        store.set("ns", "b", 2, 60)
+        store.get("ns", "a")  # "b" becomes least recently used
+        store.set("ns", "c", 3, 60)
+
+        assert store.get("ns", "b") is None
+        assert store.get("ns", "a") == 1
+        assert store.namespace_stats("ns")["evictions"] == 1
+
+    def test_byte_budget_is_enforced_across_namespaces(self):
+        store = BoundedTTLCache(max_entries=1000, max_bytes=20_000)
+        for i in range(50):
+            store.set(f"tenant_{i % 5}", f"k{i}", "x" * 1000, 60)
+
+        stats = store.get_stats()
+        assert stats["bytes"] <= 20_000
+        assert stats["entries"] < 50
+        assert store.get("tenant_4", "k49") is not None
+
+    def test_oversized_value_is_not_cached(self):
+        store = BoundedTTLCache(max_bytes=100)
+        store.set("ns", "big", "x" * 1000, 60)
+
+        assert store.get_stats()["entries"] == 0
+
+    def test_concurrent_access(self):
+        store = BoundedTTLCache(max_entries=100)
+
+        def worker(offset):
+            for i in range(500):
+                store.set("ns", f"{offset}-{i}", i, 60)
+                store.get("ns", f"{offset}-{i // 2}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = store.get_stats()
+        assert stats["entries"] == 100
+        assert stats["namespaces"]["ns"]["entries"] == 100
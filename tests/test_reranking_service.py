@@ -0,0 +1,67 @@
+"""Tests for batched, cached cross-encoder reranking."""
+
+from services.reranking_service import RerankingService, RerankScoreCache
+
+
+class FakeCrossEncoder:
+    """Cross-encoder scoring pairs by content length, recording each predict call."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, pairs, batch_size=32):
+        self.batches.append([content for _, content in pairs])
+        return [len(content) / 100 for _, content in pairs]
+
+
+def make_service(**kwargs) -> RerankingService:
+    service = RerankingService(backend="torch", score_cache=RerankScoreCache(max_entries=100), **kwargs)
+    service.model = FakeCrossEncoder()
+    service.model_loaded = True
+    return service
+
+
+class TestRerankingService:
+    """Test length bucketing and the pair score cache."""
+
+    def test_batches_group_similar_lengths(self):
+        service = make_service(batch_size=2, max_batch_chars=10_000)
+        contents = ["a" * 10, "b" * 500, "c" * 12, "d" * 480]
+
+        scores = service.score_pairs("ricavi", contents, use_cache=False)
+
+        assert scores == [0.1, 5.0, 0.12, 4.8]
+        assert service.model.batches == [["b" * 500, "d" * 480], ["c" * 12, "a" * 10]]
+
+    def test_padding_budget_splits_batches(self):
+        service = make_service(batch_size=32, max_batch_chars=1_000)
+
+        service.score_pairs("ricavi", ["x" * 400] * 3, use_cache=False)
+
+        assert [len(batch) for batch in service.model.batches] == [2, 1]
+
+    def test_cached_pairs_are_not_rescored(self):
+        service = make_service()
+        service.score_pairs("Ricavi 2023", ["chunk uno", "chunk due"])
+
+        scores = service.score_pairs("  Ricavi   2023 ", ["chunk due", "chunk tre"])
+
+        assert scores == [0.09, 0.09]
+        assert service.model.batches[1] == ["chunk tre"]
+        assert service.score_cache.get_stats()["hits"] == 1
+
+    def test_queries_differing_in_case_are_scored_separately(self):
+        service = make_service()
+        service.score_pairs("EBIT", ["chunk uno"])
+
+        service.score_pairs("ebit", ["chunk uno"])
+
+        assert service.model.batches == [["chunk uno"], ["chunk uno"]]
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = RerankScoreCache(max_entries=2)
+        cache.set_many("m", "q", ["a", "b"], [0.1, 0.2])
+        cache.get_many("m", "q", ["a"])
+        cache.set_many("m", "q", ["c"], [0.3])
+
+        assert cache.get_many("m", "q", ["a", "b", "c"]) == [0.1, None, 0.3]
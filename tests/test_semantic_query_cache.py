@@ -0,0 +1,131 @@
+"""Tests for the semantic second-level query cache."""
+
+from collections import OrderedDict
+import threading
+
+from llama_index.core import Document, Settings, VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.llms import MockLLM
+import numpy as np
+
+from services.document_catalog import DocumentCatalog
+from services.rag_engine import RAGEngine
+from services.semantic_query_cache import SemanticQueryCache
+
+
+def _unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class TestSemanticQueryCache:
+    """Test paraphrase matching, parameter isolation and invalidation."""
+
+    def test_paraphrase_above_threshold_hits(self):
+        cache = SemanticQueryCache(similarity_threshold=0.9)
+        cache.store("tenant_a_docs", "Qual è l'EBITDA 2023?", _unit(1, 0.1, 0), "query|3|standard", {"answer": "5"}, 0)
+
+        hit = cache.lookup("tenant_a_docs", _unit(1, 0.15, 0), "query|3|standard", 0)
+
+        assert hit is not None
+        result, similarity = hit
+        assert result["answer"] == "5"
+        assert similarity > 0.9
+
+    def test_paraphrases_must_name_the_same_numbers_and_entities(self):
+        cache = SemanticQueryCache(similarity_threshold=0.9)
+        cache.store("ns", "Qual è l'EBITDA di Fiat nel 2023?", _unit(1, 0, 0), "p", {"answer": "5"}, 0)
+
+        # Near-identical embeddings, but another year or company
+        assert cache.lookup("ns", _unit(1, 0, 0), "p", 0, query="Qual è l'EBITDA di Fiat nel 2022?") is None
+        assert cache.lookup("ns", _unit(1, 0, 0), "p", 0, query="Qual è l'EBITDA di Stellantis nel 2023?") is None
+        hit = cache.lookup("ns", _unit(1, 0, 0), "p", 0, query="ebitda di fiat per il 2023")
+        assert hit is not None and hit[0]["answer"] == "5"
+
+    def test_dissimilar_query_misses(self):
+        cache = SemanticQueryCache(similarity_threshold=0.9)
+        cache.store("ns", "EBITDA?", _unit(1, 0, 0), "p", {"answer": "5"}, 0)
+
+        assert cache.lookup("ns", _unit(0, 1, 0), "p", 0) is None
+
+    def test_parameters_and_namespaces_are_isolated(self):
+        cache = SemanticQueryCache(similarity_threshold=0.9)
+        cache.store("tenant_a_docs", "EBITDA?", _unit(1, 0, 0), "query|3|standard", {"answer": "a"}, 0)
+
+        assert cache.lookup("tenant_a_docs", _unit(1, 0, 0), "query|5|standard", 0) is None
+        assert cache.lookup("tenant_b_docs", _unit(1, 0, 0), "query|3|standard", 0) is None
+
+    def test_collection_change_invalidates_entries(self, tmp_path):
+        cache = SemanticQueryCache(similarity_threshold=0.9)
+        catalog = DocumentCatalog(str(tmp_path / "docs.sqlite"))
+        version = catalog.content_version
+        cache.store("docs", "EBITDA?", _unit(1, 0, 0), "p", {"answer": "old"}, version)
+
+        # Another worker process changes the collection through its own connection
+        new_version = DocumentCatalog(str(tmp_path / "docs.sqlite")).bump_content_version()
+
+        assert new_version == version + 1
+        assert catalog.content_version == new_version
+        assert cache.lookup("docs", _unit(1, 0, 0), "p", catalog.content_version) is None
+
+    def test_ring_buffer_overwrites_oldest(self):
+        cache = SemanticQueryCache(similarity_threshold=0.99, max_entries=2)
+        cache.store("ns", "q1", _unit(1, 0, 0), "p", {"answer": "1"}, 0)
+        cache.store("ns", "q2", _unit(0, 1, 0), "p", {"answer": "2"}, 0)
+        cache.store("ns", "q3", _unit(0, 0, 1), "p", {"answer": "3"}, 0)
+
+        assert cache.lookup("ns", _unit(1, 0, 0), "p", 0) is None
+        assert cache.lookup("ns", _unit(0, 0, 1), "p", 0)[0]["answer"] == "3"
+        assert cache.get_stats()["namespaces"]["ns"] == 2
+
+
+class CountingEmbedding(MockEmbedding):
+    """Mock embedding counting the queries it embeds."""
+
+    query_calls: int = 0
+    queries: list = []
+
+    def _get_query_embedding(self, query):
+        self.query_calls += 1
+        self.queries.append(query)
+        return super()._get_query_embedding(query)
+
+
+class TestEngineQueryEmbedding:
+    """The query embedded for the semantic cache is reused for retrieval."""
+
+    @staticmethod
+    def _engine(tmp_path, semantic_cache):
+        engine = RAGEngine.__new__(RAGEngine)
+        engine.collection_name = "docs"
+        engine.index = VectorStoreIndex.from_documents([Document(text="Ricavi 2023: 5 milioni")])
+        engine._query_engines = OrderedDict()
+        engine._query_engines_lock = threading.Lock()
+        engine.query_cache = None
+        engine.semantic_cache = semantic_cache
+        engine.document_catalog = DocumentCatalog(str(tmp_path / "docs.sqlite"))
+        return engine
+
+    def test_query_is_embedded_once(self, tmp_path, monkeypatch):
+        embed_model = CountingEmbedding(embed_dim=4)
+        monkeypatch.setattr(Settings, "_embed_model", embed_model)
+        monkeypatch.setattr(Settings, "_llm", MockLLM())
+        engine = self._engine(tmp_path, SemanticQueryCache(similarity_threshold=0.99))
+
+        result = engine.query("Quali sono i ricavi 2023?", top_k=1)
+
+        assert result["sources"]
+        assert embed_model.query_calls == 1
+
+    def test_retrieval_embeds_the_question_with_or_without_the_cache(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(Settings, "_llm", MockLLM())
+        embedded = []
+        for semantic_cache in (SemanticQueryCache(similarity_threshold=0.99), None):
+            embed_model = CountingEmbedding(embed_dim=4)
+            monkeypatch.setattr(Settings, "_embed_model", embed_model)
+
+            self._engine(tmp_path, semantic_cache).query("Quali sono i ricavi 2023?", top_k=1)
+            embedded.append(embed_model.queries)
+
+        # Not the Italian prompt built around it
+        assert embedded == [["Quali sono i ricavi 2023?"], ["Quali sono i ricavi 2023?"]]
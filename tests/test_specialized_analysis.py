@@ -0,0 +1,126 @@
+"""Tests for single-pass specialized analysis in the RAG engine."""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from types import SimpleNamespace
+
+from config.settings import settings
+from services.rag_engine import RAGEngine
+
+
+class FakeQueryEngine:
+    def __init__(self, kwargs):
+        self.kwargs = kwargs
+
+
+class FakeIndex:
+    """Index recording the query engines it builds."""
+
+    def __init__(self):
+        self.engines = []
+
+    def as_query_engine(self, **kwargs):
+        engine = FakeQueryEngine(kwargs)
+        self.engines.append(engine)
+        return engine
+
+
+def make_engine() -> RAGEngine:
+    engine = RAGEngine.__new__(RAGEngine)
+    engine.index = FakeIndex()
+    engine._query_engines = OrderedDict()
+    engine._query_engines_lock = threading.Lock()
+    return engine
+
+
+class TestSpecializedAnalysis:
+    """Test prompt injection, engine reuse and the two-pass option."""
+
+    def test_single_pass_injects_specialized_template(self, monkeypatch):
+        monkeypatch.setattr(settings, "specialized_analysis_mode", "single_pass")
+        engine = make_engine()
+
+        query_engine = engine._create_query_engine(5, analysis_type=engine._single_pass_analysis_type("bilancio"))
+
+        template = query_engine.kwargs["text_qa_template"].get_template()
+        assert "{context_str}" in template and "equity analyst" in template
+        refine = query_engine.kwargs["refine_template"].get_template()
+        assert "{existing_answer}" in refine and "{context_msg}" in refine and "equity analyst" in refine
+        assert not engine._needs_second_pass("bilancio")
+        assert engine._specialized_response("Testo", [], "q", "bilancio") == "[Analisi BILANCIO]\n\nTesto"
+
+    def test_engines_are_reused_per_configuration(self, monkeypatch):
+        monkeypatch.setattr(settings, "specialized_analysis_mode", "single_pass")
+        engine = make_engine()
+
+        first = engine._create_query_engine(5, analysis_type="fatturato")
+        assert engine._create_query_engine(5, analysis_type="fatturato") is first
+        assert engine._create_query_engine(5) is not first
+        assert len(engine.index.engines) == 2
+
+    def test_concurrent_lookups_share_a_bounded_cache(self, monkeypatch):
+        monkeypatch.setattr(RAGEngine, "MAX_CACHED_QUERY_ENGINES", 4)
+        engine = make_engine()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda top_k: engine._create_query_engine(top_k % 6 + 1), range(2000)))
+
+        assert len(engine._query_engines) == 4
+
+    def test_replacing_the_index_drops_cached_engines(self, monkeypatch):
+        from llama_index.core import Settings
+        from llama_index.core.embeddings import MockEmbedding
+        from llama_index.core.vector_stores import SimpleVectorStore
+
+        monkeypatch.setattr(Settings, "_embed_model", MockEmbedding(embed_dim=2))
+        engine = make_engine()
+        stale = engine._create_query_engine(5)
+        engine.client = None  # get_collection fails: an empty index is created
+        engine.vector_store = SimpleVectorStore()
+
+        engine._initialize_index()
+
+        assert engine._query_engines == OrderedDict()
+        assert engine._create_query_engine(5) is not stale
+
+    def test_two_pass_mode_keeps_default_template(self, monkeypatch):
+        monkeypatch.setattr(settings, "specialized_analysis_mode", "two_pass")
+        engine = make_engine()
+        calls = []
+        engine._apply_specialized_analysis = lambda *args: calls.append(args) or "rewritten"
+
+        assert engine._single_pass_analysis_type("bilancio") is None
+        assert engine._specialized_response("Testo", [], "q", "bilancio") == "rewritten"
+        assert engine._specialized_response("Testo", [], "q", "standard") == "Testo"
+        assert len(calls) == 1
+
+    def test_two_pass_rewrite_uses_the_same_instructions(self, monkeypatch):
+        from services import rag_engine
+
+        prompts = []
+
+        class FakeCompletions:
+            def create(self, messages, **kwargs):
+                prompts.append(messages[-1]["content"])
+                message = SimpleNamespace(content="Analisi")
+                return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+        fake_client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+        monkeypatch.setattr(rag_engine, "get_openai_client", lambda api_key: fake_client)
+        engine = make_engine()
+        sources = [{"score": 0.9, "text": "Ricavi 2023: 5 milioni"}]
+
+        answer = engine._apply_specialized_analysis("Ricavi in crescita", sources, "q", "fatturato")
+
+        _, instructions = RAGEngine.SPECIALIZED_ANALYSES["fatturato"]
+        assert answer == "[Analisi FATTURATO]\n\nAnalisi"
+        assert instructions in prompts[0] and "Ricavi in crescita" in prompts[0]
+        assert instructions in RAGEngine._specialized_templates("fatturato")["text_qa_template"].get_template()
+
+    def test_types_without_synthesis_prompt_are_unchanged(self, monkeypatch):
+        monkeypatch.setattr(settings, "specialized_analysis_mode", "single_pass")
+        engine = make_engine()
+
+        assert engine._single_pass_analysis_type("magazzino") is None
+        assert "text_qa_template" not in engine._create_query_engine(3, analysis_type="magazzino").kwargs
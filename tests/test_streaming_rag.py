@@ -0,0 +1,68 @@
+"""Tests for token streaming in the streaming RAG engine."""
+
+import asyncio
+from types import SimpleNamespace
+
+from llama_index.core.schema import NodeWithScore, TextNode
+
+from src.application.services.streaming_rag import StreamingRAGEngine, format_sse
+
+
+class FakeStreamingQueryEngine:
+    """Query engine with split retrieve/synthesize steps and an async token stream."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.events = []
+
+    async def aretrieve(self, query_bundle):
+        self.events.append("retrieve")
+        return [NodeWithScore(node=TextNode(text="Ricavi 2023: 10 milioni", metadata={"source": "bilancio.pdf"}), score=0.9)]
+
+    async def asynthesize(self, query_bundle, nodes):
+        self.events.append("synthesize")
+
+        async def response_gen():
+            for token in self.tokens:
+                yield token
+
+        return SimpleNamespace(async_response_gen=response_gen)
+
+
+def collect(engine: StreamingRAGEngine, query: str):
+    async def run():
+        return [chunk async for chunk in engine.stream_query(query)]
+
+    return asyncio.run(run())
+
+
+class TestStreamingRAGEngine:
+    """Test ordering of sources and tokens and the recorded metrics."""
+
+    def test_sources_precede_tokens(self):
+        query_engine = FakeStreamingQueryEngine(["I ", "ricavi ", "sono ", "10M"])
+        engine = StreamingRAGEngine(query_engine, llm=object(), chunk_size=2)
+
+        chunks = collect(engine, "Quali sono i ricavi?")
+
+        statuses = [chunk.metadata.get("status") for chunk in chunks if chunk.metadata]
+        assert statuses == ["retrieving", "generating", "complete"]
+        assert chunks[1].metadata["sources"][0]["metadata"] == {"source": "bilancio.pdf"}
+        # First token goes out alone, the rest is buffered by chunk_size
+        assert [chunk.token for chunk in chunks[2:-1]] == ["I ", "ricavi sono ", "10M"]
+        assert query_engine.events == ["retrieve", "synthesize"]
+        assert chunks[-1].is_final
+
+    def test_metrics_recorded_per_request(self):
+        engine = StreamingRAGEngine(FakeStreamingQueryEngine(["a", "b", "c"]), llm=object())
+
+        final = collect(engine, "domanda")[-1]
+
+        assert final.metadata["metrics"]["tokens"] == 3
+        assert final.metadata["metrics"]["time_to_first_token"] is not None
+        assert engine.get_metrics_summary()["requests"] == 1
+
+
+def test_format_sse_with_event():
+    assert format_sse({"token": "ciao"}) == 'data: {"token": "ciao"}\n\n'
+    assert format_sse({}, event="close") == "event: close\ndata: {}\n\n"
@@ -0,0 +1,221 @@
+"""Tests for per-page table detection and learned table-engine selection."""
+
+import fitz
+import pytest
+
+from src.application.services import pdf_page_extractor
+from src.application.services.pdf_page_extractor import PageTable, PDFPageExtractor
+from src.application.services.pdf_processor import PDFProcessor
+from src.application.services.table_detector import (
+    TableDetector,
+    TableEngineSelector,
+    page_table_signals,
+)
+
+PROSE = "Il margine operativo lordo cresce rispetto all'esercizio precedente grazie ai nuovi contratti."
+ROWS = [("Ricavi", "1.250,0", "1.100,5"), ("EBITDA", "310,2", "(12,4)"), ("Utile netto", "95,0", "80,1"),
+        ("Debito", "420,0", "455,3")]
+
+
+def write_report(path):
+    """Page 1 prose, page 2 ruled grid, page 3 rows between horizontal rules, page 4 unruled figures."""
+    doc = fitz.open()
+
+    page = doc.new_page()
+    for line in range(6):
+        page.insert_text((72, 72 + 16 * line), PROSE[:80])
+    page.insert_text((72, 200), "Nel 2023 i dipendenti erano 120.")
+
+    for layout in ("grid", "rules", "plain"):
+        page = doc.new_page()
+        page.insert_text((72, 60), "Conto economico consolidato")
+        top, row_height, columns = 100, 20, (72, 250, 400, 520)
+        for idx, row in enumerate(ROWS):
+            y = top + idx * row_height
+            for x, cell in zip(columns, row):
+                page.insert_text((x + 4, y + 14), cell)
+        bottom = top + len(ROWS) * row_height
+        if layout != "plain":
+            for idx in range(len(ROWS) + 1):
+                page.draw_line((columns[0], top + idx * row_height), (columns[-1], top + idx * row_height))
+        if layout == "grid":
+            for x in columns:
+                page.draw_line((x, top), (x, bottom))
+
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+@pytest.fixture
+def report(tmp_path):
+    return write_report(tmp_path / "report.pdf")
+
+
+@pytest.fixture
+def signals(report):
+    with fitz.open(report) as doc:
+        return [page_table_signals(page, number) for number, page in enumerate(doc, 1)]
+
+
+class RecordingEngine:
+    """Fake table engine returning one table per page it is given, except on ``empty_pages``."""
+
+    def __init__(self, name, empty_pages=()):
+        self.name = name
+        self.empty_pages = set(empty_pages)
+        self.pages = []
+
+    def __call__(self, file_path, page_numbers):
+        self.pages.extend(page_numbers)
+        return [
+            PageTable(page_number=number, table_index=0, data=[["1"]], extraction_method=self.name)
+            for number in page_numbers if number not in self.empty_pages
+        ]
+
+
+class TestDetection:
+    """Signals read from the fitz text layer and drawings."""
+
+    def test_layouts(self, signals):
+        assert [page.layout for page in signals] == ["plain", "grid", "rules", "plain"]
+        assert signals[1].vertical_rules >= 4 and signals[2].vertical_rules == 0
+
+    def test_only_table_pages_are_candidates(self, signals):
+        detector = TableDetector(min_numeric_rows=3, min_numeric_ratio=0.2)
+
+        assert [detector.is_candidate(page) for page in signals] == [False, True, True, True]
+        assert signals[0].numeric_rows == 1  # "Nel 2023 ... 120."
+        assert signals[3].numeric_rows == len(ROWS) and signals[3].numeric_ratio == 0.5
+
+    def test_page_frames_and_callout_boxes_are_not_grids(self):
+        detector = TableDetector(min_numeric_rows=3, min_numeric_ratio=0.2)
+        doc = fitz.open()
+        framed = doc.new_page()
+        framed.draw_rect(fitz.Rect(36, 36, 559, 806))
+        framed.draw_rect(fitz.Rect(72, 300, 400, 360))
+        for line in range(6):
+            framed.insert_text((72, 72 + 16 * line), PROSE[:80])
+        lined = doc.new_page()
+        corners = [(36, 36), (559, 36), (559, 806), (36, 806)]
+        for start, end in zip(corners, corners[1:] + corners[:1]):
+            lined.draw_line(start, end)
+        for line in range(6):
+            lined.insert_text((72, 72 + 16 * line), PROSE[:80])
+
+        framed_signals, lined_signals = (page_table_signals(page, number) for number, page in enumerate(doc, 1))
+
+        assert framed_signals.layout == "plain" and not detector.is_candidate(framed_signals)
+        assert lined_signals.layout == "rules" and not detector.is_candidate(lined_signals)
+
+    def test_boxed_cells_make_a_grid(self):
+        doc = fitz.open()
+        page = doc.new_page()
+        for row, (label, current, previous) in enumerate(ROWS):
+            for col, cell in enumerate((label, current, previous)):
+                rect = fitz.Rect(72 + 150 * col, 100 + 20 * row, 222 + 150 * col, 120 + 20 * row)
+                page.draw_rect(rect)
+                page.insert_text((rect.x0 + 4, rect.y1 - 6), cell)
+
+        signals = page_table_signals(page, 1)
+
+        assert signals.layout == "grid"
+        assert TableDetector(min_numeric_rows=3, min_numeric_ratio=0.2).is_candidate(signals)
+
+    def test_scattered_numbers_in_prose_are_not_a_table(self, signals):
+        assert not TableDetector(min_numeric_rows=1, min_numeric_ratio=0.2).is_candidate(signals[0])
+
+
+class TestEngineSelector:
+    """Engine ranking per layout."""
+
+    def test_priors_depend_on_layout(self):
+        selector = TableEngineSelector()
+        methods = ["camelot_lattice", "camelot_stream", "pdfplumber"]
+
+        assert selector.rank("grid", methods)[0] == "camelot_lattice"
+        assert selector.rank("plain", methods)[0] == "camelot_stream"
+
+    def test_failures_demote_an_engine_for_that_layout_only(self):
+        selector = TableEngineSelector()
+        methods = ["camelot_lattice", "camelot_stream", "pdfplumber"]
+        selector.record("grid", "camelot_lattice", tried=10, found=1)
+        selector.record("grid", "pdfplumber", tried=10, found=9)
+
+        assert selector.rank("grid", methods) == ["pdfplumber", "camelot_stream", "camelot_lattice"]
+        assert selector.rank("plain", methods)[0] == "camelot_stream"
+
+
+class TestGatedExtraction:
+    """Only candidate pages reach an engine, and only one engine unless it finds nothing."""
+
+    @pytest.fixture
+    def engines(self, monkeypatch):
+        lattice = RecordingEngine("camelot_lattice", empty_pages={3})
+        stream = RecordingEngine("camelot_stream")
+        monkeypatch.setitem(pdf_page_extractor.TABLE_METHODS, "camelot_lattice", (True, lattice))
+        monkeypatch.setitem(pdf_page_extractor.TABLE_METHODS, "camelot_stream", (True, stream))
+        return lattice, stream
+
+    def extractor(self, selector, max_table_engines=2):
+        return PDFPageExtractor(
+            max_workers=1,
+            max_table_engines=max_table_engines,
+            table_detector=TableDetector(min_numeric_rows=3, min_numeric_ratio=0.2),
+            engine_selector=selector,
+        )
+
+    def test_candidates_go_to_one_engine_with_fallback_on_misses(self, report, engines):
+        lattice, stream = engines
+        selector = TableEngineSelector()
+        selector.PRIORS = {**selector.PRIORS, "rules": ["camelot_lattice", "camelot_stream"]}
+
+        pages = self.extractor(selector).extract(report, table_methods=["camelot_lattice", "camelot_stream"])
+
+        assert sorted(lattice.pages) == [2, 3]
+        assert stream.pages == [4, 3]  # Plain page first choice, then the rules page lattice missed
+        assert [(table.page_number, table.extraction_method) for table in pages.tables] == [
+            (2, "camelot_lattice"), (3, "camelot_stream"), (4, "camelot_stream")
+        ]
+        assert [table.table_index for table in pages.tables] == [0, 1, 2]
+        assert pages.table_method == "camelot_stream"
+
+    def test_engine_choice_is_learned_per_layout(self, report, engines):
+        lattice, stream = engines
+        selector = TableEngineSelector()
+        selector.PRIORS = {**selector.PRIORS, "rules": ["camelot_lattice", "camelot_stream"]}
+        extractor = self.extractor(selector)
+
+        extractor.extract(report, table_methods=["camelot_lattice", "camelot_stream"])
+        lattice.pages.clear()
+        stream.pages.clear()
+        extractor.extract(report, table_methods=["camelot_lattice", "camelot_stream"])
+
+        # Lattice missed the rules page once: stream now goes first there
+        assert lattice.pages == [2]
+        assert sorted(stream.pages) == [3, 4]
+
+    def test_single_engine_budget_skips_fallback(self, report, engines):
+        lattice, stream = engines
+        selector = TableEngineSelector()
+        selector.PRIORS = {**selector.PRIORS, "rules": ["camelot_lattice", "camelot_stream"]}
+
+        pages = self.extractor(selector, max_table_engines=1).extract(
+            report, table_methods=["camelot_lattice", "camelot_stream"]
+        )
+
+        assert stream.pages == [4]
+        assert [table.page_number for table in pages.tables] == [2, 4]
+
+    def test_processor_with_pdfplumber_reads_the_ruled_table(self, report):
+        processor = PDFProcessor(
+            enable_ocr=False,
+            table_extraction_method="pdfplumber",
+            page_extractor=self.extractor(TableEngineSelector()),
+        )
+        result = processor.process_pdf(report)
+
+        assert result.tables and {table.page_number for table in result.tables} <= {2, 3, 4}
+        grid = next(table for table in result.tables if table.page_number == 2)
+        assert grid.headers == list(ROWS[0]) and grid.data[-1] == list(ROWS[-1])
+        assert grid.source_ref.extraction_method == "pdfplumber"
@@ -0,0 +1,149 @@
+"""Tests for the bounded tenant engine registry."""
+
+from collections import OrderedDict
+import threading
+import time
+
+import pytest
+
+from services.rag_engine import RAGEngine
+from src.application.services.enterprise_orchestrator import EnterpriseOrchestrator
+from src.infrastructure.performance.tenant_engine_registry import TenantEngineRegistry
+
+
+class FakeEngine:
+    def __init__(self, tenant_id, size=10):
+        self.tenant_id = tenant_id
+        self.size = size
+
+
+class TestTenantEngineRegistry:
+    """Test reuse, LRU/idle/memory eviction and single construction per tenant."""
+
+    def test_engine_is_built_once_and_reused(self):
+        registry = TenantEngineRegistry()
+        built = []
+
+        def factory():
+            built.append("a")
+            return FakeEngine("a")
+
+        first = registry.get_or_create("a", factory)
+        second = registry.get_or_create("a", factory)
+
+        assert first is second
+        assert built == ["a"]
+        assert registry.get_stats()["hits"] == 1
+
+    def test_lru_eviction_by_count(self):
+        evicted = []
+        registry = TenantEngineRegistry(max_engines=2, on_evict=lambda tenant_id, _: evicted.append(tenant_id))
+        for tenant_id in ("a", "b"):
+            registry.get_or_create(tenant_id, lambda t=tenant_id: FakeEngine(t))
+        registry.get_or_create("a", lambda: FakeEngine("a"))  # "b" becomes least recently used
+
+        registry.get_or_create("c", lambda: FakeEngine("c"))
+
+        assert evicted == ["b"]
+        assert "a" in registry and "c" in registry
+
+    def test_memory_budget_eviction(self):
+        registry = TenantEngineRegistry(max_memory_bytes=25, size_fn=lambda engine: engine.size)
+        registry.get_or_create("a", lambda: FakeEngine("a", size=10))
+        registry.get_or_create("b", lambda: FakeEngine("b", size=10))
+
+        registry.get_or_create("c", lambda: FakeEngine("c", size=10))
+
+        assert "a" not in registry
+        assert registry.get_stats()["memory_bytes"] == 20
+        assert registry.get_stats()["evictions_memory"] == 1
+
+    def test_idle_engines_are_evicted(self):
+        registry = TenantEngineRegistry(idle_timeout_seconds=0.05)
+        registry.get_or_create("a", lambda: FakeEngine("a"))
+        time.sleep(0.1)
+
+        registry.get_or_create("b", lambda: FakeEngine("b"))
+
+        assert "a" not in registry
+        assert registry.get_stats()["evictions_idle"] == 1
+
+    def test_concurrent_requests_build_one_engine(self):
+        registry = TenantEngineRegistry()
+        built = []
+
+        def slow_factory():
+            built.append(1)
+            time.sleep(0.05)
+            return FakeEngine("a")
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(registry.get_or_create("a", slow_factory)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(built) == 1
+        assert all(engine is results[0] for engine in results)
+
+    def test_failed_build_releases_its_lock(self):
+        registry = TenantEngineRegistry()
+
+        def broken_factory():
+            raise RuntimeError("qdrant unreachable")
+
+        with pytest.raises(RuntimeError):
+            registry.get_or_create("a", broken_factory)
+
+        assert registry._build_locks == {}
+        assert registry.get_or_create("a", lambda: FakeEngine("a")).tenant_id == "a"
+
+    def test_leased_engines_are_closed_after_their_last_request(self):
+        closed = []
+        registry = TenantEngineRegistry(max_engines=1, on_evict=lambda tenant_id, _: closed.append(tenant_id))
+
+        with registry.lease("a", lambda: FakeEngine("a")) as engine:
+            assert registry.retain(engine)  # e.g. a background task started by the request
+            registry.get_or_create("b", lambda: FakeEngine("b"))
+
+            assert "a" not in registry
+            assert closed == []
+            assert registry.get_stats()["evicted_in_use"] == 1
+
+        assert closed == []
+        registry.release(engine)
+        assert closed == ["a"]
+        assert registry.get_stats()["leased_engines"] == 0
+
+        # Engines without leases are closed at eviction, and cannot be retained
+        registry.get_or_create("c", lambda: FakeEngine("c"))
+        assert closed == ["a", "b"]
+        assert not registry.retain(FakeEngine("x"))
+
+
+class TestEngineClose:
+    """Evicted engines release their own connections."""
+
+    def test_close_releases_the_fact_table(self):
+        class FakeFactTable:
+            closed = False
+
+            def close(self):
+                self.closed = True
+
+        fact_table = FakeFactTable()
+        engine = RAGEngine.__new__(RAGEngine)
+        engine.enterprise_orchestrator = EnterpriseOrchestrator.__new__(EnterpriseOrchestrator)
+        engine.enterprise_orchestrator.fact_table_repo = fact_table
+        engine._query_engines = OrderedDict(cached=object())
+        engine._query_engines_lock = threading.Lock()
+
+        engine.close()
+
+        assert fact_table.closed
+        assert engine.enterprise_orchestrator.fact_table_repo is None
+        assert not engine._query_engines
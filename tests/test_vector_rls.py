@@ -0,0 +1,82 @@
+"""Tests for the compilation of RLS filters into Qdrant payload filters."""
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, FieldCondition, Filter, IsEmptyCondition, MatchAny, PointStruct, VectorParams
+
+from src.core.security.access_control import AccessConstraint, RLSFilter
+from src.core.security.vector_rls import compile_rls_filter
+
+
+class TestCompileRLSFilter:
+    """Test mapping of access constraints to chunk payload conditions."""
+
+    def test_bypass_returns_no_filter(self):
+        assert compile_rls_filter(RLSFilter(constraints=[], metadata={"bypass": True})) is None
+
+    def test_entity_constraint_keeps_untagged_chunks(self):
+        rls_filter = RLSFilter(constraints=[AccessConstraint("entity_id", "in", ["Azienda_A", "Azienda_B"])])
+
+        compiled = compile_rls_filter(rls_filter)
+
+        entity_filter = compiled.must[0]
+        match, missing = entity_filter.should
+        assert isinstance(match, FieldCondition) and match.key == "entity"
+        assert isinstance(match.match, MatchAny) and match.match.any == ["Azienda_A", "Azienda_B"]
+        assert isinstance(missing, IsEmptyCondition) and missing.is_empty.key == "entity"
+
+    def test_classification_above_default_excludes_missing_level(self):
+        rls_filter = RLSFilter(constraints=[AccessConstraint("classification_level", "lte", 1)])
+
+        level_filter = compile_rls_filter(rls_filter).must[0]
+
+        assert level_filter.should is None
+        assert level_filter.must[0].range.lte == 1
+
+    def test_fallback_and_unknown_operator_deny_access(self):
+        denied = compile_rls_filter(RLSFilter(constraints=[], metadata={"fallback": True}))
+        assert denied.must == denied.must_not
+
+        unknown = compile_rls_filter(RLSFilter(constraints=[AccessConstraint("period", "regex", "20.*")]))
+        assert isinstance(unknown.must[0], Filter)
+        assert unknown.must[0].must == unknown.must[0].must_not
+
+    def test_unmapped_fields_are_skipped(self):
+        rls_filter = RLSFilter(constraints=[AccessConstraint("tenant_id", "eq", "tenant_a")])
+
+        assert compile_rls_filter(rls_filter) is None
+
+
+class TestRLSFilterInQdrant:
+    """Compiled filters select the expected points of a real (in-memory) collection."""
+
+    POINTS = {
+        1: {"entity": "Azienda_A", "classification_level": 1},
+        2: {"entity": "Azienda_A", "classification_level": 3},
+        3: {"entity": "Azienda_B", "classification_level": 2},
+        4: {"entity": "Azienda_A"},  # Untagged level counts as INTERNAL
+        5: {"classification_level": 4},  # Untagged entity stays visible
+    }
+
+    def visible(self, rls_filter):
+        client = QdrantClient(":memory:")
+        client.create_collection("rls", vectors_config=VectorParams(size=2, distance=Distance.COSINE))
+        client.upsert("rls", [PointStruct(id=idx, vector=[1.0, 0.0], payload=p) for idx, p in self.POINTS.items()])
+
+        points, _ = client.scroll("rls", scroll_filter=compile_rls_filter(rls_filter))
+        return sorted(point.id for point in points)
+
+    def test_entity_and_classification_filters(self):
+        def visible(*constraints):
+            return self.visible(RLSFilter(constraints=list(constraints)))
+
+        assert visible(AccessConstraint("entity_id", "in", ["Azienda_A"])) == [1, 2, 4, 5]
+        assert visible(AccessConstraint("classification_level", "lte", 2)) == [1, 3, 4]
+        assert visible(AccessConstraint("classification_level", "lte", 1)) == [1]
+        assert visible(AccessConstraint("classification_level", "gte", 3)) == [2, 5]
+        assert visible(
+            AccessConstraint("entity_id", "in", ["Azienda_A"]), AccessConstraint("classification_level", "lte", 2)
+        ) == [1, 4]
+
+    def test_bypass_sees_everything_and_fallback_nothing(self):
+        assert self.visible(RLSFilter(constraints=[], metadata={"bypass": True})) == [1, 2, 3, 4, 5]
+        assert self.visible(RLSFilter(constraints=[], metadata={"fallback": True})) == []